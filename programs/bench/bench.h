@@ -0,0 +1,135 @@
+// Common start-up, iteration loop and result signature for the Vigna benchmarks
+//
+// A benchmark includes this file first, then defines
+//
+//     static void bench_init(void);               untimed set-up
+//     static uint32_t bench_iteration(uint32_t i); one timed iteration
+//
+// with BENCH_ITERATIONS defined before the include. Every iteration starts
+// with a store of its index to BENCH_MARK, and the end of the last one with a
+// store of BENCH_ITERATIONS, so the program harness (+mark=...) timestamps
+// each iteration. The signature at BENCH_OUTPUT holds
+//
+//     [0] BENCH_ITERATIONS  [1] checksum of all iteration results  [2] BENCH_DONE
+//
+// Built with -DBENCH_HOST the same kernels run natively and print the
+// checksum; programs/bench/suite.json records the native results.
+
+#ifndef BENCH_H
+#define BENCH_H
+
+#include <stdint.h>
+
+#define BENCH_OUTPUT 0x8000
+#define BENCH_MARK   0x8010
+#define BENCH_DONE   0x600DBE4C
+
+static void bench_init(void);
+static uint32_t bench_iteration(uint32_t i);
+
+static inline uint32_t bench_rotl(uint32_t x, uint32_t n)
+{
+    return (x << n) | (x >> (32 - n));
+}
+
+#ifdef BENCH_HOST
+
+#include <stdio.h>
+
+int main(void)
+{
+    uint32_t checksum = 0;
+    bench_init();
+    for (uint32_t i = 0; i < BENCH_ITERATIONS; i++)
+        checksum = bench_rotl(checksum, 1) ^ bench_iteration(i);
+    printf("%u 0x%08X\n", (unsigned)BENCH_ITERATIONS, (unsigned)checksum);
+    return 0;
+}
+
+#else
+
+// Without the M extension GCC calls these libgcc routines; the test
+// toolchain has no rv32 libgcc, so the benchmarks bring their own.
+#ifndef __riscv_mul
+uint32_t __mulsi3(uint32_t a, uint32_t b)
+{
+    uint32_t result = 0;
+    while (b) {
+        if (b & 1)
+            result += a;
+        a <<= 1;
+        b >>= 1;
+    }
+    return result;
+}
+#endif
+
+#ifndef __riscv_div
+static uint32_t bench_udivmod(uint32_t n, uint32_t d, uint32_t *rem)
+{
+    uint32_t q = 0, r = 0;
+    for (int bit = 31; bit >= 0; bit--) {
+        r = (r << 1) | ((n >> bit) & 1);
+        if (r >= d) {
+            r -= d;
+            q |= 1u << bit;
+        }
+    }
+    *rem = r;
+    return q;
+}
+
+uint32_t __udivsi3(uint32_t n, uint32_t d)
+{
+    uint32_t r;
+    return bench_udivmod(n, d, &r);
+}
+
+uint32_t __umodsi3(uint32_t n, uint32_t d)
+{
+    uint32_t r;
+    bench_udivmod(n, d, &r);
+    return r;
+}
+
+int32_t __divsi3(int32_t n, int32_t d)
+{
+    uint32_t r;
+    uint32_t q = bench_udivmod(n < 0 ? -(uint32_t)n : (uint32_t)n,
+                               d < 0 ? -(uint32_t)d : (uint32_t)d, &r);
+    return (n < 0) != (d < 0) ? -(int32_t)q : (int32_t)q;
+}
+
+int32_t __modsi3(int32_t n, int32_t d)
+{
+    uint32_t r;
+    bench_udivmod(n < 0 ? -(uint32_t)n : (uint32_t)n, d < 0 ? -(uint32_t)d : (uint32_t)d, &r);
+    return n < 0 ? -(int32_t)r : (int32_t)r;
+}
+#endif
+
+__attribute__((section(".text.start"), noreturn))
+void _start(void)
+{
+    volatile uint32_t *output = (volatile uint32_t *)BENCH_OUTPUT;
+    volatile uint32_t *mark = (volatile uint32_t *)BENCH_MARK;
+    uint32_t checksum = 0;
+
+    bench_init();
+    for (uint32_t i = 0; i < BENCH_ITERATIONS; i++) {
+        *mark = i;
+        checksum = bench_rotl(checksum, 1) ^ bench_iteration(i);
+    }
+    *mark = BENCH_ITERATIONS;
+
+    output[0] = BENCH_ITERATIONS;
+    output[1] = checksum;
+    output[2] = BENCH_DONE;
+
+    // Infinite loop to halt processor
+    while (1) {}
+}
+
+#endif
+
+#endif
@@ -0,0 +1,29 @@
+// Compact-code benchmark: a tight xorshift / table loop using few registers
+// and small immediates, so nearly every instruction has a 16-bit RVC form
+
+#define BENCH_ITERATIONS 4
+#include "bench.h"
+
+static uint32_t table[16];
+
+static void bench_init(void)
+{
+    for (uint32_t k = 0; k < 16; k++)
+        table[k] = k;
+}
+
+static uint32_t bench_iteration(uint32_t i)
+{
+    uint32_t x = i + 1;
+    uint32_t acc = 0;
+
+    for (uint32_t n = 0; n < 64; n++) {
+        x ^= x << 13;
+        x ^= x >> 17;
+        x ^= x << 5;
+        acc += x & 0xFF;
+        table[x & 15] ^= acc;
+        acc ^= table[n & 15];
+    }
+    return acc ^ x;
+}
@@ -0,0 +1,38 @@
+// CRC benchmark: bitwise (table-free) CRC-32 of a 128-byte buffer, shift and
+// branch heavy
+
+#define BENCH_ITERATIONS 4
+#include "bench.h"
+
+#define LEN 128
+
+static uint8_t buffer[LEN];
+
+static void bench_init(void)
+{
+    uint32_t seed = 0xC0FFEE;
+    for (uint32_t k = 0; k < LEN; k++) {
+        seed ^= seed << 13;
+        seed ^= seed >> 17;
+        seed ^= seed << 5;
+        buffer[k] = (uint8_t)seed;
+    }
+}
+
+static uint32_t crc32(const uint8_t *p, uint32_t n, uint32_t crc)
+{
+    crc = ~crc;
+    while (n--) {
+        crc ^= *p++;
+        for (uint32_t bit = 0; bit < 8; bit++)
+            crc = (crc >> 1) ^ (0xEDB88320u & (0u - (crc & 1)));
+    }
+    return ~crc;
+}
+
+static uint32_t bench_iteration(uint32_t i)
+{
+    uint32_t crc = crc32(buffer, LEN, i);
+    buffer[i & (LEN - 1)] ^= (uint8_t)crc;
+    return crc;
+}
@@ -0,0 +1,49 @@
+// Divide benchmark: decimal digit sums, signed quotients and remainders and
+// Euclid's GCD over 8 values (software division without the M extension)
+
+#define BENCH_ITERATIONS 4
+#include "bench.h"
+
+#define COUNT 8
+
+static uint32_t values[COUNT];
+
+static void bench_init(void)
+{
+    uint32_t seed = 0x5EED;
+    for (uint32_t k = 0; k < COUNT; k++) {
+        seed ^= seed << 13;
+        seed ^= seed >> 17;
+        seed ^= seed << 5;
+        values[k] = seed;
+    }
+}
+
+static uint32_t bench_iteration(uint32_t i)
+{
+    uint32_t sum = 0;
+
+    for (uint32_t k = 0; k < COUNT; k++) {
+        uint32_t v = values[k] ^ i;
+        uint32_t digits = 0;
+        while (v) {
+            digits += v % 10;
+            v /= 10;
+        }
+
+        int32_t s = (int32_t)(values[k] >> 1) - 0x40000000;
+        int32_t d = ((int32_t)k - 16) | 1;
+
+        uint32_t a = values[k] | 1;
+        uint32_t b = (values[(k + 1) & (COUNT - 1)] >> 16) + i + 1;
+        while (b) {
+            uint32_t t = a % b;
+            a = b;
+            b = t;
+        }
+
+        sum = bench_rotl(sum, 7) ^ digits ^ (uint32_t)(s / d) ^ (uint32_t)(s % d) ^ a;
+    }
+    values[i & (COUNT - 1)] = sum;
+    return sum;
+}
@@ -0,0 +1,74 @@
+// Linked-list benchmark (CoreMark style): count, reverse, insertion-sort and
+// fold a 32-node list held in a static pool
+
+#define BENCH_ITERATIONS 4
+#include "bench.h"
+
+#define NODES 32
+
+struct node {
+    struct node *next;
+    int32_t data;
+};
+
+static struct node pool[NODES];
+static struct node *head;
+
+static void bench_init(void)
+{
+    uint32_t seed = 0x1234;
+    for (uint32_t i = 0; i < NODES; i++) {
+        seed ^= seed << 13;
+        seed ^= seed >> 17;
+        seed ^= seed << 5;
+        pool[i].data = (int32_t)(seed & 0x3FF) - 512;
+        pool[i].next = i + 1 < NODES ? &pool[i + 1] : (struct node *)0;
+    }
+    head = &pool[0];
+}
+
+static struct node *list_reverse(struct node *list)
+{
+    struct node *reversed = (struct node *)0;
+    while (list) {
+        struct node *next = list->next;
+        list->next = reversed;
+        reversed = list;
+        list = next;
+    }
+    return reversed;
+}
+
+static struct node *list_sort(struct node *list)
+{
+    struct node *sorted = (struct node *)0;
+    while (list) {
+        struct node *n = list;
+        struct node **p = &sorted;
+        list = list->next;
+        while (*p && (*p)->data <= n->data)
+            p = &(*p)->next;
+        n->next = *p;
+        *p = n;
+    }
+    return sorted;
+}
+
+static uint32_t bench_iteration(uint32_t i)
+{
+    int32_t key = (int32_t)(i << 5) - 256;
+    uint32_t found = 0;
+    uint32_t sum = 0;
+    struct node *n;
+
+    for (n = head; n; n = n->next)
+        if (n->data > key)
+            found++;
+    head = list_sort(list_reverse(head));
+    for (n = head; n; n = n->next)
+        sum = bench_rotl(sum, 3) ^ (uint32_t)n->data;
+
+    // Change the smallest element so the next iteration sorts a new list
+    head->data ^= (int32_t)(found + i);
+    return sum + found;
+}
@@ -0,0 +1,45 @@
+// Matrix benchmark (CoreMark style): 8x8 integer multiply-accumulate with a
+// per-iteration feedback into the left operand
+
+#define BENCH_ITERATIONS 4
+#include "bench.h"
+
+#define N 8
+
+static int32_t mat_a[N][N];
+static int32_t mat_b[N][N];
+static int32_t mat_c[N][N];
+
+static void bench_init(void)
+{
+    uint32_t seed = 0xACE1;
+    for (uint32_t r = 0; r < N; r++) {
+        for (uint32_t c = 0; c < N; c++) {
+            seed ^= seed << 13;
+            seed ^= seed >> 17;
+            seed ^= seed << 5;
+            mat_a[r][c] = (int32_t)(seed & 0xFF) - 128;
+            mat_b[r][c] = (int32_t)((seed >> 8) & 0xFF) - 128;
+        }
+    }
+}
+
+static uint32_t bench_iteration(uint32_t i)
+{
+    uint32_t sum = 0;
+
+    for (uint32_t r = 0; r < N; r++) {
+        for (uint32_t c = 0; c < N; c++) {
+            int32_t acc = 0;
+            for (uint32_t k = 0; k < N; k++)
+                acc += mat_a[r][k] * mat_b[k][c];
+            mat_c[r][c] = acc + (int32_t)i;
+        }
+    }
+    for (uint32_t r = 0; r < N; r++)
+        for (uint32_t c = 0; c < N; c++)
+            sum = bench_rotl(sum, 1) ^ (uint32_t)mat_c[r][c];
+
+    mat_a[i & (N - 1)][(i * 3) & (N - 1)] ^= (int32_t)(sum & 0x7F);
+    return sum;
+}
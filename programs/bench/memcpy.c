@@ -0,0 +1,47 @@
+// Copy benchmark: 512-byte word copy plus a byte copy to a misaligned
+// destination, then a fold over the result
+
+#define BENCH_ITERATIONS 4
+#include "bench.h"
+
+#define BYTES 512
+#define WORDS (BYTES / 4)
+
+static uint32_t src_words[WORDS];
+static uint32_t dst_words[WORDS + 1];
+
+static void bench_init(void)
+{
+    uint32_t seed = 0xBADC0DE;
+    for (uint32_t k = 0; k < WORDS; k++) {
+        seed ^= seed << 13;
+        seed ^= seed >> 17;
+        seed ^= seed << 5;
+        src_words[k] = seed;
+    }
+}
+
+static void copy_words(uint32_t *dst, const uint32_t *src, uint32_t n)
+{
+    while (n--)
+        *dst++ = *src++;
+}
+
+static void copy_bytes(uint8_t *dst, const uint8_t *src, uint32_t n)
+{
+    while (n--)
+        *dst++ = *src++;
+}
+
+static uint32_t bench_iteration(uint32_t i)
+{
+    uint32_t sum = 0;
+
+    copy_words(dst_words, src_words, WORDS);
+    copy_bytes((uint8_t *)dst_words + 1 + (i & 3), (const uint8_t *)src_words, BYTES - 8);
+    for (uint32_t k = 0; k <= WORDS; k++)
+        sum = bench_rotl(sum, 1) ^ dst_words[k];
+
+    src_words[i & (WORDS - 1)] += sum;
+    return sum;
+}
@@ -0,0 +1,41 @@
+// Sorting benchmark: bubble sort of 32 pseudo-random words, the nested
+// compare-and-swap loops of sorting_test.c on unsorted data, so both the
+// backward loop branches and the data-dependent swap branch are exercised
+
+#define BENCH_ITERATIONS 4
+#include "bench.h"
+
+#define LEN 32
+
+static int32_t data[LEN];
+static uint32_t seed;
+
+static void bench_init(void)
+{
+    seed = 0x5EED;
+}
+
+static uint32_t bench_iteration(uint32_t i)
+{
+    for (uint32_t k = 0; k < LEN; k++) {
+        seed ^= seed << 13;
+        seed ^= seed >> 17;
+        seed ^= seed << 5;
+        data[k] = (int32_t)(seed & 0xFFF) - 2048;
+    }
+
+    for (uint32_t n = LEN - 1; n > 0; n--) {
+        for (uint32_t k = 0; k < n; k++) {
+            if (data[k] > data[k + 1]) {
+                int32_t temp = data[k];
+                data[k] = data[k + 1];
+                data[k + 1] = temp;
+            }
+        }
+    }
+
+    uint32_t fold = i;
+    for (uint32_t k = 0; k < LEN; k++)
+        fold = bench_rotl(fold, 3) ^ (uint32_t)data[k];
+    return fold;
+}
@@ -0,0 +1,108 @@
+// State-machine benchmark (CoreMark style): classify comma-separated number
+// tokens (integer, float, scientific, hex, invalid) and count transitions
+
+#define BENCH_ITERATIONS 8
+#include "bench.h"
+
+enum {
+    S_START, S_SIGN, S_ZERO, S_INT, S_DOT, S_FLOAT, S_EXP, S_EXPSIGN, S_SCI,
+    S_XPREFIX, S_HEX, S_INVALID, S_COUNT
+};
+
+static char input[] =
+    "5012,1234,-874,+122,7.5e-2,0x1F,3.14,-.5,9e9,abc,0x,12e,+,66.0E+3,"
+    "-0.001,17,1.2.3,0xDEAD,42,-7,0,00,.,8e+,0XbeeF,123456789,-0.0e0,x1";
+
+static uint32_t counts[S_COUNT];
+
+static void bench_init(void)
+{
+}
+
+static int is_digit(char c)
+{
+    return c >= '0' && c <= '9';
+}
+
+static int is_hex(char c)
+{
+    return is_digit(c) || (c >= 'a' && c <= 'f') || (c >= 'A' && c <= 'F');
+}
+
+static uint32_t next_state(uint32_t state, char c)
+{
+    switch (state) {
+    case S_START:
+        if (c == '0')
+            return S_ZERO;
+        if (is_digit(c))
+            return S_INT;
+        if (c == '+' || c == '-')
+            return S_SIGN;
+        return c == '.' ? S_DOT : S_INVALID;
+    case S_SIGN:
+        if (is_digit(c))
+            return S_INT;
+        return c == '.' ? S_DOT : S_INVALID;
+    case S_ZERO:
+        if (c == 'x' || c == 'X')
+            return S_XPREFIX;
+        // A leading zero otherwise behaves like any other digit
+        // fall through
+    case S_INT:
+        if (is_digit(c))
+            return S_INT;
+        if (c == '.')
+            return S_FLOAT;
+        return c == 'e' || c == 'E' ? S_EXP : S_INVALID;
+    case S_DOT:
+        return is_digit(c) ? S_FLOAT : S_INVALID;
+    case S_FLOAT:
+        if (is_digit(c))
+            return S_FLOAT;
+        return c == 'e' || c == 'E' ? S_EXP : S_INVALID;
+    case S_EXP:
+        if (c == '+' || c == '-')
+            return S_EXPSIGN;
+        return is_digit(c) ? S_SCI : S_INVALID;
+    case S_EXPSIGN:
+    case S_SCI:
+        return is_digit(c) ? S_SCI : S_INVALID;
+    case S_XPREFIX:
+    case S_HEX:
+        return is_hex(c) ? S_HEX : S_INVALID;
+    default:
+        return S_INVALID;
+    }
+}
+
+static uint32_t bench_iteration(uint32_t i)
+{
+    uint32_t state = S_START;
+    uint32_t transitions = 0;
+    uint32_t sum = 0;
+
+    for (uint32_t k = 0; k < S_COUNT; k++)
+        counts[k] = 0;
+    for (const char *p = input;; p++) {
+        if (*p == ',' || *p == '\0') {
+            counts[state]++;
+            state = S_START;
+            if (*p == '\0')
+                break;
+            continue;
+        }
+        uint32_t next = next_state(state, *p);
+        if (next != state)
+            transitions++;
+        state = next;
+    }
+    for (uint32_t k = 0; k < S_COUNT; k++)
+        sum = bench_rotl(sum, 5) ^ counts[k];
+
+    // Corrupt one character (never a separator) for the next iteration
+    uint32_t at = (i * 7) & 63;
+    if (input[at] != ',')
+        input[at] ^= 0x01;
+    return sum ^ (transitions << 16);
+}
@@ -1,4 +1,4 @@
-// Verilog memory initialization from: build/sorting_test.bin
+// Verilog memory initialization from: build/sorting_test.elf
 // Generated by bin_to_verilog_mem.py
 // Base address: 0x00000000
 // Format: assignments
@@ -47,4 +47,9 @@
         instruction_memory[ 41] = 32'h00b6a823;
         instruction_memory[ 42] = 32'h00e7aa23;
         instruction_memory[ 43] = 32'h0000006f;
-        // End of program (176 bytes, 44 words)
+        instruction_memory[ 44] = 32'h00000005;
+        instruction_memory[ 45] = 32'h00000002;
+        instruction_memory[ 46] = 32'h00000008;
+        instruction_memory[ 47] = 32'h00000001;
+        instruction_memory[ 48] = 32'h00000009;
+        // End of program (196 bytes, 49 words)
@@ -0,0 +1,201 @@
+//////////////////////////////////////////////////////////////////////////////////
+// Company: Wuhan University
+// Engineer:
+//
+// Create Date: 2026/10/17
+// Design Name: axi_backpressure_test
+// Module Name: axi_backpressure_test
+// Project Name: vigna
+// Description: Run a program through vigna_axi under AXI back-pressure
+//
+// Dependencies: vigna_axi.v, vigna_axi_mem_model.v
+//
+// Revision:
+// Revision 1.0 - Ready stalls, latency, jitter, bank conflicts, sparse memory
+// Additional Comments:
+// The image (+image=<file>, default sorting_test.mem) is run once without
+// stalls and then under each memory setting below; every run must halt with
+// the same words in the result region (+sig_begin/+sig_end, default
+// 0x1000-0x1018). Cycle counts are reported for comparison.
+//////////////////////////////////////////////////////////////////////////////////
+
+`timescale 1ns / 1ps
+`include "vigna_conf.vh"
+`include "sim/vigna_mem_model.v"
+`include "sim/vigna_axi_mem_model.v"
+
+module axi_backpressure_test;
+
+    localparam SETTINGS   = 7;
+    localparam MEM_SIZE   = 64 * 1024;
+    localparam MAX_CYCLES = 50000;
+    localparam MAX_WORDS  = 64;
+
+    reg clk;
+    reg resetn;
+
+    wire        i_arvalid, i_arready;
+    wire [31:0] i_araddr;
+    wire [ 2:0] i_arprot;
+    wire        i_rvalid, i_rready;
+    wire [31:0] i_rdata;
+    wire [ 1:0] i_rresp;
+
+    wire        d_arvalid, d_arready;
+    wire [31:0] d_araddr;
+    wire [ 2:0] d_arprot;
+    wire        d_rvalid, d_rready;
+    wire [31:0] d_rdata;
+    wire [ 1:0] d_rresp;
+
+    wire        d_awvalid, d_awready;
+    wire [31:0] d_awaddr;
+    wire [ 2:0] d_awprot;
+    wire        d_wvalid, d_wready;
+    wire [31:0] d_wdata;
+    wire [ 3:0] d_wstrb;
+    wire        d_bvalid, d_bready;
+    wire [ 1:0] d_bresp;
+
+    reg [1023:0] image_file;
+    reg [31:0]   sig_begin;
+    reg [31:0]   sig_end;
+    reg [31:0]   reference [0:MAX_WORDS-1];
+    reg [255:0]  name;
+
+    integer cycles;
+    integer reference_cycles;
+    integer same_count;
+    reg [31:0] last_pc;
+    reg [31:0] halt_word;
+    integer test_pass_count;
+    integer test_fail_count;
+    integer s, w, mismatches;
+
+    vigna_axi uut (
+        .clk(clk),
+        .resetn(resetn),
+`ifdef VIGNA_CORE_INTERRUPT
+        .ext_irq(1'b0),
+        .timer_irq(1'b0),
+        .soft_irq(1'b0),
+`endif
+        .i_arvalid(i_arvalid), .i_arready(i_arready), .i_araddr(i_araddr), .i_arprot(i_arprot),
+        .i_rvalid(i_rvalid), .i_rready(i_rready), .i_rdata(i_rdata), .i_rresp(i_rresp),
+        .d_arvalid(d_arvalid), .d_arready(d_arready), .d_araddr(d_araddr), .d_arprot(d_arprot),
+        .d_rvalid(d_rvalid), .d_rready(d_rready), .d_rdata(d_rdata), .d_rresp(d_rresp),
+        .d_awvalid(d_awvalid), .d_awready(d_awready), .d_awaddr(d_awaddr), .d_awprot(d_awprot),
+        .d_wvalid(d_wvalid), .d_wready(d_wready), .d_wdata(d_wdata), .d_wstrb(d_wstrb),
+        .d_bvalid(d_bvalid), .d_bready(d_bready), .d_bresp(d_bresp)
+    );
+
+    vigna_axi_mem_model mem (
+        .clk(clk),
+        .resetn(resetn),
+        .i_arvalid(i_arvalid), .i_arready(i_arready), .i_araddr(i_araddr), .i_arprot(i_arprot),
+        .i_rvalid(i_rvalid), .i_rready(i_rready), .i_rdata(i_rdata), .i_rresp(i_rresp),
+        .d_arvalid(d_arvalid), .d_arready(d_arready), .d_araddr(d_araddr), .d_arprot(d_arprot),
+        .d_rvalid(d_rvalid), .d_rready(d_rready), .d_rdata(d_rdata), .d_rresp(d_rresp),
+        .d_awvalid(d_awvalid), .d_awready(d_awready), .d_awaddr(d_awaddr), .d_awprot(d_awprot),
+        .d_wvalid(d_wvalid), .d_wready(d_wready), .d_wdata(d_wdata), .d_wstrb(d_wstrb),
+        .d_bvalid(d_bvalid), .d_bready(d_bready), .d_bresp(d_bresp)
+    );
+
+    always #5 clk = ~clk;
+
+    // Memory setting `n`; setting 0 is the unstalled reference
+    task configure;
+        input integer n;
+        begin
+            mem.init(MEM_SIZE);
+            case (n)
+                0: begin name = "no back-pressure";           mem.stall = 0;  end
+                1: begin name = "30% ready stalls";           mem.stall = 30; end
+                2: begin name = "60% ready stalls";           mem.stall = 60; mem.seed = 5; end
+                3: begin name = "latency 3/2";                mem.mem.imem_latency = 3; mem.mem.dmem_latency = 2; end
+                4: begin name = "jitter 0-4, 25% stalls";     mem.mem.imem_jitter = 4; mem.mem.dmem_jitter = 4; mem.stall = 25; end
+                5: begin name = "2 banks, latency 2";         mem.mem.banks = 2; mem.mem.imem_latency = 2; mem.mem.dmem_latency = 2; end
+                default: begin name = "sparse, 40% stalls";   mem.mem.sparse = 1; mem.stall = 40; end
+            endcase
+            mem.mem.load_image(image_file, 0);
+        end
+    endtask
+
+    // Reset the core and run until its PC stays on a jump to itself
+    // (jal x0, 0 or c.j 0) for 10 cycles
+    task run;
+        begin
+            resetn = 0;
+            repeat (5) @(posedge clk);
+            resetn = 1;
+            cycles = 0;
+            same_count = 0;
+            last_pc = 32'hffffffff;
+            while (cycles < MAX_CYCLES && same_count < 10) begin
+                @(posedge clk);
+                cycles = cycles + 1;
+                halt_word = mem.mem.peek(uut.vigna_core_inst.pc);
+                if (uut.vigna_core_inst.pc == last_pc &&
+                    (last_pc[1] ? halt_word[31:16] == 16'ha001 :
+                     (halt_word == 32'h0000006f || halt_word[15:0] == 16'ha001)))
+                    same_count = same_count + 1;
+                else
+                    same_count = 0;
+                last_pc = uut.vigna_core_inst.pc;
+            end
+        end
+    endtask
+
+    initial begin
+        clk = 0;
+        resetn = 0;
+        test_pass_count = 0;
+        test_fail_count = 0;
+        if (!$value$plusargs("image=%s", image_file))
+            image_file = "sorting_test.mem";
+        if (!$value$plusargs("sig_begin=%h", sig_begin))
+            sig_begin = 32'h1000;
+        if (!$value$plusargs("sig_end=%h", sig_end))
+            sig_end = 32'h1018;
+        if (sig_end - sig_begin > 4 * MAX_WORDS)
+            sig_end = sig_begin + 4 * MAX_WORDS;
+
+        $display("Testing vigna_axi under AXI back-pressure...");
+        for (s = 0; s < SETTINGS; s = s + 1) begin
+            configure(s);
+            run();
+            mismatches = 0;
+            for (w = 0; w < (sig_end - sig_begin) / 4; w = w + 1) begin
+                if (s == 0)
+                    reference[w] = mem.mem.peek(sig_begin + 4 * w);
+                else if (mem.mem.peek(sig_begin + 4 * w) !== reference[w])
+                    mismatches = mismatches + 1;
+            end
+            if (s == 0)
+                reference_cycles = cycles;
+
+            if (same_count < 10) begin
+                $display("  FAIL: %0s, no halt within %0d cycles", name, MAX_CYCLES);
+                test_fail_count = test_fail_count + 1;
+            end else if (mismatches != 0) begin
+                $display("  FAIL: %0s, %0d result words differ", name, mismatches);
+                test_fail_count = test_fail_count + 1;
+            end else begin
+                $display("  PASS: %0s, halted after %0d cycles (%0d.%02dx)", name, cycles,
+                         cycles / reference_cycles, (cycles * 100 / reference_cycles) % 100);
+                test_pass_count = test_pass_count + 1;
+            end
+        end
+
+        $display("");
+        $display("Test Results:");
+        $display("  Passed: %0d", test_pass_count);
+        $display("  Failed: %0d", test_fail_count);
+        if (test_fail_count == 0)
+            $display("All AXI back-pressure tests PASSED!");
+        else
+            $display("Some AXI back-pressure tests FAILED!");
+        $finish;
+    end
+
+endmodule
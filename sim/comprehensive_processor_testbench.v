@@ -44,6 +44,10 @@ module comprehensive_processor_testbench();
         .d_wdata(d_wdata),
         .d_wstrb(d_wstrb)
     );
+
+    // Retire trace (+trace=<file>); each section's program is dumped for replay
+`define VIGNA_TRACE_IMEM instruction_memory
+`include "sim/vigna_retire_trace.vh"
     
     // Clock generation
     initial begin
@@ -0,0 +1,265 @@
+//////////////////////////////////////////////////////////////////////////////////
+// Company: Wuhan University
+// Engineer:
+//
+// Create Date: 2026/10/17
+// Design Name: perf_counter_test
+// Module Name: perf_counter_test
+// Project Name: vigna
+// Description: Test the performance counter CSRs of the Vigna CPU core
+//
+// Dependencies: vigna_core.v
+//
+// Revision:
+// Revision 1.0 - Counter reads, writes and mcountinhibit
+// Revision 1.1 - minstret across an interrupt
+// Additional Comments:
+// Requires VIGNA_CORE_ZICSR_EXTENSION and VIGNA_CORE_PERF_COUNTERS; checks the
+// misprediction counter with VIGNA_CORE_BRANCH_PREDICT and minstret across a
+// timer interrupt with VIGNA_CORE_INTERRUPT
+//////////////////////////////////////////////////////////////////////////////////
+
+`timescale 1ns / 1ps
+`include "vigna_conf.vh"
+
+module perf_counter_test;
+
+    // Clock and reset
+    reg clk;
+    reg resetn;
+
+    // Simple memory interface
+    wire        i_valid;
+    reg         i_ready;
+    wire [31:0] i_addr;
+    reg  [31:0] i_rdata;
+
+    wire        d_valid;
+    reg         d_ready;
+    wire [31:0] d_addr;
+    reg  [31:0] d_rdata;
+    wire [31:0] d_wdata;
+    wire [3:0]  d_wstrb;
+
+`ifdef VIGNA_CORE_INTERRUPT
+    // Timer interrupt, dropped when the handler stores to 0x100
+    reg timer_irq;
+`endif
+
+    // Memory arrays
+    reg [31:0] instruction_memory [1023:0];
+    reg [31:0] data_memory [1023:0];
+
+    // Test status
+    integer test_pass_count;
+    integer test_fail_count;
+    integer i;
+
+    // Instantiate Vigna core
+    vigna vigna_core_inst(
+        .clk(clk),
+        .resetn(resetn),
+
+`ifdef VIGNA_CORE_INTERRUPT
+        .ext_irq(1'b0),
+        .timer_irq(timer_irq),
+        .soft_irq(1'b0),
+`endif
+
+        .i_valid(i_valid),
+        .i_ready(i_ready),
+        .i_addr(i_addr),
+        .i_rdata(i_rdata),
+
+        .d_valid(d_valid),
+        .d_ready(d_ready),
+        .d_addr(d_addr),
+        .d_rdata(d_rdata),
+        .d_wdata(d_wdata),
+        .d_wstrb(d_wstrb)
+    );
+
+    // Clock generation
+    always #5 clk = ~clk;
+
+    // Memories answer one cycle after the request, so every fetch and data
+    // access stalls for at least a cycle
+    always @(posedge clk) begin
+        if (resetn) begin
+            if (i_valid && !i_ready) begin
+                i_rdata <= instruction_memory[i_addr[11:2]];
+                i_ready <= 1;
+            end else if (!i_valid) begin
+                i_ready <= 0;
+            end
+
+`ifdef VIGNA_CORE_INTERRUPT
+            if (d_valid && d_wstrb != 0 && d_addr == 32'h100)
+                timer_irq <= 0;
+`endif
+            if (d_valid && !d_ready) begin
+                if (d_wstrb != 0)
+                    data_memory[d_addr[11:2]] <= d_wdata;
+                else
+                    d_rdata <= data_memory[d_addr[11:2]];
+                d_ready <= 1;
+            end else if (!d_valid) begin
+                d_ready <= 0;
+            end
+        end else begin
+            i_ready <= 0;
+            d_ready <= 0;
+        end
+    end
+
+    // CSR instruction: csr, rs1 (or zimm), funct3, rd
+    function [31:0] make_csr;
+        input [11:0] csr;
+        input [4:0] rs1;
+        input [2:0] funct3;
+        input [4:0] rd;
+        begin
+            make_csr = {csr, rs1, funct3, rd, 7'b1110011};
+        end
+    endfunction
+
+    function [31:0] make_addi;
+        input [11:0] imm;
+        input [4:0] rs1;
+        input [4:0] rd;
+        begin
+            make_addi = {imm, rs1, 3'b000, rd, 7'b0010011};
+        end
+    endfunction
+
+    function [31:0] make_sw;
+        input [11:0] imm;
+        input [4:0] rs2;
+        begin
+            make_sw = {imm[11:5], rs2, 5'd0, 3'b010, imm[4:0], 7'b0100011};
+        end
+    endfunction
+
+    task check;
+        input [255:0] name;
+        input condition;
+        input [31:0] value;
+        begin
+            if (condition) begin
+                $display("  PASS: %0s (val=%0d)", name, value);
+                test_pass_count = test_pass_count + 1;
+            end else begin
+                $display("  FAIL: %0s (val=%0d)", name, value);
+                test_fail_count = test_fail_count + 1;
+            end
+        end
+    endtask
+
+    initial begin
+        $dumpfile("perf_counter_test.vcd");
+        $dumpvars(0, perf_counter_test);
+
+        clk = 0;
+        resetn = 0;
+`ifdef VIGNA_CORE_INTERRUPT
+        timer_irq = 1;
+`endif
+        test_pass_count = 0;
+        test_fail_count = 0;
+        for (i = 0; i < 1024; i = i + 1) begin
+            instruction_memory[i] = 32'h00000013;  // NOP
+            data_memory[i] = 32'h00000000;
+        end
+
+        $display("Testing performance counters...");
+
+        // mcycle/minstret around a 10-iteration loop, then rdcycle/rdinstret
+        instruction_memory[0]  = make_csr(12'hB00, 5'd0, 3'b010, 5'd1);  // csrr x1, mcycle
+        instruction_memory[1]  = make_csr(12'hB02, 5'd0, 3'b010, 5'd2);  // csrr x2, minstret
+        instruction_memory[2]  = make_addi(12'd10, 5'd0, 5'd3);          // addi x3, x0, 10
+        instruction_memory[3]  = make_addi(-12'd1, 5'd3, 5'd3);          // addi x3, x3, -1
+        instruction_memory[4]  = {7'b1111111, 5'd0, 5'd3, 3'b001, 5'b11101, 7'b1100011}; // bne x3, x0, -4
+        instruction_memory[5]  = make_csr(12'hC00, 5'd0, 3'b010, 5'd4);  // rdcycle x4
+        instruction_memory[6]  = make_csr(12'hC02, 5'd0, 3'b010, 5'd6);  // rdinstret x6
+        // data accesses for the data stall counter
+        instruction_memory[7]  = make_sw(12'd0, 5'd1);                   // sw x1, 0(x0)
+        instruction_memory[8]  = {12'd0, 5'd0, 3'b010, 5'd7, 7'b0000011}; // lw x7, 0(x0)
+        instruction_memory[9]  = make_csr(12'hB03, 5'd0, 3'b010, 5'd8);  // csrr x8, mhpmcounter3
+        instruction_memory[10] = make_csr(12'hB04, 5'd0, 3'b010, 5'd9);  // csrr x9, mhpmcounter4
+        // minstret write; writes to the instret shadow are ignored
+        instruction_memory[11] = make_csr(12'hB02, 5'd0, 3'b001, 5'd0);  // csrw minstret, x0
+        instruction_memory[12] = make_csr(12'hB02, 5'd0, 3'b010, 5'd10); // csrr x10, minstret
+        instruction_memory[13] = make_csr(12'hC02, 5'd0, 3'b101, 5'd0);  // csrwi instret, 0
+        instruction_memory[14] = make_csr(12'hB02, 5'd0, 3'b010, 5'd11); // csrr x11, minstret
+        // mcountinhibit: stop mcycle, bit 1 (time) is hardwired to zero
+        instruction_memory[15] = make_csr(12'h320, 5'd3, 3'b101, 5'd0);  // csrwi mcountinhibit, 3
+        instruction_memory[16] = make_csr(12'h320, 5'd0, 3'b010, 5'd12); // csrr x12, mcountinhibit
+        instruction_memory[17] = make_csr(12'hB00, 5'd0, 3'b010, 5'd13); // csrr x13, mcycle
+        instruction_memory[18] = make_csr(12'hB00, 5'd0, 3'b010, 5'd14); // csrr x14, mcycle
+        // the loop's bne falls through once: the only misprediction
+        instruction_memory[19] = make_csr(12'hB06, 5'd0, 3'b010, 5'd15); // csrr x15, mhpmcounter6
+`ifdef VIGNA_CORE_INTERRUPT
+        // the timer line is up from reset: it is taken as soon as mstatus.MIE
+        // is set, in place of the first nop, and the handler retires two
+        // instructions; the interrupted nop is not counted until it runs
+        instruction_memory[20] = make_addi(12'h200, 5'd0, 5'd16);        // addi x16, x0, 0x200
+        instruction_memory[21] = make_csr(12'h305, 5'd16, 3'b001, 5'd0); // csrw mtvec, x16
+        instruction_memory[22] = make_addi(12'h080, 5'd0, 5'd16);        // addi x16, x0, 0x80
+        instruction_memory[23] = make_csr(12'h304, 5'd16, 3'b001, 5'd0); // csrw mie, x16 (MTIE)
+        instruction_memory[24] = make_csr(12'hB02, 5'd0, 3'b010, 5'd17); // csrr x17, minstret
+        instruction_memory[25] = make_csr(12'h300, 5'd8, 3'b110, 5'd0);  // csrsi mstatus, 8 (MIE)
+        // 26-35: nops
+        instruction_memory[36] = make_csr(12'hB02, 5'd0, 3'b010, 5'd18); // csrr x18, minstret
+        instruction_memory[37] = {20'd0, 5'd0, 7'b1101111};              // j .
+        instruction_memory[128] = make_sw(12'h100, 5'd0);                // handler: sw x0, 0x100(x0)
+        instruction_memory[129] = 32'h30200073;                          // mret
+`else
+        instruction_memory[20] = {20'd0, 5'd0, 7'b1101111};              // j .
+`endif
+
+        repeat (5) @(posedge clk);
+        resetn = 1;
+        repeat (600) @(posedge clk);
+
+        check("minstret counts the loop", vigna_core_inst.cpu_regs[6] - vigna_core_inst.cpu_regs[2] == 23,
+              vigna_core_inst.cpu_regs[6] - vigna_core_inst.cpu_regs[2]);
+        check("mcycle exceeds minstret", vigna_core_inst.cpu_regs[4] - vigna_core_inst.cpu_regs[1] >
+              vigna_core_inst.cpu_regs[6] - vigna_core_inst.cpu_regs[2],
+              vigna_core_inst.cpu_regs[4] - vigna_core_inst.cpu_regs[1]);
+        check("mhpmcounter3 counts fetch stalls", vigna_core_inst.cpu_regs[8] != 0,
+              vigna_core_inst.cpu_regs[8]);
+        check("mhpmcounter4 counts data stalls", vigna_core_inst.cpu_regs[9] != 0,
+              vigna_core_inst.cpu_regs[9]);
+        check("minstret write", vigna_core_inst.cpu_regs[10] == 1, vigna_core_inst.cpu_regs[10]);
+        check("instret shadow is read-only", vigna_core_inst.cpu_regs[11] == 3,
+              vigna_core_inst.cpu_regs[11]);
+        check("mcountinhibit readback", vigna_core_inst.cpu_regs[12] == 1,
+              vigna_core_inst.cpu_regs[12]);
+        check("inhibited mcycle holds", vigna_core_inst.cpu_regs[13] == vigna_core_inst.cpu_regs[14],
+              vigna_core_inst.cpu_regs[14] - vigna_core_inst.cpu_regs[13]);
+`ifdef VIGNA_CORE_BRANCH_PREDICT
+        check("mhpmcounter6 counts mispredicts", vigna_core_inst.cpu_regs[15] == 1,
+              vigna_core_inst.cpu_regs[15]);
+`else
+        check("mhpmcounter6 is not implemented", vigna_core_inst.cpu_regs[15] == 0,
+              vigna_core_inst.cpu_regs[15]);
+`endif
+`ifdef VIGNA_CORE_INTERRUPT
+        // csrsi, 10 nops and the two handler instructions
+        check("interrupt taken", timer_irq == 0, timer_irq);
+        check("minstret skips interrupt entry", vigna_core_inst.cpu_regs[18] - vigna_core_inst.cpu_regs[17] == 14,
+              vigna_core_inst.cpu_regs[18] - vigna_core_inst.cpu_regs[17]);
+`endif
+
+        $display("");
+        $display("Test Results:");
+        $display("  Passed: %0d", test_pass_count);
+        $display("  Failed: %0d", test_fail_count);
+        if (test_fail_count == 0)
+            $display("All performance counter tests PASSED!");
+        else
+            $display("Some performance counter tests FAILED!");
+        $finish;
+    end
+
+endmodule
@@ -0,0 +1,351 @@
+`timescale 1ns / 1ps
+
+// Compile-once program harness for Vigna RISC-V processor
+// The program image, memory size, cycle budget and signature region are
+// chosen at run time with plusargs, so one .vvp can run any number of images:
+//
+//   vvp program_harness.vvp +image=simple_test.mem +max_cycles=1000 \
+//       +sig_begin=1000 +sig_end=1010 +signature=simple_test.sig
+//
+//   +image=<file>       $readmemh image loaded at address 0 (required)
+//   +mem_size=<bytes>   memory size, power of two up to MAX_MEM_BYTES (default 64 KiB)
+//   +max_cycles=<n>     cycle budget before the run is reported as a timeout
+//   +sig_begin=<hex>    first byte address of the signature region
+//   +sig_end=<hex>      end (exclusive) of the signature region
+//   +signature=<file>   hex dump of the signature region (default signature.mem)
+//   +trace=<file>       retire trace for tools/vigna_lockstep.py (see sim/vigna_retire_trace.vh)
+//   +mark=<hex>         print "Mark <data> at cycle <n>" for every store to this byte address
+//                       (iteration timestamps for tools/vigna_bench.py)
+//
+// Instruction and data ports share one sim/vigna_mem_model.v, which also
+// takes its latency, jitter, bank and sparse plusargs (+imem_latency=3 ...).
+// Addresses wrap at mem_size unless +mem_sparse is given.
+// A run halts when the fetch address stays put for 10 cycles while the core
+// sits on a jump to itself.
+//
+// With VIGNA_CORE_INTERRUPT the harness can also raise interrupts:
+//
+//   +irq_schedule=<file> "<cycle> ext|timer|soft" per line, raised at that cycle
+//   +irq_random=<n>     raise a random line 1..2n cycles after the last one was taken
+//   +irq_lines=<mask>   lines +irq_random picks from: 4 ext, 2 timer, 1 soft (default 7)
+//   +irq_seed=<n>       +irq_random seed (default 1)
+//   +irq_vector=<hex>   trap vector, where an mret is placed (default c000)
+//
+// mtvec, mie and mstatus.MIE are set up out of reset, so any image runs with
+// interrupts enabled. A line stays raised until the core requests the
+// instruction at the vector, which prints
+// "IRQ <line> raised at cycle <n> during 0x<pc> taken at cycle <m> mepc 0x<pc>"
+// where "during" is the last instruction dispatched when the line went up.
+// No new random interrupts are raised once the program sits in its halt loop;
+// tools/vigna_irq.py runs programs under many seeds and reports the latencies.
+// tools/vigna_harness.py compiles this harness once and checks the dumps.
+
+`include "vigna_conf.vh"
+`include "sim/vigna_mem_model.v"
+
+module program_harness();
+
+    parameter MAX_MEM_BYTES = 1024 * 1024;
+
+    // Clock and reset
+    reg clk;
+    reg resetn;
+
+    // Instruction memory interface
+    wire        i_valid;
+    wire        i_ready;
+    wire [31:0] i_addr;
+    wire [31:0] i_rdata;
+
+    // Data memory interface
+    wire        d_valid;
+    wire        d_ready;
+    wire [31:0] d_addr;
+    wire [31:0] d_rdata;
+    wire [31:0] d_wdata;
+    wire [ 3:0] d_wstrb;
+
+    // Run-time configuration
+    reg [1023:0] image_file;
+    reg [1023:0] signature_file;
+    integer mem_size;
+    integer max_cycles;
+    reg [31:0] sig_begin;
+    reg [31:0] sig_end;
+    reg [31:0] mark_addr;
+    reg        mark_enable;
+
+    // Test control
+    integer cycle_count;
+    reg [31:0] last_pc;
+    integer same_pc_count;
+
+    // The halt loop: the instruction at the core's PC jumps to itself
+    // (jal x0, 0 or c.j 0). Long multiplies, divides and 1-bit shifts also
+    // keep the fetch address still for more than 10 cycles.
+    reg [31:0] halt_word;
+    reg        at_halt_loop;
+
+`ifdef VIGNA_CORE_INTERRUPT
+    localparam MAX_IRQS = 4096;
+
+    reg  [2:0]   irq;           // {ext, timer, soft}, as on the core
+    reg          irq_enable;
+    reg  [1023:0] irq_file;
+    reg  [31:0]  irq_vector;
+    integer      irq_random;
+    integer      irq_lines;
+    integer      irq_seed;
+    integer      irq_raised_at [0:2];
+    reg  [31:0]  irq_during [0:2];
+    reg  [31:0]  irq_dispatch_pc;
+    integer      irq_at [0:MAX_IRQS-1];
+    reg  [2:0]   irq_kind [0:MAX_IRQS-1];
+    integer      irq_count, irq_next, irq_next_random;
+    integer      irq_raised, irq_taken;
+    integer      irq_fd, irq_cycle, irq_line;
+    reg  [8*8-1:0] irq_name;
+    reg          vector_fetch, last_vector_fetch;
+`endif
+
+    // Instantiate the processor core
+    vigna dut (
+        .clk(clk),
+        .resetn(resetn),
+`ifdef VIGNA_CORE_INTERRUPT
+        .ext_irq(irq[2]),
+        .timer_irq(irq[1]),
+        .soft_irq(irq[0]),
+`endif
+        .i_valid(i_valid),
+        .i_ready(i_ready),
+        .i_addr(i_addr),
+        .i_rdata(i_rdata),
+        .d_valid(d_valid),
+        .d_ready(d_ready),
+        .d_addr(d_addr),
+        .d_rdata(d_rdata),
+        .d_wdata(d_wdata),
+        .d_wstrb(d_wstrb)
+    );
+
+`include "sim/vigna_retire_trace.vh"
+
+    // Clock generation
+    initial begin
+        clk = 0;
+        forever #5 clk = ~clk;
+    end
+
+    // Shared instruction and data memory
+    vigna_mem_model #(.MAX_MEM_BYTES(MAX_MEM_BYTES)) mem (
+        .clk(clk),
+        .resetn(resetn),
+        .i_valid(i_valid),
+        .i_ready(i_ready),
+        .i_addr(i_addr),
+        .i_rdata(i_rdata),
+        .d_valid(d_valid),
+        .d_ready(d_ready),
+        .d_addr(d_addr),
+        .d_rdata(d_rdata),
+        .d_wdata(d_wdata),
+        .d_wstrb(d_wstrb)
+    );
+
+    // Iteration timestamps, taken when a store to the mark address completes
+    always @(posedge clk) begin
+        if (resetn && mark_enable && d_valid && d_ready && d_wstrb != 0 &&
+            (mem.sparse ? d_addr == mark_addr : (d_addr & mem.addr_mask) == (mark_addr & mem.addr_mask)))
+            $display("Mark 0x%08x at cycle %0d", d_wdata, cycle_count);
+    end
+
+`ifdef VIGNA_CORE_INTERRUPT
+    function [8*5-1:0] irq_line_name;
+        input integer line;
+        irq_line_name = line == 2 ? "ext" : line == 1 ? "timer" : "soft";
+    endfunction
+
+    // Last instruction dispatched; an interrupt taken instead is not dispatched
+    always @(posedge clk)
+        if (resetn && dut.exec_state == 4'b0000 && dut.fetched && !dut.interrupt_taken)
+            irq_dispatch_pc = dut.pc;
+
+    // Read the interrupt plusargs and the schedule file
+    task irq_init;
+        begin
+            irq = 3'b000;
+            irq_count = 0;
+            irq_next = 0;
+            irq_raised = 0;
+            irq_taken = 0;
+            irq_dispatch_pc = 0;
+            last_vector_fetch = 0;
+            if (!$value$plusargs("irq_random=%d", irq_random))
+                irq_random = 0;
+            if (!$value$plusargs("irq_lines=%d", irq_lines))
+                irq_lines = 7;
+            if (!$value$plusargs("irq_seed=%d", irq_seed))
+                irq_seed = 1;
+            if (!$value$plusargs("irq_vector=%h", irq_vector))
+                irq_vector = 32'hc000;
+            if ($value$plusargs("irq_schedule=%s", irq_file)) begin
+                irq_fd = $fopen(irq_file, "r");
+                if (irq_fd == 0) begin
+                    $display("ERROR: cannot open interrupt schedule %0s", irq_file);
+                    $finish;
+                end
+                while (irq_count < MAX_IRQS && $fscanf(irq_fd, "%d %s\n", irq_cycle, irq_name) == 2) begin
+                    irq_at[irq_count] = irq_cycle;
+                    irq_kind[irq_count] = irq_name == "ext" ? 3'b100 : irq_name == "timer" ? 3'b010 :
+                                          irq_name == "soft" ? 3'b001 : 3'b000;
+                    if (irq_kind[irq_count] == 3'b000) begin
+                        $display("ERROR: unknown interrupt line '%0s' in %0s", irq_name, irq_file);
+                        $finish;
+                    end
+                    irq_count = irq_count + 1;
+                end
+                $fclose(irq_fd);
+            end
+            irq_enable = irq_count > 0 || irq_random > 0;
+            irq_lines = irq_lines & 7;
+            if (irq_random > 0 && irq_lines == 0) begin
+                $display("ERROR: +irq_lines selects no interrupt line");
+                $finish;
+            end
+            irq_next_random = irq_random > 0 ? 1 + $unsigned($random(irq_seed)) % (2 * irq_random) : 0;
+            if (irq_enable)
+                mem.poke(irq_vector, 32'h30200073, 4'hf);    // mret
+        end
+    endtask
+
+    // Trap setup out of reset: vector, all three lines enabled, MIE set
+    task irq_setup;
+        begin
+            if (irq_enable) begin
+                dut.mtvec_r = irq_vector;
+                dut.mie_r = 32'h00000888;
+                dut.mstatus_r = 32'h00000008;
+            end
+        end
+    endtask
+
+    task irq_raise;
+        input [2:0] lines;
+        begin
+            for (irq_line = 0; irq_line < 3; irq_line = irq_line + 1) begin
+                if (lines[irq_line] && !irq[irq_line]) begin
+                    irq[irq_line] = 1'b1;
+                    irq_raised_at[irq_line] = cycle_count;
+                    irq_during[irq_line] = irq_dispatch_pc;
+                    irq_raised = irq_raised + 1;
+                end
+            end
+        end
+    endtask
+
+    // One cycle: acknowledge a taken interrupt at its vector fetch, raise new ones
+    task irq_step;
+        begin
+            vector_fetch = i_valid && i_addr == irq_vector;
+            if (vector_fetch && !last_vector_fetch && irq != 3'b000) begin
+                irq_line = dut.mcause_r[3:0] == 4'd11 ? 2 : dut.mcause_r[3:0] == 4'd7 ? 1 : 0;
+                $display("IRQ %0s raised at cycle %0d during 0x%08x taken at cycle %0d mepc 0x%08x",
+                         irq_line_name(irq_line), irq_raised_at[irq_line], irq_during[irq_line],
+                         cycle_count, dut.mepc_r);
+                irq[irq_line] = 1'b0;
+                irq_taken = irq_taken + 1;
+                if (irq_random > 0)
+                    irq_next_random = cycle_count + 1 + $unsigned($random(irq_seed)) % (2 * irq_random);
+            end
+            last_vector_fetch = vector_fetch;
+
+            while (irq_next < irq_count && irq_at[irq_next] <= cycle_count) begin
+                irq_raise(irq_kind[irq_next]);
+                irq_next = irq_next + 1;
+            end
+            if (irq_random > 0 && irq == 3'b000 && cycle_count >= irq_next_random && !at_halt_loop) begin
+                irq_line = $unsigned($random(irq_seed)) % 3;
+                while (!irq_lines[irq_line])
+                    irq_line = (irq_line + 1) % 3;
+                irq_raise(3'b001 << irq_line);
+                irq_next_random = 32'h7fffffff;
+            end
+        end
+    endtask
+`endif
+
+    // Main test sequence
+    initial begin
+        resetn = 0;
+
+        if (!$value$plusargs("image=%s", image_file)) begin
+            $display("ERROR: no program image given (+image=<file>)");
+            $finish;
+        end
+        if (!$value$plusargs("mem_size=%d", mem_size))
+            mem_size = 64 * 1024;
+        if (!$value$plusargs("max_cycles=%d", max_cycles))
+            max_cycles = 100000;
+        if (!$value$plusargs("signature=%s", signature_file))
+            signature_file = "signature.mem";
+        if (!$value$plusargs("sig_begin=%h", sig_begin))
+            sig_begin = 0;
+        if (!$value$plusargs("sig_end=%h", sig_end))
+            sig_end = 0;
+        mark_enable = $value$plusargs("mark=%h", mark_addr);
+
+        mem.init(mem_size);
+        mem.load_image(image_file, 0);
+`ifdef VIGNA_CORE_INTERRUPT
+        irq_init();
+`endif
+
+        // Reset pulse
+        repeat(10) @(posedge clk);
+        resetn = 1;
+`ifdef VIGNA_CORE_INTERRUPT
+        @(negedge clk);
+        irq_setup();
+`endif
+
+        // Run until the PC stays put (halt loop) or the budget runs out
+        cycle_count = 0;
+        last_pc = 32'hFFFFFFFF;
+        same_pc_count = 0;
+        while (cycle_count < max_cycles && same_pc_count < 10) begin
+            @(posedge clk);
+            cycle_count = cycle_count + 1;
+            halt_word = mem.peek(dut.pc);
+            at_halt_loop = dut.pc[1] ? halt_word[31:16] == 16'ha001 :
+                           (halt_word == 32'h0000006f || halt_word[15:0] == 16'ha001);
+            if (i_addr == last_pc && at_halt_loop) begin
+                same_pc_count = same_pc_count + 1;
+            end else begin
+                same_pc_count = 0;
+                last_pc = i_addr;
+            end
+`ifdef VIGNA_CORE_INTERRUPT
+            if (irq_enable)
+                irq_step();
+`endif
+        end
+
+        if (same_pc_count >= 10)
+            $display("Program halted at PC=0x%08x after %d cycles", i_addr, cycle_count);
+        else
+            $display("Program timeout after %d cycles", max_cycles);
+
+`ifdef VIGNA_CORE_INTERRUPT
+        if (irq_enable)
+            $display("Interrupts: %0d raised, %0d taken", irq_raised, irq_taken);
+`endif
+        if (sig_end > sig_begin) begin
+            mem.dump(signature_file, sig_begin, sig_end);
+            $display("Signature 0x%08x-0x%08x written", sig_begin, sig_end);
+        end
+
+        $finish;
+    end
+
+endmodule
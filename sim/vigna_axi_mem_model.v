@@ -0,0 +1,268 @@
+//////////////////////////////////////////////////////////////////////////////////
+// Company: Wuhan University
+// Engineer:
+//
+// Create Date: 2026/10/17
+// Design Name: vigna_axi_mem_model
+// Module Name: vigna_axi_mem_model
+// Project Name: vigna
+// Description: AXI4-Lite slave memory model with back-pressure for vigna_axi
+//
+// Dependencies: vigna_mem_model.v
+//
+// Revision:
+// Revision 1.0 - Random ready stalls, responses held until taken
+// Revision 1.1 - Transaction log
+// Additional Comments:
+// The instruction and data channels front one vigna_mem_model, so the
+// latency, jitter, bank and sparse plusargs of that model apply to the
+// read/write responses. init() also reads:
+//
+//   +axi_stall=<pct>    chance per cycle that arready/awready/wready stay low
+//   +axi_seed=<n>       stall seed (default 1)
+//   +axi_log=<file>     transaction log for tools/vigna_axi_stats.py
+//
+// The log has one line per transfer on each of the seven channels when its
+// VALID rises and one at its handshake: "<cycle> <channel> valid|handshake
+// <payload>", the payload being the address (ar/aw), the data (r/w) or 0
+// (b). Cycles count the clock edges out of reset and carry on across runs.
+//
+// One transaction per channel is outstanding at a time. Ready is offered
+// the cycle after valid is seen; AW and W complete independently, and a
+// pending read goes before a write that has not started.
+//////////////////////////////////////////////////////////////////////////////////
+
+`timescale 1ns / 1ps
+
+module vigna_axi_mem_model #(
+    parameter MAX_MEM_BYTES = 1024 * 1024
+)(
+    input             clk,
+    input             resetn,
+
+    // Instruction read channels
+    input             i_arvalid,
+    output reg        i_arready,
+    input      [31:0] i_araddr,
+    input      [ 2:0] i_arprot,
+    output reg        i_rvalid,
+    input             i_rready,
+    output reg [31:0] i_rdata,
+    output     [ 1:0] i_rresp,
+
+    // Data read channels
+    input             d_arvalid,
+    output reg        d_arready,
+    input      [31:0] d_araddr,
+    input      [ 2:0] d_arprot,
+    output reg        d_rvalid,
+    input             d_rready,
+    output reg [31:0] d_rdata,
+    output     [ 1:0] d_rresp,
+
+    // Data write channels
+    input             d_awvalid,
+    output reg        d_awready,
+    input      [31:0] d_awaddr,
+    input      [ 2:0] d_awprot,
+    input             d_wvalid,
+    output reg        d_wready,
+    input      [31:0] d_wdata,
+    input      [ 3:0] d_wstrb,
+    output reg        d_bvalid,
+    input             d_bready,
+    output     [ 1:0] d_bresp
+);
+
+    assign i_rresp = 2'b00;
+    assign d_rresp = 2'b00;
+    assign d_bresp = 2'b00;
+
+    integer stall;
+    integer seed;
+
+    reg [1023:0] log_file;
+    reg          log_open;
+    integer      log_fd;
+    integer      log_cycle;
+    reg   [ 6:0] log_wait;
+
+    // Simple-bus side of the shared memory
+    reg         m_i_valid;
+    wire        m_i_ready;
+    reg  [31:0] m_i_addr;
+    wire [31:0] m_i_rdata;
+
+    reg         m_d_valid;
+    wire        m_d_ready;
+    reg  [31:0] m_d_addr;
+    wire [31:0] m_d_rdata;
+    reg  [31:0] m_d_wdata;
+    reg  [ 3:0] m_d_wstrb;
+
+    // Channel state: a transaction is in the memory or its response waits
+    reg i_busy;
+    reg d_busy;
+    reg aw_done, w_done;
+    reg read_first;
+
+    vigna_mem_model #(.MAX_MEM_BYTES(MAX_MEM_BYTES)) mem (
+        .clk(clk),
+        .resetn(resetn),
+        .i_valid(m_i_valid),
+        .i_ready(m_i_ready),
+        .i_addr(m_i_addr),
+        .i_rdata(m_i_rdata),
+        .d_valid(m_d_valid),
+        .d_ready(m_d_ready),
+        .d_addr(m_d_addr),
+        .d_rdata(m_d_rdata),
+        .d_wdata(m_d_wdata),
+        .d_wstrb(m_d_wstrb)
+    );
+
+    // Read the plusargs of both models and clear `size` bytes of memory
+    task init;
+        input integer size;
+        begin
+            mem.init(size);
+            if (!$value$plusargs("axi_stall=%d", stall))
+                stall = 0;
+            if (!$value$plusargs("axi_seed=%d", seed))
+                seed = 1;
+            if (log_open !== 1'b1 && $value$plusargs("axi_log=%s", log_file)) begin
+                log_fd = $fopen(log_file, "w");
+                log_open = log_fd != 0;
+                log_cycle = 0;
+                if (!log_open)
+                    $display("WARNING: cannot open AXI log %0s", log_file);
+            end
+            if (stall < 0 || stall > 99) begin
+                $display("ERROR: +axi_stall=%0d must be a percentage below 100", stall);
+                $finish;
+            end
+        end
+    endtask
+
+    function stalled;
+        input dummy;
+        stalled = stall > 0 && $unsigned($random(seed)) % 100 < stall;
+    endfunction
+
+    // One channel's log lines for this edge
+    task log_channel;
+        input integer n;
+        input [8*4-1:0] name;
+        input valid;
+        input ready;
+        input [31:0] payload;
+        begin
+            if (valid && !log_wait[n])
+                $fdisplay(log_fd, "%0d %0s valid %h", log_cycle, name, payload);
+            if (valid && ready)
+                $fdisplay(log_fd, "%0d %0s handshake %h", log_cycle, name, payload);
+            log_wait[n] = valid && !ready;
+        end
+    endtask
+
+    always @(posedge clk) begin
+        if (log_open === 1'b1) begin
+            if (!resetn) begin
+                log_wait = 7'b0;
+            end else begin
+                log_channel(0, "i_ar", i_arvalid, i_arready, i_araddr);
+                log_channel(1, "i_r", i_rvalid, i_rready, i_rdata);
+                log_channel(2, "d_ar", d_arvalid, d_arready, d_araddr);
+                log_channel(3, "d_r", d_rvalid, d_rready, d_rdata);
+                log_channel(4, "d_aw", d_awvalid, d_awready, d_awaddr);
+                log_channel(5, "d_w", d_wvalid, d_wready, d_wdata);
+                log_channel(6, "d_b", d_bvalid, d_bready, 32'h0);
+                log_cycle = log_cycle + 1;
+            end
+        end
+    end
+
+    // Instruction channel
+    always @(posedge clk) begin
+        if (!resetn) begin
+            i_arready <= 1'b0;
+            i_rvalid <= 1'b0;
+            m_i_valid <= 1'b0;
+            i_busy = 1'b0;
+        end else begin
+            if (i_arvalid && i_arready) begin
+                m_i_valid <= 1'b1;
+                m_i_addr <= i_araddr;
+                i_busy = 1'b1;
+            end
+            if (m_i_valid && m_i_ready) begin
+                m_i_valid <= 1'b0;
+                i_rvalid <= 1'b1;
+                i_rdata <= m_i_rdata;
+            end
+            if (i_rvalid && i_rready) begin
+                i_rvalid <= 1'b0;
+                i_busy = 1'b0;
+            end
+            i_arready <= !i_busy && i_arvalid && !stalled(0);
+        end
+    end
+
+    // Data channels
+    always @(posedge clk) begin
+        if (!resetn) begin
+            d_arready <= 1'b0;
+            d_awready <= 1'b0;
+            d_wready <= 1'b0;
+            d_rvalid <= 1'b0;
+            d_bvalid <= 1'b0;
+            m_d_valid <= 1'b0;
+            d_busy = 1'b0;
+            aw_done = 1'b0;
+            w_done = 1'b0;
+        end else begin
+            if (d_arvalid && d_arready) begin
+                m_d_valid <= 1'b1;
+                m_d_addr <= d_araddr;
+                m_d_wstrb <= 4'h0;
+                d_busy = 1'b1;
+            end
+            if (d_awvalid && d_awready) begin
+                m_d_addr <= d_awaddr;
+                aw_done = 1'b1;
+            end
+            if (d_wvalid && d_wready) begin
+                m_d_wdata <= d_wdata;
+                m_d_wstrb <= d_wstrb;
+                w_done = 1'b1;
+            end
+            if (aw_done && w_done) begin
+                m_d_valid <= 1'b1;
+                d_busy = 1'b1;
+                aw_done = 1'b0;
+                w_done = 1'b0;
+            end
+
+            if (m_d_valid && m_d_ready) begin
+                m_d_valid <= 1'b0;
+                if (m_d_wstrb == 4'h0) begin
+                    d_rvalid <= 1'b1;
+                    d_rdata <= m_d_rdata;
+                end else begin
+                    d_bvalid <= 1'b1;
+                end
+            end
+            if ((d_rvalid && d_rready) || (d_bvalid && d_bready)) begin
+                d_rvalid <= 1'b0;
+                d_bvalid <= 1'b0;
+                d_busy = 1'b0;
+            end
+
+            read_first = d_arvalid && !aw_done && !w_done;
+            d_arready <= !d_busy && read_first && !stalled(0);
+            d_awready <= !d_busy && !read_first && d_awvalid && !aw_done && !stalled(0);
+            d_wready  <= !d_busy && !read_first && d_wvalid && !w_done && !stalled(0);
+        end
+    end
+
+endmodule
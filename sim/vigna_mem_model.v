@@ -0,0 +1,286 @@
+//////////////////////////////////////////////////////////////////////////////////
+// Company: Wuhan University
+// Engineer:
+//
+// Create Date: 2026/10/17
+// Design Name: vigna_mem_model
+// Module Name: vigna_mem_model
+// Project Name: vigna
+// Description: Instruction/data memory model with configurable latency
+//
+// Dependencies:
+//
+// Revision:
+// Revision 1.0 - Fixed, random and bank-conflict latency, sparse address space
+// Additional Comments:
+// Both simple-bus ports share one store. Call init() before the first request;
+// it reads the run-time settings:
+//
+//   +imem_latency=<n>   cycles from an instruction request to i_ready (default 1)
+//   +dmem_latency=<n>   the same for data requests (default 1)
+//   +imem_jitter=<n>    0..n random extra cycles per instruction request
+//   +dmem_jitter=<n>    0..n random extra cycles per data request
+//   +mem_seed=<n>       jitter seed (default 1)
+//   +mem_banks=<n>      word-interleaved banks; a request to the bank the other
+//                       port is using waits for it, the data port wins ties
+//   +mem_sparse         map 4 KiB pages of the whole 32-bit space on first
+//                       write instead of wrapping addresses at the dense size
+//
+// A latency of 1 answers on the edge after the request, like mem_sim.v. A
+// request is dropped if valid falls before it is answered.
+//////////////////////////////////////////////////////////////////////////////////
+
+`timescale 1ns / 1ps
+
+module vigna_mem_model #(
+    parameter MAX_MEM_BYTES = 1024 * 1024,
+    parameter PAGE_BITS     = 12
+)(
+    input             clk,
+    input             resetn,
+
+    input             i_valid,
+    output reg        i_ready,
+    input      [31:0] i_addr,
+    output reg [31:0] i_rdata,
+
+    input             d_valid,
+    output reg        d_ready,
+    input      [31:0] d_addr,
+    output reg [31:0] d_rdata,
+    input      [31:0] d_wdata,
+    input      [ 3:0] d_wstrb
+);
+
+    localparam MAX_MEM_WORDS = MAX_MEM_BYTES / 4;
+    localparam PAGE_WORDS    = 1 << (PAGE_BITS - 2);
+    localparam FRAMES        = MAX_MEM_BYTES >> PAGE_BITS;
+    localparam SLOTS         = 2 * FRAMES;
+
+    reg [31:0] memory [0:MAX_MEM_WORDS-1];
+
+    // Run-time settings
+    reg [31:0] addr_mask;
+    reg        sparse;
+    integer imem_latency, dmem_latency;
+    integer imem_jitter, dmem_jitter;
+    integer banks;
+    integer seed;
+
+    // Sparse page table: open-addressed hash of page numbers to frames
+    reg [31:0] slot_page  [0:SLOTS-1];
+    reg        slot_used  [0:SLOTS-1];
+    integer    slot_frame [0:SLOTS-1];
+    integer    frames_used;
+
+    // Outstanding requests: cycles left until ready, -1 when idle
+    integer i_left, d_left;
+    integer i_bank, d_bank;
+    integer i;
+
+    // Slot holding `page`, or the free slot it would take
+    function integer find_slot;
+        input [31:0] page;
+        integer n;
+        begin
+            find_slot = ((page * 32'h9E3779B1) >> 16) % SLOTS;
+            for (n = 0; n < SLOTS && slot_used[find_slot] && slot_page[find_slot] != page; n = n + 1)
+                find_slot = (find_slot + 1) % SLOTS;
+        end
+    endfunction
+
+    // Word of `memory` backing a byte address, -1 for an unmapped sparse page
+    function integer word_index;
+        input [31:0] addr;
+        integer s;
+        begin
+            if (!sparse) begin
+                word_index = (addr & addr_mask) >> 2;
+            end else begin
+                s = find_slot(addr >> PAGE_BITS);
+                if (slot_used[s] && slot_page[s] == addr >> PAGE_BITS)
+                    word_index = slot_frame[s] * PAGE_WORDS + addr[PAGE_BITS-1:2];
+                else
+                    word_index = -1;
+            end
+        end
+    endfunction
+
+    // Word at a byte address without any timing; unmapped pages read as 0
+    function [31:0] peek;
+        input [31:0] addr;
+        integer w;
+        begin
+            w = word_index(addr);
+            peek = w < 0 ? 32'h00000000 : memory[w];
+        end
+    endfunction
+
+    function integer bank_of;
+        input [31:0] addr;
+        bank_of = banks > 1 ? (addr >> 2) % banks : 0;
+    endfunction
+
+    function integer request_delay;
+        input integer latency;
+        input integer jitter;
+        request_delay = latency - 1 + (jitter > 0 ? $unsigned($random(seed)) % (jitter + 1) : 0);
+    endfunction
+
+    task map_page;
+        input [31:0] page;
+        integer s;
+        begin
+            s = find_slot(page);
+            if (!slot_used[s] || slot_page[s] != page) begin
+                if (slot_used[s] || frames_used == FRAMES) begin
+                    $display("ERROR: sparse memory full (%0d pages of %0d bytes)", FRAMES, 1 << PAGE_BITS);
+                    $finish;
+                end
+                slot_used[s] = 1'b1;
+                slot_page[s] = page;
+                slot_frame[s] = frames_used;
+                frames_used = frames_used + 1;
+            end
+        end
+    endtask
+
+    // Byte-strobed write without any timing (strobes are lane-aligned)
+    task poke;
+        input [31:0] addr;
+        input [31:0] data;
+        input [ 3:0] strb;
+        integer w;
+        begin
+            if (sparse)
+                map_page(addr >> PAGE_BITS);
+            w = word_index(addr);
+            if (strb[0]) memory[w][ 7: 0] = data[ 7: 0];
+            if (strb[1]) memory[w][15: 8] = data[15: 8];
+            if (strb[2]) memory[w][23:16] = data[23:16];
+            if (strb[3]) memory[w][31:24] = data[31:24];
+        end
+    endtask
+
+    // Read the plusargs and clear `size` bytes of dense memory (all of it
+    // and the page table when sparse)
+    task init;
+        input integer size;
+        begin
+            if (!$value$plusargs("imem_latency=%d", imem_latency))
+                imem_latency = 1;
+            if (!$value$plusargs("dmem_latency=%d", dmem_latency))
+                dmem_latency = 1;
+            if (!$value$plusargs("imem_jitter=%d", imem_jitter))
+                imem_jitter = 0;
+            if (!$value$plusargs("dmem_jitter=%d", dmem_jitter))
+                dmem_jitter = 0;
+            if (!$value$plusargs("mem_seed=%d", seed))
+                seed = 1;
+            if (!$value$plusargs("mem_banks=%d", banks))
+                banks = 0;
+            sparse = $test$plusargs("mem_sparse");
+
+            if (imem_latency < 1 || dmem_latency < 1 || imem_jitter < 0 || dmem_jitter < 0) begin
+                $display("ERROR: memory latencies must be at least 1 and jitters not negative");
+                $finish;
+            end
+            if (!sparse && (size < 4 || size > MAX_MEM_BYTES || (size & (size - 1)) != 0)) begin
+                $display("ERROR: memory size %0d must be a power of two between 4 and %0d", size, MAX_MEM_BYTES);
+                $finish;
+            end
+
+            addr_mask = size - 1;
+            for (i = 0; i < (sparse ? MAX_MEM_WORDS : size / 4); i = i + 1)
+                memory[i] = 32'h00000000;
+            for (i = 0; i < SLOTS; i = i + 1)
+                slot_used[i] = 1'b0;
+            frames_used = 0;
+        end
+    endtask
+
+    // $readmemh image placed at byte address `base`; sparse mode maps the
+    // pages it covers (up to its last non-zero word)
+    task load_image;
+        input [1023:0] file;
+        input [31:0]   base;
+        integer first, last, page;
+        begin
+            if (!sparse) begin
+                $readmemh(file, memory, (base & addr_mask) >> 2);
+            end else begin
+                first = frames_used * PAGE_WORDS + base[PAGE_BITS-1:2];
+                $readmemh(file, memory, first);
+                last = first;
+                for (i = first; i < MAX_MEM_WORDS; i = i + 1)
+                    if (memory[i] != 32'h00000000)
+                        last = i;
+                for (page = 0; page <= (last - frames_used * PAGE_WORDS) / PAGE_WORDS; page = page + 1)
+                    map_page((base >> PAGE_BITS) + page);
+            end
+        end
+    endtask
+
+    // Words from byte address `first` up to `last` (exclusive), one hex word
+    // per line
+    task dump;
+        input [1023:0] file;
+        input [31:0]   first;
+        input [31:0]   last;
+        integer fd;
+        reg [31:0] addr;
+        begin
+            fd = $fopen(file, "w");
+            for (addr = first; addr < last; addr = addr + 4)
+                $fdisplay(fd, "%h", peek(addr));
+            $fclose(fd);
+        end
+    endtask
+
+    always @(posedge clk) begin
+        if (!resetn) begin
+            i_ready <= 1'b0;
+            d_ready <= 1'b0;
+            i_left = -1;
+            d_left = -1;
+        end else begin
+            if (!i_valid)
+                i_left = -1;
+            if (!d_valid)
+                d_left = -1;
+
+            // Accept new requests; the data port wins a bank both ask for
+            if (d_valid && !d_ready && d_left < 0 &&
+                !(banks > 1 && i_left >= 0 && i_bank == bank_of(d_addr))) begin
+                d_left = request_delay(dmem_latency, dmem_jitter);
+                d_bank = bank_of(d_addr);
+            end
+            if (i_valid && !i_ready && i_left < 0 &&
+                !(banks > 1 && d_left >= 0 && d_bank == bank_of(i_addr))) begin
+                i_left = request_delay(imem_latency, imem_jitter);
+                i_bank = bank_of(i_addr);
+            end
+
+            // Answer the requests whose time has come
+            i_ready <= 1'b0;
+            if (i_left == 0) begin
+                i_rdata <= peek(i_addr);
+                i_ready <= 1'b1;
+            end
+            if (i_left >= 0)
+                i_left = i_left - 1;
+
+            d_ready <= 1'b0;
+            if (d_left == 0) begin
+                if (d_wstrb != 4'h0)
+                    poke(d_addr, d_wdata, d_wstrb);
+                else
+                    d_rdata <= peek(d_addr);
+                d_ready <= 1'b1;
+            end
+            if (d_left >= 0)
+                d_left = d_left - 1;
+        end
+    end
+
+endmodule
@@ -0,0 +1,99 @@
+// Retire trace for lockstep checking against the instruction-set simulator
+//
+// `include this file inside a testbench module that instantiates the core as
+// `dut` and drives it with `clk` / `resetn`. Tracing is enabled at run time:
+//
+//   vvp sim.vvp +trace=run.trace
+//
+// Every retired instruction writes one line
+//
+//   <pc> <instruction> <rd> <rd value> <cycle>
+//
+// in hex, except rd (0 when nothing is written) and cycle, the rising edge
+// out of reset the instruction was dispatched on. <instruction> is the
+// expanded form of compressed instructions. Each release of resetn starts a
+// new section:
+//
+//   # section <n> [image=<file>] [data=<file>]
+//
+// If the testbench defines VIGNA_TRACE_IMEM (and optionally VIGNA_TRACE_DMEM)
+// to the name of its instruction (data) memory array before the `include, the
+// memory is dumped with $writememh when the section's first instruction is
+// dispatched, so programs built by the testbench itself can be replayed.
+// tools/vigna_lockstep.py replays the trace on the ISS and reports the first
+// divergence; tools/vigna_profile.py turns the dispatch cycles into a profile.
+
+integer      trace_fd;
+integer      trace_section;
+reg [1023:0] trace_file;
+reg [1023:0] trace_image;
+reg [1023:0] trace_data;
+reg          trace_section_open;
+reg          trace_pending;
+reg [31:0]   trace_pc;
+reg [31:0]   trace_inst;
+integer      trace_cycle;
+integer      trace_dispatch;
+
+initial begin
+    trace_fd = 0;
+    trace_section = 0;
+    trace_section_open = 0;
+    trace_pending = 0;
+    trace_cycle = 0;
+    if ($value$plusargs("trace=%s", trace_file)) begin
+        trace_fd = $fopen(trace_file, "w");
+        if (trace_fd == 0)
+            $display("ERROR: cannot open trace file %0s", trace_file);
+    end
+end
+
+always @(posedge resetn) begin
+    trace_section = trace_section + 1;
+    trace_section_open = 1;
+    trace_pending = 0;
+    trace_cycle = 0;
+end
+
+// Dispatch: sample the instruction before the core's nonblocking updates land.
+// An instruction an interrupt is taken on is not dispatched
+always @(posedge clk) begin
+    if (resetn)
+        trace_cycle = trace_cycle + 1;
+    if (trace_fd != 0 && resetn && dut.exec_state == 4'b0000 && dut.fetched
+`ifdef VIGNA_CORE_INTERRUPT
+        && !dut.interrupt_taken
+`endif
+        ) begin
+        if (trace_section_open) begin
+            trace_section_open = 0;
+`ifdef VIGNA_TRACE_IMEM
+            $sformat(trace_image, "%0s.%0d.imem", trace_file, trace_section);
+            $writememh(trace_image, `VIGNA_TRACE_IMEM);
+`ifdef VIGNA_TRACE_DMEM
+            $sformat(trace_data, "%0s.%0d.dmem", trace_file, trace_section);
+            $writememh(trace_data, `VIGNA_TRACE_DMEM);
+            $fdisplay(trace_fd, "# section %0d image=%0s data=%0s", trace_section, trace_image, trace_data);
+`else
+            $fdisplay(trace_fd, "# section %0d image=%0s", trace_section, trace_image);
+`endif
+`else
+            $fdisplay(trace_fd, "# section %0d", trace_section);
+`endif
+        end
+        trace_pc = dut.pc;
+        trace_inst = dut.effective_inst;
+        trace_dispatch = trace_cycle;
+        trace_pending = 1;
+    end
+end
+
+// Retirement: the state machine is back in dispatch and the write-back landed
+always @(negedge clk) begin
+    if (trace_pending && dut.exec_state == 4'b0000) begin
+        trace_pending = 0;
+        if (resetn)
+            $fdisplay(trace_fd, "%08x %08x %0d %08x %0d", trace_pc, trace_inst, dut.wb_reg,
+                      dut.wb_reg != 0 ? dut.cpu_regs[dut.wb_reg] : 32'd0, trace_dispatch);
+    end
+end
@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+Tests for the memory image converter (flat binaries and ELF32 segment
+loading, Harvard split, symbol export and the output formats).
+"""
+
+import os
+import sys
+import struct
+import tempfile
+
+# Add tools directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'tools'))
+
+from bin_to_verilog_mem import (
+    bin_to_verilog_mem, read_elf, read_symbols, merge_regions, write_image
+)
+from vigna_iss import read_mem_image
+
+TEXT = struct.pack('<3I', 0x00500093, 0x00102023, 0x0000006f)
+RODATA = struct.pack('<2I', 0x11223344, 0x55667788)
+
+
+def make_elf(text_addr=0x0, data_addr=0x100, bss=8):
+    """A minimal ELF32 RISC-V executable: an R-X and an RW- segment plus a symbol table."""
+    strtab = b'\0_start\0table\0'
+    symtab = bytes(16) + struct.pack('<IIIBBH', 1, text_addr, len(TEXT), 0x12, 0, 1) \
+        + struct.pack('<IIIBBH', 8, data_addr, len(RODATA), 0x11, 0, 2)
+    ehdr_size, phdr_size, shdr_size = 52, 32, 40
+    text_off = ehdr_size + 2 * phdr_size
+    data_off = text_off + len(TEXT)
+    sym_off = data_off + len(RODATA)
+    str_off = sym_off + len(symtab)
+    sh_off = str_off + len(strtab)
+
+    ident = b'\x7fELF' + bytes([1, 1, 1]) + bytes(9)
+    out = struct.pack('<16sHHIIIIIHHHHHH', ident, 2, 243, 1, text_addr, ehdr_size, sh_off, 0,
+                      ehdr_size, phdr_size, 2, shdr_size, 3, 0)
+    out += struct.pack('<8I', 1, text_off, text_addr, text_addr, len(TEXT), len(TEXT), 5, 4)
+    out += struct.pack('<8I', 1, data_off, data_addr, data_addr, len(RODATA),
+                       len(RODATA) + bss, 6, 4)
+    out += TEXT + RODATA + symtab + strtab
+    out += bytes(shdr_size)
+    out += struct.pack('<10I', 0, 2, 0, 0, sym_off, len(symtab), 2, 1, 4, 16)
+    out += struct.pack('<10I', 0, 3, 0, 0, str_off, len(strtab), 0, 0, 1, 0)
+    return out
+
+
+def test_read_elf():
+    """Loadable segments keep their addresses; .bss is zero-filled."""
+    elf = read_elf(make_elf())
+    assert [(s['addr'], s['exec']) for s in elf['segments']] == [(0x0, True), (0x100, False)]
+    assert elf['segments'][1]['data'] == RODATA + bytes(8)
+    assert [(s['name'], s['value'], s['type'], s['bind']) for s in elf['symbols']] == \
+        [('_start', 0x0, 'FUNC', 'GLOBAL'), ('table', 0x100, 'OBJECT', 'GLOBAL')]
+
+
+def test_merge_regions():
+    """Unaligned regions are padded to words and touching regions merge."""
+    assert merge_regions([(0x4, b'\x01\x02'), (0x0, b'\xaa')]) == \
+        [(0x0, b'\xaa\x00\x00\x00\x01\x02\x00\x00')]
+    assert [a for a, _ in merge_regions([(0x0, b'1234'), (0x10, b'5678')])] == [0x0, 0x10]
+
+
+def test_elf_images_and_symbols():
+    """A unified image places every segment; the Harvard split separates them."""
+    with tempfile.TemporaryDirectory() as root:
+        elf = os.path.join(root, 'prog.elf')
+        with open(elf, 'wb') as f:
+            f.write(make_elf())
+        out = os.path.join(root, 'prog.mem')
+        sym = os.path.join(root, 'prog.sym')
+        bin_to_verilog_mem(elf, out, symbols_output=sym)
+        words = dict(read_mem_image(out))
+        assert words[0] == 0x00500093 and words[2] == 0x0000006f
+        assert words[0x40] == 0x11223344 and words[0x43] == 0
+        assert [s['name'] for s in read_symbols(sym)] == ['_start', 'table']
+
+        imem = os.path.join(root, 'prog.imem')
+        dmem = os.path.join(root, 'prog.dmem')
+        bin_to_verilog_mem(elf, imem, data_output=dmem, data_base=0x100)
+        assert sorted(dict(read_mem_image(imem))) == [0, 1, 2]
+        assert dict(read_mem_image(dmem))[0] == 0x11223344
+
+
+def test_flat_binary_unchanged():
+    """Flat binaries still produce a plain word list starting at index 0."""
+    with tempfile.TemporaryDirectory() as root:
+        path = os.path.join(root, 'prog.bin')
+        with open(path, 'wb') as f:
+            f.write(TEXT + b'\x01')
+        out = os.path.join(root, 'prog.mem')
+        bin_to_verilog_mem(path, out, base_addr=0x80)
+        with open(out) as f:
+            text = f.read()
+        assert '@' not in text
+        assert read_mem_image(out)[-1] == (3, 0x00000001)
+
+
+def _convert(data, fmt, **kwargs):
+    """Write `data` at address 0 in a format and return the output text."""
+    with tempfile.TemporaryDirectory() as root:
+        path = os.path.join(root, 'image.out')
+        write_image([(0, data)], path, 0, fmt, 'test', **kwargs)
+        with open(path) as f:
+            return f.read()
+
+
+def test_sparse_and_bytes_formats():
+    """Sparse readmemh skips zero runs; the byte image has one byte per line."""
+    data = struct.pack('<I', 0x13) + bytes(4 * 8) + struct.pack('<2I', 0x6f, 0)
+    with tempfile.TemporaryDirectory() as root:
+        path = os.path.join(root, 'image.mem')
+        write_image([(0, data)], path, 0, 'sparse')
+        assert read_mem_image(path) == [(0, 0x13), (9, 0x6f), (10, 0)]
+    text = _convert(data[:5], 'bytes')
+    assert [l for l in text.splitlines() if not l.startswith('//') and l] == \
+        ['13', '00', '00', '00', '00', '00', '00', '00']
+
+
+def test_ihex_format():
+    """Intel HEX records carry checksums, extended linear addresses and every loaded byte."""
+    text = TEXT + bytes(64) + TEXT
+    with tempfile.TemporaryDirectory() as root:
+        path = os.path.join(root, 'image.hex')
+        write_image([(0x0, text), (0x10000, RODATA)], path, 0, 'ihex')
+        with open(path) as f:
+            records = [bytes.fromhex(line[1:].strip()) for line in f]
+    assert all(sum(r) & 0xFF == 0 for r in records)
+    data = {}
+    upper = 0
+    for r in records:
+        if r[3] == 0x04:
+            upper = int.from_bytes(r[4:6], 'big') << 16
+        elif r[3] == 0x00:
+            address = upper + (r[1] << 8 | r[2])
+            for i, byte in enumerate(r[4:4 + r[0]]):
+                data[address + i] = byte
+    assert records[-1] == bytes([0, 0, 0, 1, 0xFF])
+    # Zero words inside a region are kept; the gap between the regions is not written
+    assert bytes(data[i] for i in range(len(text))) == text
+    assert bytes(data[0x10000 + i] for i in range(len(RODATA))) == RODATA
+    assert len(data) == len(text) + len(RODATA)
+
+
+def test_coe_and_mif_formats():
+    """COE is dense up to the depth; MIF collapses zero runs into ranges."""
+    coe = _convert(TEXT, 'coe', depth=5)
+    assert coe.endswith("memory_initialization_vector=\n00500093,\n00102023,\n0000006f,\n"
+                        "00000000,\n00000000;\n")
+    mif = _convert(TEXT, 'mif', depth=16)
+    assert "DEPTH=16;" in mif
+    assert "    2 : 0000006F;\n    [3..F] : 00000000;\nEND;\n" in mif
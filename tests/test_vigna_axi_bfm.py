@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+"""
+Tests for the AXI4-Lite slave models, protocol checker and stress launcher
+helpers (the cocotb testbench itself needs cocotb and Icarus Verilog or Verilator).
+"""
+
+import os
+import sys
+import random
+import tempfile
+
+import pytest
+
+# Add tools directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'tools'))
+
+from vigna_axi_bfm import (
+    DelayGenerator, SparseMemory, AxiLiteReadSlave, AxiLiteWriteSlave, AxiLiteChecker,
+    VignaAxiSlaves, MASTER_SIGNALS, SLAVE_SIGNALS, is_halt_loop
+)
+from vigna_harness import load_expectation
+from vigna_axi_stress import seed_batches, percentile, judge, summarize
+
+REPO_ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+EXPECTED_DIR = os.path.join(REPO_ROOT, 'programs', 'expected')
+
+
+def _read(slave, addr, max_cycles=100):
+    """Drive one read like vigna_axi does; returns (data, cycles)."""
+    arvalid, cycles = True, 0
+    while cycles < max_cycles:
+        arready, rvalid, rdata = slave.arready, slave.rvalid, slave.rdata
+        cycles += 1
+        slave.step(arvalid, addr, not arvalid)
+        if arvalid and arready:
+            arvalid = False
+        elif not arvalid and rvalid:
+            return rdata, cycles
+    raise AssertionError("read did not complete")
+
+
+def test_delay_profiles():
+    """Delays stay within each profile's range; bad settings are rejected."""
+    rng = random.Random(1)
+    assert {DelayGenerator(rng, 'none', 5)() for _ in range(50)} == {0}
+    uniform = [DelayGenerator(rng, 'uniform', 3)() for _ in range(500)]
+    assert set(uniform) == {0, 1, 2, 3}
+    bursty = [DelayGenerator(rng, 'bursty', 2)() for _ in range(500)]
+    assert bursty.count(0) > 300 and max(bursty) <= 8 and 1 not in bursty
+    with pytest.raises(ValueError):
+        DelayGenerator(rng, 'fast')
+    with pytest.raises(ValueError):
+        DelayGenerator(rng, 'uniform', -1)
+
+
+def test_sparse_memory():
+    """Images load word by word, strobes select byte lanes and the whole space is mapped."""
+    memory = SparseMemory()
+    with tempfile.TemporaryDirectory() as root:
+        path = os.path.join(root, 'image.mem')
+        with open(path, 'w') as f:
+            f.write("11223344\n@4\ndeadbeef\n")
+        memory.load(path, base=0x100)
+    assert memory.read(0x100) == 0x11223344 and memory.read(0x110) == 0xDEADBEEF
+    memory.write(0x100, 0xAABBCCDD, 0b0101)
+    assert memory.read(0x100) == 0x11BB33DD
+    memory.write(0xFFFFFFFC, 0x12345678, 0xF)
+    assert memory.read(0xFFFFFFFE) == 0x12345678 and memory.read(0x8000) == 0
+
+
+def test_read_slave_latency():
+    """Without delays a read takes three edges; random delays only stretch it."""
+    memory = SparseMemory()
+    memory.write(0x40, 0xCAFEF00D, 0xF)
+    zero = DelayGenerator(random.Random(0), 'none')
+    slave = AxiLiteReadSlave(memory, zero, zero)
+    assert _read(slave, 0x40) == (0xCAFEF00D, 3)
+    assert slave.stats.transactions == 1 and slave.stats.latency_max == 2
+
+    rng = random.Random(3)
+    slow = AxiLiteReadSlave(memory, DelayGenerator(rng, 'uniform', 4), DelayGenerator(rng, 'uniform', 4))
+    cycles = [_read(slow, 0x40)[1] for _ in range(50)]
+    assert min(cycles) >= 3 and max(cycles) <= 11 and len(set(cycles)) > 3
+    assert slow.stats.transactions == 50 and slow.stats.stalls > 0
+
+
+def test_write_slave_channels():
+    """AW and W are accepted independently; the write lands once both are in."""
+    memory = SparseMemory()
+    zero = DelayGenerator(random.Random(0), 'none')
+    slave = AxiLiteWriteSlave(memory, zero, zero)
+
+    # W first, AW two cycles later
+    assert slave.step(False, 0, True, 0x55667788, 0xF, True) == (False, True, False)
+    assert slave.step(False, 0, True, 0x55667788, 0xF, True) == (False, False, False)
+    assert memory.read(0x20) == 0
+    assert slave.step(True, 0x20, False, 0, 0, True) == (True, False, False)
+    assert slave.step(True, 0x20, False, 0, 0, True) == (False, False, True)
+    assert memory.read(0x20) == 0x55667788
+    assert slave.step(False, 0, False, 0, 0, True) == (False, False, False)
+    assert slave.stats.transactions == 1 and slave.stats.latency_max == 4
+
+
+def test_checker_rules():
+    """Each AXI4-Lite handshake rule is reported once when broken."""
+    checker = AxiLiteChecker()
+    checker.check_reset(0, 'd_aw', 0)
+    checker.check(1, 'd_aw', 1, 0, (0x10, 0))
+    checker.check(2, 'd_aw', 1, 1, (0x10, 0))     # handshake
+    checker.check(3, 'd_aw', 0, 0, (0x10, 0))
+    assert checker.count == 0
+
+    checker.check(4, 'd_aw', 1, 0, (0x20, 0))
+    checker.check(5, 'd_aw', 1, 0, (0x24, 0))     # payload changed
+    checker.check(6, 'd_aw', 0, 0, (0x24, 0))     # VALID dropped
+    checker.check(7, 'd_w', None, 0, (0, 0))      # VALID X
+    checker.check(8, 'd_w', 1, 0, (None, 0xF))    # payload X
+    checker.check_reset(9, 'i_ar', 1)             # VALID in reset
+    assert checker.count == 5
+    assert [v.split(': ', 2)[2] for v in checker.violations] == [
+        "payload changed while waiting for READY", "VALID dropped before the handshake",
+        "VALID is X/Z", "payload has X/Z bits while VALID", "VALID not low during reset"]
+
+
+class _Master:
+    """Reads and writes through all of vigna_axi's channels the way the bridge does."""
+
+    def __init__(self, ops):
+        self.ops = list(ops)
+        self.done = []
+        self.op = None
+
+    def outputs(self, slaves_out):
+        s = {name: 0 for name in MASTER_SIGNALS}
+        if self.op is None and self.ops:
+            self.op = dict(self.ops.pop(0), aw=False, w=False, ar=False)
+        op = self.op
+        if op is None:
+            return s
+        port = 'i' if op['kind'] == 'fetch' else 'd'
+        if op['kind'] == 'write':
+            s.update(d_awvalid=int(not op['aw']), d_awaddr=op['addr'], d_wvalid=int(not op['w']),
+                     d_wdata=op['data'], d_wstrb=0xF, d_bready=int(op['aw'] and op['w']))
+        else:
+            s.update({f"{port}_arvalid": int(not op['ar']), f"{port}_araddr": op['addr'],
+                      f"{port}_rready": int(op['ar'])})
+        return s
+
+    def edge(self, s, slaves_out):
+        """Handshakes at this edge (slave outputs as driven before it)."""
+        op = self.op
+        if op is None:
+            return
+        port = 'i' if op['kind'] == 'fetch' else 'd'
+        if op['kind'] == 'write':
+            op['aw'] |= bool(s['d_awvalid'] and slaves_out['d_awready'])
+            op['w'] |= bool(s['d_wvalid'] and slaves_out['d_wready'])
+            if s['d_bready'] and slaves_out['d_bvalid']:
+                self.done.append(None)
+                self.op = None
+        else:
+            op['ar'] |= bool(s[f"{port}_arvalid"] and slaves_out[f"{port}_arready"])
+            if s[f"{port}_rready"] and slaves_out[f"{port}_rvalid"]:
+                self.done.append(slaves_out[f"{port}_rdata"])
+                self.op = None
+
+
+@pytest.mark.parametrize('profile', ['none', 'uniform', 'bursty'])
+def test_slaves_with_master(profile):
+    """A well-behaved master sees its writes read back and no violations."""
+    memory = SparseMemory()
+    memory.write(0, 0x0000006F, 0xF)
+    slaves = VignaAxiSlaves(memory, random.Random(11), profile, max_delay=3)
+    ops = []
+    for i in range(20):
+        ops += [{'kind': 'fetch', 'addr': 0},
+                {'kind': 'write', 'addr': 0x100 + 4 * i, 'data': i * 0x01010101},
+                {'kind': 'read', 'addr': 0x100 + 4 * i}]
+    master = _Master(ops)
+    busy = 0
+    out = slaves.outputs()
+    assert sorted(out) == sorted(SLAVE_SIGNALS)
+    for _ in range(3):
+        slaves.reset_step({name: 0 for name in MASTER_SIGNALS})
+    cycles = 0
+    while master.op is not None or master.ops:
+        s = master.outputs(out)
+        master.edge(s, out)
+        out = slaves.step(s)
+        busy += not slaves.data_idle()
+        cycles += 1
+        assert cycles < 5000
+    # The last read has been answered; the writes and reads kept the data bus busy
+    assert slaves.data_idle() and busy >= 40
+    assert master.done == [0x6F, None, 0] + [
+        value for i in range(1, 20) for value in (0x6F, None, i * 0x01010101)]
+    assert slaves.checker.count == 0
+    stats = slaves.stats(cycles)
+    assert stats['instr']['transactions'] == stats['data_write']['transactions'] == 20
+    assert 0 < stats['data_read']['utilization'] < 1
+    assert is_halt_loop(memory, 0) and not is_halt_loop(memory, 0x100)
+
+
+def test_stress_helpers():
+    """Seed batching, nearest-rank percentiles, verdicts and the summary."""
+    assert seed_batches(1, 120, 50) == [(1, 50), (51, 50), (101, 20)]
+    with pytest.raises(ValueError):
+        seed_batches(1, 0, 50)
+    assert percentile(list(range(1, 101)), 95) == 95 and percentile([7], 50) == 7
+
+    exp = load_expectation(os.path.join(EXPECTED_DIR, 'sorting_test.json'))
+    channels = {channel: {'transactions': 10, 'utilization': 0.5, 'stall_cycles': 2,
+                          'mean_latency': 3.0, 'max_latency': 6}
+                for channel in ('instr', 'data_read', 'data_write')}
+    record = {'seed': 4, 'halted': True, 'cycles': 400, 'violation_count': 0, 'violations': [],
+              'signature': [1, 2, 5, 8, 9, 0xABCDEF00], 'channels': channels}
+    passed = judge(record, exp, 200)
+    assert passed['status'] == 'pass' and passed['ipc'] == 0.5
+
+    wrong = judge(dict(record, signature=[1, 2, 8, 5, 9, 0xABCDEF00]), exp, 200)
+    assert wrong['status'] == 'fail' and wrong['message'].startswith('2 signature words differ')
+    broken = judge(dict(record, violation_count=1, violations=['cycle 9: d_w: VALID is X/Z']), exp, 200)
+    assert 'protocol' in broken['message']
+    assert 'no halt' in judge(dict(record, halted=False), exp, 200)['message']
+
+    summary = summarize([passed, judge(dict(record, seed=5, cycles=500), exp, 200), wrong])
+    assert (summary['seeds'], summary['passed'], summary['failed']) == (3, 2, 1)
+    assert summary['cycles'] == {'min': 400, 'mean': 450.0, 'p95': 500, 'max': 500}
+    assert summary['ipc']['max'] == 0.5 and summary['channels']['instr']['max_latency'] == 6
@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+Tests for the AXI transaction analyzer (handshake extraction, transaction
+pairing, utilization and stall split, on hand-written logs and dumps).
+"""
+
+import os
+import sys
+import tempfile
+
+import pytest
+
+np = pytest.importorskip('numpy')
+
+# Add tools directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'tools'))
+
+from vigna_axi_stats import (
+    CHANNEL_SIGNALS, channel_events, find_bridge_scope, load_dump, load_log, transactions,
+    histogram, spread, analyze, format_report
+)
+
+# Two instruction reads and one write; the first read waits a cycle for
+# arready and its response a cycle for rready
+LOG = """# cycle channel event payload
+0 i_ar valid 00000000
+1 i_ar handshake 00000000
+3 i_r valid 00000013
+4 i_r handshake 00000013
+2 d_aw valid 00001000
+2 d_w valid 0000002a
+3 d_aw handshake 00001000
+4 d_w handshake 0000002a
+5 d_b valid 00000000
+5 d_b handshake 00000000
+6 i_ar valid 00000004
+6 i_ar handshake 00000004
+8 i_r valid 0000006f
+8 i_r handshake 0000006f
+"""
+
+
+def write(root, name, text):
+    path = os.path.join(root, name)
+    with open(path, 'w') as f:
+        f.write(text)
+    return path
+
+
+def log_to_samples(text, cycles):
+    """Per-cycle valid/ready/payload arrays reproducing a log's handshakes."""
+    samples = {}
+    for channel, (valid, ready, payload) in CHANNEL_SIGNALS.items():
+        samples[valid] = np.zeros(cycles, dtype=np.uint64)
+        samples[ready] = np.zeros(cycles, dtype=np.uint64)
+        if payload:
+            samples[payload] = np.zeros(cycles, dtype=np.uint64)
+    starts = {}
+    for line in text.splitlines():
+        if line.startswith('#'):
+            continue
+        cycle, channel, event, value = line.split()
+        valid, ready, payload = CHANNEL_SIGNALS[channel]
+        if event == 'valid':
+            starts[channel] = int(cycle)
+            continue
+        samples[valid][starts[channel]:int(cycle) + 1] = 1
+        samples[ready][int(cycle)] = 1
+        if payload:
+            samples[payload][starts[channel]:int(cycle) + 1] = int(value, 16)
+    return samples
+
+
+def make_vcd(samples, cycles, reset_cycles=2):
+    """Dump with the bridge at tb.uut, a memory model with the same ports and reset cycles."""
+    names = sorted(samples)
+    ids = {name: chr(40 + i) for i, name in enumerate(names)}
+    lines = ["$timescale 1ns $end", "$scope module tb $end", "$var reg 1 ! clk $end",
+             "$var reg 1 \" resetn $end"]
+    for scope in ('uut', 'mem'):
+        lines += [f"$scope module {scope} $end", "$var wire 1 ! clk $end", "$var wire 1 \" resetn $end"]
+        lines += [f"$var wire 32 {ids[name]} {name} $end" for name in names]
+        if scope == 'uut':
+            lines += ["$scope module vigna_core_inst $end", "$var reg 32 & pc $end", "$upscope $end"]
+        lines.append("$upscope $end")
+    lines += ["$upscope $end", "$enddefinitions $end", "#0", "0!", "0\"", "b0 &"]
+    lines += [f"b0 {ids[name]}" for name in names]
+    time = 0
+    for cycle in range(-reset_cycles, cycles):
+        # Values change half a cycle before the edge that samples them
+        lines.append(f"#{time + 5}")
+        lines.append("0!")
+        lines.append("1\"" if cycle >= 0 else "0\"")
+        if cycle >= 0:
+            lines += [f"b{int(samples[name][cycle]):b} {ids[name]}" for name in names]
+        lines.append(f"#{time + 10}")
+        lines.append("1!")
+        time += 10
+    return "\n".join(lines) + "\n"
+
+
+def test_channel_events():
+    """VALID rises and handshakes, including back-to-back transfers."""
+    valid = [0, 1, 1, 1, 0, 1, 1, 1]
+    ready = [0, 0, 0, 1, 0, 1, 1, 0]
+    events = channel_events(valid, ready, [0, 5, 5, 5, 0, 6, 7, 8])
+    assert events['valid'].tolist() == [1, 5, 6, 7]
+    assert events['handshake'].tolist() == [3, 5, 6]
+    assert events['payload'].tolist() == [5, 6, 7]
+
+
+def test_log_analysis():
+    """Latency, stall split, utilization and overlap of a small log."""
+    with tempfile.TemporaryDirectory() as root:
+        cycles, events = load_log(write(root, 'axi.log', LOG))
+    assert cycles == 9
+    t = transactions(events)
+    assert t['instr']['request'].tolist() == [0, 6]
+    assert t['instr']['done'].tolist() == [4, 8]
+    assert t['data_write']['request'].tolist() == [2]
+    assert t['data_write']['accept'].tolist() == [4]
+    assert t['data_read']['request'].tolist() == []
+
+    report = analyze(cycles, events)
+    instr = report['channels']['instr']
+    assert instr['transactions'] == 2 and instr['utilization'] == round(8 / 9, 4)
+    assert instr['latency']['min'] == 2 and instr['latency']['max'] == 3
+    assert instr['stall_cycles'] == {'request_wait': 1, 'slave': 4, 'response_wait': 1}
+    assert report['channels']['data_write']['stall_cycles'] == {
+        'request_wait': 2, 'slave': 1, 'response_wait': 0}
+    assert report['channels']['data_read']['latency'] is None
+    assert report['overlap'] == {'both_busy': round(3 / 9, 4), 'instr_only': round(5 / 9, 4),
+                                 'data_only': round(1 / 9, 4), 'idle': 0.0}
+    assert report['contributors'][0] == {'channel': 'instr', 'cause': 'slave', 'cycles': 4,
+                                         'share': round(4 / 9, 4)}
+    assert report['addresses'][0] == {'channel': 'instr', 'address': 0, 'transactions': 1, 'cycles': 3}
+    text = format_report(report)
+    assert 'instruction only 55.6%' in text and '0x00001000' in text
+
+
+def test_dump_matches_log():
+    """A dump of the same handshakes gives the same report as the log."""
+    cycles = 9
+    samples = log_to_samples(LOG, cycles)
+    with tempfile.TemporaryDirectory() as root:
+        vcd = write(root, 'axi.vcd', make_vcd(samples, cycles))
+        dump_cycles, dump_events = load_dump(vcd)
+        _, log_events = load_log(write(root, 'axi.log', LOG))
+    assert dump_cycles == cycles
+    assert analyze(dump_cycles, dump_events) == analyze(cycles, log_events)
+
+    names = ['tb.mem.' + n for n in samples] + ['tb.uut.' + n for n in samples] + ['tb.uut.vigna_core_inst.pc']
+    assert find_bridge_scope(names) == 'tb.uut'
+    with pytest.raises(ValueError):
+        find_bridge_scope(['tb.clk', 'tb.uut.i_arvalid'])
+
+
+def test_histogram_and_spread():
+    """One bin per value when they fit, wider bins otherwise; nearest-rank percentiles."""
+    assert histogram([3, 3, 5]) == [(3, 3, 2), (4, 4, 0), (5, 5, 1)]
+    assert histogram(list(range(100)), max_bins=10)[0] == (0, 9, 10)
+    assert len(histogram(list(range(101)), max_bins=10)) == 10
+    assert histogram([]) == []
+    assert spread(np.arange(1, 101)) == {'min': 1, 'mean': 50.5, 'p50': 50, 'p95': 95, 'p99': 99,
+                                         'max': 100}
+    assert spread(np.array([], dtype=np.int64)) is None
+
+
+def test_malformed_log():
+    """Lines that are not a channel event are reported with their number."""
+    with tempfile.TemporaryDirectory() as root:
+        with pytest.raises(ValueError, match='line 2'):
+            load_log(write(root, 'bad.log', "0 i_ar valid 0\n1 x_ar valid 0\n"))
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Tests for the benchmark runner (variant selection, iteration timing from
+harness marks, the history database and regression detection) and for the
+benchmark sources themselves, which are checked natively against the suite.
+"""
+
+import os
+import sys
+import shutil
+import subprocess
+
+import pytest
+
+# Add tools directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'tools'))
+
+from vigna_config_generator import PREDEFINED_CONFIGS
+from vigna_bench import (load_suite, isa_variant, bench_expectation, iteration_cycles,
+                         significance, compare_results, BenchHistory, config_fingerprint,
+                         rtl_fingerprint)
+from vigna_harness import harness_plusargs, parse_marks
+
+BENCH_DIR = os.path.join(os.path.dirname(__file__), '..', 'programs', 'bench')
+
+
+def test_variant_per_config():
+    """Each predefined configuration runs the richest image its extensions allow."""
+    variants = load_suite()['variants']
+    chosen = {name: isa_variant(info['options'], variants) for name, info in PREDEFINED_CONFIGS.items()}
+    assert chosen['rv32i'] == 'rv32i'
+    assert chosen['rv32e'] == 'rv32e'
+    assert chosen['rv32imc'] == 'rv32imc'
+    assert chosen['rv32imc_zicsr'] == 'rv32imc'
+    assert isa_variant({'e_extension': True, 'm_extension': True}, variants) == 'rv32e'
+    assert isa_variant({'e_extension': True}, ['rv32i']) is None
+
+
+def test_expectation_requests_marks():
+    """Benchmark runs check the signature and ask the harness for iteration marks."""
+    suite = load_suite()
+    exp = bench_expectation(suite, 'crc32', 'rv32im')
+    assert exp['image'].endswith(os.path.join('build', 'bench', 'crc32_rv32im.mem'))
+    assert exp['expect'] == [4, suite['benchmarks']['crc32']['checksum'], 0x600DBE4C]
+    assert '+mark=8010' in harness_plusargs(exp, 'sig.mem')
+
+
+def test_iteration_cycles_from_marks():
+    """Iteration lengths come from consecutive marks; missing marks give None."""
+    output = "Mark 0x00000000 at cycle 40\nMark 0x00000001 at cycle 140\nMark 0x00000002 at cycle 250\n"
+    marks = parse_marks(output)
+    assert marks == [(0, 40), (1, 140), (2, 250)]
+    assert iteration_cycles(marks, 2) == [100, 110]
+    assert iteration_cycles(marks, 3) is None
+
+
+def test_significance():
+    """Noise inside z standard deviations passes; deterministic changes are flagged."""
+    assert significance(100.0, []) == ('new', None)
+    assert significance(100.0, [100.0, 100.0])[0] == 'ok'
+    assert significance(101.0, [100.0, 100.0])[0] == 'regression'
+    assert significance(99.0, [100.0])[0] == 'improvement'
+    assert significance(104.0, [95.0, 100.0, 105.0])[0] == 'ok'
+    assert significance(100.2, [100.0], min_change=0.005)[0] == 'ok'
+
+
+def test_history_window(tmp_path):
+    """Earlier results of the same series are returned oldest first, limited to the window."""
+    history = BenchHistory(str(tmp_path / 'bench.sqlite'))
+    config = PREDEFINED_CONFIGS['rv32im']['options']
+    base = {'benchmark': 'crc32', 'config': 'rv32im', 'config_fp': config_fingerprint(config),
+            'rtl_fp': 'r', 'image_fp': 'img', 'variant': 'rv32im', 'iterations': 4, 'cycles': 0,
+            'min_iteration': 0, 'max_iteration': 0}
+    runs = []
+    for value in (100.0, 101.0, 102.0):
+        run = history.start_run('abc', False)
+        history.record(run, dict(base, per_iteration=value))
+        runs.append(run)
+    history.record(runs[-1], dict(base, image_fp='other', per_iteration=5.0))
+
+    assert history.previous('crc32', base['config_fp'], 'img', runs[-1]) == [100.0, 101.0]
+    assert history.previous('crc32', base['config_fp'], 'img', window=2) == [101.0, 102.0]
+    assert [row['per_iteration'] for row in history.series('crc32', 'rv32im', limit=3)] == [5.0, 102.0, 101.0]
+    history.close()
+
+
+def test_compare_results():
+    """Results with an option enabled pair up with the configuration as defined."""
+    def result(name, config, per, status='pass'):
+        return {'benchmark': name, 'config': config, 'status': status, 'per_iteration': per}
+    results = [result('matrix', 'rv32im', 4000.0), result('matrix', 'rv32im+m_fpga_fast', 1000.0),
+               result('divide', 'rv32im', 900.0), result('divide', 'rv32im+m_fpga_fast', None, 'fail'),
+               result('matrix', 'rv32i', 5000.0)]
+    rows = compare_results(results, 'm_fpga_fast')
+    assert rows == [{'benchmark': 'matrix', 'config': 'rv32im', 'base': 4000.0,
+                     'variant': 1000.0, 'speedup': 4.0}]
+
+
+def test_fingerprints():
+    """Configuration fingerprints ignore names; RTL fingerprints follow the configuration."""
+    rv32i = PREDEFINED_CONFIGS['rv32i']['options']
+    rv32im = PREDEFINED_CONFIGS['rv32im']['options']
+    assert config_fingerprint(dict(rv32i)) == config_fingerprint(rv32i)
+    assert config_fingerprint(rv32i) != config_fingerprint(rv32im)
+    assert rtl_fingerprint(rv32i) != rtl_fingerprint(rv32im)
+
+
+@pytest.mark.skipif(shutil.which('gcc') is None, reason="native gcc not available")
+@pytest.mark.parametrize('name', sorted(load_suite()['benchmarks']))
+def test_native_checksum_matches_suite(tmp_path, name):
+    """Each kernel built natively (-DBENCH_HOST) reproduces the suite's iterations and checksum."""
+    info = load_suite()['benchmarks'][name]
+    exe = str(tmp_path / name)
+    subprocess.run(['gcc', '-std=c99', '-O2', '-DBENCH_HOST', os.path.join(BENCH_DIR, name + '.c'),
+                    '-o', exe], check=True)
+    iterations, checksum = subprocess.run([exe], capture_output=True, text=True, check=True).stdout.split()
+    assert int(iterations) == info['iterations']
+    assert int(checksum, 16) == info['checksum']
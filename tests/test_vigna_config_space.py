@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Tests for the configuration space explorer (constraint propagation,
+exhaustive enumeration and covering arrays).
+"""
+
+import os
+import sys
+import itertools
+
+# Add tools directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'tools'))
+
+from vigna_config_generator import VignaConfigGenerator, PREDEFINED_CONFIGS
+from vigna_config_space import ConfigSpace, covering_array, sample_configs, parse_fixed
+from vigna_regression import build_jobs
+
+TOY_OPTIONS = {
+    'a': {'default': False, 'conflicts': ['b']},
+    'b': {'default': False, 'conflicts': []},
+    'c': {'default': False, 'conflicts': [], 'depends_on': 'a'},
+    'd': {'default': False, 'conflicts': []},
+    'v': {'default': '1', 'conflicts': [], 'type': 'value', 'depends_on': 'd'},
+}
+
+
+def brute_force(options):
+    generator = VignaConfigGenerator()
+    generator.options = options
+    names = [n for n, info in options.items() if info.get('type') != 'value']
+    return [dict(zip(names, values)) for values in itertools.product((False, True), repeat=len(names))
+            if generator.validate_config(dict(zip(names, values)))[0]]
+
+
+def test_enumeration_matches_validation():
+    """Propagation yields exactly the assignments validate_config accepts."""
+    space = ConfigSpace(TOY_OPTIONS)
+    assert sorted(map(sorted, map(dict.items, space.enumerate()))) == \
+        sorted(map(sorted, map(dict.items, brute_force(TOY_OPTIONS))))
+    assert space.assign({}, 'c', True) == {'c': True, 'a': True, 'b': False}
+    assert space.assign({'b': True}, 'c', True) is None
+    assert space.config({'a': True, 'd': True})['v'] == '1'
+    assert 'v' not in space.config({'a': True})
+
+
+def test_real_space_and_fixed_options():
+    """Every enumerated real configuration validates; fixed options shrink the space."""
+    generator = VignaConfigGenerator()
+    space = ConfigSpace()
+    configs = list(space.enumerate())
+    assert len(configs) == space.count() == len(brute_force(generator.options))
+    assert all(generator.validate_config(config)[0] for config in configs)
+
+    fixed = ConfigSpace(fixed=parse_fixed(['interrupt=1']))
+    assert 'zicsr_extension' not in fixed.free
+    assert all(c['interrupt'] and c['zicsr_extension'] for c in fixed.enumerate())
+    try:
+        ConfigSpace(fixed={'interrupt': True, 'zicsr_extension': False})
+        assert False, "contradiction not detected"
+    except ValueError:
+        pass
+
+
+def test_covering_array_covers_all_feasible_tuples():
+    """Pairwise and 3-wise samples cover every feasible combination with valid rows."""
+    space = ConfigSpace()
+    for strength in (2, 3):
+        rows = covering_array(space, strength, seed=1)
+        assert len(rows) < space.count() // 20
+        for row in rows:
+            assert space.assign_all(row.items()) == row
+        for combo in itertools.combinations(space.free, strength):
+            for values in itertools.product((False, True), repeat=strength):
+                literals = list(zip(combo, values))
+                if space.assign_all(literals) is not None:
+                    assert any(all(row[n] == v for n, v in literals) for row in rows), literals
+
+
+def test_sample_extends_predefined_configs():
+    """A sample starts from the shipped configurations and feeds the regression runner."""
+    configs = sample_configs(2, seed=0)
+    assert list(configs)[:len(PREDEFINED_CONFIGS)] == list(PREDEFINED_CONFIGS)
+    added = [name for name in configs if name.startswith('t2_')]
+    assert added and len(configs) == len(PREDEFINED_CONFIGS) + len(added)
+    assert sample_configs(2, seed=0) == configs
+
+    jobs = build_jobs(testbenches=['processor'], configs=configs)
+    assert [job.config_name for job in jobs] == list(configs)
+    assert jobs[-1].options['reset_addr'] == "32'h0000_0000"
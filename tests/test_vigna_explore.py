@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Tests for the design-space explorer (Pareto frontier, cycle cache keys,
+timing-model measurement and report output).
+"""
+
+import os
+import sys
+import csv
+
+# Add tools directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'tools'))
+
+from vigna_config_generator import VignaConfigGenerator, PREDEFINED_CONFIGS
+from vigna_explore import pareto_front, cycles_key, model_cycles, write_csv, render_svg
+from vigna_harness import load_expectation
+
+EXPECTED_DIR = os.path.join(os.path.dirname(__file__), '..', 'programs', 'expected')
+
+
+def point(name, cycles, lut):
+    return {'config': name, 'status': 'ok', 'message': '', 'cycles': cycles, 'instret': 100,
+            'cpi': cycles / 100, 'lut': lut, 'ff': 0, 'cells': lut}
+
+
+def test_pareto_front_drops_dominated_points():
+    """Only points no other point beats on both axes survive, ordered by cycles."""
+    points = [point('small', 900, 400), point('fast', 500, 900), point('mid', 700, 600),
+              point('worse', 800, 700), point('same_cycles_bigger', 500, 950),
+              {'config': 'failed', 'status': 'error', 'cycles': None, 'lut': None}]
+    front = pareto_front(points, ['cycles', 'lut'])
+    assert [p['config'] for p in front] == ['fast', 'mid', 'small']
+
+
+def test_pareto_front_keeps_one_of_equal_points():
+    """Configurations with identical results appear once on the frontier."""
+    front = pareto_front([point('a', 500, 500), point('b', 500, 500)], ['cycles', 'lut'])
+    assert [p['config'] for p in front] == ['a']
+
+
+def test_model_cycles_on_workload():
+    """The timing model measures the expectation workload and counts instructions."""
+    workload = [load_expectation(os.path.join(EXPECTED_DIR, 'simple_test.json'))]
+    cycles, instret = model_cycles(PREDEFINED_CONFIGS['rv32i']['options'], workload)
+    assert instret > 0 and cycles > instret
+
+
+def test_cycles_key_tracks_config_and_mode():
+    """Keys change with the configuration header and with the cycle source."""
+    workload = [load_expectation(os.path.join(EXPECTED_DIR, 'simple_test.json'))]
+    generator = VignaConfigGenerator()
+    rv32i = generator.render_config(PREDEFINED_CONFIGS['rv32i']['options'], 'rv32i')
+    rv32im = generator.render_config(PREDEFINED_CONFIGS['rv32im']['options'], 'rv32im')
+    assert cycles_key(rv32i, workload, 'model') == cycles_key(rv32i, workload, 'model')
+    assert cycles_key(rv32i, workload, 'model') != cycles_key(rv32im, workload, 'model')
+    assert cycles_key(rv32i, workload, 'model') != cycles_key(rv32i, workload, 'rtl', 'v12')
+
+
+def test_csv_and_svg_outputs(tmp_path):
+    """Every point is written to the CSV; frontier points are labelled in the plot."""
+    points = [point('small', 900, 400), point('fast', 500, 900), point('worse', 950, 950)]
+    for p in pareto_front(points, ['cycles', 'lut']):
+        p['pareto'] = True
+    path = tmp_path / 'points.csv'
+    write_csv(str(path), points)
+    with open(path, newline='') as f:
+        rows = list(csv.DictReader(f))
+    assert [(r['config'], r['pareto']) for r in rows] == [('small', '1'), ('fast', '1'), ('worse', '0')]
+
+    svg = render_svg(points, 'lut')
+    assert svg.startswith('<svg') and '<polyline' in svg
+    assert '>small</text>' in svg and '>worse</text>' not in svg
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Tests for the program harness driver (expectation files, plusargs and
+signature checking; simulating the harness needs Icarus Verilog).
+"""
+
+import os
+import sys
+import glob
+import tempfile
+
+# Add tools directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'tools'))
+
+from vigna_iss import VignaISS
+from vigna_harness import (
+    load_expectation, harness_plusargs, parse_run_output, read_signature, check_signature
+)
+
+REPO_ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+EXPECTED_DIR = os.path.join(REPO_ROOT, 'programs', 'expected')
+
+
+def test_expectations_match_iss():
+    """Every shipped expectation file agrees with the instruction-set simulator."""
+    paths = glob.glob(os.path.join(EXPECTED_DIR, '*.json'))
+    assert paths
+    for path in paths:
+        exp = load_expectation(path)
+        assert os.path.exists(exp['image']), path
+        iss = VignaISS({}, mem_size=exp['mem_size'])
+        iss.load_mem(exp['image'])
+        assert iss.run(exp['max_cycles']) == 'halt', path
+        words = [iss.read_word(a) for a in range(exp['begin'], exp['end'], 4)]
+        assert check_signature(exp, words) == [], path
+
+
+def test_plusargs_and_output_parsing():
+    """Plusargs carry the run-time settings; halt and timeout lines are parsed."""
+    exp = load_expectation(os.path.join(EXPECTED_DIR, 'simple_test.json'))
+    args = harness_plusargs(exp, 'sig.mem')
+    assert '+sig_begin=1000' in args
+    assert '+sig_end=1010' in args
+    assert '+max_cycles=1000' in args
+    assert args[0].startswith('+image=') and args[0].endswith('simple_test.mem')
+
+    assert parse_run_output("Program halted at PC=0x00000034 after          54 cycles\n") == \
+        (True, 0x34, 54)
+    assert parse_run_output("Program timeout after        1000 cycles\n") == (False, None, 1000)
+
+
+def test_signature_check():
+    """$writememh dumps are read in order and compared word by word."""
+    exp = load_expectation(os.path.join(EXPECTED_DIR, 'simple_test.json'))
+    with tempfile.NamedTemporaryFile(mode='w', suffix='.mem', delete=False) as f:
+        f.write("// 0x00000400\n@400\n0000001e\n0000000f\n00000014\ndeadbeee\n")
+        path = f.name
+    try:
+        words = read_signature(path)
+    finally:
+        os.unlink(path)
+    assert words == [30, 15, 20, 0xDEADBEEE]
+    assert check_signature(exp, words) == [(0x100C, 0xDEADBEEF, 0xDEADBEEE)]
+    assert check_signature(exp, words[:2])[0] == (0x1008, 20, None)
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Tests for the batch image converter (templates, manifests, the worker pool
+and content-hash skipping).
+"""
+
+import os
+import sys
+import json
+import tempfile
+
+# Add tools directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'tools'))
+
+from bin_to_verilog_mem import bin_to_verilog_mem, read_symbols
+from vigna_image_batch import (
+    parse_output_spec, expand_inputs, jobs_from_templates, load_manifest, run_batch
+)
+from test_bin_to_verilog_mem import make_elf
+
+OUTPUTS = ['{dir}/{stem}.mem', '{dir}/{stem}.vh:assignments', '{dir}/out/{stem}.dmem::data']
+
+
+def _write_elfs(root, count):
+    paths = []
+    for i in range(count):
+        path = os.path.join(root, f"prog{i}.elf")
+        with open(path, 'wb') as f:
+            f.write(make_elf(data_addr=0x100 + 0x10 * i))
+        paths.append(path)
+    return paths
+
+
+def _read(path):
+    with open(path, 'r') as f:
+        return f.read()
+
+
+def test_output_specs():
+    """Templates take an optional format and image selection."""
+    assert parse_output_spec('{stem}.vh:assignments') == \
+        {'path': '{stem}.vh', 'format': 'assignments', 'image': 'all'}
+    assert parse_output_spec('{stem}.dmem::data')['format'] == 'readmemh'
+    for bad in ('{stem}.x:nope', '{stem}.x:readmemh:both'):
+        try:
+            parse_output_spec(bad)
+            assert False, bad
+        except ValueError:
+            pass
+
+
+def test_batch_matches_single_conversion():
+    """Every output equals what bin_to_verilog_mem.py writes for that file alone."""
+    with tempfile.TemporaryDirectory() as root:
+        elfs = _write_elfs(root, 4)
+        jobs = jobs_from_templates(expand_inputs([os.path.join(root, '*.elf')]),
+                                   [parse_output_spec(s) for s in OUTPUTS], '{dir}/{stem}.sym')
+        assert [j['input'] for j in jobs] == elfs
+        state = os.path.join(root, 'state.json')
+        results = run_batch(jobs, workers=2, state_file=state)
+        assert all(r['status'] == 'ok' and len(r['written']) == 4 for r in results)
+
+        for elf in elfs:
+            stem = elf[:-4]
+            bin_to_verilog_mem(elf, stem + '.ref.mem')
+            bin_to_verilog_mem(elf, stem + '.ref.vh', format_type='assignments')
+            assert _read(stem + '.mem') == _read(stem + '.ref.mem')
+            assert _read(stem + '.vh') == _read(stem + '.ref.vh')
+            assert [s['name'] for s in read_symbols(stem + '.sym')] == ['_start', 'table']
+        assert '\n@44\n11223344\n' in _read(os.path.join(root, 'out', 'prog1.dmem'))
+
+
+def test_unchanged_inputs_are_skipped():
+    """A second run writes nothing; changing one input or a setting rewrites only that."""
+    with tempfile.TemporaryDirectory() as root:
+        elfs = _write_elfs(root, 3)
+        outputs = [parse_output_spec(s) for s in OUTPUTS[:2]]
+        state = os.path.join(root, 'state.json')
+        run_batch(jobs_from_templates(elfs, outputs), state_file=state)
+
+        results = run_batch(jobs_from_templates(elfs, outputs), state_file=state)
+        assert [len(r['written']) for r in results] == [0, 0, 0]
+        assert [len(r['skipped']) for r in results] == [2, 2, 2]
+
+        with open(elfs[1], 'wb') as f:
+            f.write(make_elf(data_addr=0x200))
+        os.remove(elfs[2][:-4] + '.vh')
+        results = run_batch(jobs_from_templates(elfs, outputs), state_file=state)
+        assert [len(r['written']) for r in results] == [0, 2, 1]
+
+        results = run_batch(jobs_from_templates(elfs, outputs, base_addr=0x0, data_base=0x100),
+                            state_file=state)
+        assert [len(r['written']) for r in results] == [2, 2, 2]
+        results = run_batch(jobs_from_templates(elfs[:1], outputs, data_base=0x100),
+                            state_file=state, force=True)
+        assert len(results[0]['written']) == 2
+
+
+def test_manifest_and_errors():
+    """Manifest paths are relative to the manifest; a bad input fails only its own job."""
+    with tempfile.TemporaryDirectory() as root:
+        _write_elfs(root, 1)
+        manifest = os.path.join(root, 'images.json')
+        with open(manifest, 'w') as f:
+            json.dump({'jobs': [
+                {'input': 'prog0.elf', 'data_base': '0x100',
+                 'outputs': [{'path': 'prog0.imem', 'image': 'code'},
+                             {'path': 'prog0.dmem', 'image': 'data'},
+                             {'path': 'prog0.mif', 'format': 'mif', 'depth': 128}]},
+                {'input': 'missing.elf', 'outputs': [{'path': 'missing.mem'}]},
+            ]}, f)
+        jobs = load_manifest(manifest)
+        results = run_batch(jobs, workers=2, state_file=os.path.join(root, 'state.json'))
+        assert results[0]['status'] == 'ok' and len(results[0]['written']) == 3
+        assert results[1]['status'] == 'error' and not results[1]['keys']
+        assert '\n\n11223344\n55667788\n' in _read(os.path.join(root, 'prog0.dmem'))
+        assert 'DEPTH=128;' in _read(os.path.join(root, 'prog0.mif'))
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Tests for the interrupt latency harness (plusargs, schedules, parsing the
+harness's IRQ lines and the latency summary; the runs themselves need Icarus
+Verilog).
+"""
+
+import os
+import sys
+import csv
+import tempfile
+
+import pytest
+
+# Add tools directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'tools'))
+
+from vigna_harness import load_expectation, parse_irqs
+from vigna_irq import (
+    DEFAULT_CONFIGS, IRQ_VECTOR, parse_lines, read_schedule, irq_plusargs, vector_conflict, latencies,
+    summarize, worst_cases, describe, write_csv, run_seed
+)
+from vigna_bench import load_suite, bench_expectation, DEFAULT_SUITE
+
+REPO_ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+EXPECTED_DIR = os.path.join(REPO_ROOT, 'programs', 'expected')
+
+OUTPUT = """IRQ timer raised at cycle 22 during 0x00000014 taken at cycle 26 mepc 0x00000018
+IRQ soft raised at cycle 49 during 0x00000028 taken at cycle 52 mepc 0x0000002c
+IRQ ext raised at cycle 61 during 0x0000002c taken at cycle 97 mepc 0x00000030
+IRQ timer raised at cycle 60 during 0x0000002c taken at cycle 99 mepc 0x00000030
+Program halted at PC=0x000000ac after         973 cycles
+Interrupts: 4 raised, 4 taken
+"""
+
+
+def test_lines_and_plusargs():
+    """Line lists become the +irq_lines mask; random runs and schedules get their plusargs."""
+    assert parse_lines('ext,timer,soft') == 7
+    assert parse_lines('ext, soft') == 5
+    with pytest.raises(ValueError):
+        parse_lines('nmi')
+    assert irq_plusargs(3, 20, 4) == ['+irq_random=20', '+irq_lines=4', '+irq_seed=3', '+irq_vector=c000']
+    assert irq_plusargs(None, 20, schedule='/tmp/irqs.txt', vector=0x9000) == [
+        '+irq_schedule=/tmp/irqs.txt', '+irq_vector=9000']
+    assert DEFAULT_CONFIGS == ['rv32im_zicsr', 'rv32imc_zicsr']
+
+
+def test_read_schedule():
+    """Schedules are sorted by cycle; comments are skipped and bad lines named."""
+    with tempfile.TemporaryDirectory() as root:
+        path = os.path.join(root, 'irqs.txt')
+        with open(path, 'w') as f:
+            f.write("# cycle line\n100 soft\n\n20 ext   # first\n21 timer\n")
+        assert read_schedule(path) == [(20, 'ext'), (21, 'timer'), (100, 'soft')]
+        with open(path, 'w') as f:
+            f.write("20 ext\n30 nmi\n")
+        with pytest.raises(ValueError, match=':2:'):
+            read_schedule(path)
+
+
+def test_latency_summary():
+    """Latency runs from the line going up to the vector fetch; spreads per line and overall."""
+    irqs = parse_irqs(OUTPUT)
+    assert irqs[0] == {'line': 'timer', 'raised': 22, 'during': 0x14, 'taken': 26, 'mepc': 0x18}
+    samples = latencies({'config': 'rv32im_zicsr', 'program': 'p', 'seed': 1, 'irqs': irqs})
+    assert [s['latency'] for s in samples] == [4, 3, 36, 39]
+
+    summary = summarize(samples)['rv32im_zicsr']
+    assert list(summary) == ['ext', 'timer', 'soft', 'all']
+    assert summary['timer'] == {'count': 2, 'min': 4, 'mean': 21.5, 'p99': 39, 'max': 39}
+    assert summary['all'] == {'count': 4, 'min': 3, 'mean': 20.5, 'p99': 39, 'max': 39}
+
+    # One entry per executing instruction, longest first
+    worst = worst_cases(samples, 3)
+    assert [(s['latency'], s['during']) for s in worst] == [(39, 0x2c), (4, 0x14), (3, 0x28)]
+
+
+def test_describe_and_csv():
+    """Worst cases name the instruction executing; one CSV row per interrupt."""
+    exp = load_expectation(os.path.join(EXPECTED_DIR, 'sorting_test.json'))
+    assert describe(exp, {}, 0) != '?'
+    assert describe(exp, {}, IRQ_VECTOR).startswith('mret')
+    assert describe(dict(exp, image='missing.mem'), {}, 0) == '?'
+
+    samples = latencies({'config': 'c', 'program': 'p', 'seed': None, 'irqs': parse_irqs(OUTPUT)})
+    with tempfile.TemporaryDirectory() as root:
+        path = os.path.join(root, 'irq.csv')
+        write_csv(path, samples)
+        with open(path, newline='') as f:
+            rows = list(csv.DictReader(f))
+    assert len(rows) == 4
+    assert rows[2]['line'] == 'ext' and rows[2]['latency'] == '36' and rows[2]['during'] == '0x0000002c'
+
+
+def test_vector_conflict():
+    """The trap vector must stay clear of every program's image, signature and mark."""
+    exp = load_expectation(os.path.join(EXPECTED_DIR, 'sorting_test.json'))
+    for path in sorted(os.listdir(EXPECTED_DIR)):
+        assert vector_conflict(load_expectation(os.path.join(EXPECTED_DIR, path))) is None
+    suite = load_suite(DEFAULT_SUITE)
+    bench = dict(bench_expectation(suite, 'divide', 'rv32im'), image=exp['image'])
+    assert vector_conflict(bench) is None
+
+    assert 'signature' in vector_conflict(bench, suite['output'])
+    assert 'mark' in vector_conflict(bench, suite['mark'])
+    assert 'inside sorting_test.mem' in vector_conflict(exp, 0x10)
+    # The harness memory wraps at its size
+    assert 'inside' in vector_conflict(dict(exp, mem_size=0x4000))
+
+    # Such runs are reported without simulating
+    result = run_seed('missing.vvp', 'c', dict(exp, begin=IRQ_VECTOR, end=IRQ_VECTOR + 4), 1, [], '.', 1)
+    assert result['status'] == 'error' and 'signature' in result['message']
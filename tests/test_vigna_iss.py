@@ -0,0 +1,260 @@
+#!/usr/bin/env python3
+"""
+Tests for the VIGNA instruction-set simulator.
+Runs the prebuilt program images and checks individual instruction semantics.
+"""
+
+import os
+import sys
+import tempfile
+
+# Add tools directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'tools'))
+
+import vigna_iss
+from vigna_iss import (
+    VignaISS, IllegalInstructionError, expand_compressed, read_mem_image,
+    _enc_i, _enc_r, _enc_s, _enc_b, _enc_j, _enc_u
+)
+
+REPO_ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+BUILD_DIR = os.path.join(REPO_ROOT, 'programs', 'build')
+
+HALT = 0x0000006f  # jal x0, 0
+
+
+def run_words(words, config=None, max_instructions=10000):
+    """Load a list of instruction words at address 0 and run them."""
+    iss = VignaISS(config or {})
+    for i, word in enumerate(words):
+        iss.write_word(4 * i, word)
+    reason = iss.run(max_instructions)
+    return iss, reason
+
+
+def test_program_images():
+    """The prebuilt programs produce the results program_testbench.v expects."""
+    expected = {
+        'simple_test.mem': [30, 15, 20, 0xDEADBEEF],
+        'fibonacci_simple.mem': [0, 1, 1, 2, 3, 5, 8, 13, 0x12345678],
+    }
+    for image, values in expected.items():
+        iss = VignaISS({})
+        iss.load_mem(os.path.join(BUILD_DIR, image))
+        assert iss.run(100000) == 'halt', image
+        for i, value in enumerate(values):
+            assert iss.read_word(0x1000 + 4 * i) == value, (image, i)
+
+
+def test_read_mem_image_directives():
+    """$readmemh comments and @address directives are honoured."""
+    with tempfile.NamedTemporaryFile(mode='w', suffix='.mem', delete=False) as f:
+        f.write("// header\n00000013 /* inline */ 00000093\n@10\ndeadbeef\n")
+        path = f.name
+    try:
+        assert read_mem_image(path) == [(0, 0x13), (1, 0x93), (0x10, 0xdeadbeef)]
+    finally:
+        os.unlink(path)
+
+
+def test_alu_and_branches():
+    """Signed/unsigned comparisons, shifts and a counted loop."""
+    words = [
+        _enc_i(-5, 0, 0, 1, 0x13),          # addi x1, x0, -5
+        _enc_i(3, 0, 0, 2, 0x13),           # addi x2, x0, 3
+        _enc_r(0, 2, 1, 2, 3, 0x33),        # slt  x3, x1, x2  -> 1
+        _enc_r(0, 2, 1, 3, 4, 0x33),        # sltu x4, x1, x2  -> 0
+        _enc_r(0x20, 2, 1, 5, 5, 0x13),     # srai x5, x1, 2   -> -2
+        _enc_r(0, 2, 1, 5, 6, 0x13),        # srli x6, x1, 2
+        _enc_i(0, 0, 0, 7, 0x13),           # addi x7, x0, 0
+        _enc_i(1, 7, 0, 7, 0x13),           # loop: addi x7, x7, 1
+        _enc_b(-4, 2, 7, 1, 0x63),          # bne x7, x2, loop
+        HALT,
+    ]
+    iss, reason = run_words(words)
+    assert reason == 'halt'
+    assert iss.regs[3] == 1
+    assert iss.regs[4] == 0
+    assert iss.regs[5] == 0xFFFFFFFE
+    assert iss.regs[6] == 0xFFFFFFFB >> 2
+    assert iss.regs[7] == 3
+
+
+def test_m_extension_corner_cases():
+    """Division by zero and signed overflow follow the RISC-V spec."""
+    words = [
+        _enc_u(0x80000000, 1, 0x37),        # lui  x1, 0x80000
+        _enc_i(-1, 0, 0, 2, 0x13),          # addi x2, x0, -1
+        _enc_r(1, 2, 1, 4, 3, 0x33),        # div  x3, x1, x2 -> 0x80000000
+        _enc_r(1, 2, 1, 6, 4, 0x33),        # rem  x4, x1, x2 -> 0
+        _enc_r(1, 0, 1, 5, 5, 0x33),        # divu x5, x1, x0 -> 0xffffffff
+        _enc_r(1, 0, 1, 7, 6, 0x33),        # remu x6, x1, x0 -> x1
+        _enc_r(1, 2, 2, 1, 7, 0x33),        # mulh x7, x2, x2 -> 0
+        _enc_r(1, 2, 1, 3, 8, 0x33),        # mulhu x8, x1, x2
+        HALT,
+    ]
+    iss, _ = run_words(words, {'m_extension': True})
+    assert iss.regs[3] == 0x80000000
+    assert iss.regs[4] == 0
+    assert iss.regs[5] == 0xFFFFFFFF
+    assert iss.regs[6] == 0x80000000
+    assert iss.regs[7] == 0
+    assert iss.regs[8] == (0x80000000 * 0xFFFFFFFF) >> 32
+
+    try:
+        run_words(words, {})
+    except IllegalInstructionError:
+        pass
+    else:
+        raise AssertionError("M instruction accepted without m_extension")
+
+
+def test_compressed_expansion():
+    """Compressed instructions expand to the same words GCC documents."""
+    cases = {
+        0x1141: _enc_i(-16, 2, 0, 2, 0x13),     # addi sp, sp, -16
+        0xc606: _enc_s(12, 1, 2, 2, 0x23),      # sw ra, 12(sp)
+        0x40b2: _enc_i(12, 2, 2, 1, 0x03),      # lw ra, 12(sp)
+        0x8082: _enc_i(0, 1, 0, 0, 0x67),       # ret
+        0x853e: _enc_r(0, 15, 0, 0, 10, 0x33),  # mv a0, a5
+        0x8f99: _enc_r(0x20, 14, 15, 0, 15, 0x33),  # sub a5, a5, a4
+        0x0028: _enc_i(8, 2, 0, 10, 0x13),      # addi a0, sp, 8
+        0x6785: _enc_u(0x1000, 15, 0x37),       # lui a5, 0x1
+        0xc111: _enc_b(4, 0, 10, 0, 0x63),      # beqz a0, +4
+        0xa001: _enc_j(0, 0, 0x6f),             # j .
+    }
+    for half, word in cases.items():
+        assert expand_compressed(half) == word, hex(half)
+    assert expand_compressed(0x0000) is None
+
+
+def test_compressed_program():
+    """A mixed 16/32-bit stream executes with the C extension enabled."""
+    iss = VignaISS({'c_extension': True})
+    iss.load_bytes(bytes([0x15, 0x45,             # c.li a0, 5
+                          0x05, 0x05,             # c.addi a0, 1
+                          0x93, 0x05, 0x75, 0x00,  # addi a1, a0, 7
+                          0x01, 0xa0]))           # c.j .
+    assert iss.run(100) == 'halt'
+    assert iss.regs[10] == 6
+    assert iss.regs[11] == 13
+    assert iss.pc == 8
+
+
+def test_e_extension_register_limit():
+    """RV32E rejects instructions that name x16-x31."""
+    try:
+        run_words([_enc_i(1, 0, 0, 16, 0x13), HALT], {'e_extension': True})
+    except IllegalInstructionError:
+        pass
+    else:
+        raise AssertionError("x16 accepted with e_extension")
+
+
+def test_csr_and_interrupt():
+    """CSR instructions work and a pending interrupt vectors to mtvec."""
+    config = {'zicsr_extension': True, 'interrupt': True}
+    words = [
+        _enc_i(0x40, 0, 0, 1, 0x13),        # addi x1, x0, 0x40
+        _enc_i(0x305, 1, 1, 0, 0x73),       # csrrw x0, mtvec, x1
+        _enc_i(0x800, 0, 0, 2, 0x13),       # addi x2, x0, -2048 (0xfffff800)
+        _enc_i(0x304, 2, 1, 0, 0x73),       # csrrw x0, mie, x2
+        _enc_i(0x300, 8, 6, 0, 0x73),       # csrrsi x0, mstatus, 8
+        _enc_i(0, 0, 0, 3, 0x13),           # addi x3, x0, 0
+        HALT,
+    ]
+    iss = VignaISS(config)
+    for i, word in enumerate(words):
+        iss.write_word(4 * i, word)
+    iss.write_word(0x40, _enc_i(0x342, 0, 2, 4, 0x73))   # csrrs x4, mcause, x0
+    iss.write_word(0x44, HALT)
+    iss.set_irq(ext=True)
+    assert iss.run(100) == 'halt'
+    assert iss.pc == 0x44
+    assert iss.regs[4] == 0x8000000B
+    assert iss.csrs[vigna_iss.CSR_MEPC] == 0x14
+    assert iss.csrs[vigna_iss.CSR_MSTATUS] & 0x88 == 0x80
+
+
+def test_perf_counter_csrs():
+    """User counter CSRs alias the machine counters and ignore writes."""
+    config = {'zicsr_extension': True, 'perf_counters': True}
+    words = [
+        _enc_i(100, 0, 0, 1, 0x13),         # addi x1, x0, 100
+        _enc_i(0xB02, 1, 1, 0, 0x73),       # csrrw x0, minstret, x1
+        _enc_i(0xC02, 0, 2, 2, 0x73),       # csrrs x2, instret, x0
+        _enc_i(0xC02, 3, 5, 0, 0x73),       # csrrwi x0, instret, 3
+        _enc_i(0xB02, 0, 2, 3, 0x73),       # csrrs x3, minstret, x0
+        _enc_i(0xB80, 1, 1, 0, 0x73),       # csrrw x0, mcycleh, x1
+        _enc_i(0xC81, 0, 2, 4, 0x73),       # csrrs x4, timeh, x0
+        _enc_i(0x320, 31, 5, 0, 0x73),      # csrrwi x0, mcountinhibit, 31
+        _enc_i(0x320, 0, 2, 5, 0x73),       # csrrs x5, mcountinhibit, x0
+        _enc_i(0xB1F, 1, 1, 6, 0x73),       # csrrw x6, mhpmcounter31, x1
+        _enc_i(0xB1F, 0, 2, 6, 0x73),       # csrrs x6, mhpmcounter31, x0
+        HALT,
+    ]
+    iss, reason = run_words(words, config)
+    assert reason == 'halt'
+    # minstret keeps counting after the write, the reading instruction included
+    assert iss.regs[2:7] == [101, 103, 100, 29, 0]
+
+    # Without the option the addresses are ordinary CSR storage
+    iss, _ = run_words(words, {'zicsr_extension': True})
+    assert iss.regs[2:5] == [0, 100, 0]
+    assert iss.regs[6] == 100
+
+
+def test_minstret_counts_retired_instructions():
+    """minstret follows instret, stops under mcountinhibit and carries into minstreth."""
+    config = {'zicsr_extension': True, 'perf_counters': True}
+    words = [
+        _enc_i(0xB02, 0, 2, 1, 0x73),       # csrr x1, minstret
+        _enc_i(0x320, 4, 5, 0, 0x73),       # csrwi mcountinhibit, 4
+        _enc_i(0, 0, 0, 0, 0x13),           # nop
+        _enc_i(0x320, 0, 5, 0, 0x73),       # csrwi mcountinhibit, 0
+        _enc_i(0xC02, 0, 2, 2, 0x73),       # rdinstret x2
+        _enc_i(-1, 0, 0, 3, 0x13),          # addi x3, x0, -1
+        _enc_i(0xB02, 3, 1, 0, 0x73),       # csrw minstret, x3
+        _enc_i(0xB82, 0, 2, 4, 0x73),       # csrr x4, minstreth
+        _enc_i(0xB02, 0, 2, 5, 0x73),       # csrr x5, minstret
+        HALT,
+    ]
+    for run in (lambda iss: iss.run(100), lambda iss: [iss.step() for _ in range(9)]):
+        iss = VignaISS(config)
+        for i, word in enumerate(words):
+            iss.write_word(4 * i, word)
+        run(iss)
+        assert iss.regs[1:6] == [1, 3, vigna_iss.MASK32, 1, 1]
+
+
+def test_misprediction_counter_csr():
+    """mhpmcounter6 exists only with branch prediction on the prefetch queue."""
+    config = {'zicsr_extension': True, 'perf_counters': True, 'prefetch': True}
+    words = [
+        _enc_i(7, 0, 0, 1, 0x13),           # addi x1, x0, 7
+        _enc_i(0xB06, 1, 1, 0, 0x73),       # csrrw x0, mhpmcounter6, x1
+        _enc_i(0xC06, 0, 2, 2, 0x73),       # csrrs x2, hpmcounter6, x0
+        HALT,
+    ]
+    iss, _ = run_words(words, config)
+    assert iss.regs[2] == 0
+    iss, _ = run_words(words, dict(config, branch_prediction=True))
+    assert iss.regs[2] == 7
+
+
+def test_self_modifying_store_invalidates_cache():
+    """Stores into already-decoded code are picked up on the next fetch."""
+    words = [
+        _enc_i(0, 0, 0, 1, 0x13),           # addi x1, x0, 0
+        _enc_i(0x10, 0, 2, 2, 0x03),        # lw   x2, 16(x0)
+        _enc_s(12, 2, 0, 2, 0x23),          # sw   x2, 12(x0)
+        _enc_i(1, 1, 0, 1, 0x13),           # addi x1, x1, 1 (patched)
+        _enc_i(5, 1, 0, 1, 0x13),           # data: addi x1, x1, 5
+        HALT,
+    ]
+    iss = VignaISS({})
+    for i, word in enumerate(words):
+        iss.write_word(4 * i, word)
+    iss._decode(12)
+    iss.run(100)
+    assert iss.regs[1] == 10
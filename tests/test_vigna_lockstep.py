@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Tests for the lockstep checker (trace parsing, replay against the ISS and
+first-divergence reporting; producing traces from RTL needs Icarus Verilog).
+"""
+
+import os
+import sys
+import tempfile
+
+# Add tools directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'tools'))
+
+from vigna_iss import VignaISS, disassemble, _enc_i, _enc_s
+from vigna_lockstep import parse_trace_line, writeback_reg, check_trace, format_divergence
+
+REPO_ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+SIMPLE_TEST = os.path.join(REPO_ROOT, 'programs', 'build', 'simple_test.mem')
+
+
+def iss_trace(image, count, config=None):
+    """A retire trace in the RTL format, produced by the ISS itself."""
+    iss = VignaISS(config or {})
+    iss.load_mem(image)
+    lines = ["# section 1"]
+    for _ in range(count):
+        pc = iss.pc
+        word = iss.instruction_at(pc)[0]
+        rd = writeback_reg(word)
+        iss.step()
+        lines.append(f"{pc:08x} {word:08x} {rd} {iss.regs[rd] if rd else 0:08x}")
+    return lines
+
+
+def test_disassemble():
+    """Common encodings disassemble with ABI register names."""
+    assert disassemble(_enc_i(5, 0, 0, 1, 0x13)) == "addi ra, zero, 5"
+    assert disassemble(_enc_s(-4, 10, 2, 2, 0x23)) == "sw a0, -4(sp)"
+    assert disassemble(0x0000006f, 0x40) == "jal zero, 0x40"
+    assert disassemble(0x34102573) == "csrrs a0, mepc, zero"
+    assert disassemble(0xFFFFFFFF) == ".word 0xffffffff"
+
+
+def test_parse_trace_line():
+    """Section headers, retire records and stray comments are told apart."""
+    assert parse_trace_line("# section 2 image=t.2.imem") == ('section', 2, {'image': 't.2.imem'})
+    assert parse_trace_line("00000010 00500093 1 00000005 17") == \
+        ('retire', 0x10, 0x00500093, 1, 5, 17)
+    assert parse_trace_line("00000010 00500093 1 00000005") == ('retire', 0x10, 0x00500093, 1, 5, None)
+    assert parse_trace_line("# VCD info") is None
+    assert writeback_reg(0x00500093) == 1
+    assert writeback_reg(_enc_s(0, 1, 2, 2, 0x23)) == 0
+
+
+def test_clean_trace_matches():
+    """A trace that follows the ISS, including the halt loop, has no divergence."""
+    result = check_trace(iss_trace(SIMPLE_TEST, 200), {}, image=SIMPLE_TEST)
+    assert result['divergence'] is None
+    assert result['retired'] == 200 and result['sections'] == 1
+
+
+def test_first_divergence_reported():
+    """A corrupted write-back value is reported at the right instruction."""
+    lines = iss_trace(SIMPLE_TEST, 60)
+    index = next(i for i, line in enumerate(lines[1:], 1) if line.split()[2] != '0')
+    pc, inst, rd, value = lines[index].split()
+    lines[index] = f"{pc} {inst} {rd} {int(value, 16) ^ 1:08x}"
+
+    result = check_trace(lines, {}, image=SIMPLE_TEST, context=4)
+    divergence = result['divergence']
+    assert divergence['index'] == index
+    assert divergence['pc'] == int(pc, 16)
+    assert [name for name, _, _ in divergence['fields']] == ['value']
+    assert len(divergence['history']) == min(index - 1, 4)
+    report = format_divergence(divergence)
+    assert f"#{index}" in report and disassemble(int(inst, 16), int(pc, 16)) in report
+
+
+def test_sections_load_their_images():
+    """Each section restarts the ISS on the image it names (Harvard memories)."""
+    with tempfile.TemporaryDirectory() as root:
+        image = os.path.join(root, 'run.trace.1.imem')
+        with open(image, 'w') as f:
+            f.write("@0\n00500093\n00102023\n00002103\n0000006f\n")
+        lines = ["# section 1 image=" + image,
+                 "00000000 00500093 1 00000005",
+                 "00000004 00102023 0 00000000",
+                 "00000008 00002103 2 00000005",
+                 "0000000c 0000006f 0 00000000",
+                 "# section 2 image=run.trace.1.imem",
+                 "00000000 00500093 1 00000005",
+                 "00000004 00102023 0 00000000",
+                 "00000008 00002103 2 00000000"]
+        result = check_trace(lines, {}, mem_size=4096, harvard=True, trace_dir=root)
+        assert result['sections'] == 2
+        divergence = result['divergence']
+        assert divergence['section'] == 2 and divergence['index'] == 3
+        assert divergence['fields'] == [('value', 5, 0)]
+
+
+def test_counter_reads_take_traced_value():
+    """Cycle and event counter reads adopt the core's value instead of diverging."""
+    with tempfile.TemporaryDirectory() as root:
+        image = os.path.join(root, 'counter.mem')
+        with open(image, 'w') as f:
+            f.write(f"@0\n{_enc_i(0xB00, 0, 2, 1, 0x73):08x}\n"
+                    f"{_enc_i(1, 1, 0, 2, 0x13):08x}\n0000006f\n")
+        lines = ["# section 1",
+                 f"00000000 {_enc_i(0xB00, 0, 2, 1, 0x73):08x} 1 00001234",
+                 f"00000004 {_enc_i(1, 1, 0, 2, 0x13):08x} 2 00001235"]
+        config = {'zicsr_extension': True, 'perf_counters': True}
+        assert check_trace(lines, config, image=image)['divergence'] is None
+
+        divergence = check_trace(lines, {'zicsr_extension': True}, image=image)['divergence']
+        assert divergence['index'] == 1
+        assert divergence['fields'] == [('value', 0, 0x1234)]
+
+        # minstret is counted by the ISS, a wrong value diverges
+        with open(image, 'w') as f:
+            f.write(f"@0\n{_enc_i(0xB02, 0, 2, 1, 0x73):08x}\n0000006f\n")
+        lines = ["# section 1", f"00000000 {_enc_i(0xB02, 0, 2, 1, 0x73):08x} 1 00000001"]
+        assert check_trace(lines, config, image=image)['divergence'] is None
+        lines[1] = lines[1][:-1] + '2'
+        divergence = check_trace(lines, config, image=image)['divergence']
+        assert divergence['fields'] == [('value', 1, 2)]
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Tests for the effective-define resolver (conditional nesting, includes,
+-D overrides and the configuration options derived from them).
+"""
+
+import os
+import sys
+import tempfile
+import subprocess
+
+# Add tools directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'tools'))
+
+from vigna_preprocessor import scan, resolve, parse_define_args
+from vigna_config_generator import VignaConfigGenerator, PREDEFINED_CONFIGS
+
+REPO_ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+
+
+def write(path, text):
+    with open(path, 'w') as f:
+        f.write(text)
+
+
+def test_scan_skips_comments_and_strings():
+    """Directives inside comments and strings are ignored; bodies lose comments."""
+    directives = scan('//`define A\n/* `define B\n*/ $display("`define C");\n'
+                      '`define D 32\'h10 // reset\n`define E(x) (x + \\\n 1)\n`ifdef D `endif\n')
+    assert directives == [('define', 'D', "32'h10"), ('define', 'E', '(x + \n 1)'),
+                          ('ifdef', 'D', ''), ('endif', '', '')]
+
+
+def test_conditional_nesting():
+    """`ifdef / `elsif / `else chains pick one branch, including nested ones."""
+    text = ('`define A\n'
+            '`ifdef B\n`define X 1\n'
+            '`elsif A\n'
+            '  `ifndef C\n    `define X 2\n  `else\n    `define X 3\n  `endif\n'
+            '`else\n`define X 4\n'
+            '`endif\n'
+            '`ifdef A `undef A `endif\n')
+    assert resolve([], text=text)['defines'] == {'X': '2'}
+    assert resolve([], {'B': '1'}, text=text)['defines'] == {'B': '1', 'X': '1'}
+    assert resolve([], {'C': ''}, text=text)['defines'] == {'C': '', 'X': '3'}
+    assert parse_define_args(['-DA', '-DB=2', 'C=x=y']) == {'A': '1', 'B': '2', 'C': 'x=y'}
+
+
+def test_includes_and_guards():
+    """Only active includes are read; defines carry across files in order."""
+    with tempfile.TemporaryDirectory() as root:
+        os.mkdir(os.path.join(root, 'inc'))
+        write(os.path.join(root, 'inc', 'conf.vh'), '`ifndef CONF\n`define CONF\n`define FAST\n`endif\n')
+        write(os.path.join(root, 'inc', 'fast.v'), '`define FAST_UNIT\n')
+        write(os.path.join(root, 'core.v'), '`include "conf.vh"\n`ifdef FAST\n`include "fast.v"\n`endif\n')
+        write(os.path.join(root, 'slow.vh'), '`ifndef CONF\n`define CONF\n`endif\n')
+
+        result = resolve(['core.v'], include_dirs=['inc'], cwd=root)
+        assert set(result['defines']) == {'CONF', 'FAST', 'FAST_UNIT'}
+        assert [os.path.basename(p) for p in result['files']] == ['core.v', 'conf.vh', 'fast.v']
+
+        # A header given first claims the guard, so the core's own include is inert
+        result = resolve(['slow.vh', 'core.v'], include_dirs=['inc'], cwd=root)
+        assert set(result['defines']) == {'CONF'}
+        assert resolve(['nope.v'], cwd=root)['missing'] == [os.path.join(root, 'nope.v')]
+
+
+def test_configuration_from_defines():
+    """Config headers parse to the options they were generated from, -D applies on top."""
+    generator = VignaConfigGenerator()
+    for name, info in PREDEFINED_CONFIGS.items():
+        options = info['options']
+        with tempfile.TemporaryDirectory() as root:
+            conf = os.path.join(root, 'vigna_conf.vh')
+            generator.generate_config_file(options, conf, info['name'])
+            parsed = generator.parse_existing_config(conf)
+            for option, value in parsed.items():
+                assert value == options.get(option, False), (name, option)
+
+    rv32i = PREDEFINED_CONFIGS['rv32i']['options']
+    effective = generator.apply_defines(rv32i, parse_define_args(['-DVIGNA_CORE_C_EXTENSION']))
+    assert effective['c_extension'] is True and effective['m_extension'] is False
+    parsed = generator.parse_existing_config(os.path.join(REPO_ROOT, 'vigna_conf_rv32i.vh'),
+                                             {'VIGNA_CORE_M_EXTENSION': '1'})
+    assert parsed['m_extension'] is True and parsed['c_extension'] is False
+
+
+def test_parse_merges_over_preset():
+    """A partial header only overrides the options it mentions."""
+    generator = VignaConfigGenerator()
+    with tempfile.TemporaryDirectory() as root:
+        partial = os.path.join(root, 'partial.vh')
+        write(partial, "`define VIGNA_CORE_C_EXTENSION\n//`define VIGNA_CORE_TWO_STAGE_SHIFT\n"
+                       "`undef VIGNA_CORE_ALIGNMENT\n")
+        assert generator.parse_existing_config(partial) == {
+            'c_extension': True, 'two_stage_shift': False, 'alignment': False}
+        assert generator.parse_existing_config(partial, {'VIGNA_CORE_M_EXTENSION': '1'})['m_extension']
+
+        out = os.path.join(root, 'merged.vh')
+        script = os.path.join(REPO_ROOT, 'tools', 'vigna_config_generator.py')
+        result = subprocess.run([sys.executable, script, '--config', 'rv32im', '--parse', partial,
+                                 '--output', out], capture_output=True, text=True)
+        assert result.returncode == 0, result.stdout + result.stderr
+        merged = generator.parse_existing_config(out)
+        assert merged['m_extension'] and merged['c_extension'] and merged['bus_binding']
+        assert not merged['two_stage_shift'] and not merged['alignment']
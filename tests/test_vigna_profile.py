@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+Tests for the dynamic profiler (return-address hints, symbol lookup, call
+stacks and folded output from ISS runs and from retire traces).
+"""
+
+import os
+import sys
+import struct
+
+import pytest
+
+# Add tools directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'tools'))
+
+from vigna_iss import VignaISS, build_config, _enc_i, _enc_j
+from vigna_timing import VignaTimingModel
+from vigna_profile import (
+    Symbolizer, Profiler, call_effect, profile_program, profile_trace, format_report
+)
+
+REPO_ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+SORTING_TEST = os.path.join(REPO_ROOT, 'programs', 'build', 'sorting_test.mem')
+
+# main calls f twice, f calls g through t0; every function returns
+CALLS = [
+    _enc_i(3, 0, 0, 10, 0x13),      # 0x00 main: addi a0, zero, 3
+    _enc_j(0x10, 1, 0x6F),          # 0x04       jal ra, f
+    _enc_j(0x0C, 1, 0x6F),          # 0x08       jal ra, f
+    _enc_j(0, 0, 0x6F),             # 0x0c       j . (halt)
+    _enc_i(0, 0, 0, 0, 0x13),       # 0x10       nop
+    _enc_j(0x0C, 5, 0x6F),          # 0x14 f:    jal t0, g
+    _enc_i(0, 1, 0, 0, 0x67),       # 0x18       ret
+    _enc_i(0, 0, 0, 0, 0x13),       # 0x1c       nop
+    _enc_i(5, 10, 1, 10, 0x13),     # 0x20 g:    slli a0, a0, 5
+    _enc_i(0, 5, 0, 0, 0x67),       # 0x24       jr t0
+]
+SYMBOLS = [
+    {'name': 'main', 'value': 0x00, 'size': 0x14, 'type': 'FUNC', 'bind': 'GLOBAL'},
+    {'name': 'f', 'value': 0x14, 'size': 0x08, 'type': 'FUNC', 'bind': 'GLOBAL'},
+    {'name': 'g', 'value': 0x20, 'size': 0x08, 'type': 'FUNC', 'bind': 'LOCAL'},
+]
+
+
+def _calls_iss(config):
+    iss = VignaISS(config)
+    iss.load_bytes(struct.pack(f'<{len(CALLS)}I', *CALLS))
+    return iss
+
+
+def test_call_effect():
+    """jal/jalr push and pop by the return-address hints; other jumps leave the stack alone."""
+    assert call_effect(_enc_j(8, 1, 0x6F)) == (False, True)       # call
+    assert call_effect(_enc_j(8, 0, 0x6F)) == (False, False)      # j / tail call
+    assert call_effect(_enc_i(0, 1, 0, 0, 0x67)) == (True, False)  # ret
+    assert call_effect(_enc_i(0, 6, 0, 0, 0x67)) == (False, False)  # jr t1
+    assert call_effect(_enc_i(0, 6, 0, 1, 0x67)) == (False, True)  # jalr ra, t1
+    assert call_effect(_enc_i(0, 5, 0, 1, 0x67)) == (True, True)   # coroutine swap
+    assert call_effect(_enc_i(0, 1, 0, 1, 0x67)) == (False, True)
+    assert call_effect(_enc_i(3, 0, 0, 10, 0x13)) == (False, False)
+
+
+def test_symbolizer():
+    """Functions win over labels, sizes bound a symbol and mapping symbols are skipped."""
+    symbols = Symbolizer(SYMBOLS + [
+        {'name': '_start', 'value': 0x00, 'size': 0, 'type': 'NOTYPE', 'bind': 'GLOBAL'},
+        {'name': '$x', 'value': 0x20, 'size': 0, 'type': 'NOTYPE', 'bind': 'LOCAL'},
+        {'name': 'table', 'value': 0x30, 'size': 0x10, 'type': 'OBJECT', 'bind': 'LOCAL'},
+        {'name': 'tail', 'value': 0x40, 'size': 0, 'type': 'NOTYPE', 'bind': 'LOCAL'},
+    ])
+    assert symbols.locate(0x00) == 'main'
+    assert symbols.locate(0x24) == 'g+0x4'
+    assert symbols.function(0x2c) is None
+    assert symbols.function(0x34) is None
+    assert symbols.locate(0x100) == 'tail+0xc0'
+    assert Symbolizer().locate(0x10) == ''
+
+
+def test_profile_calls():
+    """ISS runs account every cycle and rebuild the call stacks."""
+    config = build_config('rv32im')
+    iss = _calls_iss(config)
+    profiler = Profiler(Symbolizer(SYMBOLS))
+    timing = VignaTimingModel(config)
+    assert profile_program(iss, profiler, timing) == 'halt'
+
+    assert profiler.instructions == iss.instret == 12
+    assert profiler.cycles == iss.cycles - timing.startup_cycles
+    assert [line.rsplit(' ', 1)[0] for line in profiler.folded()] == ['main', 'main;f', 'main;f;g']
+    assert profiler.folded('instructions') == ['main 4', 'main;f 4', 'main;f;g 4']
+    assert profiler.unmatched_returns == 0
+
+    functions = {entry['name']: entry for entry in profiler.functions()}
+    assert functions['f']['calls'] == 2 and functions['g']['calls'] == 2
+    assert functions['main']['total_cycles'] == profiler.cycles
+    assert functions['f']['total_cycles'] == functions['f']['self_cycles'] + functions['g']['self_cycles']
+
+    mix = profiler.mix()
+    assert mix['shift']['instructions'] == 2
+    assert mix['jump']['instructions'] == 9
+    assert mix['compressed']['instructions'] == 0
+    assert profiler.hotspots(1)[0]['location'] == 'f'
+
+    # Without symbols frames are named by their entry address
+    anonymous = Profiler()
+    profile_program(_calls_iss(config), anonymous)
+    assert anonymous.folded('instructions') == [
+        '0x00000000 4', '0x00000000;0x00000014 4', '0x00000000;0x00000014;0x00000020 4']
+
+
+def test_profile_sorting_test():
+    """Per-PC cycles and the class mix add up to the timing model's totals."""
+    config = build_config('rv32im_zicsr')
+    iss = VignaISS(config)
+    iss.load_mem(SORTING_TEST)
+    profiler = Profiler()
+    timing = VignaTimingModel(config)
+    profile_program(iss, profiler, timing)
+
+    assert profiler.instructions == iss.instret
+    assert profiler.cycles == iss.cycles - timing.startup_cycles
+    assert sum(row['cycles'] for row in profiler.hotspots()) == profiler.cycles
+    mix = profiler.mix()
+    assert sum(entry['cycles'] for name, entry in mix.items() if name != 'compressed') == profiler.cycles
+    report = format_report(profiler, 5)
+    assert 'load' in report and 'bge' in report
+
+
+def test_profile_trace():
+    """A retire trace is charged dispatch-to-dispatch cycles; sections restart the stack."""
+    config = build_config('rv32im')
+    iss = _calls_iss(config)
+    records = []
+    iss.run(timing=VignaTimingModel(config), retire=lambda pc, cycles: records.append((pc, cycles)))
+
+    lines = ['# section 1 image=calls.mem']
+    cycle = 0
+    for pc, cycles in records:
+        word = iss.instruction_at(pc)[0]
+        lines.append(f"{pc:08x} {word:08x} 0 00000000 {cycle}")
+        cycle += cycles
+    profiler = Profiler(Symbolizer(SYMBOLS))
+    assert profile_trace(lines + lines, profiler) == 2
+
+    expected = Profiler(Symbolizer(SYMBOLS))
+    profile_program(_calls_iss(config), expected, VignaTimingModel(config))
+    halt = records[-1][1] - 1
+    assert profiler.instructions == 2 * expected.instructions
+    assert profiler.cycles == 2 * (expected.cycles - halt)
+    assert profiler.folded('instructions') == ['main 8', 'main;f 8', 'main;f;g 8']
+    # Sizes follow from the next PC where the program runs straight on
+    assert profiler.pcs[0x00][3] == 4 and profiler.pcs[0x0c][3] is None
+
+    with pytest.raises(ValueError, match='no cycle column'):
+        profile_trace(['00000000 00300513 10 00000003'], Profiler())
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Tests for the VIGNA parallel regression runner (job matrix, output parsing
+and reports; running simulations needs Icarus Verilog).
+"""
+
+import os
+import sys
+import json
+import tempfile
+import xml.etree.ElementTree as ET
+
+# Add tools directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'tools'))
+
+from vigna_config_generator import PREDEFINED_CONFIGS, VignaConfigGenerator
+from vigna_regression import (
+    REPO_ROOT, build_jobs, evaluate_output, prepare_workdir, compile_command,
+    write_json_report, write_junit_report
+)
+
+
+def test_job_matrix_follows_predefined_configs():
+    """Every predefined configuration gets at least one compatible testbench."""
+    jobs = build_jobs()
+    assert {job.config_name for job in jobs} == set(PREDEFINED_CONFIGS)
+    names = {job.name for job in jobs}
+    assert 'rv32e/processor' in names
+    assert 'rv32e/comprehensive' not in names
+    assert 'rv32ic/c_extension' in names
+    assert 'rv32im/c_extension' not in names
+    assert 'rv32im/m_extension' in names
+    assert 'rv32i/m_extension' not in names
+    assert 'rv32im_zicsr/interrupt' in names
+    assert 'rv32im_zicsr/perf_counters' not in names
+    jobs = build_jobs(['rv32im_zicsr'], ['perf_counters'], {'VIGNA_CORE_PERF_COUNTERS': ''})
+    assert [job.name for job in jobs] == ['rv32im_zicsr/perf_counters']
+
+    jobs = build_jobs(['rv32e'], ['comprehensive'])
+    assert jobs == []
+
+    try:
+        build_jobs(['rv64gc'])
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("unknown configuration accepted")
+
+
+def test_evaluate_output():
+    """PASS/FAIL lines and summary lines decide the job status."""
+    ok = ["  PASS: ADD result = 15", "  PASS: SUB result = 5", "All tests PASSED!"]
+    assert evaluate_output(ok, 0) == ('pass', 2, 0, '')
+
+    bad = ["  PASS: ADD result = 15", "  FAIL: SUB result = 4", "Some tests FAILED!"]
+    status, passed, failed, message = evaluate_output(bad, 0)
+    assert (status, passed, failed) == ('fail', 1, 1)
+    assert message == "Some tests FAILED!"
+
+    assert evaluate_output(["Program timeout after 10000 cycles"], 0)[0] == 'fail'
+    assert evaluate_output(["VCD info: dumpfile"], 0)[0] == 'error'
+    assert evaluate_output(ok, 1)[0] == 'error'
+
+
+def test_workdir_has_job_configuration():
+    """The generated vigna_conf.vh matches the job's predefined configuration."""
+    job = build_jobs(['rv32imc'], ['program'])[0]
+    with tempfile.TemporaryDirectory() as root:
+        workdir = prepare_workdir(job, root)
+        conf = os.path.join(workdir, 'vigna_conf.vh')
+        parsed = VignaConfigGenerator().parse_existing_config(conf)
+        assert parsed['m_extension'] is True
+        assert parsed['c_extension'] is True
+        assert parsed['zicsr_extension'] is False
+        assert os.path.exists(os.path.join(workdir, 'simple_test.mem'))
+
+        command = compile_command(job, 'sim.vvp')
+        assert command[:5] == ['iverilog', '-o', 'sim.vvp', '-I', REPO_ROOT]
+        assert command[-1] == os.path.join(REPO_ROOT, 'sim', 'program_testbench.v')
+
+
+def test_defines_reach_jobs():
+    """-D defines are passed to iverilog and decide testbench compatibility."""
+    assert [job.testbench for job in build_jobs(['rv32im'], ['c_extension'])] == []
+    jobs = build_jobs(['rv32im'], ['c_extension'], {'VIGNA_CORE_C_EXTENSION': '1'})
+    assert [job.testbench for job in jobs] == ['c_extension']
+    assert jobs[0].config['c_extension'] is True
+    assert '-DVIGNA_CORE_C_EXTENSION=1' in compile_command(jobs[0], 'sim.vvp')
+
+
+def test_reports():
+    """JSON and JUnit reports describe each job."""
+    jobs = build_jobs(['rv32i'], ['comprehensive', 'program'])
+    jobs[0].status, jobs[0].passed = 'pass', 12
+    jobs[1].status, jobs[1].failed, jobs[1].message = 'fail', 1, 'Some tests FAILED!'
+    jobs[1].output = ["  FAIL: fib[3] = 0 (expected 2)"]
+
+    with tempfile.TemporaryDirectory() as root:
+        json_path = os.path.join(root, 'report.json')
+        junit_path = os.path.join(root, 'report.xml')
+        write_json_report(jobs, json_path, 1.5)
+        write_junit_report(jobs, junit_path, 1.5)
+
+        with open(json_path) as f:
+            report = json.load(f)
+        assert (report['total'], report['passed'], report['failed']) == (2, 1, 1)
+
+        suite = ET.parse(junit_path).getroot().find('testsuite')
+        assert suite.get('name') == 'rv32i'
+        assert suite.get('failures') == '1'
+        failure = suite.find("testcase[@name='program']/failure")
+        assert failure.get('message') == 'Some tests FAILED!'
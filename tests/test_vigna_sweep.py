@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Tests for the memory latency sweep (grid, plusargs, ISS instruction counts
+and CPI tables; the harness runs themselves need Icarus Verilog).
+"""
+
+import os
+import sys
+import csv
+import tempfile
+
+import pytest
+
+# Add tools directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'tools'))
+
+from vigna_harness import load_expectation
+from vigna_sweep import (
+    parse_latencies, latency_grid, memory_plusargs, iss_run, summarize, write_csv, plot_cpi
+)
+
+REPO_ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+EXPECTED_DIR = os.path.join(REPO_ROOT, 'programs', 'expected')
+
+
+def test_latency_grid():
+    """Latency lists and ranges expand to (imem, dmem) pairs along one axis."""
+    assert parse_latencies('1,2,4') == [1, 2, 4]
+    assert parse_latencies('3-5, 1,4') == [1, 3, 4, 5]
+    for bad in ('0', '2-1', 'x', ''):
+        with pytest.raises(ValueError):
+            parse_latencies(bad)
+
+    assert latency_grid([1, 4]) == [(1, 1), (4, 4)]
+    assert latency_grid([1, 4], 'imem', 2) == [(1, 2), (4, 2)]
+    assert latency_grid([1, 4], 'dmem') == [(1, 1), (1, 4)]
+
+
+def test_memory_plusargs():
+    """Only the memory model features asked for are passed to the harness."""
+    assert memory_plusargs(3, 2) == ['+imem_latency=3', '+dmem_latency=2']
+    args = memory_plusargs(1, 1, jitter=2, banks=4, seed=7, sparse=True)
+    assert args[2:] == ['+imem_jitter=2', '+dmem_jitter=2', '+mem_banks=4', '+mem_seed=7',
+                        '+mem_sparse']
+
+
+def test_model_cpi_grows_with_latency():
+    """Instruction counts do not depend on latency; predicted cycles grow with it."""
+    exp = load_expectation(os.path.join(EXPECTED_DIR, 'sorting_test.json'))
+    runs = [iss_run({}, exp, (latency, latency)) for latency in (1, 2, 4)]
+    assert len({instret for instret, _ in runs}) == 1
+    assert runs[0][1] < runs[1][1] < runs[2][1]
+    assert iss_run({}, exp) == (runs[0][0], None)
+
+
+def test_summary_and_csv():
+    """Mean CPI per configuration and latency; one CSV row per run."""
+    results = [
+        {'config': 'a', 'program': 'p', 'x': 1, 'status': 'pass', 'cpi': 3.0},
+        {'config': 'a', 'program': 'q', 'x': 1, 'status': 'pass', 'cpi': 5.0},
+        {'config': 'a', 'program': 'p', 'x': 2, 'status': 'pass', 'cpi': 6.0},
+        {'config': 'a', 'program': 'q', 'x': 2, 'status': 'fail', 'cpi': None},
+        {'config': 'b', 'program': 'p', 'x': 1, 'status': 'pass', 'cpi': 2.5},
+    ]
+    assert summarize(results) == {'a': {1: 4.0, 2: 6.0}, 'b': {1: 2.5}}
+
+    with tempfile.TemporaryDirectory() as root:
+        path = os.path.join(root, 'sweep.csv')
+        write_csv(path, results)
+        with open(path, newline='') as f:
+            rows = list(csv.DictReader(f))
+    assert len(rows) == len(results)
+    assert rows[1]['program'] == 'q' and rows[1]['cpi'] == '5.0'
+
+
+def test_plot():
+    """The CPI plot is written when matplotlib is available."""
+    pytest.importorskip('matplotlib')
+    with tempfile.TemporaryDirectory() as root:
+        path = os.path.join(root, 'cpi.png')
+        plot_cpi({'a': {1: 4.0, 2: 6.0}}, path, 'memory latency (cycles)')
+        assert os.path.getsize(path) > 0
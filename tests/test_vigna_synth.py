@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Tests for the Yosys area and timing estimator (statistics parsing, cell
+classification and the result cache). Yosys itself is not run.
+"""
+
+import os
+import sys
+import json
+import shutil
+
+# Add tools directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'tools'))
+
+from vigna_config_generator import VignaConfigGenerator, PREDEFINED_CONFIGS
+from vigna_synth import (classify_cells, parse_stat, parse_ltp, synth_key, yosys_script,
+                         synthesize, SynthCache, format_table, REPO_ROOT)
+
+
+def conf_text(name):
+    return VignaConfigGenerator().render_config(PREDEFINED_CONFIGS[name]['options'], name)
+
+
+def test_classify_xilinx_cells():
+    """Xilinx primitives land in the LUT, FF, carry, mux and RAM classes."""
+    counts = classify_cells({'LUT6': 100, 'LUT3': 20, 'FDRE': 200, 'FDSE': 5, 'CARRY4': 12,
+                             'MUXF7': 4, 'RAM32M': 3, 'BUFG': 1, 'IBUF': 60})
+    assert counts['lut'] == 120
+    assert counts['ff'] == 205
+    assert counts['carry'] == 12
+    assert counts['mux'] == 4
+    assert counts['ram'] == 3
+    assert counts['dsp'] == 0
+    assert counts['other'] == 61
+
+
+def test_classify_generic_cells():
+    """Generic $lut and $_DFF_* cells are counted too, with or without the escape."""
+    counts = classify_cells({'$lut': 50, '$_DFF_P_': 10, '$_SDFFE_PP0P_': 6, '\\SB_LUT4': 2})
+    assert counts['lut'] == 52
+    assert counts['ff'] == 16
+
+
+def test_parse_stat_design_and_module():
+    """The 'design' section is used, or the top module when there is none."""
+    design = {'num_cells': 7, 'num_cells_by_type': {'LUT6': 4, 'FDRE': 3}}
+    stats = parse_stat(json.dumps({'modules': {'\\vigna': design}, 'design': design}), 'vigna')
+    assert stats == {'cells': 7, 'cells_by_type': {'LUT6': 4, 'FDRE': 3}}
+    assert parse_stat(json.dumps({'modules': {'\\vigna': design}}), 'vigna')['cells'] == 7
+
+
+def test_parse_ltp():
+    """The path length is read from the ltp report."""
+    assert parse_ltp("\nLongest topological path in vigna (length=23):\n    0: \\clk\n") == 23
+    assert parse_ltp("nothing here") is None
+
+
+def test_script_reads_conf_first():
+    """The configuration header is read before the core, with the repository on the include path."""
+    script = yosys_script('vigna_axi', 'generic', '/tmp/job/vigna_conf.vh')
+    read = script.splitlines()[0]
+    assert read.index('vigna_conf.vh') < read.index('vigna_axi.v')
+    assert 'synth -top vigna_axi -flatten' in script
+    assert 'stat -json' in script and 'ltp -noff' in script
+
+
+def test_key_depends_on_config_top_and_target():
+    """Different configurations, tops, targets or Yosys versions never share a key."""
+    base = synth_key(conf_text('rv32i'), 'vigna', 'xc7', 'Yosys 0.40')
+    assert base == synth_key(conf_text('rv32i'), 'vigna', 'xc7', 'Yosys 0.40')
+    assert base != synth_key(conf_text('rv32im'), 'vigna', 'xc7', 'Yosys 0.40')
+    assert base != synth_key(conf_text('rv32i'), 'vigna_axi', 'xc7', 'Yosys 0.40')
+    assert base != synth_key(conf_text('rv32i'), 'vigna', 'generic', 'Yosys 0.40')
+    assert base != synth_key(conf_text('rv32i'), 'vigna', 'xc7', 'Yosys 0.41')
+
+
+def test_key_ignores_repository_config_header(tmp_path):
+    """Editing the repository's vigna_conf.vh leaves the key alone, editing a source does not."""
+    for name in ('vigna_core.v', 'vigna_coproc.v', 'vigna_conf.vh'):
+        shutil.copy(os.path.join(REPO_ROOT, name), tmp_path / name)
+    base = synth_key(conf_text('rv32i'), 'vigna', 'xc7', 'Yosys 0.40', root=str(tmp_path))
+    header = (tmp_path / 'vigna_conf.vh').read_text()
+    edited = header.replace('`define VIGNA_CONF_VH', '`define VIGNA_CONF_VH\n`define VIGNA_CORE_M_EXTENSION', 1)
+    assert edited != header
+    (tmp_path / 'vigna_conf.vh').write_text(edited)
+    assert base == synth_key(conf_text('rv32i'), 'vigna', 'xc7', 'Yosys 0.40', root=str(tmp_path))
+    with open(tmp_path / 'vigna_core.v', 'a') as f:
+        f.write('// edited\n')
+    assert base != synth_key(conf_text('rv32i'), 'vigna', 'xc7', 'Yosys 0.40', root=str(tmp_path))
+
+
+def test_cached_result_is_returned(tmp_path):
+    """A stored result is reported without running Yosys."""
+    cache = SynthCache(str(tmp_path))
+    config = PREDEFINED_CONFIGS['rv32i']['options']
+    key = synth_key(conf_text('rv32i'), 'vigna', 'xc7', 'Yosys 0.40')
+    cache.put(key, {'config': 'other', 'top': 'vigna', 'target': 'xc7', 'status': 'ok',
+                    'message': '', 'cached': False, 'time': 12.5, 'lut': 582, 'ff': 285,
+                    'carry': 0, 'mux': 0, 'ram': 0, 'dsp': 0, 'other': 0, 'cells': 900,
+                    'cells_by_type': {}, 'depth': 20})
+
+    from vigna_synth import _yosys_versions
+    _yosys_versions['fake-yosys'] = 'Yosys 0.40'
+    result = synthesize('rv32i', config, cache=cache, yosys='fake-yosys')
+    assert result['cached'] and result['config'] == 'rv32i'
+    assert (result['lut'], result['ff'], result['depth']) == (582, 285, 20)
+    assert '582' in format_table([result])
@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+"""
+Tests for the VIGNA cycle-approximate timing model.
+"""
+
+import os
+import sys
+
+# Add tools directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'tools'))
+
+from vigna_iss import VignaISS, build_config, _enc_i, _enc_r, _enc_s, _enc_b, _enc_j
+from vigna_timing import (
+    VignaTimingModel, predict_testbench_cycles, parse_testbench_log, breakdown,
+    static_prediction, MRET
+)
+
+REPO_ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+BUILD_DIR = os.path.join(REPO_ROOT, 'programs', 'build')
+
+
+def test_simple_test_matches_documented_cycle_count():
+    """simple_test halts after 54 cycles in program_testbench.v."""
+    iss = VignaISS({})
+    iss.load_mem(os.path.join(BUILD_DIR, 'simple_test.mem'))
+    iss.run(1000, timing=VignaTimingModel({'two_stage_shift': True}))
+    assert predict_testbench_cycles(iss) == 54
+
+
+def test_class_costs():
+    """ALU ops take 3 cycles, memory and control flow 4, M ops 36."""
+    costs = VignaTimingModel({}).static_costs()
+    assert costs['alu'] == 3
+    assert costs['load'] == 4
+    assert costs['store'] == 4
+    assert costs['branch'] == 4
+    assert costs['jump'] == 4
+    assert costs['muldiv'] == 36
+
+    slow = VignaTimingModel({}, imem_latency=1, dmem_latency=4).static_costs()
+    assert slow['load'] == 7
+    assert slow['alu'] == 3
+
+
+def test_shift_costs():
+    """Two-stage shifts step by 4 bits first, then by 1."""
+    word = _enc_r(0, 13, 1, 1, 2, 0x13)             # slli x2, x1, 13
+    assert VignaTimingModel({'two_stage_shift': True}).cost(word) == (6, 0)
+    assert VignaTimingModel({}).cost(word) == (15, 0)
+
+    cost, _ = VignaTimingModel({'two_stage_shift': True}).cost(_enc_r(0, 3, 1, 5, 2, 0x33))
+    regs = [0] * 32
+    regs[3] = 1
+    assert cost(regs) == 3
+    regs[3] = 31
+    assert cost(regs) == 12
+
+
+def test_divide_by_zero_early_out():
+    """The divider answers division by zero without iterating."""
+    cost, _ = VignaTimingModel({}).cost(_enc_r(1, 3, 1, 4, 2, 0x33))   # div x2, x1, x3
+    regs = [0] * 32
+    assert cost(regs) == 4
+    regs[3] = 7
+    assert cost(regs) == 36
+
+
+def test_fpga_fast_muldiv_costs():
+    """The fast unit multiplies in 3 cycles and divides per dividend bit pair."""
+    model = VignaTimingModel({'m_extension': True, 'm_fpga_fast': True})
+    assert model.static_costs()['muldiv'] == 4
+    assert model.cost(_enc_r(1, 3, 1, 0, 2, 0x33)) == (4, 0)            # mul x2, x1, x3
+
+    cost, _ = model.cost(_enc_r(1, 3, 1, 4, 2, 0x33))                  # div x2, x1, x3
+    regs = [0] * 32
+    assert cost(regs) == 3
+    regs[3] = 7
+    assert cost(regs) == 4                                              # 0 / 7
+    regs[1] = 100                                                       # 7 bits, 4 pairs
+    assert cost(regs) == 8
+    regs[1] = 0xFFFFFF9C                                                # -100
+    assert cost(regs) == 8
+    regs[1] = 0x80000000
+    assert cost(regs) == 20
+
+    divu, _ = model.cost(_enc_r(1, 3, 1, 5, 2, 0x33))                  # divu x2, x1, x3
+    assert divu(regs) == 20
+    regs[1] = 0xFFFFFF9C
+    assert divu(regs) == 20
+
+
+def _timed_run(config, words):
+    iss = VignaISS(config)
+    for i, word in enumerate(words):
+        iss.write_word(4 * i, word)
+    iss.run(1000, timing=VignaTimingModel(config))
+    return iss
+
+
+def test_mret_holds_fetch():
+    """mret holds fetch until its CSR cycle like jalr; cycle counts from program_harness."""
+    config = build_config('rv32im_zicsr')
+    assert VignaTimingModel(config).cost(MRET) == (4, 1)
+    assert VignaTimingModel(config).static_costs()['mret'] == 4
+    assert 'mret' not in VignaTimingModel({}).static_costs()
+    assert VignaTimingModel({}).cost(MRET) == (3, 0)
+
+    # mret back to a counter loop ten times: addi t2, 10; addi t0, 0x40;
+    # csrw mepc, t0; mret; ... 0x40: addi a1, 1; bne a1, t2, mret; sw a1, 0x100; j .
+    words = [_enc_i(10, 0, 0, 7, 0x13), _enc_i(0x40, 0, 0, 5, 0x13),
+             _enc_i(0x341, 5, 1, 0, 0x73), MRET] + [0x13] * 12 + [
+             _enc_i(1, 11, 0, 11, 0x13), _enc_b(0x0c - 0x44, 7, 11, 1, 0x63),
+             _enc_s(0x100, 11, 0, 2, 0x23), _enc_j(0, 0, 0x6F)]
+    for options, cycles in (({}, 134), ({'prefetch': True}, 143),
+                            ({'prefetch': True, 'branch_prediction': True}, 132)):
+        iss = _timed_run(dict(config, **options), words)
+        assert iss.regs[11] == 10
+        assert predict_testbench_cycles(iss) == cycles
+
+
+def test_prefetch_overlaps_fetch_with_execute():
+    """The word after a load is queued while the load waits for data."""
+    words = []
+    for _ in range(8):
+        words.append(_enc_i(0x100, 0, 2, 2, 0x03))    # lw x2, 0x100(x0)
+        words.append(_enc_i(1, 1, 0, 1, 0x13))        # addi x1, x1, 1
+    words.append(0x0000006f)
+
+    iss = _timed_run({}, words)
+    assert iss.cycles == 64
+    iss = _timed_run({'prefetch': True}, words)
+    assert iss.cycles == 55
+    assert iss.regs[1] == 8
+    # i_addr runs ahead of the halt loop until the queue is full
+    assert predict_testbench_cycles(iss) == 67
+
+    costs = VignaTimingModel({'prefetch': True}).static_costs()
+    assert costs['alu'] == 2
+    assert costs['branch'] == 3
+
+
+def test_prefetch_compressed_pairs():
+    """Both halves of a queued word issue without another fetch."""
+    halves = [0x0085] * 16 + [0xa001, 0x0001]           # c.addi x1, 1 ... c.j .
+    words = [halves[i] | (halves[i + 1] << 16) for i in range(0, len(halves), 2)]
+    assert _timed_run({'c_extension': True}, words).cycles == 56
+    iss = _timed_run({'c_extension': True, 'prefetch': True}, words)
+    assert iss.cycles == 39
+    assert iss.regs[1] == 16
+
+
+def _bubble_sort(values):
+    """Bubble sort of `values` at 0x400, the loops of programs/sorting_test.c."""
+    words = [
+        _enc_i(0x400, 0, 0, 10, 0x13),              # addi x10, x0, 0x400
+        _enc_i(len(values) - 1, 0, 0, 11, 0x13),    # addi x11, x0, n - 1
+        _enc_i(0, 0, 0, 12, 0x13),                  # outer: addi x12, x0, 0
+        _enc_i(0, 10, 0, 5, 0x13),                  # addi x5, x10, 0
+        _enc_i(0, 5, 2, 6, 0x03),                   # inner: lw x6, 0(x5)
+        _enc_i(4, 5, 2, 7, 0x03),                   # lw x7, 4(x5)
+        _enc_b(12, 6, 7, 5, 0x63),                  # bge x7, x6, skip
+        _enc_s(0, 7, 5, 2, 0x23),                   # sw x7, 0(x5)
+        _enc_s(4, 6, 5, 2, 0x23),                   # sw x6, 4(x5)
+        _enc_i(4, 5, 0, 5, 0x13),                   # skip: addi x5, x5, 4
+        _enc_i(1, 12, 0, 12, 0x13),                 # addi x12, x12, 1
+        _enc_b(-28, 11, 12, 4, 0x63),               # blt x12, x11, inner
+        _enc_i(-1, 11, 0, 11, 0x13),                # addi x11, x11, -1
+        _enc_b(-44, 0, 11, 1, 0x63),                # bne x11, x0, outer
+        _enc_j(0, 0, 0x6F),                         # j .
+    ]
+    return words + [0x13] * (0x100 - len(words)) + values
+
+
+def test_branch_prediction_on_sort_loops():
+    """Backward loop branches redirect the queue early, the swap branch mispredicts."""
+    values = [2915, 1636, 267, 3110, 3314, 3582, 3913, 1216,
+              1914, 3217, 736, 1721, 3505, 1377, 348, 2037]
+    words = _bubble_sort(values)
+    prefetch = {'prefetch': True}
+    predict = {'prefetch': True, 'branch_prediction': True}
+
+    iss = _timed_run(prefetch, words)
+    assert iss.instret == 913
+    assert predict_testbench_cycles(iss) == 3331
+    iss = _timed_run(predict, words)
+    assert [iss.read_word(0x400 + 4 * i) for i in range(16)] == sorted(values)
+    assert predict_testbench_cycles(iss) == 3031
+    assert iss._front_end.mispredictions == 71
+
+    # prediction needs the queue
+    assert VignaTimingModel({'branch_prediction': True}).front_end(0) is None
+    costs = VignaTimingModel(predict).static_costs()
+    assert costs['branch'] == 2
+    assert costs['jump'] == 2
+    assert VignaTimingModel(predict).cost(_enc_i(0, 1, 0, 0, 0x67)) == (3, 1)    # jalr x0, 0(x1)
+
+
+def test_static_prediction():
+    """jal and backward branches are predicted taken, forward branches not."""
+    assert static_prediction(_enc_j(-8, 1, 0x6F), 0x100, 4) == (True, 0xF8)
+    assert static_prediction(_enc_b(-28, 11, 12, 4, 0x63), 0x100, 4) == (True, 0xE4)
+    assert static_prediction(_enc_b(12, 6, 7, 5, 0x63), 0x100, 4) == (False, 0x104)
+    assert static_prediction(_enc_b(12, 6, 7, 5, 0x63), 0x100, 2) == (False, 0x102)
+    assert static_prediction(_enc_i(0, 1, 0, 0, 0x67), 0x100, 4) is None
+    assert static_prediction(_enc_i(1, 1, 0, 1, 0x13), 0x100, 4) is None
+
+
+def test_profile_breakdown():
+    """The per-PC profile aggregates by instruction class."""
+    iss = VignaISS({})
+    iss.write_word(0, _enc_i(3, 0, 0, 1, 0x13))       # addi x1, x0, 3
+    iss.write_word(4, _enc_i(0, 0, 2, 2, 0x03))       # lw x2, 0(x0)
+    iss.write_word(8, 0x0000006f)
+    profile = {}
+    iss.run(100, timing=VignaTimingModel({}), profile=profile)
+    classes = breakdown(iss, profile)
+    assert classes['alu'] == [1, 3]
+    assert classes['load'] == [1, 4]
+    assert classes['jump'] == [1, 4]
+    assert iss.cycles == sum(cycles for _, cycles in profile.values()) + 4
+
+
+def test_parse_testbench_log():
+    """Halt lines from program_testbench.v are recognised."""
+    log = ("Running program: Simple Arithmetic Test\n"
+           "Program halted at PC=0x00000034 after          54 cycles\n")
+    assert parse_testbench_log(log) == [(0x34, 54)]
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Tests for the content-addressed .vvp cache (keying, storage and eviction).
+"""
+
+import os
+import sys
+import time
+import tempfile
+
+# Add tools directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'tools'))
+
+from vigna_vvp_cache import VvpCache, parse_iverilog_args, collect_inputs
+
+
+def write(path, text):
+    with open(path, 'w') as f:
+        f.write(text)
+
+
+def test_parse_iverilog_args():
+    """Output, include directories, options and sources are separated."""
+    output, includes, options, sources = parse_iverilog_args(
+        ['-o', 'a.vvp', '-I.', '-I', 'inc', '-D', 'FOO=1', '-g2012',
+         'vigna_core.v', 'sim/tb.v'])
+    assert output == 'a.vvp'
+    assert includes == ['.', 'inc']
+    assert options == ['-DFOO=1', '-g2012']
+    assert sources == ['vigna_core.v', 'sim/tb.v']
+
+
+def test_key_tracks_includes_and_defines():
+    """Editing an included configuration or a define changes the key."""
+    with tempfile.TemporaryDirectory() as root:
+        inc = os.path.join(root, 'inc')
+        os.mkdir(inc)
+        write(os.path.join(root, 'core.v'), '`include "conf.vh"\nmodule core; endmodule\n')
+        write(os.path.join(inc, 'conf.vh'), '`define A\n')
+        args = ['-o', 'out.vvp', '-I', 'inc', 'core.v']
+        assert collect_inputs(['core.v'], ['inc'], root) == [
+            os.path.join(root, 'core.v'), os.path.join(inc, 'conf.vh')]
+
+        cache = VvpCache(os.path.join(root, 'cache'))
+        key = cache.key(args, root)
+        assert cache.key(['-o', 'other.vvp', '-I', 'inc', 'core.v'], root) == key
+        assert cache.key(args + ['-DB'], root) != key
+
+        write(os.path.join(inc, 'conf.vh'), '`define B\n')
+        assert cache.key(args, root) != key
+
+        # The working directory shadows -I directories, as in iverilog
+        write(os.path.join(root, 'conf.vh'), '`define B\n')
+        assert collect_inputs(['core.v'], ['inc'], root)[1] == os.path.join(root, 'conf.vh')
+
+
+def test_key_ignores_inactive_includes():
+    """Files included only in an inactive `ifdef branch do not affect the key."""
+    with tempfile.TemporaryDirectory() as root:
+        write(os.path.join(root, 'core.v'), '`ifdef FAST\n`include "fast.v"\n`endif\n')
+        write(os.path.join(root, 'fast.v'), 'module fast; endmodule\n')
+        args = ['-o', 'out.vvp', 'core.v']
+        assert collect_inputs(['core.v'], [], root) == [os.path.join(root, 'core.v')]
+        assert collect_inputs(['core.v'], [], root, {'FAST': '1'})[1] == os.path.join(root, 'fast.v')
+
+        cache = VvpCache(os.path.join(root, 'cache'))
+        key, fast_key = cache.key(args, root), cache.key(args + ['-DFAST'], root)
+        write(os.path.join(root, 'fast.v'), 'module fast2; endmodule\n')
+        assert cache.key(args, root) == key
+        assert cache.key(args + ['-DFAST'], root) != fast_key
+
+
+def test_store_lookup_and_lru_eviction():
+    """Entries round-trip and the least recently used one is evicted first."""
+    with tempfile.TemporaryDirectory() as root:
+        cache = VvpCache(os.path.join(root, 'cache'), max_bytes=250)
+        src = os.path.join(root, 'a.vvp')
+        dest = os.path.join(root, 'b.vvp')
+        assert not cache.lookup('0' * 64, dest)
+
+        for i, key in enumerate(['a' * 64, 'b' * 64]):
+            write(src, str(i) * 100)
+            cache.store(key, src)
+            past = time.time() - 100 + i
+            os.utime(cache._entry(key), (past, past))
+
+        assert cache.lookup('a' * 64, dest)        # refreshes 'a'
+        with open(dest) as f:
+            assert f.read() == '0' * 100
+
+        write(src, '2' * 100)
+        cache.store('c' * 64, src)
+        stats = cache.stats()
+        assert stats['entries'] == 2 and stats['bytes'] <= 250
+        assert not os.path.exists(cache._entry('b' * 64))
+        assert os.path.exists(cache._entry('a' * 64))
+
+        cache.clear()
+        assert cache.stats()['entries'] == 0
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Tests for the columnar waveform store (conversion needs only the standard
+library; the query tests run when NumPy is installed).
+"""
+
+import io
+import os
+import sys
+import tempfile
+from array import array
+
+import pytest
+
+# Add tools directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'tools'))
+sys.path.insert(0, os.path.dirname(__file__))
+
+from vigna_wavestore import convert, parse_condition, _condition_names
+from test_vigna_vcd import make_vcd, CYCLES
+
+
+def build_store(root):
+    vcd = os.path.join(root, 'dump.vcd')
+    with open(vcd, 'w') as f:
+        f.write(make_vcd(CYCLES))
+    store = os.path.join(root, 'dump.wave')
+    return convert(vcd, store), store
+
+
+def test_convert_writes_columns():
+    """Each identifier code becomes one column; aliases share it."""
+    with tempfile.TemporaryDirectory() as root:
+        index, store = build_store(root)
+        signals = index['signals']
+        assert signals['tb.clk']['column'] == signals['tb.dut.clk']['column']
+        assert index['timescale'] == '1ps'
+
+        pc = signals['tb.dut.pc']
+        times = array('Q')
+        values = array('Q')
+        with open(os.path.join(store, pc['column'] + '.time'), 'rb') as f:
+            times.frombytes(f.read())
+        with open(os.path.join(store, pc['column'] + '.value'), 'rb') as f:
+            values.frombytes(f.read())
+        assert len(times) == pc['changes'] == len(CYCLES) + 3
+        assert list(times) == sorted(times)
+        assert values[-1] == 0x8
+        assert not pc['has_x']
+
+
+def test_condition_parsing():
+    """Verilog operators and sized literals map onto a Python expression tree."""
+    tree = parse_condition("d_valid && !d_ready || dut.pc == 32'h40")
+    assert _condition_names(tree) == {'d_valid', 'd_ready', 'dut.pc'}
+    with pytest.raises(ValueError):
+        parse_condition("open('x')")
+
+
+def test_queries():
+    """Values over a range, clock edges and conditional cycle searches."""
+    np = pytest.importorskip('numpy')
+    from vigna_wavestore import WaveStore
+    with tempfile.TemporaryDirectory() as root:
+        _, path = build_store(root)
+        store = WaveStore(path)
+        assert store.resolve('vigna.exec_state') == 'tb.dut.exec_state'
+        assert store.resolve('d_valid') == 'tb.dut.d_valid'
+
+        edges = store.edges()
+        assert len(edges) == len(CYCLES) + 3
+        times, values = store.changes('vigna.pc', 0, int(edges[-1]))
+        assert values[0] == 0 and values[-1] == 0x8
+
+        stalled = store.cycles_where('d_valid && !d_ready')
+        assert len(stalled) == 2
+        coproc = store.cycles_where("vigna.exec_state == 4'h9")
+        assert len(coproc) == 2 and np.all(coproc > stalled.max())
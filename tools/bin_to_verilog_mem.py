@@ -2,58 +2,388 @@
 """
 Converts a binary file to Verilog memory initialization format
 for use with the Vigna RISC-V processor testbenches.
+
+The input is either a flat binary, placed at --base-addr, or an ELF32
+RISC-V executable, whose loadable segments are placed at their physical
+addresses (.text, .rodata, .data and zero-filled .bss alike). For the
+Harvard testbenches (cores built without VIGNA_TOP_BUS_BINDING) the
+executable segments and the data segments can be written to separate
+instruction and data images, and the ELF symbol table can be exported for
+later tools.
+
+Usage:
+    python3 bin_to_verilog_mem.py build/prog.elf build/prog.mem
+    python3 bin_to_verilog_mem.py --data-output build/prog.dmem --data-base 0x1000 build/prog.elf build/prog.imem
+    python3 bin_to_verilog_mem.py --symbols build/prog.sym build/prog.elf build/prog.mem
+    python3 bin_to_verilog_mem.py --format assignments build/prog.bin build/prog.vh
+    python3 bin_to_verilog_mem.py --format mif --depth 16384 build/prog.elf build/prog.mif
 """
 
+import re
 import sys
+import struct
 import argparse
+from array import array
+from typing import Dict, Iterator, List, Optional, Tuple
+
+ELF_MAGIC = b'\x7fELF'
+EM_RISCV = 243
+PT_LOAD = 1
+PF_X = 0x1
+SHT_SYMTAB = 2
+
+SYMBOL_TYPES = {0: 'NOTYPE', 1: 'OBJECT', 2: 'FUNC', 3: 'SECTION', 4: 'FILE'}
+SYMBOL_BINDS = {0: 'LOCAL', 1: 'GLOBAL', 2: 'WEAK'}
+
+_EHDR = struct.Struct('<16sHHIIIIIHHHHHH')
+_PHDR = struct.Struct('<8I')
+_SHDR = struct.Struct('<10I')
+_SYM = struct.Struct('<IIIBBH')
+
+# Words formatted per write, and the shortest zero run that sparse output skips
+CHUNK_WORDS = 1 << 16
+SPARSE_MIN_ZERO_WORDS = 4
+
+# A region is (start address, bytes)
+Region = Tuple[int, bytes]
+
+
+def is_elf(data: bytes) -> bool:
+    """True if the data starts with the ELF magic number."""
+    return data[:4] == ELF_MAGIC
+
+
+def read_elf(data: bytes) -> Dict[str, any]:
+    """Parse an ELF32 little-endian RISC-V executable.
+
+    Returns {'entry', 'segments', 'symbols'}: segments are dicts with the
+    physical address, the memory image (file bytes plus zero fill up to
+    p_memsz) and whether the segment is executable; symbols are dicts with
+    name, value, size, type and bind.
+    """
+    if len(data) < _EHDR.size or not is_elf(data):
+        raise ValueError("not an ELF file")
+    (ident, _, machine, _, entry, phoff, shoff, _, _, phentsize, phnum,
+     shentsize, shnum, _) = _EHDR.unpack_from(data)
+    if ident[4] != 1 or ident[5] != 1:
+        raise ValueError("only 32-bit little-endian ELF files are supported")
+    if machine != EM_RISCV:
+        raise ValueError(f"ELF machine {machine} is not RISC-V")
+
+    segments = []
+    for i in range(phnum):
+        (p_type, offset, _, paddr, filesz, memsz, flags, _) = \
+            _PHDR.unpack_from(data, phoff + i * phentsize)
+        if p_type != PT_LOAD or memsz == 0:
+            continue
+        if offset + filesz > len(data):
+            raise ValueError(f"segment at 0x{paddr:08x} extends past the end of the file")
+        image = data[offset:offset + filesz] + bytes(memsz - filesz)
+        segments.append({'addr': paddr, 'data': image, 'exec': bool(flags & PF_X)})
+    segments.sort(key=lambda s: s['addr'])
+
+    symbols = []
+    sections = [_SHDR.unpack_from(data, shoff + i * shentsize) for i in range(shnum)] if shoff else []
+    for sh in sections:
+        if sh[1] != SHT_SYMTAB:
+            continue
+        strtab = sections[sh[6]]
+        strings = data[strtab[4]:strtab[4] + strtab[5]]
+        for offset in range(sh[4], sh[4] + sh[5], sh[9] or _SYM.size):
+            name_off, value, size, info, _, shndx = _SYM.unpack_from(data, offset)
+            name = strings[name_off:strings.index(b'\0', name_off)].decode('utf-8', 'replace')
+            if not name or shndx == 0:
+                continue
+            symbols.append({'name': name, 'value': value, 'size': size,
+                            'type': SYMBOL_TYPES.get(info & 0xF, str(info & 0xF)),
+                            'bind': SYMBOL_BINDS.get(info >> 4, str(info >> 4))})
+    symbols.sort(key=lambda s: (s['value'], s['name']))
+    return {'entry': entry, 'segments': segments, 'symbols': symbols}
+
+
+def write_symbols(symbols: List[Dict[str, any]], output_file: str):
+    """Write a symbol table as '<value> <size> <type> <bind> <name>' lines."""
+    with open(output_file, 'w') as f:
+        f.write("// value    size     type     bind     name\n")
+        for sym in symbols:
+            f.write(f"{sym['value']:08x} {sym['size']:08x} {sym['type']:<8} "
+                    f"{sym['bind']:<8} {sym['name']}\n")
+
+
+def read_symbols(symbol_file: str) -> List[Dict[str, any]]:
+    """Read a symbol table written by write_symbols()."""
+    symbols = []
+    with open(symbol_file, 'r') as f:
+        for line in f:
+            if not line.strip() or line.startswith('//'):
+                continue
+            value, size, sym_type, bind, name = line.split(None, 4)
+            symbols.append({'name': name.strip(), 'value': int(value, 16), 'size': int(size, 16),
+                            'type': sym_type, 'bind': bind})
+    return symbols
+
+
+def merge_regions(regions: List[Region]) -> List[Region]:
+    """Sort regions, pad each to whole words and merge the ones that touch."""
+    merged: List[Tuple[int, bytearray]] = []
+    for addr, data in sorted(regions, key=lambda r: r[0]):
+        if not data:
+            continue
+        start = addr & ~3
+        end = (addr + len(data) + 3) & ~3
+        if merged and start <= merged[-1][0] + len(merged[-1][1]):
+            base, buf = merged[-1]
+            if end - base > len(buf):
+                buf.extend(bytes(end - base - len(buf)))
+        else:
+            base, buf = start, bytearray(end - start)
+            merged.append((base, buf))
+        buf[addr - base:addr - base + len(data)] = data
+    return [(addr, bytes(data)) for addr, data in merged]
+
+
+def load_input(input_file: str, base_addr: int = 0) -> Tuple[List[Region], List[Region], Optional[Dict]]:
+    """Read an input file as (instruction regions, data regions, parsed ELF or None).
+
+    A flat binary is one instruction region at base_addr.
+    """
+    with open(input_file, 'rb') as f:
+        data = f.read()
+    if not is_elf(data):
+        return [(base_addr, data)], [], None
+    elf = read_elf(data)
+    code = [(s['addr'], s['data']) for s in elf['segments'] if s['exec']]
+    rw = [(s['addr'], s['data']) for s in elf['segments'] if not s['exec']]
+    return code, rw, elf
+
+
+def _words(data) -> array:
+    """Little-endian 32-bit words of a word-aligned buffer, converted in bulk."""
+    words = array('I')
+    words.frombytes(data)
+    if sys.byteorder == 'big':
+        words.byteswap()
+    return words
+
+
+def _hex_chunks(data, fmt: str = '%08x\n', width: int = 4) -> Iterator[str]:
+    """Format a buffer as one hex value per line, CHUNK_WORDS values at a time."""
+    view = memoryview(data)
+    step = CHUNK_WORDS * width
+    for offset in range(0, len(view), step):
+        chunk = view[offset:offset + step]
+        values = tuple(_words(chunk)) if width == 4 else tuple(chunk)
+        yield (fmt * len(values)) % values
+
+
+def split_zero_runs(regions: List[Region], min_words: int = SPARSE_MIN_ZERO_WORDS) -> List[Region]:
+    """Drop word-aligned runs of at least `min_words` zero words from regions."""
+    pattern = re.compile(b'\0{%d,}' % (4 * min_words))
+    result = []
+    for addr, data in regions:
+        view = memoryview(data)
+        pos = 0
+        for match in pattern.finditer(data):
+            gap_start = (match.start() + 3) & ~3
+            gap_end = match.end() & ~3
+            if gap_end - gap_start < 4 * min_words:
+                continue
+            if gap_start > pos:
+                result.append((addr + pos, view[pos:gap_start]))
+            pos = gap_end
+        if pos < len(data):
+            result.append((addr + pos, view[pos:]))
+    return result
+
+
+def _header(f, source: str, origin: int, format_type: str, comment: str = '//'):
+    f.write("{} Verilog memory initialization from: {}\n".format(comment, source))
+    f.write("{} Generated by bin_to_verilog_mem.py\n".format(comment))
+    f.write("{} Base address: 0x{:08x}\n".format(comment, origin))
+    f.write("{} Format: {}\n\n".format(comment, format_type))
+
+
+def _write_readmemh(f, regions, origin, sparse=False, **_):
+    if sparse:
+        regions = split_zero_runs(regions)
+    for addr, data in regions:
+        index = (addr - origin) // 4
+        if index != 0 or len(regions) > 1:
+            f.write("@{:x}\n".format(index))
+        f.writelines(_hex_chunks(data))
 
-def bin_to_verilog_mem(input_file, output_file, base_addr=0, format_type="readmemh"):
-    """Convert binary file to Verilog memory format."""
+
+def _write_bytes(f, regions, origin, **_):
+    for addr, data in regions:
+        if addr != origin or len(regions) > 1:
+            f.write("@{:x}\n".format(addr - origin))
+        f.writelines(_hex_chunks(data, '%02x\n', width=1))
+
+
+def _write_assignments(f, regions, origin, array_name='instruction_memory', **_):
+    for addr, data in regions:
+        index = (addr - origin) // 4
+        fmt = "        %s[%%3d] = 32'h%%08x;\n" % array_name
+        words = _words(data)
+        for offset in range(0, len(words), CHUNK_WORDS):
+            chunk = words[offset:offset + CHUNK_WORDS]
+            values = [v for i, word in enumerate(chunk, index + offset) for v in (i, word)]
+            f.write((fmt * len(chunk)) % tuple(values))
+
+
+def _write_ihex(f, regions, origin, **_):
+    # Every loaded byte, zeros included: readers fill gaps with 0xFF or leave them undefined
+    upper = None
+    for addr, data in regions:
+        view = memoryview(data)
+        pos = 0
+        while pos < len(view):
+            target = addr - origin + pos
+            if target >> 16 != upper:
+                upper = target >> 16
+                _ihex_record(f, 0, 0x04, struct.pack('>H', upper))
+            # Data records never cross a 64 KiB boundary
+            length = min(16, len(view) - pos, 0x10000 - (target & 0xFFFF))
+            _ihex_record(f, target & 0xFFFF, 0x00, view[pos:pos + length])
+            pos += length
+    _ihex_record(f, 0, 0x01, b'')
+
+
+def _ihex_record(f, address: int, record_type: int, payload):
+    record = bytes([len(payload), address >> 8, address & 0xFF, record_type]) + bytes(payload)
+    f.write(":{}{:02X}\n".format(record.hex().upper(), -sum(record) & 0xFF))
+
+
+def _dense(regions, origin, depth):
+    """One buffer covering words [0, depth) of the image, gaps zero-filled."""
+    image = bytearray(depth * 4)
+    for addr, data in regions:
+        offset = addr - origin
+        if offset + len(data) > len(image):
+            raise ValueError(f"image does not fit in a depth of {depth} words")
+        image[offset:offset + len(data)] = data
+    return image
+
+
+def _write_coe(f, regions, origin, depth=None, **_):
+    f.write("memory_initialization_radix=16;\nmemory_initialization_vector=\n")
+    image = _dense(regions, origin, depth)
+    if not image:
+        f.write(";\n")
+        return
+    body = "".join(_hex_chunks(image, '%08x,\n'))
+    f.write(body[:-2] + ";\n")
+
+
+def _write_mif(f, regions, origin, depth=None, **_):
+    f.write("WIDTH=32;\nDEPTH={};\n\nADDRESS_RADIX=HEX;\nDATA_RADIX=HEX;\n\n"
+            "CONTENT BEGIN\n".format(depth))
+    next_index = 0
+    for addr, data in split_zero_runs(regions):
+        index = (addr - origin) // 4
+        if index > next_index:
+            _mif_zero_run(f, next_index, index - 1)
+        words = _words(data)
+        for offset in range(0, len(words), CHUNK_WORDS):
+            chunk = words[offset:offset + CHUNK_WORDS]
+            values = [v for i, word in enumerate(chunk, index + offset) for v in (i, word)]
+            f.write(("    %X : %08X;\n" * len(chunk)) % tuple(values))
+        next_index = index + len(words)
+    if next_index > depth:
+        raise ValueError(f"image does not fit in a depth of {depth} words")
+    if next_index < depth:
+        _mif_zero_run(f, next_index, depth - 1)
+    f.write("END;\n")
+
+
+def _mif_zero_run(f, first: int, last: int):
+    if first == last:
+        f.write("    {:X} : 00000000;\n".format(first))
+    else:
+        f.write("    [{:X}..{:X}] : 00000000;\n".format(first, last))
+
+
+# format -> (writer, comment prefix or None, extra writer arguments)
+FORMATS = {
+    'readmemh': (_write_readmemh, '//', {}),
+    'sparse': (_write_readmemh, '//', {'sparse': True}),
+    'bytes': (_write_bytes, '//', {}),
+    'assignments': (_write_assignments, '//', {}),
+    'ihex': (_write_ihex, None, {}),
+    'coe': (_write_coe, ';', {}),
+    'mif': (_write_mif, '--', {}),
+}
+
+
+def write_image(regions: List[Region], output_file: str, origin: int = 0,
+                format_type: str = "readmemh", source: str = "",
+                array_name: str = "instruction_memory", depth: Optional[int] = None) -> int:
+    """Write regions as a memory image whose word 0 is at address `origin`.
+
+    Formats:
+        readmemh     one word per line, @<word index> before each region
+        sparse       readmemh that skips runs of zero words (needs zeroed memory)
+        bytes        one byte per line for byte-wide memories (mem_sim.v)
+        assignments  instruction_memory[i] = 32'h...; statements
+        ihex         Intel HEX, byte addresses relative to origin; only the gaps
+                     between regions are left out
+        coe          Xilinx COE, `depth` words (default: up to the last word)
+        mif          Altera MIF, `depth` words (default: up to the last word)
+
+    Returns the number of bytes in the image.
+    """
+    if format_type not in FORMATS:
+        raise ValueError(f"unknown format '{format_type}'")
+    writer, comment, extra = FORMATS[format_type]
+    regions = merge_regions(regions)
+    total = sum(len(data) for _, data in regions)
+    for addr, _ in regions:
+        if addr < origin:
+            raise ValueError(f"data at 0x{addr:08x} lies below the image origin 0x{origin:08x}")
+    if depth is None:
+        depth = max(((addr - origin + len(data)) // 4 for addr, data in regions), default=0)
+
+    with open(output_file, 'w', buffering=1 << 20) as f:
+        if comment is not None:
+            _header(f, source, origin, format_type, comment)
+        writer(f, regions, origin, array_name=array_name, depth=depth, **extra)
+        if format_type in ('readmemh', 'sparse', 'bytes'):
+            f.write("// End of program ({} bytes, {} words)\n".format(total, total // 4))
+        elif format_type == 'assignments':
+            f.write("        // End of program ({} bytes, {} words)\n".format(total, total // 4))
+    return total
+
+
+def bin_to_verilog_mem(input_file, output_file, base_addr=0, format_type="readmemh",
+                       data_output=None, data_base=0, symbols_output=None, depth=None):
+    """Convert a binary or ELF file to Verilog memory format.
+
+    With data_output, non-executable ELF segments go to a separate data
+    image whose word 0 is at data_base; otherwise all segments share one
+    image whose word 0 is at base_addr.
+    """
     try:
-        with open(input_file, 'rb') as f:
-            data = f.read()
-        
-        # Pad to 4-byte boundary
-        while len(data) % 4 != 0:
-            data += b'\x00'
-        
-        with open(output_file, 'w') as f:
-            f.write("// Verilog memory initialization from: {}\n".format(input_file))
-            f.write("// Generated by bin_to_verilog_mem.py\n")
-            f.write("// Base address: 0x{:08x}\n".format(base_addr))
-            f.write("// Format: {}\n\n".format(format_type))
-            
-            if format_type == "readmemh":
-                # Write memory initialization in $readmemh format
-                addr = base_addr
-                for i in range(0, len(data), 4):
-                    # Extract 4 bytes (little-endian)
-                    word = 0
-                    for j in range(4):
-                        if i + j < len(data):
-                            word |= data[i + j] << (j * 8)
-                    
-                    f.write("{:08x}\n".format(word))
-                    addr += 4
-                f.write("// End of program ({} bytes, {} words)\n".format(len(data), len(data) // 4))
-            
-            elif format_type == "assignments":
-                # Write memory initialization as assignment statements
-                addr = base_addr
-                for i in range(0, len(data), 4):
-                    # Extract 4 bytes (little-endian)
-                    word = 0
-                    for j in range(4):
-                        if i + j < len(data):
-                            word |= data[i + j] << (j * 8)
-                    
-                    f.write("        instruction_memory[{:3d}] = 32'h{:08x};\n".format(addr // 4, word))
-                    addr += 4
-                f.write("        // End of program ({} bytes, {} words)\n".format(len(data), len(data) // 4))
-        
+        code, rw, elf = load_input(input_file, base_addr)
+        if data_output:
+            size = write_image(code, output_file, base_addr, format_type, input_file,
+                               depth=depth)
+            data_size = write_image(rw, data_output, data_base, format_type, input_file,
+                                    array_name="data_memory", depth=depth)
+        else:
+            size = write_image(code + rw, output_file, base_addr, format_type, input_file,
+                               depth=depth)
+        if symbols_output:
+            if elf is None:
+                raise ValueError("symbols can only be exported from an ELF file")
+            write_symbols(elf['symbols'], symbols_output)
+
         print(f"Successfully converted {input_file} to {output_file}")
-        print(f"Program size: {len(data)} bytes ({len(data)//4} words)")
-        
+        print(f"Program size: {size} bytes ({size//4} words)")
+        if data_output:
+            print(f"Data image {data_output}: {data_size} bytes ({data_size//4} words)")
+        if symbols_output:
+            print(f"Symbols: {len(elf['symbols'])} written to {symbols_output}")
+
     except FileNotFoundError:
         print(f"Error: File {input_file} not found")
         sys.exit(1)
@@ -61,14 +391,28 @@ def bin_to_verilog_mem(input_file, output_file, base_addr=0, format_type="readme
         print(f"Error: {e}")
         sys.exit(1)
 
-if __name__ == "__main__":
-    parser = argparse.ArgumentParser(description="Convert binary to Verilog memory format")
-    parser.add_argument("input", help="Input binary file")
+
+def main():
+    parser = argparse.ArgumentParser(description="Convert binary or ELF to Verilog memory format")
+    parser.add_argument("input", help="Input binary or ELF file")
     parser.add_argument("output", help="Output Verilog file")
-    parser.add_argument("--base-addr", type=lambda x: int(x,0), default=0, 
-                       help="Base address (default: 0)")
-    parser.add_argument("--format", choices=["readmemh", "assignments"], default="readmemh",
-                       help="Output format (default: readmemh)")
-    
+    parser.add_argument("--base-addr", type=lambda x: int(x,0), default=0,
+                       help="Address of the image's first word; a flat binary is loaded here (default: 0)")
+    parser.add_argument("--format", choices=list(FORMATS), default="readmemh",
+                       help="Output format: readmemh, sparse (skips zero runs), bytes (8-bit wide), "
+                            "assignments, ihex, coe or mif (default: readmemh)")
+    parser.add_argument("--depth", type=lambda x: int(x,0),
+                       help="Memory depth in words for coe/mif (default: up to the last word)")
+    parser.add_argument("--data-output",
+                       help="Write non-executable ELF segments to this separate data image (Harvard memories)")
+    parser.add_argument("--data-base", type=lambda x: int(x,0), default=0,
+                       help="Address of the data image's first word (default: 0)")
+    parser.add_argument("--symbols", help="Export the ELF symbol table to this file")
+
     args = parser.parse_args()
-    bin_to_verilog_mem(args.input, args.output, args.base_addr, args.format)
\ No newline at end of file
+    bin_to_verilog_mem(args.input, args.output, args.base_addr, args.format,
+                       args.data_output, args.data_base, args.symbols, args.depth)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,379 @@
+#!/usr/bin/env python3
+"""
+VIGNA AXI4-Lite Slave Models and Protocol Checker
+
+Cycle-level models of the memory behind vigna_axi's instruction and data
+channels, for the cocotb testbench in sim/vigna_axi_cocotb.py. The models
+are plain Python and simulator independent: once per rising clock edge the
+testbench samples the master's outputs, passes them to step() and drives
+the returned slave outputs until the next edge, the way a registered slave
+would. That keeps them usable (and testable) without cocotb.
+
+Every ready and response is delayed by a random number of cycles drawn
+per handshake from a DelayGenerator:
+
+    none      every ready/response the cycle after it becomes possible
+    uniform   0..max_delay extra cycles
+    bursty    mostly none, sometimes a stall of max_delay..4*max_delay
+
+The checker enforces the AXI4-Lite handshake rules on all five channels:
+VALID stays asserted until the handshake, the payload is stable while
+VALID waits for READY, no X/Z on VALID or on a valid payload, and no VALID
+from the master during reset.
+"""
+
+import random
+from typing import Dict, List, Optional, Tuple
+
+from vigna_iss import read_mem_image
+
+DELAY_PROFILES = ('none', 'uniform', 'bursty')
+
+# Master outputs of vigna_axi sampled every cycle, and the slave outputs driven
+MASTER_SIGNALS = [
+    'i_arvalid', 'i_araddr', 'i_arprot', 'i_rready',
+    'd_arvalid', 'd_araddr', 'd_arprot', 'd_rready',
+    'd_awvalid', 'd_awaddr', 'd_awprot', 'd_wvalid', 'd_wdata', 'd_wstrb', 'd_bready',
+]
+SLAVE_SIGNALS = [
+    'i_arready', 'i_rvalid', 'i_rdata', 'i_rresp',
+    'd_arready', 'd_rvalid', 'd_rdata', 'd_rresp',
+    'd_awready', 'd_wready', 'd_bvalid', 'd_bresp',
+]
+
+# Stalls of the bursty profile: one request in BURST_ODDS waits
+BURST_ODDS = 5
+
+
+class DelayGenerator:
+    """Random cycle delays for one handshake signal."""
+
+    def __init__(self, rng: random.Random, profile: str = 'uniform', max_delay: int = 4):
+        if profile not in DELAY_PROFILES:
+            raise ValueError(f"unknown delay profile '{profile}'")
+        if max_delay < 0:
+            raise ValueError("max_delay must not be negative")
+        self.rng = rng
+        self.profile = profile
+        self.max_delay = max_delay
+
+    def __call__(self) -> int:
+        if self.profile == 'none' or self.max_delay == 0:
+            return 0
+        if self.profile == 'uniform':
+            return self.rng.randint(0, self.max_delay)
+        if self.rng.randrange(BURST_ODDS):
+            return 0
+        return self.rng.randint(self.max_delay, 4 * self.max_delay)
+
+
+class SparseMemory:
+    """Word-addressed memory over the whole 32-bit space; unwritten words read 0."""
+
+    def __init__(self):
+        self.words: Dict[int, int] = {}
+
+    def load(self, path: str, base: int = 0):
+        """Place a $readmemh image at byte address `base`."""
+        for index, value in read_mem_image(path):
+            self.words[((base >> 2) + index) & 0x3FFFFFFF] = value & 0xFFFFFFFF
+
+    def read(self, addr: int) -> int:
+        return self.words.get((addr >> 2) & 0x3FFFFFFF, 0)
+
+    def write(self, addr: int, data: int, strb: int):
+        """Byte-strobed write (strobes are lane-aligned, as vigna drives them)."""
+        mask = 0
+        for lane in range(4):
+            if strb >> lane & 1:
+                mask |= 0xFF << (8 * lane)
+        index = (addr >> 2) & 0x3FFFFFFF
+        self.words[index] = (self.words.get(index, 0) & ~mask) | (data & mask)
+
+
+class ChannelStats:
+    """Transactions, occupancy, stalls and latency of one channel."""
+
+    def __init__(self):
+        self.transactions = 0
+        self.busy = 0           # cycles with a request waiting or outstanding
+        self.stalls = 0         # cycles a request VALID waited for READY
+        self.latency_total = 0  # request VALID to response handshake
+        self.latency_max = 0
+
+    def record(self, latency: int):
+        self.transactions += 1
+        self.latency_total += latency
+        self.latency_max = max(self.latency_max, latency)
+
+    def as_dict(self, cycles: int) -> Dict[str, any]:
+        return {
+            'transactions': self.transactions,
+            'utilization': round(self.busy / cycles, 4) if cycles else 0.0,
+            'stall_cycles': self.stalls,
+            'mean_latency': round(self.latency_total / self.transactions, 3) if self.transactions else None,
+            'max_latency': self.latency_max,
+        }
+
+
+class AxiLiteReadSlave:
+    """Read address / read data channel pair in front of a SparseMemory.
+
+    Up to `depth` reads may be outstanding; responses come back in order.
+    """
+
+    def __init__(self, memory: SparseMemory, ready_delay: DelayGenerator,
+                 response_delay: DelayGenerator, depth: int = 1):
+        self.memory = memory
+        self.ready_delay = ready_delay
+        self.response_delay = response_delay
+        self.depth = depth
+        self.stats = ChannelStats()
+        self.cycle = 0
+        self.arready = False
+        self.rvalid = False
+        self.rdata = 0
+        self.pending: List[Tuple[int, int]] = []   # (address, request start)
+        self.request_start: Optional[int] = None
+        self.responding = 0
+        self.ready_wait: Optional[int] = None
+        self.response_wait: Optional[int] = None
+
+    def step(self, arvalid: bool, araddr: int, rready: bool) -> Tuple[bool, bool, int]:
+        """Advance one clock edge; returns (arready, rvalid, rdata) to drive next."""
+        self.cycle += 1
+        if arvalid or self.pending or self.rvalid:
+            self.stats.busy += 1
+        if self.rvalid and rready:
+            self.stats.record(self.cycle - self.responding)
+            self.rvalid = False
+
+        if arvalid and self.request_start is None:
+            self.request_start = self.cycle
+        accepted = arvalid and self.arready
+        if accepted:
+            self.pending.append((araddr, self.request_start))
+            self.request_start = None
+            self.arready = False
+        elif arvalid:
+            self.stats.stalls += 1
+
+        if not self.rvalid and self.pending:
+            if self.response_wait is None:
+                self.response_wait = self.response_delay()
+            if self.response_wait == 0:
+                addr, self.responding = self.pending.pop(0)
+                self.rdata = self.memory.read(addr)
+                self.rvalid = True
+                self.response_wait = None
+            else:
+                self.response_wait -= 1
+
+        if arvalid and not accepted and not self.arready and len(self.pending) < self.depth:
+            if self.ready_wait is None:
+                self.ready_wait = self.ready_delay()
+            if self.ready_wait == 0:
+                self.arready = True
+                self.ready_wait = None
+            else:
+                self.ready_wait -= 1
+        return self.arready, self.rvalid, self.rdata
+
+
+class AxiLiteWriteSlave:
+    """Write address / write data / write response channels in front of a SparseMemory.
+
+    AW and W are accepted independently, each after its own delay; the
+    write happens once both are in and is acknowledged after a response
+    delay.
+    """
+
+    def __init__(self, memory: SparseMemory, ready_delay: DelayGenerator,
+                 response_delay: DelayGenerator, depth: int = 1):
+        self.memory = memory
+        self.ready_delay = ready_delay
+        self.response_delay = response_delay
+        self.depth = depth
+        self.stats = ChannelStats()
+        self.cycle = 0
+        self.awready = False
+        self.wready = False
+        self.bvalid = False
+        self.addresses: List[int] = []
+        self.data: List[Tuple[int, int]] = []
+        self.done: List[int] = []          # request starts of performed writes
+        self.request_start: Optional[int] = None
+        self.responding = 0
+        self.aw_wait: Optional[int] = None
+        self.w_wait: Optional[int] = None
+        self.response_wait: Optional[int] = None
+
+    def _ready(self, valid: bool, accepted: bool, ready: bool, queued: int,
+               wait: Optional[int]) -> Tuple[bool, Optional[int]]:
+        if not valid or accepted or ready or queued >= self.depth:
+            return ready, wait
+        if wait is None:
+            wait = self.ready_delay()
+        if wait == 0:
+            return True, None
+        return False, wait - 1
+
+    def step(self, awvalid: bool, awaddr: int, wvalid: bool, wdata: int, wstrb: int,
+             bready: bool) -> Tuple[bool, bool, bool]:
+        """Advance one clock edge; returns (awready, wready, bvalid) to drive next."""
+        self.cycle += 1
+        if awvalid or wvalid or self.addresses or self.data or self.done or self.bvalid:
+            self.stats.busy += 1
+        if self.bvalid and bready:
+            self.stats.record(self.cycle - self.responding)
+            self.bvalid = False
+
+        if (awvalid or wvalid) and self.request_start is None:
+            self.request_start = self.cycle
+        aw_accepted = awvalid and self.awready
+        w_accepted = wvalid and self.wready
+        if aw_accepted:
+            self.addresses.append(awaddr)
+            self.awready = False
+        if w_accepted:
+            self.data.append((wdata, wstrb))
+            self.wready = False
+        if (awvalid and not aw_accepted) or (wvalid and not w_accepted):
+            self.stats.stalls += 1
+        while self.addresses and self.data:
+            data, strb = self.data.pop(0)
+            self.memory.write(self.addresses.pop(0), data, strb)
+            self.done.append(self.request_start)
+            self.request_start = None
+
+        if not self.bvalid and self.done:
+            if self.response_wait is None:
+                self.response_wait = self.response_delay()
+            if self.response_wait == 0:
+                self.responding = self.done.pop(0)
+                self.bvalid = True
+                self.response_wait = None
+            else:
+                self.response_wait -= 1
+
+        self.awready, self.aw_wait = self._ready(awvalid, aw_accepted, self.awready,
+                                                 len(self.addresses) + len(self.done), self.aw_wait)
+        self.wready, self.w_wait = self._ready(wvalid, w_accepted, self.wready,
+                                               len(self.data) + len(self.done), self.w_wait)
+        return self.awready, self.wready, self.bvalid
+
+
+class AxiLiteChecker:
+    """AXI4-Lite handshake rules, checked once per clock edge for each channel."""
+
+    def __init__(self, max_kept: int = 20):
+        self.max_kept = max_kept
+        self.state: Dict[str, Tuple[bool, bool, tuple]] = {}
+        self.violations: List[str] = []
+        self.count = 0
+
+    def _violate(self, cycle: int, channel: str, message: str):
+        self.count += 1
+        if len(self.violations) < self.max_kept:
+            self.violations.append(f"cycle {cycle}: {channel}: {message}")
+
+    def check_reset(self, cycle: int, channel: str, valid: Optional[int]):
+        """A master VALID sampled while reset is asserted."""
+        if valid is None or valid:
+            self._violate(cycle, channel, "VALID not low during reset")
+        self.state.pop(channel, None)
+
+    def check(self, cycle: int, channel: str, valid: Optional[int], ready: Optional[int],
+              payload: tuple):
+        """One channel at one edge; None stands for a value with X/Z bits."""
+        if valid is None:
+            self._violate(cycle, channel, "VALID is X/Z")
+            valid = 0
+        if valid and any(field is None for field in payload):
+            self._violate(cycle, channel, "payload has X/Z bits while VALID")
+        previous = self.state.get(channel)
+        if previous is not None and previous[0] and not previous[1]:
+            if not valid:
+                self._violate(cycle, channel, "VALID dropped before the handshake")
+            elif payload != previous[2]:
+                self._violate(cycle, channel, "payload changed while waiting for READY")
+        self.state[channel] = (bool(valid), bool(ready), payload)
+
+
+class VignaAxiSlaves:
+    """Instruction and data slaves of vigna_axi over one shared memory, with checks."""
+
+    def __init__(self, memory: SparseMemory, rng: random.Random, profile: str = 'uniform',
+                 max_delay: int = 4, depth: int = 1):
+        def delay():
+            return DelayGenerator(rng, profile, max_delay)
+
+        self.memory = memory
+        self.instr = AxiLiteReadSlave(memory, delay(), delay(), depth)
+        self.data_read = AxiLiteReadSlave(memory, delay(), delay(), depth)
+        self.data_write = AxiLiteWriteSlave(memory, delay(), delay(), depth)
+        self.checker = AxiLiteChecker()
+        self.cycle = 0
+        self.data_requested = False
+
+    def outputs(self) -> Dict[str, int]:
+        """Slave outputs as currently driven (all idle before the first step)."""
+        return {
+            'i_arready': int(self.instr.arready), 'i_rvalid': int(self.instr.rvalid),
+            'i_rdata': self.instr.rdata, 'i_rresp': 0,
+            'd_arready': int(self.data_read.arready), 'd_rvalid': int(self.data_read.rvalid),
+            'd_rdata': self.data_read.rdata, 'd_rresp': 0,
+            'd_awready': int(self.data_write.awready), 'd_wready': int(self.data_write.wready),
+            'd_bvalid': int(self.data_write.bvalid), 'd_bresp': 0,
+        }
+
+    def reset_step(self, s: Dict[str, Optional[int]]):
+        """An edge with reset asserted: only the master VALIDs are checked."""
+        self.cycle += 1
+        for channel in ('i_ar', 'd_ar', 'd_aw', 'd_w'):
+            self.checker.check_reset(self.cycle, channel, s[channel + 'valid'])
+
+    def step(self, s: Dict[str, Optional[int]]) -> Dict[str, int]:
+        """One edge: check and advance all channels; returns the outputs to drive."""
+        self.cycle += 1
+        check = self.checker.check
+        i, r, w = self.instr, self.data_read, self.data_write
+        check(self.cycle, 'i_ar', s['i_arvalid'], i.arready, (s['i_araddr'], s['i_arprot']))
+        check(self.cycle, 'i_r', i.rvalid, s['i_rready'], (i.rdata,))
+        check(self.cycle, 'd_ar', s['d_arvalid'], r.arready, (s['d_araddr'], s['d_arprot']))
+        check(self.cycle, 'd_r', r.rvalid, s['d_rready'], (r.rdata,))
+        check(self.cycle, 'd_aw', s['d_awvalid'], w.awready, (s['d_awaddr'], s['d_awprot']))
+        check(self.cycle, 'd_w', s['d_wvalid'], w.wready, (s['d_wdata'], s['d_wstrb']))
+        check(self.cycle, 'd_b', w.bvalid, s['d_bready'], ())
+
+        i.step(bool(s['i_arvalid']), s['i_araddr'] or 0, bool(s['i_rready']))
+        r.step(bool(s['d_arvalid']), s['d_araddr'] or 0, bool(s['d_rready']))
+        w.step(bool(s['d_awvalid']), s['d_awaddr'] or 0, bool(s['d_wvalid']), s['d_wdata'] or 0,
+               s['d_wstrb'] or 0, bool(s['d_bready']))
+        self.data_requested = bool(s['d_arvalid'] or s['d_awvalid'] or s['d_wvalid'])
+        return self.outputs()
+
+    def data_idle(self) -> bool:
+        """No data read or write waiting, outstanding or answered at the last edge.
+
+        The core's pc moves on when an instruction is dispatched, so a store
+        can still be on the bus while pc already sits on the halt loop.
+        """
+        r, w = self.data_read, self.data_write
+        return not (self.data_requested or r.pending or r.rvalid or
+                    w.addresses or w.data or w.done or w.bvalid)
+
+    def stats(self, cycles: int) -> Dict[str, Dict[str, any]]:
+        return {
+            'instr': self.instr.stats.as_dict(cycles),
+            'data_read': self.data_read.stats.as_dict(cycles),
+            'data_write': self.data_write.stats.as_dict(cycles),
+        }
+
+
+def is_halt_loop(memory: SparseMemory, pc: int) -> bool:
+    """The instruction at `pc` jumps to itself (jal x0, 0 or c.j 0)."""
+    word = memory.read(pc)
+    if pc & 2:
+        return word >> 16 == 0xA001
+    return word == 0x0000006F or word & 0xFFFF == 0xA001
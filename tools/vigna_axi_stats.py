@@ -0,0 +1,343 @@
+#!/usr/bin/env python3
+"""
+VIGNA AXI Transaction Analyzer
+
+Pulls the AXI4-Lite handshakes of vigna_axi's instruction read, data read
+and data write channels out of a simulation and reports how the bus was
+used:
+
+    utilization    cycles with a transaction between request VALID and
+                   response handshake, per channel group, and how the
+                   instruction and data sides overlap
+    latency        request VALID (arvalid, or the first of awvalid/wvalid)
+                   to response VALID (rvalid/bvalid), with histograms
+    stalls         the wait split into the request waiting for READY, the
+                   slave working on it and the response waiting for the
+                   master, ranked over all channels, plus the addresses
+                   that waited longest
+
+Two inputs are understood:
+
+  - a VCD dump (.vcd/.vcd.gz) or a waveform store made from one by
+    vigna_wavestore.py; the bridge's channel signals are sampled on every
+    rising clock edge out of reset
+  - the transaction log of sim/vigna_axi_mem_model.v (+axi_log=<file>), one
+    line per VALID rise and per handshake:
+        <cycle> <channel> valid|handshake <payload hex>
+
+Both are reduced to arrays of VALID-rise and handshake cycles per channel
+and everything after that is vectorized NumPy, so long runs are cheap.
+
+Usage:
+    python3 vigna_axi_stats.py axi.log
+    python3 vigna_axi_stats.py --scope tb.uut --bins 24 --top 20 sim/vigna_axi_test.vcd
+    python3 vigna_axi_stats.py --json bus.json program.wave
+"""
+
+import os
+import sys
+import json
+import shutil
+import argparse
+import tempfile
+from typing import Dict, List, Optional, Tuple
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+CHANNELS = ('i_ar', 'i_r', 'd_ar', 'd_r', 'd_aw', 'd_w', 'd_b')
+
+# (valid, ready, payload) signal names of each channel on vigna_axi
+CHANNEL_SIGNALS = {
+    'i_ar': ('i_arvalid', 'i_arready', 'i_araddr'),
+    'i_r': ('i_rvalid', 'i_rready', 'i_rdata'),
+    'd_ar': ('d_arvalid', 'd_arready', 'd_araddr'),
+    'd_r': ('d_rvalid', 'd_rready', 'd_rdata'),
+    'd_aw': ('d_awvalid', 'd_awready', 'd_awaddr'),
+    'd_w': ('d_wvalid', 'd_wready', 'd_wdata'),
+    'd_b': ('d_bvalid', 'd_bready', None),
+}
+
+# Request channels and response channel of each transaction type
+GROUPS = {
+    'instr': (('i_ar',), 'i_r'),
+    'data_read': (('d_ar',), 'd_r'),
+    'data_write': (('d_aw', 'd_w'), 'd_b'),
+}
+
+# Parts of a transaction's time on the bus
+STALL_CAUSES = {
+    'request_wait': 'request waiting for READY',
+    'slave': 'slave working on the request',
+    'response_wait': 'response waiting for the master',
+}
+
+
+def _require_numpy():
+    if np is None:
+        raise ImportError("the AXI analyzer needs numpy (pip install numpy)")
+
+
+def channel_events(valid, ready, payload=None) -> Dict[str, any]:
+    """VALID-rise cycles, handshake cycles and handshake payloads of one channel.
+
+    `valid`, `ready` and `payload` hold one sample per clock edge. A
+    transfer starts when VALID is high and was low (or completed) the
+    edge before.
+    """
+    valid = np.asarray(valid) != 0
+    handshake = valid & (np.asarray(ready) != 0)
+    waiting = np.concatenate(([False], (valid & ~handshake)[:-1]))
+    handshakes = np.flatnonzero(handshake)
+    return {
+        'valid': np.flatnonzero(valid & ~waiting),
+        'handshake': handshakes,
+        'payload': (np.asarray(payload, dtype=np.uint64)[handshakes] if payload is not None
+                    else np.zeros(len(handshakes), dtype=np.uint64)),
+    }
+
+
+def find_bridge_scope(signals) -> str:
+    """Hierarchical path of the vigna_axi instance among dumped signal names.
+
+    Memory models with the same port names are told apart by the core
+    instance below the bridge.
+    """
+    names = set(signals)
+    required = [sig for channel in CHANNEL_SIGNALS.values() for sig in channel[:2]]
+    scopes = {name.rpartition('.')[0] for name in names}
+    candidates = [s for s in scopes if all(f"{s}.{sig}" in names for sig in required)]
+    if not candidates:
+        raise ValueError("no vigna_axi channel signals (i_arvalid ... d_bready) found in the dump")
+    return sorted(candidates, key=lambda s: (not any(n.startswith(f"{s}.vigna_core_inst.") for n in names),
+                                             s.count('.'), s))[0]
+
+
+def load_dump(path: str, scope: Optional[str] = None) -> Tuple[int, Dict[str, Dict[str, any]]]:
+    """(cycles out of reset, events per channel) from a VCD or a waveform store."""
+    _require_numpy()
+    from vigna_wavestore import WaveStore, convert
+
+    workdir = None
+    try:
+        if not os.path.isdir(path):
+            workdir = tempfile.mkdtemp(prefix='vigna_axi_stats_')
+            convert(path, workdir)
+            path = workdir
+        store = WaveStore(path)
+        scope = scope or find_bridge_scope(store.signals())
+        names = [f"{scope}.{sig}" for channel in CHANNEL_SIGNALS.values() for sig in channel if sig]
+        for name in [f"{scope}.clk"] + names:
+            if name not in store.index['signals']:
+                raise ValueError(f"signal {name} not found in the dump")
+        reset = f"{scope}.resetn"
+        has_reset = reset in store.index['signals']
+        _, samples = store.sample(names + ([reset] if has_reset else []), clock=f"{scope}.clk")
+        keep = samples[reset] != 0 if has_reset else slice(None)
+        samples = {name.rpartition('.')[2]: values[keep] for name, values in samples.items()}
+        events = {}
+        for channel, (valid, ready, payload) in CHANNEL_SIGNALS.items():
+            events[channel] = channel_events(samples[valid], samples[ready],
+                                             samples[payload] if payload else None)
+        return len(samples['i_arvalid']), events
+    finally:
+        if workdir:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+
+def load_log(path: str) -> Tuple[int, Dict[str, Dict[str, any]]]:
+    """(cycles, events per channel) from a transaction log."""
+    _require_numpy()
+    with open(path, 'r') as f:
+        fields = [line.split() for line in f if line.strip() and not line.startswith('#')]
+    for number, row in enumerate(fields, 1):
+        if len(row) != 4 or row[1] not in CHANNEL_SIGNALS or row[2] not in ('valid', 'handshake'):
+            raise ValueError(f"{path}: malformed log line {number}: {' '.join(row)}")
+    table = np.array(fields, dtype=str).reshape(-1, 4)
+    try:
+        cycles = table[:, 0].astype(np.int64)
+        payloads = np.fromiter((int(v, 16) for v in table[:, 3]), dtype=np.uint64, count=len(table))
+    except ValueError as e:
+        raise ValueError(f"{path}: {e}")
+    events = {}
+    for channel in CHANNELS:
+        mine = table[:, 1] == channel
+        handshake = mine & (table[:, 2] == 'handshake')
+        events[channel] = {
+            'valid': cycles[mine & (table[:, 2] == 'valid')],
+            'handshake': cycles[handshake],
+            'payload': payloads[handshake],
+        }
+    return (int(cycles.max()) + 1 if len(cycles) else 0), events
+
+
+def transactions(events: Dict[str, Dict[str, any]]) -> Dict[str, Dict[str, any]]:
+    """Per transaction type, the request/accept/response/done cycles and address.
+
+    vigna_axi keeps one transaction per channel in flight, so the k-th
+    transfers of a type's channels belong together. Transactions still
+    open at the end of the run are left out.
+    """
+    result = {}
+    for group, (requests, response) in GROUPS.items():
+        parts = [events[c] for c in requests] + [events[response]]
+        count = min(min(len(p['valid']), len(p['handshake'])) for p in parts)
+        request = np.min([events[c]['valid'][:count] for c in requests], axis=0)
+        accept = np.max([events[c]['handshake'][:count] for c in requests], axis=0)
+        result[group] = {
+            'request': request.astype(np.int64),
+            'accept': accept.astype(np.int64),
+            'response': events[response]['valid'][:count].astype(np.int64),
+            'done': events[response]['handshake'][:count].astype(np.int64),
+            'address': events[requests[0]]['payload'][:count],
+        }
+    return result
+
+
+def busy_mask(request, done, cycles: int):
+    """Boolean per cycle: some transaction between its request and its done cycle."""
+    change = np.zeros(cycles + 1, dtype=np.int64)
+    np.add.at(change, np.minimum(request, cycles), 1)
+    np.add.at(change, np.minimum(done + 1, cycles), -1)
+    return np.cumsum(change[:cycles]) > 0
+
+
+def histogram(values, max_bins: int = 16) -> List[Tuple[int, int, int]]:
+    """(low, high, count) bins of integer values, one per value when they fit."""
+    values = np.asarray(values, dtype=np.int64)
+    if not len(values):
+        return []
+    low, high = int(values.min()), int(values.max())
+    width = max(1, -(-(high - low + 1) // max_bins))
+    counts = np.bincount((values - low) // width)
+    return [(low + i * width, low + (i + 1) * width - 1, int(n)) for i, n in enumerate(counts)]
+
+
+def spread(values) -> Optional[Dict[str, float]]:
+    """min/mean/p50/p95/p99/max (nearest rank) of integer values."""
+    if not len(values):
+        return None
+    ordered = np.sort(values)
+    ranks = np.maximum(np.ceil(np.array([50, 95, 99]) / 100 * len(ordered)).astype(np.int64), 1) - 1
+    p50, p95, p99 = (int(v) for v in ordered[ranks])
+    return {'min': int(ordered[0]), 'mean': round(float(ordered.mean()), 3), 'p50': p50,
+            'p95': p95, 'p99': p99, 'max': int(ordered[-1])}
+
+
+def analyze(cycles: int, events: Dict[str, Dict[str, any]], bins: int = 16,
+            top: int = 10) -> Dict[str, any]:
+    """Utilization, latency and stall report of a run's channel events."""
+    _require_numpy()
+    groups = transactions(events)
+    report: Dict[str, any] = {'cycles': cycles, 'channels': {}, 'contributors': [], 'addresses': []}
+    busy = {}
+    for group, t in groups.items():
+        busy[group] = busy_mask(t['request'], t['done'], cycles)
+        latency = t['response'] - t['request']
+        parts = {
+            'request_wait': t['accept'] - t['request'],
+            'slave': t['response'] - t['accept'],
+            'response_wait': t['done'] - t['response'],
+        }
+        report['channels'][group] = {
+            'transactions': len(latency),
+            'utilization': round(float(busy[group].mean()), 4) if cycles else 0.0,
+            'latency': spread(latency),
+            'histogram': histogram(latency, bins),
+            'stall_cycles': {cause: int(part.sum()) for cause, part in parts.items()},
+        }
+        for cause, part in parts.items():
+            report['contributors'].append({'channel': group, 'cause': cause, 'cycles': int(part.sum())})
+        if len(latency):
+            addresses, inverse = np.unique(t['address'], return_inverse=True)
+            waited = np.bincount(inverse, weights=latency).astype(np.int64)
+            counts = np.bincount(inverse)
+            for i in np.argsort(-waited, kind='stable')[:top]:
+                report['addresses'].append({'channel': group, 'address': int(addresses[i]),
+                                            'transactions': int(counts[i]), 'cycles': int(waited[i])})
+
+    total = sum(c['cycles'] for c in report['contributors'])
+    for c in report['contributors']:
+        c['share'] = round(c['cycles'] / total, 4) if total else 0.0
+    report['contributors'].sort(key=lambda c: -c['cycles'])
+    report['addresses'] = sorted(report['addresses'], key=lambda a: -a['cycles'])[:top]
+
+    instr = busy['instr']
+    data = busy['data_read'] | busy['data_write']
+    report['overlap'] = {name: round(float(mask.mean()), 4) if cycles else 0.0 for name, mask in (
+        ('both_busy', instr & data), ('instr_only', instr & ~data),
+        ('data_only', data & ~instr), ('idle', ~instr & ~data))}
+    return report
+
+
+def format_report(report: Dict[str, any], width: int = 40) -> str:
+    """Text summary of an analyzer report with histogram bars."""
+    lines = [f"Cycles: {report['cycles']}"]
+    lines.append(f"{'channel':<12}{'trans':>8}{'util':>8}{'min':>6}{'mean':>8}{'p95':>6}{'p99':>6}{'max':>6}")
+    for group, c in report['channels'].items():
+        lat = c['latency']
+        stats = (f"{lat['min']:>6}{lat['mean']:>8.2f}{lat['p95']:>6}{lat['p99']:>6}{lat['max']:>6}"
+                 if lat else f"{'-':>6}{'-':>8}{'-':>6}{'-':>6}{'-':>6}")
+        lines.append(f"{group:<12}{c['transactions']:>8}{100 * c['utilization']:>7.1f}%{stats}")
+    o = report['overlap']
+    lines.append(f"Instruction/data overlap: both busy {100 * o['both_busy']:.1f}%, "
+                 f"instruction only {100 * o['instr_only']:.1f}%, data only {100 * o['data_only']:.1f}%, "
+                 f"idle {100 * o['idle']:.1f}%")
+
+    for group, c in report['channels'].items():
+        if not c['histogram']:
+            continue
+        lines.append("")
+        lines.append(f"{group} latency (request VALID to response VALID, cycles)")
+        peak = max(n for _, _, n in c['histogram'])
+        for low, high, n in c['histogram']:
+            label = f"{low}" if low == high else f"{low}-{high}"
+            lines.append(f"  {label:>9} {n:>8} {'#' * max(1 if n else 0, round(width * n / peak))}")
+
+    if any(c['cycles'] for c in report['contributors']):
+        lines.append("")
+        lines.append("Stall contributors")
+        for c in report['contributors']:
+            if c['cycles']:
+                lines.append(f"  {c['channel']:<12}{STALL_CAUSES[c['cause']]:<34}{c['cycles']:>10}"
+                             f"{100 * c['share']:>7.1f}%")
+    if report['addresses']:
+        lines.append("")
+        lines.append(f"{'address':<12}{'channel':<12}{'trans':>8}{'cycles':>10}")
+        for a in report['addresses']:
+            lines.append(f"0x{a['address']:08x}  {a['channel']:<12}{a['transactions']:>8}{a['cycles']:>10}")
+    return "\n".join(lines)
+
+
+def main():
+    """Command-line interface for the AXI transaction analyzer."""
+    parser = argparse.ArgumentParser(description="VIGNA AXI4-Lite utilization, latency and stall analyzer")
+    parser.add_argument('input', help='VCD dump (.vcd/.vcd.gz), waveform store directory or '
+                                      'transaction log (+axi_log of vigna_axi_mem_model.v)')
+    parser.add_argument('--log', action='store_true',
+                        help='Read the input as a transaction log (default for files not ending in .vcd/.vcd.gz)')
+    parser.add_argument('--scope', help='Hierarchical path of the vigna_axi instance (default: auto-detect)')
+    parser.add_argument('--bins', type=int, default=16, help='Largest number of histogram bins (default: 16)')
+    parser.add_argument('--top', type=int, default=10,
+                        help='Number of addresses to list by waiting cycles (default: 10)')
+    parser.add_argument('--json', help='Write the full report as JSON to this file')
+    args = parser.parse_args()
+
+    is_dump = not args.log and (os.path.isdir(args.input) or args.input.endswith(('.vcd', '.vcd.gz')))
+    try:
+        cycles, events = load_dump(args.input, args.scope) if is_dump else load_log(args.input)
+        report = analyze(cycles, events, max(1, args.bins), args.top)
+    except (ImportError, OSError, KeyError, ValueError) as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+
+    print(format_report(report))
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(dict(report, source=os.path.abspath(args.input)), f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
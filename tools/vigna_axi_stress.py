@@ -0,0 +1,354 @@
+#!/usr/bin/env python3
+"""
+VIGNA AXI Stress Launcher
+
+Runs a program on vigna_axi under thousands of random bus timings. The
+cocotb testbench sim/vigna_axi_cocotb.py drives the instruction and data
+interfaces from the AXI4-Lite slave models of vigna_axi_bfm.py, with every
+ready and response delay drawn from the seed, and checks the handshake
+rules on all five channels. The launcher compiles the core once per
+configuration with Icarus Verilog or Verilator, splits the seed range into batches
+(each batch is one simulator process running its seeds back to back) and
+spreads the batches over worker processes.
+
+Every seed must halt, keep the AXI rules and leave the expected words in
+the signature region of the expectation file (the format the program
+harness uses, default programs/expected/sorting_test.json). Per seed the
+cycle count, instructions per cycle (instructions from the instruction-set
+simulator) and each channel's utilization and latency are recorded; the
+report gives their distribution over the seeds and lists the failing seeds
+with the command line reproducing each.
+
+Needs cocotb (1.9 or later) and Icarus Verilog or Verilator.
+
+Usage:
+    python3 vigna_axi_stress.py
+    python3 vigna_axi_stress.py --seeds 5000 -j 16 --profile bursty --max-delay 6
+    python3 vigna_axi_stress.py --config rv32imc --enable prefetch --depth 2 programs/expected/fibonacci.json
+    python3 vigna_axi_stress.py --first-seed 1234 --seeds 1 --keep
+    python3 vigna_axi_stress.py --simulator verilator --seeds 200 --profile none
+"""
+
+import os
+import sys
+import csv
+import json
+import time
+import shutil
+import argparse
+import tempfile
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+from vigna_config_generator import VignaConfigGenerator, CONFIG_OPTIONS, PREDEFINED_CONFIGS
+from vigna_harness import load_expectation, check_signature
+from vigna_iss import VignaISSError, build_config
+from vigna_sweep import iss_run
+from vigna_axi_bfm import DELAY_PROFILES
+
+REPO_ROOT = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+SIM_DIR = os.path.join(REPO_ROOT, 'sim')
+TOOLS_DIR = os.path.join(REPO_ROOT, 'tools')
+DEFAULT_EXPECTATION = os.path.join(REPO_ROOT, 'programs', 'expected', 'sorting_test.json')
+TEST_MODULE = 'vigna_axi_cocotb'
+TOPLEVEL = 'vigna_axi'
+CHANNELS = ['instr', 'data_read', 'data_write']
+
+CSV_FIELDS = ['seed', 'status', 'cycles', 'ipc'] + [
+    f"{channel}_{field}" for channel in CHANNELS
+    for field in ('transactions', 'utilization', 'stall_cycles', 'mean_latency', 'max_latency')]
+
+
+# Executables each simulator needs in PATH and the extra arguments of its build
+SIMULATORS = {
+    'icarus': (['iverilog', 'vvp'], []),
+    'verilator': (['verilator'], ['-Wno-fatal', '-Wno-lint', '-Wno-style',
+                                  '-Wno-MULTIDRIVEN', '-Wno-INITIALDLY']),
+}
+
+
+def get_runner(simulator: str = 'icarus'):
+    """cocotb's Python runner (cocotb_tools.runner from cocotb 2.0, cocotb.runner before)."""
+    try:
+        from cocotb_tools.runner import get_runner as cocotb_get_runner
+    except ImportError:
+        try:
+            from cocotb.runner import get_runner as cocotb_get_runner
+        except ImportError:
+            raise ImportError("the AXI stress test needs cocotb 1.9 or later (pip install cocotb)")
+    return cocotb_get_runner(simulator)
+
+
+def seed_batches(first: int, count: int, batch: int) -> List[Tuple[int, int]]:
+    """(first seed, seed count) of each simulator run."""
+    if count < 1 or batch < 1:
+        raise ValueError("seed count and batch size must be positive")
+    return [(start, min(batch, first + count - start)) for start in range(first, first + count, batch)]
+
+
+def percentile(values: List[float], p: float) -> float:
+    """Nearest-rank percentile of a non-empty list."""
+    ordered = sorted(values)
+    rank = max(1, -(-len(ordered) * p // 100))
+    return ordered[int(rank) - 1]
+
+
+def judge(record: Dict[str, any], exp: Dict[str, any], instructions: Optional[int]) -> Dict[str, any]:
+    """Pass/fail verdict and throughput figures of one seed's testbench record."""
+    result = {'seed': record['seed'], 'status': 'fail', 'message': '', 'cycles': record['cycles'],
+              'ipc': None, 'violations': record['violations'], 'channels': record['channels']}
+    mismatches = check_signature(exp, record['signature'])
+    if not record['halted']:
+        result['message'] = f"no halt within {record['cycles']} cycles"
+    elif record['violation_count']:
+        result['message'] = f"{record['violation_count']} AXI protocol violations, first: " \
+                            f"{record['violations'][0]}"
+    elif mismatches:
+        addr, expected, actual = mismatches[0]
+        result['message'] = f"{len(mismatches)} signature words differ, first at 0x{addr:08x}: " \
+                            f"expected 0x{expected:08x}, got " + \
+                            ('none' if actual is None else f"0x{actual:08x}")
+    else:
+        result['status'] = 'pass'
+        if instructions:
+            result['ipc'] = round(instructions / record['cycles'], 4)
+    return result
+
+
+def summarize(results: List[Dict[str, any]]) -> Dict[str, any]:
+    """Distribution of cycles, IPC and per-channel figures over the passing seeds."""
+    passed = [r for r in results if r['status'] == 'pass']
+    summary: Dict[str, any] = {'seeds': len(results), 'passed': len(passed),
+                               'failed': len(results) - len(passed)}
+    if not passed:
+        return summary
+
+    def spread(values: List[float]) -> Dict[str, float]:
+        return {'min': min(values), 'mean': round(sum(values) / len(values), 4),
+                'p95': percentile(values, 95), 'max': max(values)}
+
+    summary['cycles'] = spread([r['cycles'] for r in passed])
+    ipcs = [r['ipc'] for r in passed if r['ipc'] is not None]
+    if ipcs:
+        summary['ipc'] = spread(ipcs)
+    summary['channels'] = {}
+    for channel in CHANNELS:
+        stats = [r['channels'][channel] for r in passed]
+        latencies = [s['mean_latency'] for s in stats if s['mean_latency'] is not None]
+        summary['channels'][channel] = {
+            'utilization': spread([s['utilization'] for s in stats]),
+            'mean_latency': spread(latencies) if latencies else None,
+            'max_latency': max(s['max_latency'] for s in stats),
+        }
+    return summary
+
+
+def flatten(result: Dict[str, any]) -> Dict[str, any]:
+    """One CSV row of a seed's result."""
+    row = {field: result.get(field) for field in ('seed', 'status', 'cycles', 'ipc')}
+    for channel in CHANNELS:
+        for field, value in result['channels'][channel].items():
+            row[f"{channel}_{field}"] = value
+    return row
+
+
+def write_csv(path: str, results: List[Dict[str, any]]):
+    with open(path, 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=CSV_FIELDS, extrasaction='ignore')
+        writer.writeheader()
+        for r in results:
+            if r['channels']:
+                writer.writerow(flatten(r))
+
+
+def build(build_dir: str, config_name: str, config: Optional[Dict[str, any]],
+          simulator: str = 'icarus'):
+    """Compile vigna_axi for one configuration into `build_dir`."""
+    os.makedirs(build_dir, exist_ok=True)
+    conf_path = os.path.join(build_dir, 'vigna_conf.vh')
+    if config is None:
+        shutil.copy(os.path.join(REPO_ROOT, 'vigna_conf.vh'), conf_path)
+    elif not VignaConfigGenerator().generate_config_file(config, conf_path, config_name):
+        raise OSError(f"could not write {conf_path}")
+    # Icarus searches the working directory (the build directory) before -I;
+    # Verilator only the -I list, in order
+    get_runner(simulator).build(sources=[os.path.join(REPO_ROOT, 'vigna_axi.v')],
+                                includes=[build_dir, REPO_ROOT], hdl_toplevel=TOPLEVEL,
+                                build_dir=build_dir, build_args=SIMULATORS[simulator][1],
+                                timescale=('1ns', '1ps'))
+
+
+def run_batch(build_dir: str, batch: Tuple[int, int], env: Dict[str, str],
+              simulator: str = 'icarus') -> List[Dict[str, any]]:
+    """Run one seed range in its own simulator process; returns the testbench records."""
+    first, count = batch
+    test_dir = os.path.join(build_dir, f"seeds_{first}")
+    os.makedirs(test_dir, exist_ok=True)
+    results_file = os.path.join(test_dir, 'results.jsonl')
+    # cocotb 1.9 sets the simulator's PYTHONPATH from sys.path, over extra_env
+    for path in (TOOLS_DIR, SIM_DIR):
+        if path not in sys.path:
+            sys.path.insert(0, path)
+    extra_env = dict(env, VIGNA_AXI_SEEDS=f"{first},{count}", VIGNA_AXI_RESULTS=results_file,
+                     PYTHONPATH=os.pathsep.join(sys.path))
+    try:
+        # A runner object keeps per-run state, so every batch gets its own
+        # (and no sources to tell the top-level language from)
+        get_runner(simulator).test(test_module=TEST_MODULE, hdl_toplevel=TOPLEVEL, hdl_toplevel_lang='verilog',
+                                   build_dir=build_dir, test_dir=test_dir,
+                                   results_xml=os.path.join(test_dir, 'results.xml'),
+                                   extra_env=extra_env, log_file=os.path.join(test_dir, 'sim.log'))
+    except (subprocess.CalledProcessError, SystemExit):
+        pass    # failing seeds are reported from their records
+    records = []
+    if os.path.exists(results_file):
+        with open(results_file) as f:
+            records = [json.loads(line) for line in f if line.strip()]
+    return records
+
+
+def main():
+    """Command-line interface for the AXI stress launcher."""
+    parser = argparse.ArgumentParser(description="VIGNA AXI4-Lite random bus timing stress test (cocotb)")
+    parser.add_argument('expectation', nargs='?', default=DEFAULT_EXPECTATION,
+                        help='Expectation file (.json, default: programs/expected/sorting_test.json)')
+    parser.add_argument('--config', choices=sorted(PREDEFINED_CONFIGS),
+                        help='Predefined configuration (default: repository vigna_conf.vh)')
+    parser.add_argument('--enable', action='append', default=[], metavar='OPTION',
+                        help='Enable this configuration option (repeatable)')
+    parser.add_argument('--simulator', choices=sorted(SIMULATORS), default='icarus',
+                        help='HDL simulator (default: icarus)')
+    parser.add_argument('--seeds', type=int, default=1000, help='Number of seeds (default: 1000)')
+    parser.add_argument('--first-seed', type=int, default=1, help='First seed (default: 1)')
+    parser.add_argument('--batch', type=int, default=50,
+                        help='Seeds per simulator process (default: 50)')
+    parser.add_argument('--profile', choices=DELAY_PROFILES, default='uniform',
+                        help='Ready/response delay profile (default: uniform)')
+    parser.add_argument('--max-delay', type=int, default=4,
+                        help='Largest ready/response delay in cycles (default: 4)')
+    parser.add_argument('--depth', type=int, default=1,
+                        help='Requests each slave accepts ahead of its responses (default: 1)')
+    parser.add_argument('-j', '--jobs', type=int, default=os.cpu_count() or 1,
+                        help='Number of parallel simulator processes (default: number of CPUs)')
+    parser.add_argument('--build-dir', help='Build and run directory (default: a temporary one)')
+    parser.add_argument('--keep', action='store_true', help='Keep the build directory and simulator logs')
+    parser.add_argument('--csv', help='Write one row per seed to this file')
+    parser.add_argument('--json', help='Write the per-seed results and summary as JSON')
+    args = parser.parse_args()
+
+    if args.max_delay < 0 or args.depth < 1:
+        print("Error: --max-delay must not be negative and --depth must be at least 1")
+        sys.exit(1)
+    try:
+        batches = seed_batches(args.first_seed, args.seeds, args.batch)
+        exp = load_expectation(args.expectation)
+    except (OSError, ValueError, KeyError) as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+    if not os.path.exists(exp['image']):
+        print(f"Error: {exp['image']} not built (run make -C programs)")
+        sys.exit(1)
+
+    if args.config:
+        config_name = args.config
+        config = dict(PREDEFINED_CONFIGS[args.config]['options'])
+    else:
+        config_name = 'vigna_conf.vh'
+        config = build_config(None, os.path.join(REPO_ROOT, 'vigna_conf.vh'))
+    for option in args.enable:
+        if option not in CONFIG_OPTIONS or CONFIG_OPTIONS[option].get('type') == 'value':
+            print(f"Error: '{option}' is not a configuration switch")
+            sys.exit(1)
+        config[option] = True
+        config_name += f"+{option}"
+    valid, errors = VignaConfigGenerator().validate_config(config)
+    if not valid:
+        print(f"Error: invalid configuration: {'; '.join(errors)}")
+        sys.exit(1)
+
+    try:
+        instructions = iss_run(config, exp)[0]
+    except (OSError, ValueError, VignaISSError) as e:
+        print(f"Error: ISS: {e}")
+        sys.exit(1)
+    try:
+        get_runner(args.simulator)
+    except ImportError as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+    for tool in SIMULATORS[args.simulator][0]:
+        if shutil.which(tool) is None:
+            print(f"Error: '{tool}' not found in PATH (install {args.simulator})")
+            sys.exit(1)
+
+    build_dir = os.path.abspath(args.build_dir) if args.build_dir else tempfile.mkdtemp(prefix='vigna_axi_stress_')
+    env = {
+        'VIGNA_AXI_IMAGE': exp['image'],
+        'VIGNA_AXI_PROFILE': args.profile,
+        'VIGNA_AXI_MAX_DELAY': str(args.max_delay),
+        'VIGNA_AXI_DEPTH': str(args.depth),
+        'VIGNA_AXI_MAX_CYCLES': str(exp['max_cycles'] * (1 + 4 * args.max_delay)),
+        'VIGNA_AXI_SIGNATURE': f"{exp['begin']:x},{exp['end']:x}",
+    }
+    print(f"{exp['name']} on {config_name} ({args.simulator}): {args.seeds} seeds in {len(batches)} batches, "
+          f"{args.profile} delays up to {args.max_delay}, depth {args.depth}")
+    start = time.time()
+    results = []
+    try:
+        build(build_dir, config_name, None if not args.config and not args.enable else config,
+              args.simulator)
+        with ThreadPoolExecutor(max_workers=args.jobs) as pool:
+            jobs = [(batch, pool.submit(run_batch, build_dir, batch, env, args.simulator)) for batch in batches]
+            for (first, count), job in jobs:
+                records = {record['seed']: record for record in job.result()}
+                for seed in range(first, first + count):
+                    if seed in records:
+                        results.append(judge(records[seed], exp, instructions))
+                    else:
+                        results.append({'seed': seed, 'status': 'error', 'cycles': None, 'ipc': None,
+                                        'message': f"no result (see {build_dir}/seeds_{first}/sim.log)",
+                                        'violations': [], 'channels': None})
+    except (OSError, subprocess.CalledProcessError, SystemExit) as e:
+        print(f"Error: build failed: {e}")
+        sys.exit(1)
+    finally:
+        failed = [r for r in results if r['status'] != 'pass']
+        if not args.keep and not args.build_dir and not any(r['status'] == 'error' for r in failed):
+            shutil.rmtree(build_dir, ignore_errors=True)
+    elapsed = time.time() - start
+
+    summary = summarize(results)
+    if 'cycles' in summary:
+        print(f"{'':<22}{'min':>10}{'mean':>10}{'p95':>10}{'max':>10}")
+        print(f"{'cycles':<22}" + ''.join(f"{summary['cycles'][k]:>10}" for k in ('min', 'mean', 'p95', 'max')))
+        if 'ipc' in summary:
+            print(f"{'IPC':<22}" + ''.join(f"{summary['ipc'][k]:>10.3f}" for k in ('min', 'mean', 'p95', 'max')))
+        for channel, stats in summary['channels'].items():
+            print(f"{channel + ' utilization':<22}" +
+                  ''.join(f"{stats['utilization'][k]:>10.3f}" for k in ('min', 'mean', 'p95', 'max')))
+            if stats['mean_latency']:
+                print(f"{channel + ' latency':<22}" +
+                      ''.join(f"{stats['mean_latency'][k]:>10.2f}" for k in ('min', 'mean', 'p95', 'max')))
+    for r in failed[:20]:
+        print(f"  {r['status'].upper()}: seed {r['seed']}: {r['message']}")
+    if failed:
+        print(f"  reproduce: python3 {os.path.relpath(__file__)} {' '.join(sys.argv[1:])} "
+              "--first-seed <seed> --seeds 1 --keep")
+    print("-" * 60)
+    print(f"{len(results)} seeds in {elapsed:.1f}s ({len(results) / elapsed:.1f} seeds/s): "
+          f"{len(failed)} failed")
+
+    if args.csv:
+        write_csv(args.csv, results)
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'program': exp['name'], 'config': config_name, 'profile': args.profile,
+                       'max_delay': args.max_delay, 'depth': args.depth, 'instructions': instructions,
+                       'summary': summary, 'results': results}, f, indent=2)
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,444 @@
+#!/usr/bin/env python3
+"""
+VIGNA Benchmark Runner and History
+
+Runs the benchmark suite in programs/bench (list, matrix, state machine,
+CRC-32, memcpy, divide, compact-code and sorting kernels) on the program
+harness for each configuration, using the image built for the matching ISA
+variant (`make -C programs bench`). Every iteration of a benchmark stores its
+index to a marker address, which the harness timestamps (+mark), so the
+runner measures cycles per iteration without start-up or halt overhead.
+
+Results go to a local SQLite history together with the git commit (and
+whether the tree was dirty), a fingerprint of the configuration, of the
+Verilog files it reaches and of the benchmark image. Each new measurement is
+compared with the previous results for the same benchmark, configuration and
+image: it is flagged as a regression (or an improvement) when it moves away
+from their mean by more than `z` standard deviations and by more than
+`min_change` of the mean, so simulator noise never trips it and a
+deterministic simulation flags any real change.
+
+With --compare OPTION every configuration is also run with that option
+enabled (as "<config>+<option>", a series of its own in the history) and the
+speed-up over the configuration as defined is reported, e.g. the
+VIGNA_CORE_M_FPGA_FAST multiplier/divider against the iterative one.
+--enable OPTION switches an option on in every configuration first, for
+options that build on another one (branch_prediction on prefetch).
+
+Usage:
+    python3 vigna_bench.py run
+    python3 vigna_bench.py run --config rv32imc --bench crc32 --bench divide -j 8
+    python3 vigna_bench.py run --bench matrix --bench divide --compare m_fpga_fast
+    python3 vigna_bench.py run --bench sort --enable prefetch --compare branch_prediction
+    python3 vigna_bench.py history --bench matrix --config rv32im
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import socket
+import sqlite3
+import hashlib
+import argparse
+import tempfile
+import statistics
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+from vigna_config_generator import VignaConfigGenerator, CONFIG_OPTIONS, PREDEFINED_CONFIGS
+from vigna_harness import compile_harness, run_program, HARNESS_SOURCE
+from vigna_vvp_cache import VvpCache, DEFAULT_CACHE_DIR
+from vigna_preprocessor import resolve
+
+REPO_ROOT = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+DEFAULT_SUITE = os.path.join(REPO_ROOT, 'programs', 'bench', 'suite.json')
+DEFAULT_DB = os.environ.get('VIGNA_BENCH_DB', os.path.join(REPO_ROOT, '.vigna_bench.sqlite'))
+
+# Previous results a new one is compared with, and the significance test
+DEFAULT_WINDOW = 10
+DEFAULT_Z = 3.0
+DEFAULT_MIN_CHANGE = 0.005
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    started TEXT NOT NULL,
+    commit_hash TEXT NOT NULL,
+    dirty INTEGER NOT NULL,
+    host TEXT NOT NULL,
+    note TEXT NOT NULL DEFAULT ''
+);
+CREATE TABLE IF NOT EXISTS results (
+    run_id INTEGER NOT NULL REFERENCES runs(id),
+    benchmark TEXT NOT NULL,
+    config TEXT NOT NULL,
+    config_fp TEXT NOT NULL,
+    rtl_fp TEXT NOT NULL,
+    image_fp TEXT NOT NULL,
+    variant TEXT NOT NULL,
+    iterations INTEGER NOT NULL,
+    cycles INTEGER NOT NULL,
+    per_iteration REAL NOT NULL,
+    min_iteration INTEGER NOT NULL,
+    max_iteration INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS results_series ON results (benchmark, config_fp, image_fp, run_id);
+"""
+
+
+def _int(value) -> int:
+    return value if isinstance(value, int) else int(str(value), 0)
+
+
+def load_suite(path: str = DEFAULT_SUITE) -> Dict[str, any]:
+    """Read the suite description; image paths become absolute templates."""
+    with open(path, 'r') as f:
+        suite = json.load(f)
+    suite['image'] = os.path.join(os.path.dirname(os.path.abspath(path)), suite['image'])
+    for field in ('mem_size', 'max_cycles', 'output', 'mark', 'done'):
+        suite[field] = _int(suite[field])
+    for info in suite['benchmarks'].values():
+        info['iterations'] = _int(info['iterations'])
+        info['checksum'] = _int(info['checksum'])
+    return suite
+
+
+def isa_variant(config: Dict[str, any], variants: List[str]) -> Optional[str]:
+    """Richest built variant (e.g. rv32imc) whose extensions the configuration has."""
+    base = 'rv32e' if config.get('e_extension') else 'rv32i'
+    available = {letter for letter, option in (('m', 'm_extension'), ('c', 'c_extension'))
+                 if config.get(option)}
+    candidates = [v for v in variants if v.startswith(base) and set(v[len(base):]) <= available]
+    return max(candidates, key=len, default=None)
+
+
+def bench_expectation(suite: Dict[str, any], name: str, variant: str) -> Dict[str, any]:
+    """Program harness expectation for one benchmark image."""
+    info = suite['benchmarks'][name]
+    return {
+        'name': f"{name}_{variant}",
+        'path': suite['image'].format(name=name, variant=variant),
+        'image': os.path.normpath(suite['image'].format(name=name, variant=variant)),
+        'mem_size': suite['mem_size'],
+        'max_cycles': info.get('max_cycles', suite['max_cycles']),
+        'begin': suite['output'],
+        'end': suite['output'] + 12,
+        'expect': [info['iterations'], info['checksum'], suite['done']],
+        'mark': suite['mark'],
+    }
+
+
+def iteration_cycles(marks: List[Tuple[int, int]], iterations: int) -> Optional[List[int]]:
+    """Cycles of each iteration from the (index, cycle) marks, or None if incomplete."""
+    starts = {}
+    for value, cycle in marks:
+        starts.setdefault(value, cycle)
+    if any(i not in starts for i in range(iterations + 1)):
+        return None
+    return [starts[i + 1] - starts[i] for i in range(iterations)]
+
+
+def fingerprint(*parts: str) -> str:
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(part.encode() + b'\0')
+    return digest.hexdigest()[:16]
+
+
+def config_fingerprint(config: Dict[str, any]) -> str:
+    """Hash of the option values only (not of the configuration's name)."""
+    return fingerprint(json.dumps({k: config[k] for k in sorted(config)}))
+
+
+def rtl_fingerprint(config: Dict[str, any]) -> str:
+    """Hash of every Verilog file the configuration reaches in the harness."""
+    conf_text = VignaConfigGenerator().render_config(config, 'bench')
+    files = resolve(['vigna_core.v', HARNESS_SOURCE], include_dirs=[REPO_ROOT], cwd=REPO_ROOT,
+                    text=conf_text)['files']
+    contents = []
+    for path in files:
+        with open(path, 'rb') as f:
+            contents.append(hashlib.sha256(f.read()).hexdigest())
+    return fingerprint(conf_text, *contents)
+
+
+def file_fingerprint(path: str) -> str:
+    with open(path, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()[:16]
+
+
+def git_state(repo: str = REPO_ROOT) -> Tuple[str, bool]:
+    """(HEAD commit, tracked files modified) of the repository, or ('unknown', False)."""
+    try:
+        head = subprocess.run(['git', 'rev-parse', 'HEAD'], cwd=repo, capture_output=True,
+                              text=True, check=True).stdout.strip()
+        status = subprocess.run(['git', 'status', '--porcelain', '--untracked-files=no'], cwd=repo,
+                                capture_output=True, text=True, check=True).stdout
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown', False
+    return head, bool(status.strip())
+
+
+def significance(value: float, history: List[float], z: float = DEFAULT_Z,
+                 min_change: float = DEFAULT_MIN_CHANGE) -> Tuple[str, Optional[float]]:
+    """('new' / 'ok' / 'regression' / 'improvement', baseline mean) of a measurement."""
+    if not history:
+        return 'new', None
+    mean = statistics.fmean(history)
+    spread = statistics.stdev(history) if len(history) > 1 else 0.0
+    margin = max(z * spread, min_change * mean)
+    if value > mean + margin:
+        return 'regression', mean
+    if value < mean - margin:
+        return 'improvement', mean
+    return 'ok', mean
+
+
+class BenchHistory:
+    """SQLite store of benchmark runs and their per-iteration cycle counts."""
+
+    def __init__(self, path: str = DEFAULT_DB):
+        self.path = path
+        self.db = sqlite3.connect(path)
+        self.db.executescript(SCHEMA)
+
+    def close(self):
+        self.db.close()
+
+    def start_run(self, commit: str, dirty: bool, note: str = '') -> int:
+        with self.db:
+            cursor = self.db.execute(
+                "INSERT INTO runs (started, commit_hash, dirty, host, note) VALUES (?, ?, ?, ?, ?)",
+                (time.strftime('%Y-%m-%dT%H:%M:%S'), commit, int(dirty), socket.gethostname(), note))
+        return cursor.lastrowid
+
+    def record(self, run_id: int, result: Dict[str, any]):
+        with self.db:
+            self.db.execute(
+                "INSERT INTO results VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (run_id, result['benchmark'], result['config'], result['config_fp'], result['rtl_fp'],
+                 result['image_fp'], result['variant'], result['iterations'], result['cycles'],
+                 result['per_iteration'], result['min_iteration'], result['max_iteration']))
+
+    def previous(self, benchmark: str, config_fp: str, image_fp: str,
+                 before_run: Optional[int] = None, window: int = DEFAULT_WINDOW) -> List[float]:
+        """Cycles per iteration of the latest `window` earlier results, oldest first."""
+        rows = self.db.execute(
+            "SELECT per_iteration FROM results WHERE benchmark = ? AND config_fp = ? AND image_fp = ?"
+            " AND run_id < ? ORDER BY run_id DESC LIMIT ?",
+            (benchmark, config_fp, image_fp, before_run if before_run is not None else 1 << 62,
+             window)).fetchall()
+        return [row[0] for row in reversed(rows)]
+
+    def series(self, benchmark: Optional[str] = None, config: Optional[str] = None,
+               limit: int = 20) -> List[Dict[str, any]]:
+        """Latest results joined with their runs, newest first."""
+        query = ("SELECT r.id, r.started, r.commit_hash, r.dirty, x.benchmark, x.config, x.variant,"
+                 " x.per_iteration, x.rtl_fp FROM results x JOIN runs r ON r.id = x.run_id")
+        clauses, params = [], []
+        if benchmark:
+            clauses.append("x.benchmark = ?")
+            params.append(benchmark)
+        if config:
+            clauses.append("x.config = ?")
+            params.append(config)
+        if clauses:
+            query += " WHERE " + " AND ".join(clauses)
+        query += " ORDER BY r.id DESC, x.benchmark, x.config, x.rowid DESC LIMIT ?"
+        fields = ['run', 'started', 'commit', 'dirty', 'benchmark', 'config', 'variant',
+                  'per_iteration', 'rtl_fp']
+        return [dict(zip(fields, row)) for row in self.db.execute(query, params + [limit])]
+
+
+def run_benchmark(vvp_file: str, suite: Dict[str, any], name: str, config_name: str,
+                  config: Dict[str, any], variant: str, workdir: str,
+                  timeout: float) -> Dict[str, any]:
+    """Simulate one benchmark image and derive its cycles per iteration."""
+    exp = bench_expectation(suite, name, variant)
+    iterations = suite['benchmarks'][name]['iterations']
+    result = {'benchmark': name, 'config': config_name, 'variant': variant, 'status': 'error',
+              'message': '', 'iterations': iterations, 'cycles': None, 'per_iteration': None}
+    if not os.path.exists(exp['image']):
+        result['message'] = f"{exp['image']} not built (make -C programs bench)"
+        return result
+    run = run_program(vvp_file, exp, workdir, timeout)
+    result['status'], result['message'], result['cycles'] = run['status'], run['message'], run['cycles']
+    if run['status'] != 'pass':
+        return result
+    per = iteration_cycles(run.get('marks', []), iterations)
+    if per is None:
+        result['status'] = 'error'
+        result['message'] = 'iteration marks missing from the harness output'
+        return result
+    result.update({
+        'per_iteration': sum(per) / len(per), 'min_iteration': min(per), 'max_iteration': max(per),
+        'config_fp': config_fingerprint(config), 'rtl_fp': rtl_fingerprint(config),
+        'image_fp': file_fingerprint(exp['image']),
+    })
+    return result
+
+
+def compare_results(results: List[Dict[str, any]], option: str) -> List[Dict[str, any]]:
+    """Pair each "<config>+<option>" result with its "<config>" result."""
+    passed = {(r['benchmark'], r['config']): r for r in results if r['status'] == 'pass'}
+    rows = []
+    for (name, config), base in passed.items():
+        variant = passed.get((name, f"{config}+{option}"))
+        if variant is None:
+            continue
+        rows.append({'benchmark': name, 'config': config, 'base': base['per_iteration'],
+                     'variant': variant['per_iteration'],
+                     'speedup': base['per_iteration'] / variant['per_iteration']})
+    return rows
+
+
+def main():
+    """Command-line interface for the benchmark runner."""
+    parser = argparse.ArgumentParser(description="VIGNA benchmark suite runner with history")
+    parser.add_argument('command', choices=['run', 'history'],
+                        help='run the suite, or show recorded results')
+    parser.add_argument('--config', action='append', choices=sorted(PREDEFINED_CONFIGS),
+                        help='Predefined configuration (repeatable, default: all)')
+    parser.add_argument('--bench', action='append', help='Benchmark (repeatable, default: all)')
+    parser.add_argument('--suite', default=DEFAULT_SUITE, help='Suite description (.json)')
+    parser.add_argument('--db', default=DEFAULT_DB,
+                        help='History database (default: .vigna_bench.sqlite, or $VIGNA_BENCH_DB)')
+    parser.add_argument('-j', '--jobs', type=int, default=os.cpu_count() or 1,
+                        help='Number of parallel simulations (default: number of CPUs)')
+    parser.add_argument('--timeout', type=float, default=1800.0,
+                        help='Per-simulation timeout in seconds (default: 1800)')
+    parser.add_argument('--window', type=int, default=DEFAULT_WINDOW,
+                        help=f'Earlier results to compare with (default: {DEFAULT_WINDOW})')
+    parser.add_argument('--z', type=float, default=DEFAULT_Z,
+                        help=f'Standard deviations a change must exceed (default: {DEFAULT_Z})')
+    parser.add_argument('--min-change', type=float, default=DEFAULT_MIN_CHANGE,
+                        help=f'Relative change a regression must exceed (default: {DEFAULT_MIN_CHANGE})')
+    parser.add_argument('--compare', metavar='OPTION',
+                        help='Also run every configuration with this option enabled '
+                             '(e.g. m_fpga_fast) and report the speed-up')
+    parser.add_argument('--enable', action='append', default=[], metavar='OPTION',
+                        help='Enable this option in every configuration (repeatable), '
+                             'e.g. prefetch before --compare branch_prediction')
+    parser.add_argument('--no-record', action='store_true',
+                        help='Compare with the history without adding this run to it')
+    parser.add_argument('--note', default='', help='Free-form note stored with the run')
+    parser.add_argument('--no-cache', action='store_true', help='Do not use the .vvp cache')
+    parser.add_argument('--limit', type=int, default=20, help='Rows shown by history (default: 20)')
+    parser.add_argument('--json', help='Write the results of this run as JSON')
+    args = parser.parse_args()
+
+    try:
+        suite = load_suite(args.suite)
+        history = BenchHistory(args.db)
+    except (OSError, ValueError, KeyError, sqlite3.Error) as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+
+    if args.command == 'history':
+        bench = args.bench[0] if args.bench else None
+        config = args.config[0] if args.config else None
+        print(f"{'run':>5}  {'started':<20}{'commit':<12}{'benchmark':<12}{'config':<16}{'cyc/iter':>10}")
+        for row in history.series(bench, config, args.limit):
+            commit = row['commit'][:10] + ('+' if row['dirty'] else '')
+            print(f"{row['run']:>5}  {row['started']:<20}{commit:<12}{row['benchmark']:<12}"
+                  f"{row['config']:<16}{row['per_iteration']:>10.1f}")
+        return
+
+    names = args.bench or list(suite['benchmarks'])
+    for name in names:
+        if name not in suite['benchmarks']:
+            print(f"Error: unknown benchmark '{name}'")
+            sys.exit(1)
+    for tool in ('iverilog', 'vvp'):
+        if shutil.which(tool) is None:
+            print(f"Error: '{tool}' not found in PATH (install Icarus Verilog)")
+            sys.exit(1)
+
+    configs = {name: PREDEFINED_CONFIGS[name]['options'] for name in (args.config or PREDEFINED_CONFIGS)}
+    generator = VignaConfigGenerator()
+    for option in args.enable + ([args.compare] if args.compare else []):
+        if option not in CONFIG_OPTIONS or CONFIG_OPTIONS[option].get('type') == 'value':
+            print(f"Error: '{option}' is not a configuration switch")
+            sys.exit(1)
+    for option in args.enable:
+        configs = {(name if config.get(option) else f"{name}+{option}"): dict(config, **{option: True})
+                   for name, config in configs.items()}
+        configs = {name: config for name, config in configs.items() if generator.validate_config(config)[0]}
+    if args.compare:
+        for name, config in list(configs.items()):
+            enabled = dict(config, **{args.compare: True})
+            if not config.get(args.compare) and generator.validate_config(enabled)[0]:
+                configs[f"{name}+{args.compare}"] = enabled
+    cache = None if args.no_cache else VvpCache(DEFAULT_CACHE_DIR)
+    workdir = tempfile.mkdtemp(prefix='vigna_bench_')
+    start = time.time()
+    results = []
+    try:
+        with ThreadPoolExecutor(max_workers=args.jobs) as pool:
+            def compile_config(item):
+                config_dir = os.path.join(workdir, item[0])
+                os.makedirs(config_dir)
+                return compile_harness(config_dir, item[0], cache, args.timeout, item[1])
+
+            vvp_files = dict(zip(configs, pool.map(compile_config, configs.items())))
+            jobs = []
+            for config_name, config in configs.items():
+                variant = isa_variant(config, suite['variants'])
+                if variant is None:
+                    print(f"[{config_name}] no benchmark variant for this configuration, skipped")
+                    continue
+                for name in names:
+                    jobs.append(pool.submit(run_benchmark, vvp_files[config_name], suite, name,
+                                            config_name, config, variant,
+                                            os.path.dirname(vvp_files[config_name]), args.timeout))
+            for job in jobs:
+                results.append(job.result())
+    except (OSError, subprocess.TimeoutExpired) as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    commit, dirty = git_state()
+    run_id = None if args.no_record else history.start_run(commit, dirty, args.note)
+    print(f"{'benchmark':<12}{'config':<16}{'variant':<9}{'cyc/iter':>10}{'baseline':>10}{'change':>9}  verdict")
+    for r in results:
+        if r['status'] != 'pass':
+            print(f"{r['benchmark']:<12}{r['config']:<16}{r['variant']:<9}  {r['status'].upper()}: {r['message']}")
+            continue
+        previous = history.previous(r['benchmark'], r['config_fp'], r['image_fp'], run_id, args.window)
+        r['verdict'], r['baseline'] = significance(r['per_iteration'], previous, args.z, args.min_change)
+        if run_id is not None:
+            history.record(run_id, r)
+        baseline = '-' if r['baseline'] is None else f"{r['baseline']:.1f}"
+        change = '-' if r['baseline'] is None else f"{(r['per_iteration'] / r['baseline'] - 1) * 100:+.2f}%"
+        print(f"{r['benchmark']:<12}{r['config']:<16}{r['variant']:<9}{r['per_iteration']:>10.1f}"
+              f"{baseline:>10}{change:>9}  {r['verdict']}")
+    history.close()
+
+    if args.compare:
+        rows = compare_results(results, args.compare)
+        print("-" * 60)
+        print(f"{'benchmark':<12}{'config':<16}{'cyc/iter':>10}{'+' + args.compare:>16}{'speed-up':>10}")
+        for row in rows:
+            print(f"{row['benchmark']:<12}{row['config']:<16}{row['base']:>10.1f}"
+                  f"{row['variant']:>16.1f}{row['speedup']:>9.2f}x")
+
+    failed = [r for r in results if r['status'] != 'pass']
+    regressions = [r for r in results if r.get('verdict') == 'regression']
+    print("-" * 60)
+    print(f"{len(results)} benchmark runs in {time.time() - start:.1f}s at {commit[:10]}"
+          f"{' (dirty)' if dirty else ''}: {len(failed)} failed, {len(regressions)} regressions"
+          + ('' if run_id is None else f" (run {run_id})"))
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'commit': commit, 'dirty': dirty, 'run': run_id, 'results': results}, f, indent=2)
+    if failed or regressions:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -12,11 +12,16 @@ Usage:
 """
 
 import os
+import re
 import sys
 import argparse
 import json
 from typing import Dict, List, Set, Optional, Tuple
-import re
+
+from vigna_preprocessor import resolve, parse_define_args, scan_file
+
+# A define commented out in a configuration header (the option is disabled)
+_DISABLED_DEFINE_RE = re.compile(r'^[ \t]*//[ \t]*`define[ \t]+([A-Za-z_]\w*)', re.M)
 
 # Configuration options with descriptions and default values
 CONFIG_OPTIONS = {
@@ -82,6 +87,21 @@ CONFIG_OPTIONS = {
         'category': 'Performance',
         'conflicts': []
     },
+    'prefetch': {
+        'define': 'VIGNA_CORE_PREFETCH',
+        'description': 'Prefetch up to two instruction words while execute is busy',
+        'default': False,
+        'category': 'Performance',
+        'conflicts': []
+    },
+    'branch_prediction': {
+        'define': 'VIGNA_CORE_BRANCH_PREDICT',
+        'description': 'Static backward-taken/forward-not-taken prediction for the prefetch queue',
+        'default': False,
+        'category': 'Performance',
+        'conflicts': [],
+        'depends_on': 'prefetch'
+    },
     
     # RISC-V Extensions
     'm_extension': {
@@ -93,7 +113,7 @@ CONFIG_OPTIONS = {
     },
     'm_fpga_fast': {
         'define': 'VIGNA_CORE_M_FPGA_FAST',
-        'description': 'FPGA-optimized multiply/divide (TODO)',
+        'description': 'FPGA-optimized multiply/divide (DSP multiplier, radix-4 divider)',
         'default': False,
         'category': 'RISC-V Extensions',
         'conflicts': [],
@@ -118,9 +138,18 @@ CONFIG_OPTIONS = {
         'description': 'Enable interrupt support',
         'default': False,
         'category': 'RISC-V Extensions',
-        'conflicts': []
+        'conflicts': [],
+        'depends_on': 'zicsr_extension'
     },
-    
+    'perf_counters': {
+        'define': 'VIGNA_CORE_PERF_COUNTERS',
+        'description': 'Enable mcycle/minstret and mhpmcounter3-5 performance counters',
+        'default': False,
+        'category': 'RISC-V Extensions',
+        'conflicts': [],
+        'depends_on': 'zicsr_extension'
+    },
+
     # Interface Options
     'axi_lite': {
         'define': 'VIGNA_AXI_LITE_INTERFACE',
@@ -232,36 +261,49 @@ class VignaConfigGenerator:
         self.options = CONFIG_OPTIONS.copy()
         self.current_config = {}
         
-    def parse_existing_config(self, config_file: str) -> Dict[str, any]:
-        """Parse an existing configuration file to extract current settings."""
-        config = {}
+    def parse_existing_config(self, config_file: str,
+                              defines: Optional[Dict[str, str]] = None) -> Dict[str, any]:
+        """Parse an existing configuration file to extract current settings.
+
+        The file is preprocessed (`ifdef nesting, `include, `undef) on top of
+        the optional command-line `defines`. Only options the file (or its
+        includes) `define, `undef or comment out, and options given in
+        `defines`, are returned, so the result can be merged over a preset.
+        """
         if not os.path.exists(config_file):
-            return config
-            
-        with open(config_file, 'r') as f:
-            content = f.read()
-            
+            return {}
+        include_dirs = [os.path.dirname(os.path.abspath(config_file))]
+        result = resolve([config_file], defines, include_dirs)
+        config = self.config_from_defines(result['defines'])
+        mentioned = set(defines or {})
+        for path in result['files']:
+            directives = scan_file(path)
+            if any(directive == 'undefineall' for directive, _, _ in directives):
+                return config
+            mentioned.update(name for directive, name, _ in directives
+                             if directive in ('define', 'undef'))
+            with open(path, 'r', errors='surrogateescape') as f:
+                mentioned.update(_DISABLED_DEFINE_RE.findall(f.read()))
+        return {name: value for name, value in config.items()
+                if self.options[name]['define'] in mentioned}
+
+    def config_from_defines(self, defines: Dict[str, str]) -> Dict[str, any]:
+        """Map an effective define set onto configuration options."""
+        config = {}
         for option_name, option_info in self.options.items():
             define_name = option_info['define']
-            # Check if the define is enabled (not commented)
-            pattern = rf'^`define\s+{re.escape(define_name)}'
-            if re.search(pattern, content, re.MULTILINE):
-                if option_info.get('type') == 'value':
-                    # Extract the value
-                    value_pattern = rf'^`define\s+{re.escape(define_name)}\s+(.+)$'
-                    match = re.search(value_pattern, content, re.MULTILINE)
-                    if match:
-                        config[option_name] = match.group(1).strip()
-                else:
-                    config[option_name] = True
+            if option_info.get('type') == 'value':
+                if defines.get(define_name):
+                    config[option_name] = defines[define_name]
             else:
-                # Check if it's commented out
-                comment_pattern = rf'^//`define\s+{re.escape(define_name)}'
-                if re.search(comment_pattern, content, re.MULTILINE):
-                    config[option_name] = False
-                    
+                config[option_name] = define_name in defines
         return config
-    
+
+    def apply_defines(self, config: Dict[str, any], defines: Dict[str, str]) -> Dict[str, any]:
+        """The configuration as compiled with extra -D `defines`."""
+        text = self.render_config(config)
+        return self.config_from_defines(resolve([], defines, text=text)['defines'])
+
     def validate_config(self, config: Dict[str, any]) -> Tuple[bool, List[str]]:
         """Validate a configuration for conflicts and dependencies."""
         errors = []
@@ -289,56 +331,61 @@ class VignaConfigGenerator:
         
         return len(errors) == 0, errors
     
+    def render_config(self, config: Dict[str, any],
+                      config_name: str = "Custom Configuration") -> str:
+        """Text of a configuration header for the given configuration."""
+        lines = ["`ifndef VIGNA_CONF_VH", "`define VIGNA_CONF_VH", "",
+                 f"/* {config_name} */", ""]
+
+        # Group options by category
+        categories = {}
+        for option_name, option_info in self.options.items():
+            category = option_info.get('category', 'Other')
+            if category not in categories:
+                categories[category] = []
+            categories[category].append((option_name, option_info))
+
+        # Write each category
+        for category, options in categories.items():
+            lines.append(f"/* {category} */")
+            lines.append("/* " + "-" * 73 + " */")
+            lines.append("")
+
+            for option_name, option_info in options:
+                define_name = option_info['define']
+                description = option_info['description']
+                value = config.get(option_name)
+
+                # Write description as comment
+                lines.append(f"/* {description} */")
+
+                # Handle dependencies
+                depends_on = option_info.get('depends_on')
+                if depends_on and not config.get(depends_on, False):
+                    lines.append(f"/* NOTE: Requires {depends_on} to be enabled */")
+
+                # Write the define
+                if value is True:
+                    lines.append(f"`define {define_name}")
+                elif value is False or value is None:
+                    lines.append(f"//`define {define_name}")
+                else:
+                    # Value-based define
+                    lines.append(f"`define {define_name} {value}")
+
+                lines.append("")
+
+            lines.append("")
+
+        lines.append("`endif")
+        return "\n".join(lines) + "\n"
+
     def generate_config_file(self, config: Dict[str, any], output_file: str, 
                            config_name: str = "Custom Configuration") -> bool:
         """Generate a configuration file from the given configuration."""
         try:
             with open(output_file, 'w') as f:
-                f.write(f"`ifndef VIGNA_CONF_VH\n")
-                f.write(f"`define VIGNA_CONF_VH\n\n")
-                f.write(f"/* {config_name} */\n\n")
-                
-                # Group options by category
-                categories = {}
-                for option_name, option_info in self.options.items():
-                    category = option_info.get('category', 'Other')
-                    if category not in categories:
-                        categories[category] = []
-                    categories[category].append((option_name, option_info))
-                
-                # Write each category
-                for category, options in categories.items():
-                    f.write(f"/* {category} */\n")
-                    f.write("/* " + "-" * 73 + " */\n\n")
-                    
-                    for option_name, option_info in options:
-                        define_name = option_info['define']
-                        description = option_info['description']
-                        value = config.get(option_name)
-                        
-                        # Write description as comment
-                        f.write(f"/* {description} */\n")
-                        
-                        # Handle dependencies
-                        depends_on = option_info.get('depends_on')
-                        if depends_on and not config.get(depends_on, False):
-                            f.write(f"/* NOTE: Requires {depends_on} to be enabled */\n")
-                        
-                        # Write the define
-                        if value is True:
-                            f.write(f"`define {define_name}\n")
-                        elif value is False or value is None:
-                            f.write(f"//`define {define_name}\n")
-                        else:
-                            # Value-based define
-                            f.write(f"`define {define_name} {value}\n")
-                        
-                        f.write("\n")
-                    
-                    f.write("\n")
-                
-                f.write("`endif\n")
-            
+                f.write(self.render_config(config, config_name))
             return True
             
         except Exception as e:
@@ -370,6 +417,7 @@ Examples:
   {sys.argv[0]} --config rv32imc --output my_config.vh
   {sys.argv[0]} --gui
   {sys.argv[0]} --parse vigna_conf.vh --output new_config.vh
+  {sys.argv[0]} --parse vigna_conf.vh -D VIGNA_CORE_C_EXTENSION --validate
         """
     )
     
@@ -381,6 +429,8 @@ Examples:
                        help='Use predefined configuration')
     parser.add_argument('--parse',
                        help='Parse existing configuration file')
+    parser.add_argument('-D', '--define', action='append', default=[],
+                       help='Apply a command-line define NAME[=VALUE] (repeatable)')
     parser.add_argument('--output', default='vigna_conf_generated.vh',
                        help='Output configuration file (default: vigna_conf_generated.vh)')
     parser.add_argument('--validate', action='store_true',
@@ -428,9 +478,11 @@ Examples:
         print(f"Using predefined configuration: {args.config}")
     
     if args.parse:
-        parsed = generator.parse_existing_config(args.parse)
+        parsed = generator.parse_existing_config(args.parse, parse_define_args(args.define))
         config.update(parsed)
         print(f"Parsed configuration from: {args.parse}")
+    elif args.define:
+        config = generator.apply_defines(config, parse_define_args(args.define))
     
     # Apply individual option overrides
     for option_name in CONFIG_OPTIONS:
@@ -0,0 +1,282 @@
+#!/usr/bin/env python3
+"""
+VIGNA Configuration Space Explorer
+
+Enumerates the valid combinations of the boolean options in CONFIG_OPTIONS.
+The depends_on / conflicts metadata becomes a set of implications that are
+propagated as each option is assigned, so a branch that breaks a constraint
+is cut off before any configuration under it is built.
+
+Because exhaustive testing grows as 2^N, the explorer also builds covering
+arrays: a small set of valid configurations in which every valid
+combination of values of any `strength` options (2 = pairwise) appears at
+least once. Existing configurations (the predefined ones by default) are
+taken as the first rows, so only the missing combinations add rows.
+
+The regression runner sweeps a covering array with --sample:
+
+    python3 vigna_regression.py --sample 2 --compile-only -j 16
+
+Usage:
+    python3 vigna_config_space.py count
+    python3 vigna_config_space.py list --fix e_extension=0
+    python3 vigna_config_space.py sample --strength 3 --json sample.json
+    python3 vigna_config_space.py sample --strength 2 --output-dir confs/
+"""
+
+import os
+import sys
+import json
+import random
+import argparse
+import itertools
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from vigna_config_generator import CONFIG_OPTIONS, PREDEFINED_CONFIGS, VignaConfigGenerator
+
+Literal = Tuple[str, bool]
+
+# Candidate rows built per covering-array row; the one covering most is kept
+CANDIDATES = 16
+
+
+class ConfigSpace:
+    """Valid assignments of the boolean configuration options."""
+
+    def __init__(self, options: Optional[Dict[str, Dict]] = None,
+                 fixed: Optional[Dict[str, bool]] = None):
+        self.options = options or CONFIG_OPTIONS
+        self.names = [name for name, info in self.options.items() if info.get('type') != 'value']
+        self.implications: Dict[Literal, List[Literal]] = {
+            (name, value): [] for name in self.names for value in (False, True)}
+        for name in self.names:
+            info = self.options[name]
+            depends_on = info.get('depends_on')
+            if depends_on in self.names:
+                self._imply((name, True), (depends_on, True))
+            for other in info.get('conflicts', []):
+                if other in self.names:
+                    self._imply((name, True), (other, False))
+
+        self.root: Dict[str, bool] = {}
+        for name, value in (fixed or {}).items():
+            if name not in self.names:
+                raise ValueError(f"unknown boolean option '{name}'")
+            root = self.assign(self.root, name, value)
+            if root is None:
+                raise ValueError(f"fixing {name}={int(value)} contradicts the other fixed options")
+            self.root = root
+        self.free = [name for name in self.names if name not in self.root]
+
+    def _imply(self, a: Literal, b: Literal):
+        """Record a -> b together with its contrapositive."""
+        self.implications[a].append(b)
+        self.implications[(b[0], not b[1])].append((a[0], not a[1]))
+
+    def assign(self, assignment: Dict[str, bool], name: str, value: bool) -> Optional[Dict[str, bool]]:
+        """A copy of `assignment` with name=value and everything it implies, or None."""
+        result = dict(assignment)
+        pending = [(name, value)]
+        while pending:
+            n, v = pending.pop()
+            current = result.get(n)
+            if current is None:
+                result[n] = v
+                pending.extend(self.implications[(n, v)])
+            elif current != v:
+                return None
+        return result
+
+    def assign_all(self, literals, assignment: Optional[Dict[str, bool]] = None) -> Optional[Dict[str, bool]]:
+        """Assign several (name, value) literals on top of `assignment` (default: the fixed options)."""
+        result = self.root if assignment is None else assignment
+        for name, value in literals:
+            result = self.assign(result, name, value)
+            if result is None:
+                return None
+        return result
+
+    def _search(self, assignment: Dict[str, bool], order: List[str]) -> Iterator[Dict[str, bool]]:
+        name = next((n for n in order if n not in assignment), None)
+        if name is None:
+            yield assignment
+            return
+        for value in (False, True):
+            child = self.assign(assignment, name, value)
+            if child is not None:
+                yield from self._search(child, order)
+
+    def enumerate(self) -> Iterator[Dict[str, bool]]:
+        """Every valid complete assignment, in option order."""
+        return self._search(self.root, self.names)
+
+    def count(self) -> int:
+        return sum(1 for _ in self.enumerate())
+
+    def config(self, assignment: Dict[str, bool]) -> Dict[str, any]:
+        """Configuration dictionary for an assignment, with value options at their defaults."""
+        config = {name: assignment.get(name, False) for name in self.names}
+        for name, info in self.options.items():
+            if info.get('type') == 'value':
+                depends_on = info.get('depends_on')
+                if depends_on is None or config.get(depends_on):
+                    config[name] = info['default']
+        return config
+
+
+def _row_tuples(row: Dict[str, bool], names: List[str], strength: int) -> Iterator[Tuple[Literal, ...]]:
+    for combo in itertools.combinations(names, strength):
+        yield tuple((name, row[name]) for name in combo)
+
+
+def covering_array(space: ConfigSpace, strength: int = 2, seed: int = 0,
+                   initial: Optional[List[Dict[str, bool]]] = None) -> List[Dict[str, bool]]:
+    """Valid rows covering every feasible `strength`-way combination of the free options.
+
+    Rows in `initial` are kept (first) and count towards coverage; the
+    returned list holds only the rows that had to be added. Each new row is
+    the best of CANDIDATES greedy constructions (AETG style): start from a
+    random uncovered combination, then give each remaining option the value
+    that completes the most uncovered combinations.
+    """
+    names = space.free
+    strength = max(1, min(strength, len(names)))
+    rng = random.Random(seed)
+
+    uncovered = set()
+    for combo in itertools.combinations(names, strength):
+        for values in itertools.product((False, True), repeat=strength):
+            literals = tuple(zip(combo, values))
+            if space.assign_all(literals) is not None:
+                uncovered.add(literals)
+    by_literal: Dict[Literal, set] = {}
+    for literals in uncovered:
+        for literal in literals:
+            by_literal.setdefault(literal, set()).add(literals)
+
+    def cover(row):
+        for literals in _row_tuples(row, names, strength):
+            if literals in uncovered:
+                uncovered.discard(literals)
+                for literal in literals:
+                    by_literal[literal].discard(literals)
+
+    for row in initial or []:
+        assignment = space.assign_all((n, bool(row.get(n, False))) for n in names)
+        if assignment is not None:
+            cover(assignment)
+
+    rows = []
+    while uncovered:
+        pool = sorted(uncovered)
+        best, best_score = None, -1
+        for _ in range(CANDIDATES):
+            assignment = space.assign_all(rng.choice(pool))
+            order = [n for n in names if n not in assignment]
+            rng.shuffle(order)
+            for name in order:
+                if name in assignment:
+                    continue
+                choices = []
+                for value in (False, True):
+                    child = space.assign(assignment, name, value)
+                    if child is not None:
+                        gain = sum(1 for literals in by_literal.get((name, value), ())
+                                   if all(child.get(n) == v for n, v in literals))
+                        choices.append((gain, rng.random(), child))
+                assignment = max(choices, key=lambda c: (c[0], c[1]))[2]
+            score = sum(1 for literals in _row_tuples(assignment, names, strength)
+                        if literals in uncovered)
+            if score > best_score:
+                best, best_score = assignment, score
+        rows.append(best)
+        cover(best)
+    return rows
+
+
+def parse_fixed(specs: List[str]) -> Dict[str, bool]:
+    """NAME=0/1 (or true/false) pairs from the command line."""
+    fixed = {}
+    for spec in specs:
+        name, _, value = spec.partition('=')
+        if value.lower() not in ('0', '1', 'true', 'false'):
+            raise ValueError(f"expected NAME=0 or NAME=1, got '{spec}'")
+        fixed[name] = value.lower() in ('1', 'true')
+    return fixed
+
+
+def sample_configs(strength: int, seed: int = 0, fixed: Optional[Dict[str, bool]] = None,
+                   base: Optional[List[str]] = None) -> Dict[str, Dict[str, any]]:
+    """Named configurations: the `base` predefined ones plus covering-array rows.
+
+    Predefined configurations that break a constraint or a fixed option are
+    left out.
+    """
+    space = ConfigSpace(fixed=fixed)
+    base = list(PREDEFINED_CONFIGS) if base is None else base
+    configs = {}
+    for name in base:
+        options = PREDEFINED_CONFIGS[name]['options']
+        if space.assign_all((n, bool(options.get(n, False))) for n in space.names) is not None:
+            configs[name] = options
+    for i, row in enumerate(covering_array(space, strength, seed, list(configs.values())), 1):
+        configs[f"t{strength}_{i:02d}"] = space.config(row)
+    return configs
+
+
+def _flags(config: Dict[str, any], names: List[str]) -> str:
+    return ' '.join('1' if config.get(name) else '.' for name in names)
+
+
+def main():
+    """Command-line interface for the configuration space explorer."""
+    parser = argparse.ArgumentParser(description="VIGNA configuration space enumerator and sampler")
+    parser.add_argument('command', choices=['count', 'list', 'sample'],
+                        help='count valid configurations, list them, or build a covering array')
+    parser.add_argument('--fix', action='append', default=[],
+                        help='Hold an option at a value, NAME=0 or NAME=1 (repeatable)')
+    parser.add_argument('--strength', type=int, default=2,
+                        help='Combination size to cover for sample (default: 2, pairwise)')
+    parser.add_argument('--seed', type=int, default=0, help='Random seed for sample (default: 0)')
+    parser.add_argument('--no-predefined', action='store_true',
+                        help='Do not start the sample from the predefined configurations')
+    parser.add_argument('--json', help='Write the configurations as JSON to this file')
+    parser.add_argument('--output-dir', help='Write a vigna_conf_<name>.vh per configuration here')
+    args = parser.parse_args()
+
+    try:
+        fixed = parse_fixed(args.fix)
+        space = ConfigSpace(fixed=fixed)
+        if args.command == 'count':
+            print(f"{space.count()} valid configurations of {len(space.names)} options "
+                  f"({len(space.free)} free)")
+            return
+        if args.command == 'list':
+            configs = {f"c{i:04d}": space.config(a) for i, a in enumerate(space.enumerate())}
+        else:
+            configs = sample_configs(args.strength, args.seed, fixed,
+                                     [] if args.no_predefined else None)
+    except ValueError as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+
+    for i, name in enumerate(space.names):
+        print(f"  {i:>2}  {name}")
+    print(f"{'':<16}{' '.join(str(i % 10) for i in range(len(space.names)))}")
+    for name, config in configs.items():
+        print(f"{name:<16}{_flags(config, space.names)}")
+    print(f"{len(configs)} configurations")
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(configs, f, indent=2)
+    if args.output_dir:
+        os.makedirs(args.output_dir, exist_ok=True)
+        generator = VignaConfigGenerator()
+        for name, config in configs.items():
+            generator.generate_config_file(config, os.path.join(args.output_dir, f"vigna_conf_{name}.vh"),
+                                           name)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,343 @@
+#!/usr/bin/env python3
+"""
+VIGNA Design-Space Explorer
+
+Measures every configuration of a set (a covering-array sample, the whole
+configuration space, or named predefined configurations) on two axes:
+
+    cycles  total cycle count of a benchmark workload, from the timing model
+            (--cycles model, default) or from RTL simulation of the program
+            harness (--cycles rtl, requires Icarus Verilog)
+    area    LUTs (or FFs / cells, --area) from a Yosys run (vigna_synth.py)
+
+and reports the Pareto frontier: the configurations no other configuration
+beats on both axes at once. The workload is a list of program harness
+expectation files (programs/expected/*.json), which name the image, memory
+size and cycle budget of each program.
+
+Points are evaluated on a process pool. Cycle results are cached by the
+generated configuration header, the workload images and the model sources
+(or, for RTL, every Verilog file the configuration actually reaches); area
+results use the vigna_synth.py cache. After an RTL change only the points
+whose sources changed are measured again.
+
+Usage:
+    python3 vigna_explore.py programs/expected/*.json
+    python3 vigna_explore.py --sample 3 --area cells --csv points.csv --plot pareto.svg programs/expected/*.json
+    python3 vigna_explore.py --all --fix e_extension=0 --json space.json programs/expected/*.json
+"""
+
+import os
+import sys
+import csv
+import json
+import time
+import shutil
+import hashlib
+import argparse
+import tempfile
+import subprocess
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Dict, List, Optional, Tuple
+
+from vigna_config_generator import VignaConfigGenerator, PREDEFINED_CONFIGS
+from vigna_config_space import ConfigSpace, sample_configs, parse_fixed
+from vigna_iss import VignaISS, VignaISSError
+from vigna_timing import VignaTimingModel, predict_testbench_cycles
+from vigna_harness import load_expectation, compile_harness, run_program, HARNESS_SOURCE
+from vigna_vvp_cache import VvpCache, iverilog_version, DEFAULT_CACHE_DIR as VVP_CACHE_DIR
+from vigna_preprocessor import resolve
+from vigna_synth import SynthCache, synthesize, DEFAULT_CACHE_DIR as SYNTH_CACHE_DIR
+
+TOOLS_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_ROOT = os.path.normpath(os.path.join(TOOLS_DIR, '..'))
+
+DEFAULT_CACHE_DIR = os.environ.get(
+    'VIGNA_EXPLORE_CACHE', os.path.join(os.path.expanduser('~'), '.cache', 'vigna', 'explore'))
+
+# Sources whose content decides the timing model's answer
+MODEL_SOURCES = ('vigna_iss.py', 'vigna_timing.py', 'vigna_config_generator.py')
+
+AREA_METRICS = ('lut', 'ff', 'cells')
+CSV_FIELDS = ['config', 'status', 'pareto', 'cycles', 'instret', 'cpi', 'lut', 'ff', 'carry',
+              'ram', 'cells', 'depth', 'message']
+
+
+def _digest_files(digest, paths: List[str]):
+    for path in paths:
+        with open(path, 'rb') as f:
+            digest.update(hashlib.sha256(f.read()).digest())
+
+
+def cycles_key(conf_text: str, workload: List[Dict[str, any]], mode: str, version: str = '') -> str:
+    """Cache key of a workload's cycle count under one configuration.
+
+    The model key covers the model sources; the RTL key covers the Verilog
+    files the configuration reaches and the iverilog version.
+    """
+    digest = hashlib.sha256()
+    for part in (mode, version, conf_text):
+        digest.update(part.encode() + b'\0')
+    for exp in workload:
+        digest.update(f"{exp['mem_size']}:{exp['max_cycles']}".encode())
+    _digest_files(digest, [exp['image'] for exp in workload])
+    if mode == 'model':
+        _digest_files(digest, [os.path.join(TOOLS_DIR, name) for name in MODEL_SOURCES])
+    else:
+        files = resolve(['vigna_core.v', HARNESS_SOURCE], include_dirs=[REPO_ROOT],
+                        cwd=REPO_ROOT, text=conf_text)['files']
+        _digest_files(digest, files)
+    return digest.hexdigest()
+
+
+def model_cycles(config: Dict[str, any], workload: List[Dict[str, any]]) -> Tuple[int, int]:
+    """(cycles, retired instructions) of the workload from the timing model."""
+    cycles = instret = 0
+    model = VignaTimingModel(config)
+    for exp in workload:
+        iss = VignaISS(config, mem_size=exp['mem_size'])
+        iss.load_mem(exp['image'])
+        reason = iss.run(exp['max_cycles'], timing=model)
+        predicted = predict_testbench_cycles(iss)
+        if predicted is None:
+            raise VignaISSError(f"{exp['name']}: stopped with '{reason}' instead of halting")
+        cycles += predicted
+        instret += iss.instret
+    return cycles, instret
+
+
+def rtl_cycles(name: str, config: Dict[str, any], workload: List[Dict[str, any]],
+               timeout: float, vvp_cache_dir: Optional[str]) -> Tuple[int, int]:
+    """(cycles, retired instructions) of the workload from harness simulation."""
+    workdir = tempfile.mkdtemp(prefix=f"vigna_explore_{name}_")
+    try:
+        cache = VvpCache(vvp_cache_dir) if vvp_cache_dir else None
+        vvp_file = compile_harness(workdir, name, cache, timeout, config)
+        cycles = 0
+        for exp in workload:
+            result = run_program(vvp_file, exp, workdir, timeout)
+            if result['status'] != 'pass':
+                raise VignaISSError(f"{exp['name']}: {result['status']} {result['message']}".rstrip())
+            cycles += result['cycles']
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+    # The instruction count does not depend on timing; take it from the ISS
+    return cycles, model_cycles(config, workload)[1]
+
+
+def evaluate(name: str, config: Dict[str, any], workload: List[Dict[str, any]],
+             options: Dict[str, any]) -> Dict[str, any]:
+    """Cycles and area of one configuration (runs in a worker process)."""
+    point = {'config': name, 'options': config, 'status': 'ok', 'message': '',
+             'cycles': None, 'instret': None, 'cpi': None, 'cached': []}
+    conf_text = VignaConfigGenerator().render_config(config, name)
+    mode = options['cycles']
+    cache = SynthCache(options['cache_dir']) if options['cache_dir'] else None
+    key = cycles_key(conf_text, workload, mode, iverilog_version() if mode == 'rtl' else '')
+    hit = cache.get(key) if cache else None
+    try:
+        if hit is not None:
+            point['cycles'], point['instret'] = hit['cycles'], hit['instret']
+            point['cached'].append('cycles')
+        else:
+            if mode == 'rtl':
+                point['cycles'], point['instret'] = rtl_cycles(name, config, workload, options['timeout'],
+                                                               options['vvp_cache_dir'])
+            else:
+                point['cycles'], point['instret'] = model_cycles(config, workload)
+            if cache:
+                cache.put(key, {'cycles': point['cycles'], 'instret': point['instret']})
+    except (OSError, ValueError, VignaISSError, subprocess.TimeoutExpired) as e:
+        point['status'] = 'error'
+        point['message'] = str(e)
+        return point
+    point['cpi'] = round(point['cycles'] / point['instret'], 4) if point['instret'] else None
+
+    synth_cache = SynthCache(options['synth_cache_dir']) if options['synth_cache_dir'] else None
+    area = synthesize(name, config, options['top'], options['target'], cache=synth_cache,
+                      yosys=options['yosys'], timeout=options['timeout'])
+    if area['status'] != 'ok':
+        point['status'] = 'error'
+        point['message'] = f"synthesis: {area['message']}"
+        return point
+    for field in ('lut', 'ff', 'carry', 'ram', 'cells', 'depth'):
+        point[field] = area.get(field)
+    if area['cached']:
+        point['cached'].append('area')
+    return point
+
+
+def pareto_front(points: List[Dict[str, any]], objectives: List[str]) -> List[Dict[str, any]]:
+    """Points not dominated on `objectives` (all minimized), ordered by the first one."""
+    candidates = sorted((p for p in points if all(p.get(o) is not None for o in objectives)),
+                        key=lambda p: tuple(p[o] for o in objectives))
+    front = []
+    for p in candidates:
+        values = [p[o] for o in objectives]
+        dominated = any(all(q[o] <= v for o, v in zip(objectives, values)) and
+                        any(q[o] < v for o, v in zip(objectives, values)) for q in front)
+        duplicate = any(all(q[o] == v for o, v in zip(objectives, values)) for q in front)
+        if not dominated and not duplicate:
+            front = [q for q in front
+                     if not (all(v <= q[o] for o, v in zip(objectives, values)) and
+                             any(v < q[o] for o, v in zip(objectives, values)))]
+            front.append(p)
+    return front
+
+
+def write_csv(path: str, points: List[Dict[str, any]]):
+    with open(path, 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=CSV_FIELDS, extrasaction='ignore')
+        writer.writeheader()
+        for point in points:
+            writer.writerow({**point, 'pareto': int(point.get('pareto', False))})
+
+
+def render_svg(points: List[Dict[str, any]], area: str, width: int = 640, height: int = 440) -> str:
+    """Scatter plot of cycles against area with the frontier joined up, as SVG."""
+    measured = [p for p in points if p['status'] == 'ok']
+    if not measured:
+        return f'<svg xmlns="http://www.w3.org/2000/svg" width="{width}" height="{height}"/>\n'
+    left, right, top, bottom = 70, 20, 20, 50
+    xs = [p[area] for p in measured]
+    ys = [p['cycles'] for p in measured]
+    x0, x1 = min(xs), max(xs) or 1
+    y0, y1 = min(ys), max(ys) or 1
+    x1, y1 = (x1 if x1 > x0 else x0 + 1), (y1 if y1 > y0 else y0 + 1)
+
+    def sx(x):
+        return left + (x - x0) / (x1 - x0) * (width - left - right)
+
+    def sy(y):
+        return height - bottom - (y - y0) / (y1 - y0) * (height - top - bottom)
+
+    lines = [f'<svg xmlns="http://www.w3.org/2000/svg" width="{width}" height="{height}" '
+             f'font-family="sans-serif" font-size="11">',
+             f'<rect width="{width}" height="{height}" fill="white"/>',
+             f'<line x1="{left}" y1="{height - bottom}" x2="{width - right}" y2="{height - bottom}" stroke="black"/>',
+             f'<line x1="{left}" y1="{top}" x2="{left}" y2="{height - bottom}" stroke="black"/>',
+             f'<text x="{(width + left) / 2:.0f}" y="{height - 12}" text-anchor="middle">{area}</text>',
+             f'<text x="14" y="{(height - bottom + top) / 2:.0f}" text-anchor="middle" '
+             f'transform="rotate(-90 14 {(height - bottom + top) / 2:.0f})">cycles</text>']
+    for value, anchor in ((x0, 'start'), (x1, 'end')):
+        lines.append(f'<text x="{sx(value):.1f}" y="{height - bottom + 16}" text-anchor="{anchor}">{value}</text>')
+    for value in (y0, y1):
+        lines.append(f'<text x="{left - 6}" y="{sy(value) + 4:.1f}" text-anchor="end">{value}</text>')
+    front = sorted((p for p in measured if p.get('pareto')), key=lambda p: p[area])
+    if len(front) > 1:
+        path = ' '.join(f"{sx(p[area]):.1f},{sy(p['cycles']):.1f}" for p in front)
+        lines.append(f'<polyline points="{path}" fill="none" stroke="#d62728"/>')
+    for p in measured:
+        color = '#d62728' if p.get('pareto') else '#7f7f7f'
+        lines.append(f'<circle cx="{sx(p[area]):.1f}" cy="{sy(p["cycles"]):.1f}" r="3.5" fill="{color}">'
+                     f'<title>{p["config"]}: {p[area]} {area}, {p["cycles"]} cycles</title></circle>')
+        if p.get('pareto'):
+            lines.append(f'<text x="{sx(p[area]) + 6:.1f}" y="{sy(p["cycles"]) - 6:.1f}">{p["config"]}</text>')
+    lines.append('</svg>')
+    return '\n'.join(lines) + '\n'
+
+
+def main():
+    """Command-line interface for the design-space explorer."""
+    parser = argparse.ArgumentParser(description="VIGNA cycles-versus-area design-space explorer")
+    parser.add_argument('workload', nargs='+', help='Program harness expectation files (.json)')
+    parser.add_argument('--config', action='append',
+                        help='Predefined configuration (repeatable; default: --sample 2)')
+    parser.add_argument('--sample', type=int, metavar='STRENGTH',
+                        help='Covering-array sample of the configuration space (default: 2)')
+    parser.add_argument('--all', action='store_true', help='Every valid configuration')
+    parser.add_argument('--seed', type=int, default=0, help='Random seed for --sample (default: 0)')
+    parser.add_argument('--fix', action='append', default=[],
+                        help='Hold an option at NAME=0 or NAME=1 (repeatable)')
+    parser.add_argument('--cycles', choices=['model', 'rtl'], default='model',
+                        help='Cycle source: timing model or harness simulation (default: model)')
+    parser.add_argument('--area', choices=AREA_METRICS, default='lut', help='Area metric (default: lut)')
+    parser.add_argument('--top', default='vigna', choices=['vigna', 'vigna_axi'],
+                        help='Top module to synthesize (default: vigna)')
+    parser.add_argument('--target', default='xc7', help='vigna_synth.py target (default: xc7)')
+    parser.add_argument('--yosys', default='yosys', help='Yosys executable')
+    parser.add_argument('-j', '--jobs', type=int, default=os.cpu_count() or 1,
+                        help='Number of worker processes (default: number of CPUs)')
+    parser.add_argument('--timeout', type=float, default=1800.0,
+                        help='Per-tool-run timeout in seconds (default: 1800)')
+    parser.add_argument('--no-cache', action='store_true', help='Measure every point again')
+    parser.add_argument('--json', help='Write every point, frontier flagged, as JSON')
+    parser.add_argument('--csv', help='Write every point as CSV')
+    parser.add_argument('--plot', help='Write a cycles-versus-area scatter plot (.svg)')
+    args = parser.parse_args()
+
+    try:
+        workload = [load_expectation(path) for path in args.workload]
+        fixed = parse_fixed(args.fix)
+        if args.all:
+            space = ConfigSpace(fixed=fixed)
+            configs = {f"c{i:04d}": space.config(a) for i, a in enumerate(space.enumerate())}
+        elif args.config and not args.sample:
+            for name in args.config:
+                if name not in PREDEFINED_CONFIGS:
+                    raise ValueError(f"unknown configuration '{name}'")
+            configs = {name: PREDEFINED_CONFIGS[name]['options'] for name in args.config}
+        else:
+            configs = sample_configs(args.sample or 2, args.seed, fixed, args.config)
+    except (OSError, ValueError) as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+
+    tools = [args.yosys] + (['iverilog', 'vvp'] if args.cycles == 'rtl' else [])
+    for tool in tools:
+        if shutil.which(tool) is None:
+            print(f"Error: '{tool}' not found in PATH")
+            sys.exit(1)
+
+    options = {
+        'cycles': args.cycles, 'top': args.top, 'target': args.target, 'yosys': args.yosys,
+        'timeout': args.timeout,
+        'cache_dir': None if args.no_cache else DEFAULT_CACHE_DIR,
+        'synth_cache_dir': None if args.no_cache else SYNTH_CACHE_DIR,
+        'vvp_cache_dir': None if args.no_cache else VVP_CACHE_DIR,
+    }
+    start = time.time()
+    points = []
+    with ProcessPoolExecutor(max_workers=args.jobs) as pool:
+        futures = [pool.submit(evaluate, name, config, workload, options)
+                   for name, config in configs.items()]
+        for future in as_completed(futures):
+            point = future.result()
+            points.append(point)
+            if point['status'] == 'ok':
+                detail = f"{point['cycles']} cycles, {point[args.area]} {args.area}"
+                if point['cached']:
+                    detail += f", cached {'+'.join(point['cached'])}"
+            else:
+                detail = point['message']
+            print(f"[{point['config']}] {point['status'].upper()} ({detail})", flush=True)
+    order = list(configs)
+    points.sort(key=lambda p: order.index(p['config']))
+
+    front = pareto_front(points, ['cycles', args.area])
+    for point in points:
+        point['pareto'] = any(point is p for p in front)
+    print("-" * 60)
+    print(f"Pareto frontier ({len(front)} of {len(points)} configurations, {args.cycles} cycles, "
+          f"{args.area}):")
+    print(f"{'config':<16}{'cycles':>10}{'CPI':>8}{args.area:>8}")
+    for p in front:
+        print(f"{p['config']:<16}{p['cycles']:>10}{p['cpi'] or 0:>8.3f}{p[args.area]:>8}")
+    print(f"Explored in {time.time() - start:.1f}s")
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'cycles': args.cycles, 'area': args.area,
+                       'workload': [exp['path'] for exp in workload],
+                       'frontier': [p['config'] for p in front], 'points': points}, f, indent=2)
+    if args.csv:
+        write_csv(args.csv, points)
+    if args.plot:
+        with open(args.plot, 'w') as f:
+            f.write(render_svg(points, args.area))
+    if not front:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
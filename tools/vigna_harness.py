@@ -0,0 +1,360 @@
+#!/usr/bin/env python3
+"""
+VIGNA Program Harness Driver
+
+Compiles sim/program_harness.v once per configuration and runs any number of
+program images through the resulting .vvp, choosing the image, memory size,
+cycle budget and signature region with plusargs. The signature region dumped
+by the harness is checked against a per-program expectation file:
+
+    {
+      "image": "../build/simple_test.mem",     (relative to the .json file)
+      "max_cycles": 1000,                      (optional, default 100000)
+      "mem_size": 65536,                       (optional, power of two)
+      "signature": {"begin": "0x1000", "end": "0x1010"},
+      "expect": [30, 15, 20, "0xDEADBEEF"],    (null skips a word)
+      "mark": "0x8010"                         (optional, timestamp stores here)
+    }
+
+Usage:
+    python3 vigna_harness.py programs/expected/*.json
+    python3 vigna_harness.py --config rv32im -j 16 firmware/*.json
+    python3 vigna_harness.py --record programs/expected/new_test.json
+    python3 vigna_harness.py --lockstep programs/expected/*.json
+"""
+
+import os
+import re
+import sys
+import json
+import time
+import shutil
+import argparse
+import tempfile
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+from vigna_config_generator import VignaConfigGenerator, PREDEFINED_CONFIGS
+from vigna_iss import VignaISS, VignaISSError, build_config, read_mem_image
+from vigna_vvp_cache import VvpCache, DEFAULT_CACHE_DIR
+from vigna_lockstep import check_trace, format_divergence
+
+REPO_ROOT = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+HARNESS_SOURCE = os.path.join(REPO_ROOT, 'sim', 'program_harness.v')
+CORE_SOURCES = [os.path.join(REPO_ROOT, 'vigna_core.v')]
+
+DEFAULT_MEM_SIZE = 64 * 1024
+DEFAULT_MAX_CYCLES = 100000
+
+HALT_RE = re.compile(r'Program halted at PC=0x([0-9a-fA-F]+) after\s+(\d+) cycles')
+TIMEOUT_RE = re.compile(r'Program timeout after\s+(\d+) cycles')
+MARK_RE = re.compile(r'Mark 0x([0-9a-fA-F]+) at cycle (\d+)')
+IRQ_RE = re.compile(r'IRQ (ext|timer|soft) raised at cycle (\d+) during 0x([0-9a-fA-F]+) '
+                    r'taken at cycle (\d+) mepc 0x([0-9a-fA-F]+)')
+
+
+def _int(value) -> int:
+    if isinstance(value, int):
+        return value
+    return int(str(value), 0)
+
+
+def load_expectation(path: str) -> Dict[str, any]:
+    """Read an expectation file and normalise its fields."""
+    with open(path, 'r') as f:
+        data = json.load(f)
+    if 'image' not in data or 'signature' not in data:
+        raise ValueError(f"{path}: 'image' and 'signature' are required")
+    base = os.path.dirname(os.path.abspath(path))
+    exp = {
+        'name': os.path.splitext(os.path.basename(path))[0],
+        'path': path,
+        'image': os.path.normpath(os.path.join(base, data['image'])),
+        'mem_size': _int(data.get('mem_size', DEFAULT_MEM_SIZE)),
+        'max_cycles': _int(data.get('max_cycles', DEFAULT_MAX_CYCLES)),
+        'begin': _int(data['signature']['begin']),
+        'end': _int(data['signature']['end']),
+        'expect': [None if v is None else _int(v) for v in data.get('expect', [])],
+        'mark': _int(data['mark']) if 'mark' in data else None,
+    }
+    if exp['begin'] % 4 or exp['end'] % 4 or exp['end'] <= exp['begin']:
+        raise ValueError(f"{path}: signature region must be word aligned and non-empty")
+    if len(exp['expect']) > (exp['end'] - exp['begin']) // 4:
+        raise ValueError(f"{path}: more expected words than the signature region holds")
+    return exp
+
+
+def harness_plusargs(exp: Dict[str, any], signature_file: str) -> List[str]:
+    """Plusargs selecting an expectation's image, budget and signature region."""
+    return [
+        f"+image={exp['image']}",
+        f"+mem_size={exp['mem_size']}",
+        f"+max_cycles={exp['max_cycles']}",
+        f"+sig_begin={exp['begin']:x}",
+        f"+sig_end={exp['end']:x}",
+        f"+signature={signature_file}",
+    ] + ([f"+mark={exp['mark']:x}"] if exp.get('mark') is not None else [])
+
+
+def parse_run_output(text: str) -> Tuple[bool, Optional[int], Optional[int]]:
+    """Return (halted, halt PC, cycle count) from harness output."""
+    match = HALT_RE.search(text)
+    if match:
+        return True, int(match.group(1), 16), int(match.group(2))
+    match = TIMEOUT_RE.search(text)
+    return False, None, int(match.group(1)) if match else None
+
+
+def parse_marks(text: str) -> List[Tuple[int, int]]:
+    """(stored value, cycle) for every store to the +mark address, in order."""
+    return [(int(value, 16), int(cycle)) for value, cycle in MARK_RE.findall(text)]
+
+
+def parse_irqs(text: str) -> List[Dict[str, any]]:
+    """Interrupts raised with the +irq_ plusargs and taken, in the order taken."""
+    return [{'line': line, 'raised': int(raised), 'during': int(during, 16), 'taken': int(taken),
+             'mepc': int(mepc, 16)} for line, raised, during, taken, mepc in IRQ_RE.findall(text)]
+
+
+def read_signature(path: str) -> List[int]:
+    """Words of a signature dump (one hex word per line, or $writememh), in address order."""
+    entries = read_mem_image(path)
+    if not entries:
+        return []
+    first = entries[0][0]
+    words: Dict[int, int] = {index - first: value for index, value in entries}
+    return [words.get(i, 0) for i in range(max(words) + 1)]
+
+
+def check_signature(exp: Dict[str, any], words: List[int]) -> List[Tuple[int, int, Optional[int]]]:
+    """(address, expected, actual) for every mismatching word."""
+    mismatches = []
+    for i, expected in enumerate(exp['expect']):
+        if expected is None:
+            continue
+        actual = words[i] if i < len(words) else None
+        if actual != expected:
+            mismatches.append((exp['begin'] + 4 * i, expected, actual))
+    return mismatches
+
+
+def record_expectation(path: str, config: Dict[str, any], max_instructions: int = 10_000_000):
+    """Fill an expectation file's 'expect' list from an instruction-set simulator run."""
+    exp = load_expectation(path)
+    iss = VignaISS(config, mem_size=exp['mem_size'])
+    iss.load_mem(exp['image'])
+    reason = iss.run(max_instructions)
+    if reason != 'halt':
+        raise VignaISSError(f"{exp['image']}: ISS stopped with '{reason}' instead of halting")
+    words = [iss.read_word(addr) for addr in range(exp['begin'], exp['end'], 4)]
+    with open(path, 'r') as f:
+        data = json.load(f)
+    data['expect'] = [f"0x{w:08X}" if w > 0xFFFF else w for w in words]
+    with open(path, 'w') as f:
+        json.dump(data, f, indent=2)
+        f.write('\n')
+
+
+def compile_harness(workdir: str, config_name: Optional[str], cache: Optional[VvpCache],
+                    timeout: float = 300.0, config: Optional[Dict[str, any]] = None) -> str:
+    """Compile the harness for one configuration; returns the .vvp path.
+
+    `config`, if given, is used instead of the predefined `config_name`
+    (which then only titles the generated header).
+    """
+    conf_path = os.path.join(workdir, 'vigna_conf.vh')
+    if config is not None:
+        if not VignaConfigGenerator().generate_config_file(config, conf_path, config_name or 'custom'):
+            raise OSError(f"could not write {conf_path}")
+    elif config_name:
+        generator = VignaConfigGenerator()
+        if not generator.generate_config_file(PREDEFINED_CONFIGS[config_name]['options'], conf_path,
+                                              PREDEFINED_CONFIGS[config_name]['name']):
+            raise OSError(f"could not write {conf_path}")
+    else:
+        shutil.copy(os.path.join(REPO_ROOT, 'vigna_conf.vh'), conf_path)
+
+    output = os.path.join(workdir, 'program_harness.vvp')
+    args = ['-o', output, '-I', REPO_ROOT] + CORE_SOURCES + [HARNESS_SOURCE]
+    if cache is not None:
+        result, _ = cache.compile(args, workdir, timeout=timeout)
+    else:
+        result = subprocess.run(['iverilog'] + args, cwd=workdir, capture_output=True,
+                                text=True, timeout=timeout)
+    if result.returncode != 0:
+        raise OSError(f"iverilog failed:\n{result.stdout}{result.stderr}")
+    return output
+
+
+def run_program(vvp_file: str, exp: Dict[str, any], workdir: str, timeout: float = 300.0,
+                lockstep: Optional[Dict[str, any]] = None,
+                plusargs: Optional[List[str]] = None) -> Dict[str, any]:
+    """Run one expectation through the compiled harness and check it.
+
+    With a lockstep configuration the run also writes a retire trace, which
+    is replayed on the instruction-set simulator before the signature check.
+    Extra `plusargs` go to the harness as given (memory model settings such
+    as +imem_latency=3, see sim/vigna_mem_model.v).
+    """
+    rundir = tempfile.mkdtemp(prefix=exp['name'] + '_', dir=workdir)
+    try:
+        return _run_in(vvp_file, exp, rundir, timeout, lockstep, plusargs)
+    finally:
+        shutil.rmtree(rundir, ignore_errors=True)
+
+
+def _run_in(vvp_file: str, exp: Dict[str, any], rundir: str, timeout: float,
+            lockstep: Optional[Dict[str, any]] = None,
+            extra: Optional[List[str]] = None) -> Dict[str, any]:
+    signature = os.path.join(rundir, 'signature.mem')
+    trace = os.path.join(rundir, 'retire.trace')
+    plusargs = harness_plusargs(exp, signature) + (extra or [])
+    if lockstep is not None:
+        plusargs.append(f"+trace={trace}")
+    result = {'name': exp['name'], 'status': 'error', 'message': '', 'cycles': None}
+    start = time.time()
+    try:
+        proc = subprocess.run(['vvp', '-n', vvp_file, '-none'] + plusargs,
+                              cwd=rundir, capture_output=True, text=True, timeout=timeout)
+    except subprocess.TimeoutExpired:
+        result['message'] = f"vvp timed out after {timeout:.0f}s"
+        return result
+    result['time'] = round(time.time() - start, 3)
+
+    halted, _, result['cycles'] = parse_run_output(proc.stdout)
+    if exp.get('mark') is not None:
+        result['marks'] = parse_marks(proc.stdout)
+    if any(arg.startswith('+irq_') for arg in extra or []):
+        result['irqs'] = parse_irqs(proc.stdout)
+    if proc.returncode != 0 or 'ERROR' in proc.stdout:
+        lines = (proc.stdout + proc.stderr).strip().splitlines()
+        result['message'] = lines[-1] if lines else 'vvp failed'
+    elif lockstep is not None and _lockstep_failed(result, exp, trace, lockstep):
+        pass
+    elif not halted:
+        result['status'] = 'fail'
+        result['message'] = f"timeout after {exp['max_cycles']} cycles"
+    elif not os.path.exists(signature):
+        result['message'] = 'no signature written'
+    else:
+        mismatches = check_signature(exp, read_signature(signature))
+        if mismatches:
+            result['status'] = 'fail'
+            result['message'] = '; '.join(
+                f"0x{addr:08x} = {'missing' if actual is None else f'0x{actual:08x}'} "
+                f"(expected 0x{expected:08x})" for addr, expected, actual in mismatches[:4])
+        else:
+            result['status'] = 'pass'
+    return result
+
+
+def _lockstep_failed(result: Dict[str, any], exp: Dict[str, any], trace: str,
+                     config: Dict[str, any]) -> bool:
+    """Replay a run's retire trace; records the first divergence in `result`."""
+    try:
+        with open(trace, 'r') as f:
+            check = check_trace(f, config, exp['image'], exp['mem_size'])
+    except (OSError, ValueError, VignaISSError) as e:
+        result['message'] = f"lockstep: {e}"
+        return True
+    result['retired'] = check['retired']
+    if check['divergence'] is None:
+        return False
+    result['status'] = 'fail'
+    result['message'] = f"diverged from the ISS at PC=0x{check['divergence']['pc']:08x}"
+    result['divergence'] = format_divergence(check['divergence'])
+    return True
+
+
+def main():
+    """Command-line interface for the program harness."""
+    parser = argparse.ArgumentParser(description="VIGNA compile-once program harness")
+    parser.add_argument('expectations', nargs='+', help='Expectation files (.json)')
+    parser.add_argument('--config', choices=sorted(PREDEFINED_CONFIGS),
+                        help='Predefined configuration (default: repository vigna_conf.vh)')
+    parser.add_argument('-j', '--jobs', type=int, default=os.cpu_count() or 1,
+                        help='Number of parallel simulations (default: number of CPUs)')
+    parser.add_argument('--timeout', type=float, default=300.0,
+                        help='Per-run timeout in seconds (default: 300)')
+    parser.add_argument('--workdir', help='Directory for the compiled harness (default: temporary)')
+    parser.add_argument('--no-cache', action='store_true', help='Do not use the .vvp cache')
+    parser.add_argument('--cache-dir', default=DEFAULT_CACHE_DIR, help='Compiled simulation cache directory')
+    parser.add_argument('--record', action='store_true',
+                        help="Write each file's expected words from an ISS run instead of simulating")
+    parser.add_argument('--lockstep', action='store_true',
+                        help='Trace every retired instruction and compare it with the ISS')
+    parser.add_argument('--json', help='Write a JSON report to this file')
+    args = parser.parse_args()
+
+    try:
+        expectations = [load_expectation(path) for path in args.expectations]
+    except (OSError, ValueError) as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+
+    conf = None if args.config else os.path.join(REPO_ROOT, 'vigna_conf.vh')
+    if args.record:
+        try:
+            config = build_config(args.config, conf)
+            for exp in expectations:
+                record_expectation(exp['path'], config)
+                print(f"Recorded {exp['path']}")
+        except (OSError, ValueError, VignaISSError) as e:
+            print(f"Error: {e}")
+            sys.exit(1)
+        return
+
+    for tool in ('iverilog', 'vvp'):
+        if shutil.which(tool) is None:
+            print(f"Error: '{tool}' not found in PATH (install Icarus Verilog)")
+            sys.exit(1)
+
+    lockstep = None
+    if args.lockstep:
+        try:
+            lockstep = build_config(args.config, conf)
+        except (OSError, ValueError) as e:
+            print(f"Error: {e}")
+            sys.exit(1)
+
+    workdir = args.workdir or tempfile.mkdtemp(prefix='vigna_harness_')
+    os.makedirs(workdir, exist_ok=True)
+    cache = None if args.no_cache else VvpCache(args.cache_dir)
+    start = time.time()
+    try:
+        vvp_file = compile_harness(workdir, args.config, cache, args.timeout)
+    except (OSError, subprocess.TimeoutExpired) as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+
+    results = []
+    with ThreadPoolExecutor(max_workers=args.jobs) as pool:
+        for result in pool.map(lambda exp: run_program(vvp_file, exp, workdir, args.timeout,
+                                                       lockstep), expectations):
+            results.append(result)
+            line = f"[{result['name']}] {result['status'].upper()}"
+            if result['cycles'] is not None:
+                line += f" ({result['cycles']} cycles)"
+            if result['message']:
+                line += f": {result['message']}"
+            print(line, flush=True)
+            if 'divergence' in result:
+                print(result['divergence'], flush=True)
+    elapsed = time.time() - start
+
+    failed = [r for r in results if r['status'] != 'pass']
+    print("-" * 60)
+    print(f"{len(results) - len(failed)}/{len(results)} programs passed in {elapsed:.1f}s")
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'elapsed': round(elapsed, 3), 'config': args.config or 'vigna_conf.vh',
+                       'results': results}, f, indent=2)
+    if not args.workdir:
+        shutil.rmtree(workdir, ignore_errors=True)
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
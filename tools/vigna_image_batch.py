@@ -0,0 +1,284 @@
+#!/usr/bin/env python3
+"""
+VIGNA Batch Image Converter
+
+Converts many ELF or binary files to several memory image formats in one
+process, using bin_to_verilog_mem.py's converter in a pool of worker
+processes. Each input is read once per run, whatever the number of outputs.
+An output is skipped when it exists and was last written from an input with
+the same content and the same conversion settings; the content hashes are
+kept in a state file (default: .vigna_images.json).
+
+Inputs are files or glob patterns; outputs are templates with {dir}, {stem}
+and {name} filled from each input, optionally followed by :FORMAT and
+:IMAGE (all, code or data, for the Harvard split):
+
+    python3 vigna_image_batch.py --output '{dir}/{stem}.mem' \
+        --output '{dir}/{stem}.vh:assignments' --symbols '{dir}/{stem}.sym' 'build/*.elf'
+
+A JSON manifest lists jobs explicitly instead:
+
+    {"jobs": [{"input": "build/boot.elf", "base_addr": "0x0", "data_base": "0x1000",
+               "outputs": [{"path": "build/boot.imem", "image": "code"},
+                           {"path": "build/boot.dmem", "image": "data"},
+                           {"path": "build/boot.mif", "format": "mif", "depth": 4096}],
+               "symbols": "build/boot.sym"}]}
+
+    python3 vigna_image_batch.py --manifest firmware.json -j 16
+"""
+
+import os
+import sys
+import glob
+import json
+import time
+import hashlib
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional
+
+from bin_to_verilog_mem import FORMATS, load_input, write_image, write_symbols
+
+DEFAULT_STATE_FILE = '.vigna_images.json'
+IMAGES = ('all', 'code', 'data')
+
+_CONVERTER = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'bin_to_verilog_mem.py')
+
+
+def _int(value) -> int:
+    if isinstance(value, int):
+        return value
+    return int(str(value), 0)
+
+
+def parse_output_spec(spec: str) -> Dict[str, any]:
+    """Split 'TEMPLATE[:FORMAT[:IMAGE]]' into an output description."""
+    path, fmt, image = (spec.split(':') + [None, None])[:3]
+    output = {'path': path, 'format': fmt or 'readmemh', 'image': image or 'all'}
+    if output['format'] not in FORMATS:
+        raise ValueError(f"unknown format '{output['format']}' in '{spec}'")
+    if output['image'] not in IMAGES:
+        raise ValueError(f"unknown image '{output['image']}' in '{spec}' (use {', '.join(IMAGES)})")
+    return output
+
+
+def expand_inputs(patterns: List[str]) -> List[str]:
+    """Files named by a list of paths and glob patterns, in order, without duplicates."""
+    inputs = []
+    for pattern in patterns:
+        matches = sorted(glob.glob(pattern)) if glob.has_magic(pattern) else [pattern]
+        for path in matches:
+            if path not in inputs:
+                inputs.append(path)
+    return inputs
+
+
+def _fill(template: str, input_file: str) -> str:
+    name = os.path.basename(input_file)
+    return template.format(dir=os.path.dirname(input_file) or '.', name=name,
+                           stem=os.path.splitext(name)[0])
+
+
+def jobs_from_templates(inputs: List[str], outputs: List[Dict[str, any]],
+                        symbols: Optional[str] = None, base_addr: int = 0,
+                        data_base: int = 0, depth: Optional[int] = None) -> List[Dict[str, any]]:
+    """One job per input with every output template filled in."""
+    jobs = []
+    for input_file in inputs:
+        jobs.append(_normalise_job({
+            'input': input_file, 'base_addr': base_addr, 'data_base': data_base,
+            'outputs': [dict(o, path=_fill(o['path'], input_file), depth=depth) for o in outputs],
+            'symbols': _fill(symbols, input_file) if symbols else None,
+        }))
+    return jobs
+
+
+def load_manifest(path: str) -> List[Dict[str, any]]:
+    """Jobs listed in a JSON manifest; relative paths are relative to the manifest."""
+    with open(path, 'r') as f:
+        data = json.load(f)
+    base = os.path.dirname(os.path.abspath(path))
+    jobs = []
+    for entry in data.get('jobs', []):
+        if 'input' not in entry or not entry.get('outputs'):
+            raise ValueError(f"{path}: every job needs an 'input' and 'outputs'")
+        job = dict(entry)
+        job['input'] = os.path.join(base, entry['input'])
+        job['outputs'] = [dict(o, path=os.path.join(base, o['path'])) for o in entry['outputs']]
+        if entry.get('symbols'):
+            job['symbols'] = os.path.join(base, entry['symbols'])
+        jobs.append(_normalise_job(job))
+    return jobs
+
+
+def _normalise_job(job: Dict[str, any]) -> Dict[str, any]:
+    outputs = []
+    for output in job['outputs']:
+        output = {'path': output['path'], 'format': output.get('format', 'readmemh'),
+                  'image': output.get('image', 'all'),
+                  'depth': None if output.get('depth') is None else _int(output['depth'])}
+        if output['format'] not in FORMATS or output['image'] not in IMAGES:
+            raise ValueError(f"{job['input']}: bad output {output}")
+        outputs.append(output)
+    return {'input': job['input'], 'base_addr': _int(job.get('base_addr', 0)),
+            'data_base': _int(job.get('data_base', 0)), 'outputs': outputs,
+            'symbols': job.get('symbols')}
+
+
+_converter_digest = None
+
+
+def converter_digest() -> str:
+    """Hash of the converter source, so a changed converter rewrites every image."""
+    global _converter_digest
+    if _converter_digest is None:
+        with open(_CONVERTER, 'rb') as f:
+            _converter_digest = hashlib.sha256(f.read()).hexdigest()
+    return _converter_digest
+
+
+def output_key(job: Dict[str, any], output: Optional[Dict[str, any]], content_hash: str) -> str:
+    """State key for one output: input content plus everything that shapes the output."""
+    settings = [content_hash, converter_digest(), job['base_addr'], job['data_base']]
+    if output is not None:
+        settings += [output['format'], output['image'], output['depth']]
+    return hashlib.sha256(json.dumps(settings).encode()).hexdigest()
+
+
+def convert_job(job: Dict[str, any], state: Dict[str, str], force: bool = False) -> Dict[str, any]:
+    """Convert one input to all of its outputs (runs in a worker process).
+
+    Returns {'input', 'status', 'message', 'written', 'skipped', 'keys'}
+    where keys maps each output path to its new state key.
+    """
+    result = {'input': job['input'], 'status': 'ok', 'message': '', 'written': [],
+              'skipped': [], 'keys': {}}
+    try:
+        with open(job['input'], 'rb') as f:
+            content_hash = hashlib.sha256(f.read()).hexdigest()
+        targets = [(o['path'], o) for o in job['outputs']]
+        if job['symbols']:
+            targets.append((job['symbols'], None))
+        pending = []
+        for path, output in targets:
+            key = output_key(job, output, content_hash)
+            result['keys'][path] = key
+            if not force and state.get(path) == key and os.path.exists(path):
+                result['skipped'].append(path)
+            else:
+                pending.append((path, output))
+        if not pending:
+            return result
+
+        code, rw, elf = load_input(job['input'], job['base_addr'])
+        for path, output in pending:
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            if output is None:
+                if elf is None:
+                    raise ValueError("symbols can only be exported from an ELF file")
+                write_symbols(elf['symbols'], path)
+            else:
+                regions = {'all': code + rw, 'code': code, 'data': rw}[output['image']]
+                origin = job['data_base'] if output['image'] == 'data' else job['base_addr']
+                write_image(regions, path, origin, output['format'], job['input'],
+                            'data_memory' if output['image'] == 'data' else 'instruction_memory',
+                            output['depth'])
+            result['written'].append(path)
+    except (OSError, ValueError) as e:
+        result['status'] = 'error'
+        result['message'] = str(e)
+        result['keys'] = {}
+    return result
+
+
+def load_state(path: str) -> Dict[str, str]:
+    try:
+        with open(path, 'r') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_state(path: str, state: Dict[str, str]):
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp = path + '.tmp'
+    with open(tmp, 'w') as f:
+        json.dump(state, f, indent=1, sort_keys=True)
+    os.replace(tmp, path)
+
+
+def run_batch(jobs: List[Dict[str, any]], workers: int = 1, state_file: str = DEFAULT_STATE_FILE,
+              force: bool = False) -> List[Dict[str, any]]:
+    """Convert every job, skipping unchanged outputs, and update the state file."""
+    state = load_state(state_file)
+    if workers <= 1 or len(jobs) <= 1:
+        results = [convert_job(job, state, force) for job in jobs]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(convert_job, jobs, [state] * len(jobs), [force] * len(jobs),
+                                    chunksize=max(1, len(jobs) // (workers * 4))))
+    for result in results:
+        state.update(result['keys'])
+    save_state(state_file, state)
+    return results
+
+
+def main():
+    """Command-line interface for batch image conversion."""
+    parser = argparse.ArgumentParser(description="VIGNA batch ELF/binary to memory image converter")
+    parser.add_argument('inputs', nargs='*', help='Input files or glob patterns')
+    parser.add_argument('--manifest', help='JSON manifest of jobs (instead of inputs and templates)')
+    parser.add_argument('--output', action='append', default=[],
+                        help="Output template TEMPLATE[:FORMAT[:IMAGE]], e.g. '{dir}/{stem}.mem'")
+    parser.add_argument('--symbols', help="Symbol table template, e.g. '{dir}/{stem}.sym'")
+    parser.add_argument('--base-addr', type=lambda x: int(x, 0), default=0,
+                        help='Address of word 0 of the instruction/unified images (default: 0)')
+    parser.add_argument('--data-base', type=lambda x: int(x, 0), default=0,
+                        help='Address of word 0 of data images (default: 0)')
+    parser.add_argument('--depth', type=lambda x: int(x, 0), help='Memory depth in words for coe/mif')
+    parser.add_argument('-j', '--jobs', type=int, default=os.cpu_count() or 1,
+                        help='Number of worker processes (default: number of CPUs)')
+    parser.add_argument('--state', default=DEFAULT_STATE_FILE,
+                        help=f'Content-hash state file (default: {DEFAULT_STATE_FILE})')
+    parser.add_argument('--force', action='store_true', help='Rewrite every output')
+    parser.add_argument('-v', '--verbose', action='store_true', help='List every file written')
+    args = parser.parse_args()
+
+    try:
+        if args.manifest:
+            jobs = load_manifest(args.manifest)
+        else:
+            if not args.inputs or not (args.output or args.symbols):
+                parser.error("give inputs and at least one --output or --symbols, or --manifest")
+            outputs = [parse_output_spec(spec) for spec in args.output]
+            jobs = jobs_from_templates(expand_inputs(args.inputs), outputs, args.symbols,
+                                       args.base_addr, args.data_base, args.depth)
+    except (OSError, ValueError, KeyError, IndexError) as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+
+    start = time.time()
+    results = run_batch(jobs, args.jobs, args.state, args.force)
+    elapsed = time.time() - start
+
+    errors = [r for r in results if r['status'] != 'ok']
+    for result in errors:
+        print(f"Error: {result['input']}: {result['message']}")
+    if args.verbose:
+        for result in results:
+            for path in result['written']:
+                print(f"Wrote {path}")
+    written = sum(len(r['written']) for r in results)
+    skipped = sum(len(r['skipped']) for r in results)
+    print(f"{len(results)} inputs: {written} outputs written, {skipped} unchanged, "
+          f"{len(errors)} errors in {elapsed:.2f}s")
+    if errors:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,354 @@
+#!/usr/bin/env python3
+"""
+VIGNA Interrupt Latency Harness
+
+Raises ext_irq / timer_irq / soft_irq against the harness programs and
+measures how long the core takes to respond: the cycles from a line going up
+to the core requesting the first instruction at mtvec. The program harness
+(sim/program_harness.v) does the injection; this tool compiles it once per
+interrupt-capable configuration, runs every program under many seeds in
+parallel and reports min/mean/p99/max latency per configuration and line.
+
+Interrupts come at random (--random N: a random line 1..2N cycles after the
+previous one was taken, one stream per seed) or from a schedule file
+(--schedule, "<cycle> ext|timer|soft" per line, one run per program). The
+trap vector holds a bare mret, so a run passes only when the program still
+halts with its expected signature: interrupts must be invisible to it. A
+program whose image, signature region or mark address covers the vector
+would overwrite the handler, so it is reported as an error instead of run.
+
+Worst cases are listed with the instruction that was executing when the line
+went up (a divide on the M extension, a load behind a slow memory, ...).
+--latency/--jitter put the harness memory model on slow memory and
+--budget fails the run when any latency exceeds a hard limit.
+
+Usage:
+    python3 vigna_irq.py
+    python3 vigna_irq.py --config rv32im_zicsr --seeds 200 -j 16
+    python3 vigna_irq.py --enable prefetch --lines ext,timer --random 50 --budget 40
+    python3 vigna_irq.py --bench divide --latency 3 --jitter 2 --csv irq.csv
+    python3 vigna_irq.py --schedule irqs.txt programs/expected/sorting_test.json
+"""
+
+import os
+import sys
+import csv
+import glob
+import json
+import time
+import shutil
+import argparse
+import tempfile
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+from vigna_config_generator import VignaConfigGenerator, CONFIG_OPTIONS, PREDEFINED_CONFIGS
+from vigna_harness import compile_harness, run_program, load_expectation
+from vigna_bench import load_suite, isa_variant, bench_expectation, DEFAULT_SUITE
+from vigna_sweep import memory_plusargs
+from vigna_axi_stress import percentile
+from vigna_iss import VignaISS, VignaISSError, disassemble, read_mem_image
+from vigna_vvp_cache import VvpCache, DEFAULT_CACHE_DIR
+
+REPO_ROOT = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+DEFAULT_EXPECTATIONS = os.path.join(REPO_ROOT, 'programs', 'expected', '*.json')
+DEFAULT_CONFIGS = sorted(name for name, info in PREDEFINED_CONFIGS.items()
+                         if info['options'].get('interrupt'))
+
+LINES = ('ext', 'timer', 'soft')
+LINE_MASKS = {'ext': 4, 'timer': 2, 'soft': 1}
+IRQ_VECTOR = 0xC000                    # trap vector holding an mret: past the programs and the
+                                       # bench output (0x8000), below the stack at the top of memory
+
+CSV_FIELDS = ['config', 'program', 'seed', 'line', 'raised', 'taken', 'latency', 'during', 'mepc']
+
+
+def parse_lines(text: str) -> int:
+    """+irq_lines mask from "ext,timer,soft" (any subset)."""
+    mask = 0
+    for name in text.split(','):
+        name = name.strip()
+        if name not in LINE_MASKS:
+            raise ValueError(f"unknown interrupt line '{name}' (choose from {', '.join(LINES)})")
+        mask |= LINE_MASKS[name]
+    return mask
+
+
+def read_schedule(path: str) -> List[Tuple[int, str]]:
+    """(cycle, line) pairs of a schedule file; blank lines and # comments are skipped."""
+    schedule = []
+    with open(path, 'r') as f:
+        for number, line in enumerate(f, 1):
+            fields = line.split('#', 1)[0].split()
+            if not fields:
+                continue
+            if len(fields) != 2 or not fields[0].isdigit() or fields[1] not in LINE_MASKS:
+                raise ValueError(f"{path}:{number}: expected '<cycle> ext|timer|soft'")
+            schedule.append((int(fields[0]), fields[1]))
+    return sorted(schedule)
+
+
+def irq_plusargs(seed: Optional[int], random_gap: int, lines: int = 7,
+                 schedule: Optional[str] = None, vector: int = IRQ_VECTOR) -> List[str]:
+    """Harness plusargs for one seed's random interrupts or a schedule file."""
+    if schedule is not None:
+        return [f"+irq_schedule={schedule}", f"+irq_vector={vector:x}"]
+    return [f"+irq_random={random_gap}", f"+irq_lines={lines}", f"+irq_seed={seed}",
+            f"+irq_vector={vector:x}"]
+
+
+def vector_conflict(exp: Dict[str, any], vector: int = IRQ_VECTOR) -> Optional[str]:
+    """Why the trap vector would be overwritten by a program, or None.
+
+    Addresses wrap at the memory size like the harness memory; the image
+    counts from its first to its last word.
+    """
+    mask = exp['mem_size'] - 1
+    word = vector & mask & ~3
+    if (exp['begin'] & mask) <= word < (exp['begin'] & mask) + exp['end'] - exp['begin']:
+        return f"trap vector 0x{vector:x} is in the signature region"
+    if exp.get('mark') is not None and exp['mark'] & mask & ~3 == word:
+        return f"trap vector 0x{vector:x} is the mark address"
+    indexes = [index for index, _ in read_mem_image(exp['image'])]
+    if indexes and (min(indexes) * 4) & mask <= word <= (max(indexes) * 4) & mask:
+        return f"trap vector 0x{vector:x} is inside {os.path.basename(exp['image'])}"
+    return None
+
+
+def latencies(result: Dict[str, any]) -> List[Dict[str, any]]:
+    """One sample per interrupt taken in a run, tagged with the run."""
+    return [dict(irq, config=result['config'], program=result['program'], seed=result['seed'],
+                 latency=irq['taken'] - irq['raised']) for irq in result.get('irqs', [])]
+
+
+def spread(values: List[int]) -> Dict[str, float]:
+    return {'count': len(values), 'min': min(values), 'mean': round(sum(values) / len(values), 2),
+            'p99': percentile(values, 99), 'max': max(values)}
+
+
+def summarize(samples: List[Dict[str, any]]) -> Dict[str, Dict[str, Dict[str, float]]]:
+    """Latency spread per configuration, for each line and all lines together."""
+    by_config: Dict[str, Dict[str, List[int]]] = {}
+    for s in samples:
+        lines = by_config.setdefault(s['config'], {})
+        lines.setdefault(s['line'], []).append(s['latency'])
+        lines.setdefault('all', []).append(s['latency'])
+    return {config: {line: spread(lines[line]) for line in LINES + ('all',) if line in lines}
+            for config, lines in by_config.items()}
+
+
+def worst_cases(samples: List[Dict[str, any]], count: int) -> List[Dict[str, any]]:
+    """The `count` longest latencies, longest first, one per config/program/executing PC."""
+    worst, seen = [], set()
+    for s in sorted(samples, key=lambda s: (-s['latency'], s['seed'] or 0)):
+        key = (s['config'], s['program'], s['during'])
+        if key not in seen:
+            seen.add(key)
+            worst.append(s)
+        if len(worst) == count:
+            break
+    return worst
+
+
+def describe(exp: Dict[str, any], config: Dict[str, any], pc: int) -> str:
+    """Disassembly of the instruction at `pc` of a program image."""
+    if pc == IRQ_VECTOR:
+        return 'mret (trap vector, another interrupt was being handled)'
+    try:
+        iss = VignaISS(config, mem_size=exp['mem_size'])
+        iss.load_mem(exp['image'])
+        return disassemble(iss.instruction_at(pc)[0], pc)
+    except (OSError, ValueError, VignaISSError):
+        return '?'
+
+
+def write_csv(path: str, samples: List[Dict[str, any]]):
+    with open(path, 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=CSV_FIELDS, extrasaction='ignore')
+        writer.writeheader()
+        for s in samples:
+            writer.writerow(dict({field: s.get(field) for field in CSV_FIELDS},
+                                 during=f"0x{s['during']:08x}", mepc=f"0x{s['mepc']:08x}"))
+
+
+def run_seed(vvp_file: str, config_name: str, exp: Dict[str, any], seed: Optional[int],
+             plusargs: List[str], workdir: str, timeout: float) -> Dict[str, any]:
+    """Run one program under one seed's interrupts."""
+    result = {'config': config_name, 'program': exp['name'], 'seed': seed, 'status': 'error',
+              'message': '', 'cycles': None, 'irqs': []}
+    if not os.path.exists(exp['image']):
+        result['message'] = f"{exp['image']} not built"
+        return result
+    conflict = vector_conflict(exp)
+    if conflict is not None:
+        result['message'] = conflict
+        return result
+    run = run_program(vvp_file, exp, workdir, timeout, plusargs=plusargs)
+    for field in ('status', 'message', 'cycles', 'irqs'):
+        result[field] = run.get(field, result[field])
+    return result
+
+
+def main():
+    """Command-line interface for the interrupt latency harness."""
+    parser = argparse.ArgumentParser(description="VIGNA interrupt latency harness")
+    parser.add_argument('expectations', nargs='*',
+                        help='Expectation files (.json, default: programs/expected/*.json '
+                             'unless --bench is given)')
+    parser.add_argument('--config', action='append', choices=DEFAULT_CONFIGS,
+                        help=f"Interrupt configuration (repeatable, default: {', '.join(DEFAULT_CONFIGS)})")
+    parser.add_argument('--enable', action='append', default=[], metavar='OPTION',
+                        help='Enable this option in every configuration (repeatable)')
+    parser.add_argument('--bench', action='append', default=[],
+                        help='Benchmark of the bench suite to include (repeatable)')
+    parser.add_argument('--suite', default=DEFAULT_SUITE, help='Benchmark suite description (.json)')
+    parser.add_argument('--seeds', type=int, default=20, help='Seeds per program (default: 20)')
+    parser.add_argument('--first-seed', type=int, default=1, help='First seed (default: 1)')
+    parser.add_argument('--random', type=int, default=20, metavar='N',
+                        help='Mean cycles between an interrupt being taken and the next one (default: 20)')
+    parser.add_argument('--lines', type=parse_lines, default=7,
+                        help='Lines raised at random, e.g. ext,timer (default: all three)')
+    parser.add_argument('--schedule', help='Raise interrupts at the cycles of this file instead')
+    parser.add_argument('--latency', type=int, default=1, help='Memory latency of both ports (default: 1)')
+    parser.add_argument('--jitter', type=int, default=0,
+                        help='Random extra memory cycles (0..N) per request on both ports')
+    parser.add_argument('--budget', type=int, help='Fail when any latency exceeds this many cycles')
+    parser.add_argument('--top', type=int, default=5, help='Worst cases to list (default: 5)')
+    parser.add_argument('-j', '--jobs', type=int, default=os.cpu_count() or 1,
+                        help='Number of parallel simulations (default: number of CPUs)')
+    parser.add_argument('--timeout', type=float, default=1800.0,
+                        help='Per-simulation timeout in seconds (default: 1800)')
+    parser.add_argument('--no-cache', action='store_true', help='Do not use the .vvp cache')
+    parser.add_argument('--csv', help='Write one row per interrupt taken to this file')
+    parser.add_argument('--json', help='Write the summary, worst cases and runs as JSON')
+    args = parser.parse_args()
+
+    if args.seeds < 1 or args.random < 1 or args.latency < 1 or args.jitter < 0:
+        print("Error: --seeds, --random and --latency must be positive, --jitter not negative")
+        sys.exit(1)
+    if args.schedule:
+        try:
+            if not read_schedule(args.schedule):
+                print(f"Error: {args.schedule} schedules no interrupts")
+                sys.exit(1)
+        except (OSError, ValueError) as e:
+            print(f"Error: {e}")
+            sys.exit(1)
+        schedule = os.path.abspath(args.schedule)
+        seeds = [None]
+    else:
+        schedule = None
+        seeds = list(range(args.first_seed, args.first_seed + args.seeds))
+
+    paths = args.expectations or ([] if args.bench else sorted(glob.glob(DEFAULT_EXPECTATIONS)))
+    try:
+        programs = [load_expectation(path) for path in paths]
+        suite = load_suite(args.suite) if args.bench else None
+    except (OSError, ValueError, KeyError) as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+    for name in args.bench:
+        if name not in suite['benchmarks']:
+            print(f"Error: unknown benchmark '{name}'")
+            sys.exit(1)
+
+    generator = VignaConfigGenerator()
+    configs = {name: dict(PREDEFINED_CONFIGS[name]['options']) for name in args.config or DEFAULT_CONFIGS}
+    for option in args.enable:
+        if option not in CONFIG_OPTIONS or CONFIG_OPTIONS[option].get('type') == 'value':
+            print(f"Error: '{option}' is not a configuration switch")
+            sys.exit(1)
+        configs = {(name if config.get(option) else f"{name}+{option}"): dict(config, **{option: True})
+                   for name, config in configs.items()}
+        configs = {name: config for name, config in configs.items() if generator.validate_config(config)[0]}
+    if not configs:
+        print("Error: no valid configuration left")
+        sys.exit(1)
+
+    for tool in ('iverilog', 'vvp'):
+        if shutil.which(tool) is None:
+            print(f"Error: '{tool}' not found in PATH (install Icarus Verilog)")
+            sys.exit(1)
+
+    memory = memory_plusargs(args.latency, args.latency, args.jitter)
+    cache = None if args.no_cache else VvpCache(DEFAULT_CACHE_DIR)
+    workdir = tempfile.mkdtemp(prefix='vigna_irq_')
+    start = time.time()
+    results = []
+    config_programs: Dict[str, List[Dict[str, any]]] = {}
+    try:
+        with ThreadPoolExecutor(max_workers=args.jobs) as pool:
+            def compile_config(item):
+                config_dir = os.path.join(workdir, item[0])
+                os.makedirs(config_dir)
+                return compile_harness(config_dir, item[0], cache, args.timeout, item[1])
+
+            vvp_files = dict(zip(configs, pool.map(compile_config, configs.items())))
+            jobs = []
+            for config_name, config in configs.items():
+                config_programs[config_name] = list(programs)
+                if suite is not None:
+                    variant = isa_variant(config, suite['variants'])
+                    if variant is None:
+                        print(f"[{config_name}] no benchmark variant for this configuration")
+                    else:
+                        config_programs[config_name] += [bench_expectation(suite, name, variant)
+                                                         for name in args.bench]
+                for exp in config_programs[config_name]:
+                    for seed in seeds:
+                        plusargs = memory + irq_plusargs(seed, args.random, args.lines, schedule)
+                        jobs.append(pool.submit(run_seed, vvp_files[config_name], config_name, exp,
+                                                seed, plusargs, os.path.dirname(vvp_files[config_name]),
+                                                args.timeout))
+            for job in jobs:
+                results.append(job.result())
+    except (OSError, subprocess.TimeoutExpired) as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    failed = [r for r in results if r['status'] != 'pass']
+    for r in failed:
+        seed = '' if r['seed'] is None else f" seed {r['seed']}"
+        print(f"[{r['config']}] {r['program']}{seed}: {r['status'].upper()}: {r['message']}")
+
+    samples = [s for r in results for s in latencies(r)]
+    summary = summarize(samples)
+    print(f"{'config':<28}{'line':<7}{'count':>7}{'min':>6}{'mean':>8}{'p99':>6}{'max':>6}")
+    for config in configs:
+        for line, stats in summary.get(config, {}).items():
+            print(f"{config:<28}{line:<7}{stats['count']:>7}{stats['min']:>6}{stats['mean']:>8.2f}"
+                  f"{stats['p99']:>6}{stats['max']:>6}")
+
+    worst = worst_cases(samples, args.top)
+    if worst:
+        print("-" * 60)
+        print("Longest latencies (instruction executing when the line went up)")
+        exps = {(config, exp['name']): exp for config, exps in config_programs.items() for exp in exps}
+        for s in worst:
+            s['instruction'] = describe(exps[s['config'], s['program']], configs[s['config']], s['during'])
+            seed = '' if s['seed'] is None else f" seed {s['seed']}"
+            print(f"{s['latency']:>5}  {s['config']} {s['program']}{seed} {s['line']} at cycle "
+                  f"{s['raised']}: 0x{s['during']:08x}  {s['instruction']}")
+
+    over = [s for s in samples if args.budget is not None and s['latency'] > args.budget]
+    print("-" * 60)
+    print(f"{len(results)} runs, {len(samples)} interrupts in {time.time() - start:.1f}s: "
+          f"{len(failed)} runs failed" +
+          (f", {len(over)} interrupts over the {args.budget}-cycle budget" if args.budget is not None else ''))
+    if args.csv:
+        write_csv(args.csv, samples)
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'random': None if schedule else args.random, 'lines': args.lines,
+                       'schedule': schedule, 'latency': args.latency, 'jitter': args.jitter,
+                       'budget': args.budget, 'summary': summary, 'worst': worst,
+                       'results': results}, f, indent=2)
+    if failed or over:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,1268 @@
+#!/usr/bin/env python3
+"""
+VIGNA Instruction-Set Simulator
+
+A fast functional (golden) model of the VIGNA RISC-V core. The enabled ISA
+features follow the same VIGNA_CORE_* defines that the configuration
+generator reads, and programs are loaded from the $readmemh images produced
+by bin_to_verilog_mem.py.
+
+Every instruction word is decoded once into a Python closure that is cached
+by PC, so the main loop only has to look up and call the handler.
+
+Usage:
+    python3 vigna_iss.py programs/build/simple_test.mem
+    python3 vigna_iss.py --conf vigna_conf_rv32imc.vh --dump 0x1000:4 prog.mem
+    python3 vigna_iss.py --config rv32im --max-instructions 1000000 prog.mem
+    python3 vigna_iss.py -D VIGNA_CORE_C_EXTENSION prog.mem
+"""
+
+import os
+import sys
+import time
+import struct
+import argparse
+from typing import Callable, Dict, List, Optional, Tuple
+
+from vigna_config_generator import (
+    CONFIG_OPTIONS, PREDEFINED_CONFIGS, VignaConfigGenerator
+)
+from vigna_preprocessor import parse_define_args
+
+MASK32 = 0xFFFFFFFF
+MASK64 = 0xFFFFFFFFFFFFFFFF
+SIGN32 = 0x80000000
+
+# Default simulated memory size (bytes); addresses wrap like the testbench memories
+DEFAULT_MEM_SIZE = 64 * 1024
+
+# Machine-level CSR addresses implemented by the core
+CSR_MSTATUS  = 0x300
+CSR_MIE      = 0x304
+CSR_MTVEC    = 0x305
+CSR_MSCRATCH = 0x340
+CSR_MEPC     = 0x341
+CSR_MCAUSE   = 0x342
+CSR_MTVAL    = 0x343
+CSR_MIP      = 0x344
+
+# Performance counters (VIGNA_CORE_PERF_COUNTERS): machine counters at
+# 0xB00-0xB1F (high halves at +0x80), read-only user shadows at 0xC00-0xC1F
+CSR_MCOUNTINHIBIT = 0x320
+CSR_MCYCLE        = 0xB00
+CSR_MINSTRET      = 0xB02
+CSR_CYCLE         = 0xC00
+CSR_TIME          = 0xC01
+CSR_INSTRET       = 0xC02
+PERF_COUNTERS     = (0, 2, 3, 4, 5)  # implemented counter indices; time reads as cycle
+PERF_MISPREDICT   = 6                # branch mispredictions, with VIGNA_CORE_BRANCH_PREDICT
+
+# Interrupt lines, in priority order (external > timer > software)
+IRQ_EXT   = 0x800
+IRQ_TIMER = 0x080
+IRQ_SOFT  = 0x008
+IRQ_CAUSES = ((IRQ_EXT, 11), (IRQ_TIMER, 7), (IRQ_SOFT, 3))
+
+_U16 = struct.Struct('<H')
+_U32 = struct.Struct('<I')
+
+
+def is_counter_csr(addr: int) -> bool:
+    """True for the CSRs VIGNA_CORE_PERF_COUNTERS routes to the counter block."""
+    return addr == CSR_MCOUNTINHIBIT or ((addr >> 8) in (0xB, 0xC) and not addr & 0x60)
+
+
+class VignaISSError(Exception):
+    """Raised when the simulated program does something the model cannot execute."""
+
+
+class IllegalInstructionError(VignaISSError):
+    """Raised when an instruction word is not valid for the configured ISA."""
+
+
+class _Stop(Exception):
+    """Internal signal used by ECALL/EBREAK handlers to leave the run loop."""
+
+    def __init__(self, reason: str):
+        super().__init__(reason)
+        self.reason = reason
+
+
+def parse_verilog_int(value) -> int:
+    """Parse a Verilog integer literal such as 32'h0000_1000 or 4096."""
+    if isinstance(value, int):
+        return value
+    text = str(value).strip().replace('_', '')
+    if "'" not in text:
+        return int(text, 0)
+    _, _, rest = text.partition("'")
+    rest = rest.lstrip('sS')
+    bases = {'h': 16, 'd': 10, 'b': 2, 'o': 8}
+    base = bases.get(rest[:1].lower())
+    if base is None:
+        raise ValueError(f"Unsupported Verilog literal: {value}")
+    return int(rest[1:], base)
+
+
+def load_config_file(config_file: str, defines: Optional[Dict[str, str]] = None) -> Dict[str, any]:
+    """Read a vigna_conf*.vh file (plus -D `defines`) into a configuration dictionary."""
+    return VignaConfigGenerator().parse_existing_config(config_file, defines)
+
+
+def read_mem_image(mem_file: str, word_bytes: int = 4) -> List[Tuple[int, int]]:
+    """Read a $readmemh image and return (word_index, value) pairs.
+
+    Supports // and /* */ comments, several words per line and @address
+    directives, matching what $readmemh accepts.
+    """
+    with open(mem_file, 'r') as f:
+        content = f.read()
+
+    words = []
+    index = 0
+    in_block = False
+    for line in content.splitlines():
+        if in_block:
+            end = line.find('*/')
+            if end < 0:
+                continue
+            line = line[end + 2:]
+            in_block = False
+        while '/*' in line:
+            start = line.find('/*')
+            end = line.find('*/', start + 2)
+            if end < 0:
+                line = line[:start]
+                in_block = True
+                break
+            line = line[:start] + ' ' + line[end + 2:]
+        line = line.split('//', 1)[0]
+        for token in line.split():
+            if token.startswith('@'):
+                index = int(token[1:], 16)
+                continue
+            token = token.replace('_', '')
+            if 'x' in token.lower() or 'z' in token.lower():
+                value = 0
+            else:
+                value = int(token, 16) & ((1 << (word_bytes * 8)) - 1)
+            words.append((index, value))
+            index += 1
+    return words
+
+
+# ---------------------------------------------------------------------------
+# Instruction encoding helpers (used to expand compressed instructions)
+# ---------------------------------------------------------------------------
+
+def _enc_r(funct7, rs2, rs1, funct3, rd, opcode):
+    return (funct7 << 25) | (rs2 << 20) | (rs1 << 15) | (funct3 << 12) | (rd << 7) | opcode
+
+
+def _enc_i(imm, rs1, funct3, rd, opcode):
+    return ((imm & 0xFFF) << 20) | (rs1 << 15) | (funct3 << 12) | (rd << 7) | opcode
+
+
+def _enc_s(imm, rs2, rs1, funct3, opcode):
+    imm &= 0xFFF
+    return ((imm >> 5) << 25) | (rs2 << 20) | (rs1 << 15) | (funct3 << 12) | ((imm & 0x1F) << 7) | opcode
+
+
+def _enc_b(imm, rs2, rs1, funct3, opcode):
+    imm &= 0x1FFF
+    return (((imm >> 12) & 1) << 31) | (((imm >> 5) & 0x3F) << 25) | (rs2 << 20) | (rs1 << 15) \
+        | (funct3 << 12) | (((imm >> 1) & 0xF) << 8) | (((imm >> 11) & 1) << 7) | opcode
+
+
+def _enc_u(imm, rd, opcode):
+    return (imm & 0xFFFFF000) | (rd << 7) | opcode
+
+
+def _enc_j(imm, rd, opcode):
+    imm &= 0x1FFFFF
+    return (((imm >> 20) & 1) << 31) | (((imm >> 1) & 0x3FF) << 21) | (((imm >> 11) & 1) << 20) \
+        | (((imm >> 12) & 0xFF) << 12) | (rd << 7) | opcode
+
+
+def _sext(value: int, bits: int) -> int:
+    sign = 1 << (bits - 1)
+    return (value & (sign - 1)) - (value & sign)
+
+
+def _bit(value: int, pos: int) -> int:
+    return (value >> pos) & 1
+
+
+def expand_compressed(half: int) -> Optional[int]:
+    """Expand a 16-bit RV32C instruction to its 32-bit equivalent.
+
+    Returns None for reserved or illegal encodings.
+    """
+    op = half & 0x3
+    funct3 = (half >> 13) & 0x7
+    rd = (half >> 7) & 0x1F
+    rs2 = (half >> 2) & 0x1F
+    rdp = 8 + ((half >> 2) & 0x7)
+    rs1p = 8 + ((half >> 7) & 0x7)
+
+    if op == 0:
+        if funct3 == 0:  # C.ADDI4SPN
+            imm = (((half >> 7) & 0xF) << 6) | (((half >> 11) & 0x3) << 4) \
+                | (_bit(half, 5) << 3) | (_bit(half, 6) << 2)
+            if imm == 0:
+                return None
+            return _enc_i(imm, 2, 0, rdp, 0x13)
+        imm = (((half >> 10) & 0x7) << 3) | (_bit(half, 6) << 2) | (_bit(half, 5) << 6)
+        if funct3 == 2:  # C.LW
+            return _enc_i(imm, rs1p, 2, rdp, 0x03)
+        if funct3 == 6:  # C.SW
+            return _enc_s(imm, rdp, rs1p, 2, 0x23)
+        return None
+
+    if op == 1:
+        imm6 = _sext((_bit(half, 12) << 5) | rs2, 6)
+        if funct3 == 0:  # C.ADDI / C.NOP
+            return _enc_i(imm6, rd, 0, rd, 0x13)
+        if funct3 in (1, 5):  # C.JAL / C.J
+            imm = (_bit(half, 12) << 11) | (_bit(half, 11) << 4) | (((half >> 9) & 0x3) << 8) \
+                | (_bit(half, 8) << 10) | (_bit(half, 7) << 6) | (_bit(half, 6) << 7) \
+                | (((half >> 3) & 0x7) << 1) | (_bit(half, 2) << 5)
+            return _enc_j(_sext(imm, 12), 1 if funct3 == 1 else 0, 0x6F)
+        if funct3 == 2:  # C.LI
+            return _enc_i(imm6, 0, 0, rd, 0x13)
+        if funct3 == 3:
+            if rd == 2:  # C.ADDI16SP
+                imm = (_bit(half, 12) << 9) | (_bit(half, 6) << 4) | (_bit(half, 5) << 6) \
+                    | (((half >> 3) & 0x3) << 7) | (_bit(half, 2) << 5)
+                if imm == 0:
+                    return None
+                return _enc_i(_sext(imm, 10), 2, 0, 2, 0x13)
+            if imm6 == 0:
+                return None
+            return _enc_u((imm6 << 12) & MASK32, rd, 0x37)  # C.LUI
+        if funct3 == 4:
+            funct2 = (half >> 10) & 0x3
+            if funct2 in (0, 1):  # C.SRLI / C.SRAI
+                if _bit(half, 12):
+                    return None
+                return _enc_r(0x20 if funct2 else 0, rs2, rs1p, 5, rs1p, 0x13)
+            if funct2 == 2:  # C.ANDI
+                return _enc_i(imm6, rs1p, 7, rs1p, 0x13)
+            if _bit(half, 12):
+                return None
+            rs2p = rdp
+            sel = (half >> 5) & 0x3
+            if sel == 0:
+                return _enc_r(0x20, rs2p, rs1p, 0, rs1p, 0x33)  # C.SUB
+            return _enc_r(0, rs2p, rs1p, (4, 6, 7)[sel - 1], rs1p, 0x33)  # C.XOR/OR/AND
+        # C.BEQZ / C.BNEZ
+        imm = (_bit(half, 12) << 8) | (((half >> 10) & 0x3) << 3) | (((half >> 5) & 0x3) << 6) \
+            | (((half >> 3) & 0x3) << 1) | (_bit(half, 2) << 5)
+        return _enc_b(_sext(imm, 9), 0, rs1p, 0 if funct3 == 6 else 1, 0x63)
+
+    if op == 2:
+        if funct3 == 0:  # C.SLLI
+            if _bit(half, 12):
+                return None
+            return _enc_r(0, rs2, rd, 1, rd, 0x13)
+        if funct3 == 2:  # C.LWSP
+            if rd == 0:
+                return None
+            imm = (_bit(half, 12) << 5) | (((half >> 4) & 0x7) << 2) | (((half >> 2) & 0x3) << 6)
+            return _enc_i(imm, 2, 2, rd, 0x03)
+        if funct3 == 4:
+            if not _bit(half, 12):
+                if rs2 == 0:  # C.JR
+                    return _enc_i(0, rd, 0, 0, 0x67) if rd else None
+                return _enc_r(0, rs2, 0, 0, rd, 0x33)  # C.MV
+            if rs2 == 0:
+                if rd == 0:  # C.EBREAK
+                    return 0x00100073
+                return _enc_i(0, rd, 0, 1, 0x67)  # C.JALR
+            return _enc_r(0, rs2, rd, 0, rd, 0x33)  # C.ADD
+        if funct3 == 6:  # C.SWSP
+            imm = (((half >> 9) & 0xF) << 2) | (((half >> 7) & 0x3) << 6)
+            return _enc_s(imm, rs2, 2, 2, 0x23)
+    return None
+
+
+# ---------------------------------------------------------------------------
+# Disassembler
+# ---------------------------------------------------------------------------
+
+ABI_NAMES = ('zero', 'ra', 'sp', 'gp', 'tp', 't0', 't1', 't2',
+             's0', 's1', 'a0', 'a1', 'a2', 'a3', 'a4', 'a5',
+             'a6', 'a7', 's2', 's3', 's4', 's5', 's6', 's7',
+             's8', 's9', 's10', 's11', 't3', 't4', 't5', 't6')
+
+CSR_NAMES = {CSR_MSTATUS: 'mstatus', CSR_MIE: 'mie', CSR_MTVEC: 'mtvec',
+             CSR_MSCRATCH: 'mscratch', CSR_MEPC: 'mepc', CSR_MCAUSE: 'mcause',
+             CSR_MTVAL: 'mtval', CSR_MIP: 'mip', CSR_MCOUNTINHIBIT: 'mcountinhibit',
+             CSR_MCYCLE: 'mcycle', CSR_MINSTRET: 'minstret', CSR_CYCLE: 'cycle',
+             CSR_TIME: 'time', CSR_INSTRET: 'instret'}
+
+_LOADS = {0: 'lb', 1: 'lh', 2: 'lw', 4: 'lbu', 5: 'lhu'}
+_STORES = {0: 'sb', 1: 'sh', 2: 'sw'}
+_BRANCHES = {0: 'beq', 1: 'bne', 4: 'blt', 5: 'bge', 6: 'bltu', 7: 'bgeu'}
+_ALU_IMM = {0: 'addi', 2: 'slti', 3: 'sltiu', 4: 'xori', 6: 'ori', 7: 'andi'}
+_ALU_REG = {(0, 0): 'add', (0x20, 0): 'sub', (0, 1): 'sll', (0, 2): 'slt', (0, 3): 'sltu',
+            (0, 4): 'xor', (0, 5): 'srl', (0x20, 5): 'sra', (0, 6): 'or', (0, 7): 'and',
+            (1, 0): 'mul', (1, 1): 'mulh', (1, 2): 'mulhsu', (1, 3): 'mulhu',
+            (1, 4): 'div', (1, 5): 'divu', (1, 6): 'rem', (1, 7): 'remu'}
+_CSR_OPS = {1: 'csrrw', 2: 'csrrs', 3: 'csrrc', 5: 'csrrwi', 6: 'csrrsi', 7: 'csrrci'}
+
+
+def disassemble(word: int, pc: int = 0) -> str:
+    """Return assembler text for a 32-bit (or expanded compressed) instruction."""
+    r = ABI_NAMES
+    opcode = word & 0x7F
+    rd = (word >> 7) & 0x1F
+    funct3 = (word >> 12) & 0x7
+    rs1 = (word >> 15) & 0x1F
+    rs2 = (word >> 20) & 0x1F
+    funct7 = word >> 25
+    imm_i = _sext(word >> 20, 12)
+
+    if opcode == 0x37:
+        return f"lui {r[rd]}, 0x{word >> 12:x}"
+    if opcode == 0x17:
+        return f"auipc {r[rd]}, 0x{word >> 12:x}"
+    if opcode == 0x6F:
+        imm = _sext((_bit(word, 31) << 20) | (((word >> 12) & 0xFF) << 12)
+                    | (_bit(word, 20) << 11) | (((word >> 21) & 0x3FF) << 1), 21)
+        return f"jal {r[rd]}, 0x{(pc + imm) & MASK32:x}"
+    if opcode == 0x67 and funct3 == 0:
+        return f"jalr {r[rd]}, {imm_i}({r[rs1]})"
+    if opcode == 0x63 and funct3 in _BRANCHES:
+        imm = _sext((_bit(word, 31) << 12) | (_bit(word, 7) << 11)
+                    | (((word >> 25) & 0x3F) << 5) | (((word >> 8) & 0xF) << 1), 13)
+        return f"{_BRANCHES[funct3]} {r[rs1]}, {r[rs2]}, 0x{(pc + imm) & MASK32:x}"
+    if opcode == 0x03 and funct3 in _LOADS:
+        return f"{_LOADS[funct3]} {r[rd]}, {imm_i}({r[rs1]})"
+    if opcode == 0x23 and funct3 in _STORES:
+        imm = _sext(((word >> 25) << 5) | ((word >> 7) & 0x1F), 12)
+        return f"{_STORES[funct3]} {r[rs2]}, {imm}({r[rs1]})"
+    if opcode == 0x13:
+        if funct3 == 1 and funct7 == 0:
+            return f"slli {r[rd]}, {r[rs1]}, {rs2}"
+        if funct3 == 5 and funct7 in (0, 0x20):
+            return f"{'srai' if funct7 else 'srli'} {r[rd]}, {r[rs1]}, {rs2}"
+        if funct3 in _ALU_IMM:
+            if word == 0x00000013:
+                return "nop"
+            return f"{_ALU_IMM[funct3]} {r[rd]}, {r[rs1]}, {imm_i}"
+    if opcode == 0x33 and (funct7, funct3) in _ALU_REG:
+        return f"{_ALU_REG[(funct7, funct3)]} {r[rd]}, {r[rs1]}, {r[rs2]}"
+    if opcode == 0x0F:
+        return "fence.i" if funct3 == 1 else "fence"
+    if opcode == 0x73:
+        if funct3 == 0:
+            return {0x00000073: 'ecall', 0x00100073: 'ebreak', 0x30200073: 'mret',
+                    0x10500073: 'wfi'}.get(word, f".word 0x{word:08x}")
+        if funct3 in _CSR_OPS:
+            csr = CSR_NAMES.get(word >> 20, f"0x{word >> 20:03x}")
+            src = str(rs1) if funct3 & 0x4 else r[rs1]
+            return f"{_CSR_OPS[funct3]} {r[rd]}, {csr}, {src}"
+    return f".word 0x{word:08x}"
+
+
+# ---------------------------------------------------------------------------
+# Simulator
+# ---------------------------------------------------------------------------
+
+class VignaISS:
+    """Functional simulator for a single VIGNA core configuration."""
+
+    def __init__(self, config: Optional[Dict[str, any]] = None,
+                 mem_size: int = DEFAULT_MEM_SIZE, harvard: bool = False):
+        if mem_size & (mem_size - 1):
+            raise ValueError("mem_size must be a power of two")
+        self.config = dict(config or {})
+        self.has_e = bool(self.config.get('e_extension', False))
+        self.has_m = bool(self.config.get('m_extension', False))
+        self.has_c = bool(self.config.get('c_extension', False))
+        self.has_zicsr = bool(self.config.get('zicsr_extension', False))
+        self.has_interrupt = bool(self.config.get('interrupt', False)) and self.has_zicsr
+        self.has_perf = bool(self.config.get('perf_counters', False)) and self.has_zicsr
+        self.perf_counters = PERF_COUNTERS
+        if self.config.get('branch_prediction', False) and self.config.get('prefetch', False):
+            self.perf_counters += (PERF_MISPREDICT,)
+        self.num_regs = 16 if self.has_e else 32
+        self.reset_addr = parse_verilog_int(
+            self.config.get('reset_addr', CONFIG_OPTIONS['reset_addr']['default']))
+
+        self.mem_size = mem_size
+        self.mem_mask = mem_size - 1
+        self.mem = bytearray(mem_size)
+        # With harvard=True loads and stores use a separate data memory, like
+        # the testbenches that model instruction and data memories apart.
+        self.dmem = bytearray(mem_size) if harvard else self.mem
+        self.regs = [0] * 32
+        self.csrs = {}
+        self._minstret = 0
+        self.irq_lines = 0
+        self.pc = self.reset_addr
+        self.instret = 0
+        self.cycles = 0
+        self.halt_fetch_cycle = None
+        self.stop_reason = None
+        self._fetch_cycle = 0
+        self._front_end = None
+        self._timing_cache = {}
+        self._cache = {}
+        self._code_span = [mem_size, 0]
+        self.reset()
+
+    # -- state management -------------------------------------------------
+
+    def reset(self):
+        """Reset architectural state; memory contents are preserved."""
+        self.regs[:] = [0] * 32
+        if self.config.get('stack_reset_enable'):
+            self.regs[2] = parse_verilog_int(self.config.get(
+                'stack_reset_value', CONFIG_OPTIONS['stack_reset_value']['default'])) & MASK32
+        self.csrs = {}
+        self._minstret = 0
+        self.pc = self.reset_addr
+        self.instret = 0
+        self.cycles = 0
+        self.halt_fetch_cycle = None
+        self.stop_reason = None
+        self._fetch_cycle = 0
+        self._front_end = None
+        self.flush_decode_cache()
+
+    def flush_decode_cache(self):
+        """Drop every cached decoded instruction."""
+        self._cache.clear()
+        self._timing_cache.clear()
+        self._code_span[0] = self.mem_size
+        self._code_span[1] = 0
+
+    def _invalidate(self, addr: int, length: int):
+        """Forget decoded instructions overlapping a written byte range."""
+        for pc in range((addr - 2) & ~1, addr + length, 2):
+            self._cache.pop(pc & self.mem_mask, None)
+            self._timing_cache.pop(pc & self.mem_mask, None)
+
+    def load_bytes(self, data: bytes, base_addr: int = 0):
+        """Copy raw bytes into simulated memory."""
+        for offset in range(0, len(data), 4096):
+            chunk = data[offset:offset + 4096]
+            addr = (base_addr + offset) & self.mem_mask
+            end = addr + len(chunk)
+            if end <= self.mem_size:
+                self.mem[addr:end] = chunk
+            else:
+                for i, byte in enumerate(chunk):
+                    self.mem[(addr + i) & self.mem_mask] = byte
+        self.flush_decode_cache()
+
+    def load_mem(self, mem_file: str, base_addr: int = 0, word_bytes: int = 4,
+                 data: bool = False):
+        """Load a $readmemh image produced by bin_to_verilog_mem.py.
+
+        With data=True the image goes to the data memory (the same memory
+        unless the simulator was created with harvard=True).
+        """
+        mask = self.mem_mask
+        mem = self.dmem if data else self.mem
+        for index, value in read_mem_image(mem_file, word_bytes):
+            addr = base_addr + index * word_bytes
+            for i in range(word_bytes):
+                mem[(addr + i) & mask] = (value >> (8 * i)) & 0xFF
+        self.flush_decode_cache()
+
+    def read_word(self, addr: int) -> int:
+        """Read a 32-bit little-endian word from simulated memory."""
+        addr &= self.mem_mask
+        return _U32.unpack_from(self.mem, addr)[0]
+
+    def read_data_word(self, addr: int) -> int:
+        """Read a 32-bit word as a load instruction would see it."""
+        return _U32.unpack_from(self.dmem, addr & self.mem_mask)[0]
+
+    def write_word(self, addr: int, value: int):
+        """Write a 32-bit little-endian word to simulated memory."""
+        addr &= self.mem_mask
+        _U32.pack_into(self.mem, addr, value & MASK32)
+        self._invalidate(addr, 4)
+
+    def set_irq(self, ext: bool = False, timer: bool = False, soft: bool = False):
+        """Drive the ext_irq / timer_irq / soft_irq inputs."""
+        self.irq_lines = (IRQ_EXT if ext else 0) | (IRQ_TIMER if timer else 0) \
+            | (IRQ_SOFT if soft else 0)
+
+    # -- CSR access -------------------------------------------------------
+
+    def _instret_counter(self) -> int:
+        """64-bit minstret as seen by the instruction executing now."""
+        if self.csrs.get(CSR_MCOUNTINHIBIT, 0) & 0x4:
+            return self._minstret
+        return (self._minstret + self.instret) & MASK64
+
+    def _set_instret_counter(self, value: int):
+        """Set minstret; the instructions after the current one count from it."""
+        if self.csrs.get(CSR_MCOUNTINHIBIT, 0) & 0x4:
+            self._minstret = value & MASK64
+        else:
+            self._minstret = (value - self.instret) & MASK64
+
+    def read_csr(self, addr: int) -> int:
+        """Read a CSR the way the core's csr_rval mux does.
+
+        minstret counts retired instructions like the core, which counts an
+        instruction when it is dispatched (a read includes the reading
+        instruction). The cycle and event counters are plain registers here:
+        mcycle/mhpmcounterN read back what software wrote (the lockstep
+        checker takes the core's values instead).
+        """
+        if self.has_interrupt and addr == CSR_MIP:
+            return self.irq_lines
+        if self.has_perf and is_counter_csr(addr) and addr != CSR_MCOUNTINHIBIT:
+            index = addr & 0x1F
+            if index == 1:
+                index = 0
+            if index not in self.perf_counters:
+                return 0
+            if index == 2:
+                return (self._instret_counter() >> (32 if addr & 0x80 else 0)) & MASK32
+            return self.csrs.get(0xB00 | (addr & 0x80) | index, 0)
+        return self.csrs.get(addr, 0)
+
+    def write_csr(self, addr: int, value: int):
+        """Write a CSR; MIP and the user counter shadows are read-only."""
+        if self.has_interrupt and addr == CSR_MIP:
+            return
+        if self.has_perf and is_counter_csr(addr):
+            if addr == CSR_MCOUNTINHIBIT:
+                instret = self._instret_counter()
+                self.csrs[addr] = value & ~0x2 & MASK32
+                self._set_instret_counter(instret)
+                return
+            if addr >> 8 != 0xB or (addr & 0x1F) not in self.perf_counters:
+                return
+            if addr & 0x1F == 2:
+                instret = self._instret_counter()
+                if addr & 0x80:
+                    instret = (instret & MASK32) | ((value & MASK32) << 32)
+                else:
+                    instret = (instret & ~MASK32) | (value & MASK32)
+                self._set_instret_counter(instret)
+                return
+        self.csrs[addr] = value & MASK32
+
+    def _pending_interrupt(self) -> Optional[int]:
+        """Return the mcause code of the highest-priority ready interrupt."""
+        if not (self.csrs.get(CSR_MSTATUS, 0) & 0x8):
+            return None
+        ready = self.irq_lines & self.csrs.get(CSR_MIE, 0)
+        for bit, cause in IRQ_CAUSES:
+            if ready & bit:
+                return cause
+        return None
+
+    def _take_interrupt(self, pc: int, cause: int) -> int:
+        """Enter the trap handler; returns the new PC."""
+        csrs = self.csrs
+        mstatus = csrs.get(CSR_MSTATUS, 0)
+        csrs[CSR_MSTATUS] = (mstatus & ~0x88) | ((mstatus & 0x8) << 4)
+        csrs[CSR_MEPC] = pc
+        csrs[CSR_MCAUSE] = SIGN32 | cause
+        return csrs.get(CSR_MTVEC, 0)
+
+    # -- decoding ---------------------------------------------------------
+
+    def instruction_at(self, pc: int) -> Tuple[int, int]:
+        """Return (32-bit instruction word, size in bytes) at a PC.
+
+        Compressed instructions are returned in their expanded form.
+        """
+        mem = self.mem
+        pc &= self.mem_mask
+        low = mem[pc] | (mem[(pc + 1) & self.mem_mask] << 8)
+        if (low & 0x3) != 0x3:
+            if not self.has_c:
+                raise IllegalInstructionError(
+                    f"Compressed instruction 0x{low:04x} at PC=0x{pc:08x} without C extension")
+            word = expand_compressed(low)
+            if word is None:
+                raise IllegalInstructionError(
+                    f"Illegal compressed instruction 0x{low:04x} at PC=0x{pc:08x}")
+            return word, 2
+        if pc & 0x2 and not self.has_c:
+            raise VignaISSError(f"Misaligned instruction fetch at PC=0x{pc:08x}")
+        high = mem[(pc + 2) & self.mem_mask] | (mem[(pc + 3) & self.mem_mask] << 8)
+        return low | (high << 16), 4
+
+    def _decode(self, pc: int) -> Callable[[int], int]:
+        """Decode the instruction at pc into a cached handler."""
+        word, size = self.instruction_at(pc)
+        handler = self._build_handler(word, pc, size)
+        self._cache[pc] = handler
+        span = self._code_span
+        if pc < span[0]:
+            span[0] = pc
+        if pc + size > span[1]:
+            span[1] = pc + size
+        return handler
+
+    def _check_reg(self, reg: int, word: int, pc: int):
+        if reg >= self.num_regs:
+            raise IllegalInstructionError(
+                f"Register x{reg} not available with E extension "
+                f"(instruction 0x{word:08x} at PC=0x{pc:08x})")
+
+    def _build_handler(self, word: int, pc: int, size: int) -> Callable[[int], int]:
+        """Build the closure that executes one decoded instruction."""
+        regs = self.regs
+        mem = self.dmem
+        mask = self.mem_mask
+        opcode = word & 0x7F
+        rd = (word >> 7) & 0x1F
+        funct3 = (word >> 12) & 0x7
+        rs1 = (word >> 15) & 0x1F
+        rs2 = (word >> 20) & 0x1F
+        funct7 = word >> 25
+        npc = (pc + size) & MASK32
+
+        if self.has_e:
+            if opcode in (0x37, 0x17, 0x6F):
+                used = (rd,)
+            elif opcode in (0x13, 0x03, 0x67):
+                used = (rd, rs1)
+            elif opcode in (0x23, 0x63):
+                used = (rs1, rs2)
+            elif opcode == 0x33:
+                used = (rd, rs1, rs2)
+            elif opcode == 0x73:
+                used = (rd,) if funct3 & 0x4 else (rd, rs1)
+            else:
+                used = ()
+            for reg in used:
+                self._check_reg(reg, word, pc)
+
+        def illegal():
+            return IllegalInstructionError(f"Illegal instruction 0x{word:08x} at PC=0x{pc:08x}")
+
+        def nop(pc):
+            return npc
+
+        # U-type: results depend only on the decoded word and PC
+        if opcode in (0x37, 0x17):
+            value = (word & 0xFFFFF000) if opcode == 0x37 else (pc + (word & 0xFFFFF000)) & MASK32
+            if rd == 0:
+                return nop
+
+            def lui_auipc(pc):
+                regs[rd] = value
+                return npc
+            return lui_auipc
+
+        if opcode == 0x6F:  # JAL
+            imm = _sext((_bit(word, 31) << 20) | (((word >> 12) & 0xFF) << 12)
+                        | (_bit(word, 20) << 11) | (((word >> 21) & 0x3FF) << 1), 21)
+            target = (pc + imm) & MASK32
+            if rd == 0:
+                def j(pc):
+                    return target
+                return j
+
+            def jal(pc):
+                regs[rd] = npc
+                return target
+            return jal
+
+        imm_i = _sext(word >> 20, 12)
+
+        if opcode == 0x67 and funct3 == 0:  # JALR
+            def jalr(pc):
+                target = (regs[rs1] + imm_i) & 0xFFFFFFFE
+                if rd:
+                    regs[rd] = npc
+                return target
+            return jalr
+
+        if opcode == 0x63:  # branches
+            imm = _sext((_bit(word, 31) << 12) | (_bit(word, 7) << 11)
+                        | (((word >> 25) & 0x3F) << 5) | (((word >> 8) & 0xF) << 1), 13)
+            target = (pc + imm) & MASK32
+            if funct3 == 0:
+                def beq(pc):
+                    return target if regs[rs1] == regs[rs2] else npc
+                return beq
+            if funct3 == 1:
+                def bne(pc):
+                    return target if regs[rs1] != regs[rs2] else npc
+                return bne
+            if funct3 == 4:
+                def blt(pc):
+                    return target if (regs[rs1] ^ SIGN32) < (regs[rs2] ^ SIGN32) else npc
+                return blt
+            if funct3 == 5:
+                def bge(pc):
+                    return target if (regs[rs1] ^ SIGN32) >= (regs[rs2] ^ SIGN32) else npc
+                return bge
+            if funct3 == 6:
+                def bltu(pc):
+                    return target if regs[rs1] < regs[rs2] else npc
+                return bltu
+            if funct3 == 7:
+                def bgeu(pc):
+                    return target if regs[rs1] >= regs[rs2] else npc
+                return bgeu
+            raise illegal()
+
+        if opcode == 0x03:  # loads
+            if funct3 not in (0, 1, 2, 4, 5):
+                raise illegal()
+            if rd == 0:
+                return nop
+            u16 = _U16.unpack_from
+            u32 = _U32.unpack_from
+            if funct3 == 0:
+                def lb(pc):
+                    regs[rd] = ((mem[(regs[rs1] + imm_i) & mask] ^ 0x80) - 0x80) & MASK32
+                    return npc
+                return lb
+            if funct3 == 1:
+                def lh(pc):
+                    regs[rd] = ((u16(mem, (regs[rs1] + imm_i) & mask)[0] ^ 0x8000) - 0x8000) & MASK32
+                    return npc
+                return lh
+            if funct3 == 2:
+                def lw(pc):
+                    regs[rd] = u32(mem, (regs[rs1] + imm_i) & mask)[0]
+                    return npc
+                return lw
+            if funct3 == 4:
+                def lbu(pc):
+                    regs[rd] = mem[(regs[rs1] + imm_i) & mask]
+                    return npc
+                return lbu
+
+            def lhu(pc):
+                regs[rd] = u16(mem, (regs[rs1] + imm_i) & mask)[0]
+                return npc
+            return lhu
+
+        if opcode == 0x23:  # stores
+            imm = _sext(((word >> 25) << 5) | ((word >> 7) & 0x1F), 12)
+            # Stores can only hit decoded code when data and code share memory
+            span = self._code_span if mem is self.mem else [0, 0]
+            invalidate = self._invalidate
+            if funct3 == 0:
+                def sb(pc):
+                    addr = (regs[rs1] + imm) & mask
+                    mem[addr] = regs[rs2] & 0xFF
+                    if addr < span[1] and addr + 1 > span[0]:
+                        invalidate(addr, 1)
+                    return npc
+                return sb
+            if funct3 == 1:
+                p16 = _U16.pack_into
+
+                def sh(pc):
+                    addr = (regs[rs1] + imm) & mask
+                    p16(mem, addr, regs[rs2] & 0xFFFF)
+                    if addr < span[1] and addr + 2 > span[0]:
+                        invalidate(addr, 2)
+                    return npc
+                return sh
+            if funct3 == 2:
+                p32 = _U32.pack_into
+
+                def sw(pc):
+                    addr = (regs[rs1] + imm) & mask
+                    p32(mem, addr, regs[rs2])
+                    if addr < span[1] and addr + 4 > span[0]:
+                        invalidate(addr, 4)
+                    return npc
+                return sw
+            raise illegal()
+
+        if opcode == 0x13:  # register-immediate ALU
+            if funct3 in (1, 5):
+                shamt = rs2
+                if funct3 == 1 and funct7 != 0:
+                    raise illegal()
+                if funct3 == 5 and funct7 not in (0, 0x20):
+                    raise illegal()
+            if rd == 0:
+                return nop
+            uimm = imm_i & MASK32
+            if funct3 == 0:
+                def addi(pc):
+                    regs[rd] = (regs[rs1] + imm_i) & MASK32
+                    return npc
+                return addi
+            if funct3 == 1:
+                def slli(pc):
+                    regs[rd] = (regs[rs1] << shamt) & MASK32
+                    return npc
+                return slli
+            if funct3 == 2:
+                simm = uimm ^ SIGN32
+
+                def slti(pc):
+                    regs[rd] = 1 if (regs[rs1] ^ SIGN32) < simm else 0
+                    return npc
+                return slti
+            if funct3 == 3:
+                def sltiu(pc):
+                    regs[rd] = 1 if regs[rs1] < uimm else 0
+                    return npc
+                return sltiu
+            if funct3 == 4:
+                def xori(pc):
+                    regs[rd] = regs[rs1] ^ uimm
+                    return npc
+                return xori
+            if funct3 == 5:
+                if funct7 == 0:
+                    def srli(pc):
+                        regs[rd] = regs[rs1] >> shamt
+                        return npc
+                    return srli
+
+                def srai(pc):
+                    regs[rd] = (((regs[rs1] ^ SIGN32) - SIGN32) >> shamt) & MASK32
+                    return npc
+                return srai
+            if funct3 == 6:
+                def ori(pc):
+                    regs[rd] = regs[rs1] | uimm
+                    return npc
+                return ori
+
+            def andi(pc):
+                regs[rd] = regs[rs1] & uimm
+                return npc
+            return andi
+
+        if opcode == 0x33:  # register-register ALU and M extension
+            if funct7 == 1:
+                if not self.has_m:
+                    raise illegal()
+                handler = self._build_m_handler(funct3, rd, rs1, rs2, npc)
+                return handler if rd else nop
+            if funct7 not in (0, 0x20) or (funct7 == 0x20 and funct3 not in (0, 5)):
+                raise illegal()
+            if rd == 0:
+                return nop
+            if funct3 == 0:
+                if funct7:
+                    def sub(pc):
+                        regs[rd] = (regs[rs1] - regs[rs2]) & MASK32
+                        return npc
+                    return sub
+
+                def add(pc):
+                    regs[rd] = (regs[rs1] + regs[rs2]) & MASK32
+                    return npc
+                return add
+            if funct3 == 1:
+                def sll(pc):
+                    regs[rd] = (regs[rs1] << (regs[rs2] & 0x1F)) & MASK32
+                    return npc
+                return sll
+            if funct3 == 2:
+                def slt(pc):
+                    regs[rd] = 1 if (regs[rs1] ^ SIGN32) < (regs[rs2] ^ SIGN32) else 0
+                    return npc
+                return slt
+            if funct3 == 3:
+                def sltu(pc):
+                    regs[rd] = 1 if regs[rs1] < regs[rs2] else 0
+                    return npc
+                return sltu
+            if funct3 == 4:
+                def xor(pc):
+                    regs[rd] = regs[rs1] ^ regs[rs2]
+                    return npc
+                return xor
+            if funct3 == 5:
+                if funct7:
+                    def sra(pc):
+                        regs[rd] = (((regs[rs1] ^ SIGN32) - SIGN32) >> (regs[rs2] & 0x1F)) & MASK32
+                        return npc
+                    return sra
+
+                def srl(pc):
+                    regs[rd] = regs[rs1] >> (regs[rs2] & 0x1F)
+                    return npc
+                return srl
+            if funct3 == 6:
+                def or_(pc):
+                    regs[rd] = regs[rs1] | regs[rs2]
+                    return npc
+                return or_
+
+            def and_(pc):
+                regs[rd] = regs[rs1] & regs[rs2]
+                return npc
+            return and_
+
+        if opcode == 0x0F:  # FENCE / FENCE.I
+            if funct3 == 1:
+                flush = self.flush_decode_cache
+
+                def fence_i(pc):
+                    flush()
+                    return npc
+                return fence_i
+            return nop
+
+        if opcode == 0x73:  # SYSTEM
+            if funct3 == 0:
+                if word == 0x00000073:
+                    def ecall(pc):
+                        raise _Stop('ecall')
+                    return ecall
+                if word == 0x00100073:
+                    def ebreak(pc):
+                        raise _Stop('ebreak')
+                    return ebreak
+                if word == 0x30200073 and self.has_interrupt:
+                    csrs = self.csrs
+
+                    def mret(pc):
+                        mstatus = csrs.get(CSR_MSTATUS, 0)
+                        csrs[CSR_MSTATUS] = (mstatus & ~0x88) | ((mstatus & 0x80) >> 4) | 0x80
+                        return csrs.get(CSR_MEPC, 0)
+                    return mret
+                if word == 0x10500073:  # WFI
+                    return nop
+                raise illegal()
+            if not self.has_zicsr or funct3 == 4:
+                raise illegal()
+            return self._build_csr_handler(word, funct3, rd, rs1, npc)
+
+        raise illegal()
+
+    def _build_m_handler(self, funct3: int, rd: int, rs1: int, rs2: int,
+                         npc: int) -> Callable[[int], int]:
+        """Build handlers for the M extension (mirrors vigna_m_ext results)."""
+        regs = self.regs
+
+        if funct3 == 0:
+            def mul(pc):
+                regs[rd] = (regs[rs1] * regs[rs2]) & MASK32
+                return npc
+            return mul
+        if funct3 == 1:
+            def mulh(pc):
+                a = (regs[rs1] ^ SIGN32) - SIGN32
+                b = (regs[rs2] ^ SIGN32) - SIGN32
+                regs[rd] = ((a * b) >> 32) & MASK32
+                return npc
+            return mulh
+        if funct3 == 2:
+            def mulhsu(pc):
+                a = (regs[rs1] ^ SIGN32) - SIGN32
+                regs[rd] = ((a * regs[rs2]) >> 32) & MASK32
+                return npc
+            return mulhsu
+        if funct3 == 3:
+            def mulhu(pc):
+                regs[rd] = (regs[rs1] * regs[rs2]) >> 32
+                return npc
+            return mulhu
+        if funct3 == 4:
+            def div(pc):
+                a = (regs[rs1] ^ SIGN32) - SIGN32
+                b = (regs[rs2] ^ SIGN32) - SIGN32
+                if b == 0:
+                    regs[rd] = MASK32
+                elif a == -SIGN32 and b == -1:
+                    regs[rd] = SIGN32
+                else:
+                    q = abs(a) // abs(b)
+                    regs[rd] = (-q if (a < 0) != (b < 0) else q) & MASK32
+                return npc
+            return div
+        if funct3 == 5:
+            def divu(pc):
+                b = regs[rs2]
+                regs[rd] = regs[rs1] // b if b else MASK32
+                return npc
+            return divu
+        if funct3 == 6:
+            def rem(pc):
+                a = (regs[rs1] ^ SIGN32) - SIGN32
+                b = (regs[rs2] ^ SIGN32) - SIGN32
+                if b == 0:
+                    regs[rd] = a & MASK32
+                elif a == -SIGN32 and b == -1:
+                    regs[rd] = 0
+                else:
+                    r = abs(a) % abs(b)
+                    regs[rd] = (-r if a < 0 else r) & MASK32
+                return npc
+            return rem
+
+        def remu(pc):
+            b = regs[rs2]
+            regs[rd] = regs[rs1] % b if b else regs[rs1]
+            return npc
+        return remu
+
+    def _build_csr_handler(self, word: int, funct3: int, rd: int, rs1: int,
+                           npc: int) -> Callable[[int], int]:
+        """Build handlers for CSRRW/CSRRS/CSRRC and their immediate forms."""
+        regs = self.regs
+        csr = word >> 20
+        read_csr = self.read_csr
+        write_csr = self.write_csr
+        use_imm = funct3 & 0x4
+        kind = funct3 & 0x3
+
+        def csr_op(pc):
+            old = read_csr(csr)
+            src = rs1 if use_imm else regs[rs1]
+            if kind == 1:
+                write_csr(csr, src)
+            elif rs1 != 0:
+                write_csr(csr, (old | src) if kind == 2 else (old & ~src))
+            if rd:
+                regs[rd] = old
+            return npc
+        return csr_op
+
+    # -- execution --------------------------------------------------------
+
+    def step(self) -> int:
+        """Execute a single instruction and return the new PC."""
+        pc = self.pc
+        if self.has_interrupt and self.irq_lines:
+            cause = self._pending_interrupt()
+            if cause is not None:
+                self.pc = self._take_interrupt(pc, cause)
+                return self.pc
+        handler = self._cache.get(pc)
+        if handler is None:
+            handler = self._decode(pc)
+        self.instret += 1
+        try:
+            self.pc = handler(pc)
+        except _Stop as stop:
+            self.stop_reason = stop.reason
+            self.pc = (pc + self.instruction_at(pc)[1]) & MASK32
+        return self.pc
+
+    def run(self, max_instructions: int = 10_000_000, timing=None,
+            profile: Optional[Dict[int, List[int]]] = None,
+            retire: Optional[Callable[[int, int], None]] = None) -> str:
+        """Run until the program halts or the instruction budget is used up.
+
+        A jump or branch to itself (the usual `while(1)` at the end of the
+        test programs) stops execution with reason 'halt'. ECALL and EBREAK
+        stop with reasons 'ecall' and 'ebreak'; otherwise 'limit' is returned.
+
+        With a timing model (see vigna_timing.py) the cycle count is tracked
+        in self.cycles; with a profile dict, [count, cycles] is accumulated
+        per PC, and a retire callable is called with (pc, cycles) for every
+        instruction in execution order.
+        """
+        if timing is not None or profile is not None or retire is not None or self.has_perf:
+            return self._run_timed(max_instructions, timing, profile, retire)
+        cache_get = self._cache.get
+        decode = self._decode
+        check_irq = self.has_interrupt and self.irq_lines
+        pc = self.pc
+        count = 0
+        reason = 'limit'
+        try:
+            while count < max_instructions:
+                if check_irq:
+                    cause = self._pending_interrupt()
+                    if cause is not None:
+                        pc = self._take_interrupt(pc, cause)
+                handler = cache_get(pc)
+                if handler is None:
+                    handler = decode(pc)
+                next_pc = handler(pc)
+                count += 1
+                if next_pc == pc:
+                    reason = 'halt'
+                    break
+                pc = next_pc
+        except _Stop as stop:
+            count += 1
+            reason = stop.reason
+            pc = (pc + self.instruction_at(pc)[1]) & MASK32
+        except (IndexError, struct.error) as e:
+            self.pc = pc
+            self.instret += count
+            raise VignaISSError(f"Memory access out of range at PC=0x{pc:08x}: {e}")
+        self.pc = pc
+        self.instret += count
+        self.stop_reason = reason
+        return reason
+
+    def _run_timed(self, max_instructions: int, timing,
+                   profile: Optional[Dict[int, List[int]]],
+                   retire: Optional[Callable[[int, int], None]] = None) -> str:
+        """Run loop that also accumulates modelled cycles and/or a profile.
+
+        With the performance counters self.instret is kept current for minstret.
+        """
+        cache_get = self._cache.get
+        decode = self._decode
+        timing_cache = self._timing_cache
+        regs = self.regs
+        check_irq = self.has_interrupt and self.irq_lines
+        if timing is not None and self.instret == 0 and self.cycles == 0:
+            self.cycles = timing.startup_cycles
+            self._fetch_cycle = timing.first_fetch_cycle
+            self._front_end = timing.front_end(self.pc, self.instruction_at)
+        front_end = self._front_end if timing is not None else None
+        perf = self.has_perf
+        instret = self.instret
+        cycles = self.cycles
+        fetch_cycle = self._fetch_cycle
+        pc = self.pc
+        count = 0
+        reason = 'limit'
+        try:
+            while count < max_instructions:
+                if check_irq:
+                    cause = self._pending_interrupt()
+                    if cause is not None:
+                        pc = self._take_interrupt(pc, cause)
+                        if timing is not None:
+                            cycles += timing.issue_cost(1, 1)
+                handler = cache_get(pc)
+                if handler is None:
+                    handler = decode(pc)
+                cost = 0
+                if timing is not None:
+                    entry = timing_cache.get(pc)
+                    if entry is None:
+                        entry = timing_cache[pc] = timing.cost(self.instruction_at(pc)[0])
+                    cost, ctrl = entry
+                    if cost.__class__ is not int:
+                        cost = cost(regs)
+                    if front_end is not None:
+                        # waiting for the prefetch queue counts towards this instruction
+                        length = self.instruction_at(pc)[1] if pc & 0x2 else 4
+                        stall = front_end.fetch(cycles, pc, length) - cycles
+                        front_end.execute(cycles + stall, ctrl, pc)
+                        cost += stall
+                    next_fetch = cycles + ctrl
+                    cycles += cost
+                if profile is not None:
+                    slot = profile.get(pc)
+                    if slot is None:
+                        profile[pc] = [1, cost]
+                    else:
+                        slot[0] += 1
+                        slot[1] += cost
+                if retire is not None:
+                    retire(pc, cost)
+                if perf:
+                    self.instret = instret + count + 1
+                next_pc = handler(pc)
+                count += 1
+                if next_pc == pc:
+                    if front_end is not None:
+                        # i_addr follows the queue, not the PC
+                        fetch_cycle = front_end.settle(cycles, pc, length, cost - stall, ctrl)
+                    self.halt_fetch_cycle = fetch_cycle
+                    reason = 'halt'
+                    break
+                if timing is not None:
+                    fetch_cycle = next_fetch
+                pc = next_pc
+        except _Stop as stop:
+            count += 1
+            reason = stop.reason
+            pc = (pc + self.instruction_at(pc)[1]) & MASK32
+        except (IndexError, struct.error) as e:
+            self.pc = pc
+            self.instret = instret + count
+            self.cycles = cycles
+            raise VignaISSError(f"Memory access out of range at PC=0x{pc:08x}: {e}")
+        self.pc = pc
+        self.instret = instret + count
+        self.cycles = cycles
+        self._fetch_cycle = fetch_cycle
+        self.stop_reason = reason
+        return reason
+
+    def dump_regs(self) -> str:
+        """Format the register file for display."""
+        lines = []
+        for i in range(0, self.num_regs, 4):
+            lines.append("  ".join(f"x{r:<2}=0x{self.regs[r]:08x}"
+                                   for r in range(i, min(i + 4, self.num_regs))))
+        return "\n".join(lines)
+
+
+def build_config(config_name: Optional[str] = None, conf_file: Optional[str] = None,
+                 defines: Optional[Dict[str, str]] = None) -> Dict[str, any]:
+    """Assemble a configuration from a predefined name and/or a .vh file.
+
+    Command-line `defines` apply on top, as iverilog's -D options would.
+    """
+    config = {}
+    if config_name:
+        if config_name not in PREDEFINED_CONFIGS:
+            raise ValueError(f"Unknown configuration '{config_name}'")
+        config.update(PREDEFINED_CONFIGS[config_name]['options'])
+    if conf_file:
+        config.update(load_config_file(conf_file, defines))
+    elif defines:
+        config = VignaConfigGenerator().apply_defines(config, defines)
+    return config
+
+
+def main():
+    """Command-line interface for the instruction-set simulator."""
+    parser = argparse.ArgumentParser(description="VIGNA instruction-set simulator")
+    parser.add_argument('image', help='Program image in $readmemh format (.mem)')
+    parser.add_argument('--config', help='Predefined configuration name (e.g. rv32imc)')
+    parser.add_argument('--conf', help='Configuration header to read (e.g. vigna_conf.vh)')
+    parser.add_argument('-D', '--define', action='append', default=[],
+                        help='Define NAME[=VALUE] on top of the configuration, as with iverilog -D')
+    parser.add_argument('--base-addr', type=lambda x: int(x, 0), default=0,
+                        help='Load address of the image (default: 0)')
+    parser.add_argument('--mem-size', type=lambda x: int(x, 0), default=DEFAULT_MEM_SIZE,
+                        help=f'Simulated memory size in bytes (default: {DEFAULT_MEM_SIZE})')
+    parser.add_argument('--max-instructions', type=int, default=10_000_000,
+                        help='Instruction budget (default: 10000000)')
+    parser.add_argument('--dump', action='append', default=[],
+                        help='Dump memory words after the run, as ADDR:COUNT')
+    parser.add_argument('--regs', action='store_true', help='Print the register file')
+    args = parser.parse_args()
+
+    if not args.config and not args.conf:
+        default_conf = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                    '..', 'vigna_conf.vh')
+        args.conf = default_conf if os.path.exists(default_conf) else None
+
+    try:
+        config = build_config(args.config, args.conf, parse_define_args(args.define))
+        iss = VignaISS(config, mem_size=args.mem_size)
+        iss.load_mem(args.image, args.base_addr)
+        start = time.perf_counter()
+        reason = iss.run(args.max_instructions)
+        elapsed = time.perf_counter() - start
+    except (ValueError, OSError, VignaISSError) as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+
+    rate = iss.instret / elapsed / 1e6 if elapsed > 0 else 0.0
+    print(f"Stopped ({reason}) at PC=0x{iss.pc:08x} after {iss.instret} instructions "
+          f"({elapsed:.3f}s, {rate:.2f} MIPS)")
+    if args.regs:
+        print(iss.dump_regs())
+    for spec in args.dump:
+        addr_text, _, count_text = spec.partition(':')
+        addr = int(addr_text, 0)
+        for i in range(int(count_text or '1', 0)):
+            print(f"  [0x{addr + 4 * i:08x}] = 0x{iss.read_word(addr + 4 * i):08x}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,256 @@
+#!/usr/bin/env python3
+"""
+VIGNA Lockstep Checker
+
+Replays a retire trace written by sim/vigna_retire_trace.vh (enabled with
++trace=<file>) on the instruction-set simulator and stops at the first
+retired instruction whose PC, instruction word, destination register or
+written value differs from the ISS. The report shows the disassembled
+instructions leading up to the divergence and the ones that follow it.
+
+Each reset section of the trace is replayed on a fresh ISS. Sections that
+name an image (the comprehensive testbench dumps its generated programs) load
+it; the others use --image.
+
+Interrupts are not modelled: a trace that takes an interrupt diverges at the
+first handler instruction. Neither are the cycle and event counters: reads of
+mcycle and mhpmcounterN take the traced value. minstret is counted by the ISS
+and checked like any other register write.
+
+Usage:
+    vvp program_harness.vvp +image=programs/build/simple_test.mem +trace=simple.trace
+    python3 vigna_lockstep.py --image programs/build/simple_test.mem simple.trace
+
+    vvp comprehensive.vvp +trace=comprehensive.trace
+    python3 vigna_lockstep.py --harvard --mem-size 4096 comprehensive.trace
+"""
+
+import os
+import sys
+import argparse
+from collections import deque
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from vigna_iss import (
+    VignaISS, VignaISSError, build_config, disassemble, is_counter_csr, ABI_NAMES,
+    DEFAULT_MEM_SIZE
+)
+
+# Opcodes whose rd field the core writes back (CSR instructions are SYSTEM with funct3 != 0)
+_WRITES_RD = (0x37, 0x17, 0x6F, 0x67, 0x03, 0x13, 0x33)
+
+
+def parse_trace_line(line: str) -> Optional[Tuple]:
+    """Parse one trace line.
+
+    Returns ('section', number, {key: value}) for section headers,
+    ('retire', pc, inst, rd, value, cycle) for retired instructions (cycle is
+    None in traces written before it was recorded) and None for blank lines
+    and other comments.
+    """
+    line = line.strip()
+    if not line:
+        return None
+    if line.startswith('#'):
+        fields = line[1:].split()
+        if len(fields) < 2 or fields[0] != 'section':
+            return None
+        attrs = dict(field.partition('=')[::2] for field in fields[2:])
+        return 'section', int(fields[1]), attrs
+    fields = line.split()
+    if len(fields) not in (4, 5):
+        raise ValueError(f"malformed trace line: {line!r}")
+    cycle = int(fields[4]) if len(fields) == 5 else None
+    return 'retire', int(fields[0], 16), int(fields[1], 16), int(fields[2]), int(fields[3], 16), cycle
+
+
+def writeback_reg(word: int, has_e: bool = False) -> int:
+    """Destination register the core writes for an instruction (0 for none)."""
+    opcode = word & 0x7F
+    if opcode in _WRITES_RD or (opcode == 0x73 and (word >> 12) & 0x7):
+        rd = (word >> 7) & 0x1F
+        return rd & 0xF if has_e else rd
+    return 0
+
+
+def _reads_counter(word: int) -> bool:
+    """True for a CSR instruction on a performance counter the ISS does not count."""
+    csr = word >> 20
+    return (word & 0x7F == 0x73 and (word >> 12) & 0x7 != 0 and is_counter_csr(csr)
+            and csr & 0x1F != 2)
+
+
+def _format_record(pc: int, inst: int, rd: int, value: int) -> str:
+    text = f"0x{pc:08x}  {inst:08x}  {disassemble(inst, pc):<28}"
+    if rd:
+        text += f" {ABI_NAMES[rd]}=0x{value:08x}"
+    return text.rstrip()
+
+
+class LockstepChecker:
+    """Steps an ISS alongside a stream of retire records."""
+
+    def __init__(self, config: Dict[str, any], mem_size: int = DEFAULT_MEM_SIZE,
+                 harvard: bool = False, image: Optional[str] = None, context: int = 8):
+        self.config = config
+        self.mem_size = mem_size
+        self.harvard = harvard
+        self.image = image
+        self.context = context
+        self.iss: Optional[VignaISS] = None
+        self.section = 0
+        self.index = 0
+        self.retired = 0
+        self.history: deque = deque(maxlen=context)
+
+    def start_section(self, number: int, image: Optional[str] = None, data: Optional[str] = None):
+        """Begin a reset section on a freshly loaded ISS."""
+        image = image or self.image
+        if image is None:
+            raise ValueError(f"section {number} names no image and no --image was given")
+        self.iss = VignaISS(self.config, mem_size=self.mem_size, harvard=self.harvard)
+        self.iss.load_mem(image)
+        if data:
+            self.iss.load_mem(data, data=True)
+        self.section = number
+        self.index = 0
+        self.history.clear()
+
+    def check(self, pc: int, inst: int, rd: int, value: int) -> Optional[Dict[str, any]]:
+        """Retire one traced instruction on the ISS; returns a divergence or None."""
+        if self.iss is None:
+            self.start_section(1)
+        iss = self.iss
+        expected_pc = iss.pc
+        fields = []
+        error = None
+        try:
+            expected_inst = iss.instruction_at(expected_pc)[0]
+            expected_rd = writeback_reg(expected_inst, iss.has_e)
+            iss.step()
+            if expected_rd and iss.has_perf and _reads_counter(expected_inst) and rd == expected_rd:
+                iss.regs[expected_rd] = value
+            expected_value = iss.regs[expected_rd] if expected_rd else 0
+        except VignaISSError as e:
+            expected_inst, expected_rd, expected_value = None, None, None
+            error = str(e)
+
+        for name, expected, actual in (('pc', expected_pc, pc), ('inst', expected_inst, inst),
+                                       ('rd', expected_rd, rd), ('value', expected_value, value)):
+            if expected is not None and expected != actual:
+                fields.append((name, expected, actual))
+        self.index += 1
+        self.retired += 1
+        if fields or error:
+            return {
+                'section': self.section, 'index': self.index, 'pc': pc,
+                'fields': fields, 'error': error,
+                'trace': (pc, inst, rd, value),
+                'history': list(self.history),
+                'upcoming': self._upcoming(expected_pc),
+            }
+        self.history.append((pc, inst, rd, value))
+        return None
+
+    def _upcoming(self, pc: int) -> List[Tuple[int, int]]:
+        """(pc, word) of the instructions following `pc` in ISS memory."""
+        result = []
+        for _ in range(self.context // 2):
+            try:
+                word, size = self.iss.instruction_at(pc)
+            except VignaISSError:
+                break
+            result.append((pc, word))
+            pc += size
+        return result
+
+
+def check_trace(lines: Iterable[str], config: Dict[str, any], image: Optional[str] = None,
+                mem_size: int = DEFAULT_MEM_SIZE, harvard: bool = False, context: int = 8,
+                trace_dir: str = '.') -> Dict[str, any]:
+    """Replay a retire trace; returns {'retired', 'sections', 'divergence'}."""
+    checker = LockstepChecker(config, mem_size, harvard, image, context)
+    sections = 0
+    for line in lines:
+        record = parse_trace_line(line)
+        if record is None:
+            continue
+        if record[0] == 'section':
+            _, number, attrs = record
+            sections += 1
+            checker.start_section(number, _locate(attrs.get('image'), trace_dir),
+                                  _locate(attrs.get('data'), trace_dir))
+            continue
+        divergence = checker.check(*record[1:5])
+        if divergence is not None:
+            return {'retired': checker.retired, 'sections': sections, 'divergence': divergence}
+    return {'retired': checker.retired, 'sections': sections, 'divergence': None}
+
+
+def _locate(path: Optional[str], trace_dir: str) -> Optional[str]:
+    """Find an image named in a trace: as written, or next to the trace file."""
+    if not path or os.path.exists(path):
+        return path
+    return os.path.join(trace_dir, os.path.basename(path))
+
+
+def format_divergence(divergence: Dict[str, any]) -> str:
+    """Human-readable first-divergence report with disassembled context."""
+    lines = [f"First divergence in section {divergence['section']} at retired instruction "
+             f"#{divergence['index']} (PC=0x{divergence['pc']:08x})"]
+    if divergence['error']:
+        lines.append(f"  ISS: {divergence['error']}")
+    for name, expected, actual in divergence['fields']:
+        if name == 'rd':
+            lines.append(f"  {name:<6} ISS {ABI_NAMES[expected]:<12} trace {ABI_NAMES[actual]}")
+        else:
+            lines.append(f"  {name:<6} ISS 0x{expected:08x}   trace 0x{actual:08x}")
+    lines.append("Retired before the divergence:")
+    for record in divergence['history']:
+        lines.append("    " + _format_record(*record))
+    lines.append(" >> " + _format_record(*divergence['trace']) + "   (trace)")
+    if divergence['upcoming']:
+        lines.append("ISS program from the expected PC:")
+        for pc, word in divergence['upcoming']:
+            lines.append(f"    0x{pc:08x}  {word:08x}  {disassemble(word, pc)}")
+    return "\n".join(lines)
+
+
+def main():
+    """Command-line interface for the lockstep checker."""
+    parser = argparse.ArgumentParser(description="VIGNA retire-trace lockstep checker")
+    parser.add_argument('trace', help='Retire trace written with +trace=<file>')
+    parser.add_argument('--image', help='Program image for sections that do not name one')
+    parser.add_argument('--config', help='Predefined configuration name (e.g. rv32imc)')
+    parser.add_argument('--conf', help='Configuration header to read (e.g. vigna_conf.vh)')
+    parser.add_argument('--mem-size', type=lambda x: int(x, 0), default=DEFAULT_MEM_SIZE,
+                        help=f'Simulated memory size in bytes (default: {DEFAULT_MEM_SIZE})')
+    parser.add_argument('--harvard', action='store_true',
+                        help='Separate instruction and data memories (comprehensive testbench)')
+    parser.add_argument('--context', type=int, default=8,
+                        help='Instructions shown before the divergence (default: 8)')
+    args = parser.parse_args()
+
+    if not args.config and not args.conf:
+        default_conf = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                    '..', 'vigna_conf.vh')
+        args.conf = default_conf if os.path.exists(default_conf) else None
+
+    try:
+        config = build_config(args.config, args.conf)
+        with open(args.trace, 'r') as f:
+            result = check_trace(f, config, args.image, args.mem_size, args.harvard,
+                                 args.context, os.path.dirname(os.path.abspath(args.trace)))
+    except (ValueError, OSError, VignaISSError) as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+
+    if result['divergence'] is not None:
+        print(format_divergence(result['divergence']))
+        sys.exit(1)
+    print(f"Lockstep OK: {result['retired']} instructions in {result['sections']} section(s) "
+          f"match the ISS")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,255 @@
+#!/usr/bin/env python3
+"""
+VIGNA Verilog Define Resolver
+
+Works out the effective `define set of a compilation: the source files in
+command-line order (defines carry over from one file to the next, as in
+iverilog), plus -D defines. `ifdef / `ifndef / `elsif / `else / `endif
+nesting, `undef and `include are followed; comments and strings are
+skipped. Macro bodies are kept as text and are not expanded.
+
+Each file is tokenized in a single pass into its list of directives, and the
+result is cached by file content, so resolving hundreds of configuration
+variants only scans each distinct file once.
+
+Usage:
+    python3 vigna_preprocessor.py vigna_conf_rv32imc.vh
+    python3 vigna_preprocessor.py -I. -DVIGNA_CORE_C_EXTENSION vigna_core.v sim/processor_testbench.v
+"""
+
+import os
+import re
+import sys
+import hashlib
+import argparse
+from typing import Dict, List, Optional, Tuple
+
+# Macros iverilog defines on its own
+ICARUS_PREDEFINES = {'__ICARUS__': '1'}
+
+MAX_INCLUDE_DEPTH = 32
+
+_TOKEN_RE = re.compile(r'//[^\n]*|/\*.*?\*/|"(?:\\.|[^"\\\n])*"|`([A-Za-z_]\w*)', re.S)
+_COMMENT_RE = re.compile(r'//[^\n]*|/\*.*?\*/', re.S)
+_DEFINE_RE = re.compile(r'[ \t]+([A-Za-z_]\w*)(\([^)]*\))?')
+_NAME_RE = re.compile(r'\s+([A-Za-z_]\w*)')
+_INCLUDE_RE = re.compile(r'\s*(?:"([^"\n]+)"|<([^>\n]+)>)')
+
+_CONDITIONALS = ('ifdef', 'ifndef', 'elsif')
+_NO_ARGUMENT = ('else', 'endif', 'undefineall', 'resetall')
+
+Directive = Tuple[str, str, str]        # (directive, macro or file name, define body)
+
+_scan_cache: Dict[bytes, List[Directive]] = {}
+_file_cache: Dict[str, Tuple[int, int, List[Directive]]] = {}
+
+
+def _logical_line(text: str, pos: int) -> Tuple[str, int]:
+    """The rest of the line from `pos`, joining backslash continuations."""
+    parts = []
+    while True:
+        end = text.find('\n', pos)
+        if end < 0:
+            end = len(text)
+        line = text[pos:end]
+        if line.endswith('\r'):
+            line = line[:-1]
+        if not line.endswith('\\') or end == len(text):
+            parts.append(line)
+            return '\n'.join(parts), end
+        parts.append(line[:-1])
+        pos = end + 1
+
+
+def scan(text: str) -> List[Directive]:
+    """Compiler directives of a Verilog source, in order, cached by content."""
+    digest = hashlib.sha1(text.encode('utf-8', 'surrogateescape')).digest()
+    directives = _scan_cache.get(digest)
+    if directives is not None:
+        return directives
+
+    directives = []
+    pos = 0
+    while True:
+        m = _TOKEN_RE.search(text, pos)
+        if m is None:
+            break
+        pos = m.end()
+        name = m.group(1)
+        if name is None or name in _NO_ARGUMENT:
+            if name is not None:
+                directives.append((name, '', ''))
+            continue
+        if name == 'define':
+            d = _DEFINE_RE.match(text, pos)
+            if d is None:
+                continue
+            body, pos = _logical_line(text, d.end())
+            directives.append(('define', d.group(1), _COMMENT_RE.sub('', body).strip()))
+        elif name == 'undef' or name in _CONDITIONALS:
+            d = _NAME_RE.match(text, pos)
+            if d is not None:
+                directives.append((name, d.group(1), ''))
+                pos = d.end()
+        elif name == 'include':
+            d = _INCLUDE_RE.match(text, pos)
+            if d is not None:
+                directives.append(('include', d.group(1) or d.group(2), ''))
+                pos = d.end()
+        # Anything else is a macro use or a directive without effect on defines
+    _scan_cache[digest] = directives
+    return directives
+
+
+def scan_file(path: str) -> List[Directive]:
+    """Directives of a file; unchanged files are not read again."""
+    st = os.stat(path)
+    cached = _file_cache.get(path)
+    if cached is not None and cached[0] == st.st_mtime_ns and cached[1] == st.st_size:
+        return cached[2]
+    with open(path, 'r', errors='surrogateescape') as f:
+        directives = scan(f.read())
+    _file_cache[path] = (st.st_mtime_ns, st.st_size, directives)
+    return directives
+
+
+def parse_define_args(args: List[str]) -> Dict[str, str]:
+    """Defines from -D options ('-DNAME' or '-DNAME=VALUE'; a bare name means 1)."""
+    defines = {}
+    for arg in args:
+        if arg.startswith('-D'):
+            arg = arg[2:]
+        name, sep, value = arg.partition('=')
+        if name:
+            defines[name] = value if sep else '1'
+    return defines
+
+
+def find_include(name: str, cwd: str, include_dirs: List[str]) -> Optional[str]:
+    """Locate an `include file: the working directory first, then each -I directory."""
+    if os.path.isabs(name):
+        return name if os.path.isfile(name) else None
+    for directory in [cwd] + [os.path.join(cwd, d) for d in include_dirs]:
+        path = os.path.join(directory, name)
+        if os.path.isfile(path):
+            return os.path.normpath(path)
+    return None
+
+
+class _Resolution:
+    """Define table and conditional stack shared by all files of one compilation."""
+
+    def __init__(self, defines: Dict[str, str], include_dirs: List[str], cwd: str):
+        self.defines = dict(defines)
+        self.include_dirs = include_dirs
+        self.cwd = cwd
+        self.files: List[str] = []
+        self.missing: List[str] = []
+        # Per open conditional: [enclosing block active, a branch was taken, this branch active]
+        self.stack: List[List[bool]] = []
+
+    def active(self) -> bool:
+        return not self.stack or self.stack[-1][2]
+
+    def run(self, directives: List[Directive], depth: int = 0):
+        for directive, name, body in directives:
+            if directive in ('ifdef', 'ifndef'):
+                enclosing = self.active()
+                taken = enclosing and ((name in self.defines) == (directive == 'ifdef'))
+                self.stack.append([enclosing, taken, taken])
+            elif directive == 'elsif' and self.stack:
+                entry = self.stack[-1]
+                entry[2] = entry[0] and not entry[1] and name in self.defines
+                entry[1] = entry[1] or entry[2]
+            elif directive == 'else' and self.stack:
+                entry = self.stack[-1]
+                entry[2] = entry[0] and not entry[1]
+                entry[1] = True
+            elif directive == 'endif':
+                if self.stack:
+                    self.stack.pop()
+            elif not self.active():
+                continue
+            elif directive == 'define':
+                self.defines[name] = body
+            elif directive == 'undef':
+                self.defines.pop(name, None)
+            elif directive == 'undefineall':
+                self.defines.clear()
+            elif directive == 'include':
+                self.include(name, depth)
+
+    def include(self, name: str, depth: int):
+        if depth >= MAX_INCLUDE_DEPTH:
+            raise ValueError(f"`include nesting deeper than {MAX_INCLUDE_DEPTH} at \"{name}\"")
+        path = find_include(name, self.cwd, self.include_dirs)
+        if path is None:
+            self.missing.append(name)
+            return
+        self.source(path, depth + 1)
+
+    def source(self, path: str, depth: int = 0):
+        try:
+            directives = scan_file(path)
+        except OSError:
+            self.missing.append(path)
+            return
+        self.files.append(path)
+        self.run(directives, depth)
+
+
+def resolve(sources: List[str], defines: Optional[Dict[str, str]] = None,
+            include_dirs: Optional[List[str]] = None, cwd: str = '.',
+            text: Optional[str] = None) -> Dict[str, any]:
+    """Effective defines after preprocessing `sources` in order.
+
+    `text`, if given, is preprocessed before the sources as if it were the
+    first file (e.g. a configuration header that was never written out).
+
+    Returns {'defines': {name: body}, 'files': [every file read, in order],
+    'missing': [sources and `include names that could not be found]}.
+    """
+    state = _Resolution(defines or {}, include_dirs or [], cwd)
+    if text is not None:
+        state.run(scan(text))
+    for source in sources:
+        state.source(os.path.normpath(os.path.join(cwd, source)))
+    return {'defines': state.defines, 'files': state.files, 'missing': state.missing}
+
+
+def main():
+    """Command-line interface: print the effective defines of a compilation."""
+    parser = argparse.ArgumentParser(
+        description="VIGNA effective `define resolver (iverilog-style arguments)")
+    parser.add_argument('sources', nargs='+', help='Source files, in compilation order')
+    parser.add_argument('-I', dest='include_dirs', action='append', default=[],
+                        help='Include directory (repeatable)')
+    parser.add_argument('-D', dest='defines', action='append', default=[],
+                        help='Define NAME or NAME=VALUE (repeatable)')
+    parser.add_argument('--prefix', default='VIGNA_',
+                        help="Only list defines starting with this prefix (default: VIGNA_, '' for all)")
+    parser.add_argument('--files', action='store_true', help='Also list the files that were read')
+    args = parser.parse_args()
+
+    defines = dict(ICARUS_PREDEFINES, **parse_define_args(args.defines))
+    try:
+        result = resolve(args.sources, defines, args.include_dirs)
+    except ValueError as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+
+    for name in sorted(result['defines']):
+        if name.startswith(args.prefix):
+            body = result['defines'][name]
+            print(f"`define {name} {body}".rstrip())
+    if args.files:
+        for path in result['files']:
+            print(f"// read {path}")
+    for name in result['missing']:
+        print(f"Warning: {name} not found")
+    if result['missing']:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,471 @@
+#!/usr/bin/env python3
+"""
+VIGNA Dynamic Profiler
+
+Turns an execution trace into data for optimising firmware: cycles and
+instruction counts per PC and per function, the instruction-class mix, and
+call stacks written as folded stacks for flame-graph tools (flamegraph.pl,
+inferno, speedscope).
+
+The trace comes from one of two places:
+
+- the instruction-set simulator with the timing model (the default): the
+  image (.mem, or an ELF whose segments are loaded and whose symbol table is
+  used) runs on the ISS and every instruction is charged its modelled cost;
+- a retire trace from RTL simulation (--trace, written with +trace=<file> by
+  testbenches that include sim/vigna_retire_trace.vh): every instruction is
+  charged the cycles from its dispatch to the next one. The last instruction
+  of each section is charged its dispatch cycle only, and the halt loop
+  retires until the testbench notices it.
+
+Either way an instruction's cycles are the exec_state cycles it occupies
+plus the wait for the next instruction to arrive, which is what firmware
+tuning on Vigna is about: a shift or a divide costs many times an add, so
+flame graphs are weighted by cycles unless --weight instructions is given.
+
+With VIGNA_CORE_PREFETCH the two differ per PC but not in total: the timing
+model charges an instruction for waiting on its own fetch, the trace charges
+the instruction before it.
+
+Call stacks are rebuilt from jal/jalr with the RISC-V return-address hints:
+writing ra or t0 pushes a frame, jumping through ra or t0 without writing
+one pops it, and a jalr that does both pops and pushes (or only pushes when
+rd == rs1). Interrupt handlers show up in the stack of the interrupted code.
+
+Usage:
+    python3 vigna_profile.py programs/build/sorting_test.mem
+    python3 vigna_profile.py --config rv32imc --folded prog.folded prog.elf
+    flamegraph.pl prog.folded > prog.svg
+
+    vvp program_harness.vvp +image=prog.mem +trace=prog.trace
+    python3 vigna_profile.py --trace prog.trace --symbols prog.sym prog.mem
+"""
+
+import os
+import sys
+import json
+import argparse
+from bisect import bisect_right
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from vigna_iss import VignaISS, VignaISSError, build_config, disassemble, DEFAULT_MEM_SIZE
+from vigna_timing import VignaTimingModel, INSTRUCTION_CLASSES, classify
+from vigna_lockstep import parse_trace_line
+from bin_to_verilog_mem import is_elf, read_elf, read_symbols
+
+# Registers the return-address hints treat as links (ra and t0)
+LINK_REGS = (1, 5)
+
+# Deeper call stacks (runaway recursion) are folded into their deepest frame
+MAX_DEPTH = 256
+
+WEIGHTS = ('cycles', 'instructions')
+
+
+def call_effect(word: int) -> Tuple[bool, bool]:
+    """(pops, pushes) of an expanded jal/jalr under the return-address hints."""
+    opcode = word & 0x7F
+    rd = (word >> 7) & 0x1F
+    if opcode == 0x6F:
+        return False, rd in LINK_REGS
+    if opcode != 0x67:
+        return False, False
+    rs1 = (word >> 15) & 0x1F
+    rd_link = rd in LINK_REGS
+    rs1_link = rs1 in LINK_REGS
+    if rd_link and rs1_link:
+        return rd != rs1, True
+    return rs1_link, rd_link
+
+
+def load_symbols(path: str) -> List[Dict[str, any]]:
+    """Symbols of an ELF file or of a .sym table written by bin_to_verilog_mem."""
+    with open(path, 'rb') as f:
+        data = f.read()
+    if is_elf(data):
+        return read_elf(data)['symbols']
+    return read_symbols(path)
+
+
+class Symbolizer:
+    """Maps code addresses to the function symbols that contain them."""
+
+    def __init__(self, symbols: Iterable[Dict[str, any]] = ()):
+        by_addr = {}
+        code = [sym for sym in symbols
+                if sym['type'] in ('FUNC', 'NOTYPE') and sym['name']
+                and not sym['name'].startswith(('$', '.L'))]
+        # Functions win over labels at the same address, global over local
+        for sym in sorted(code, key=lambda s: (s['value'], s['type'] != 'FUNC',
+                                               s['bind'] != 'GLOBAL')):
+            by_addr.setdefault(sym['value'], sym)
+        self._addrs = sorted(by_addr)
+        self._symbols = [by_addr[addr] for addr in self._addrs]
+
+    def __len__(self) -> int:
+        return len(self._symbols)
+
+    def lookup(self, pc: int) -> Optional[Tuple[str, int]]:
+        """(name, offset) of the symbol containing pc, or None."""
+        i = bisect_right(self._addrs, pc) - 1
+        if i < 0:
+            return None
+        sym = self._symbols[i]
+        if sym['size'] and pc >= sym['value'] + sym['size']:
+            return None
+        return sym['name'], pc - sym['value']
+
+    def function(self, pc: int) -> Optional[str]:
+        """Name of the function containing pc, or None."""
+        found = self.lookup(pc)
+        return found[0] if found else None
+
+    def locate(self, pc: int) -> str:
+        """'name+0xoffset' for pc, or '' outside every symbol."""
+        found = self.lookup(pc)
+        if found is None:
+            return ''
+        name, offset = found
+        return f"{name}+0x{offset:x}" if offset else name
+
+
+class Profiler:
+    """Accumulates a stream of retired instructions into a profile.
+
+    Per PC it keeps [count, cycles, word, size]; per folded call stack
+    [instructions, cycles]. Frames are (entry, call site): a caller frame is
+    named after the function of the call site that left it, the innermost one
+    after the function of the current PC. Without symbols frames are named by
+    their entry address.
+    """
+
+    def __init__(self, symbolizer: Optional[Symbolizer] = None, max_depth: int = MAX_DEPTH):
+        self.symbolizer = symbolizer or Symbolizer()
+        self.max_depth = max_depth
+        self.pcs: Dict[int, List] = {}
+        self.stacks: Dict[str, List[int]] = {}
+        self.calls: Dict[str, int] = {}
+        self.instructions = 0
+        self.cycles = 0
+        self.unmatched_returns = 0
+        self.truncated_calls = 0
+        self._names: Dict[int, Optional[str]] = {}
+        self._effects: Dict[int, Tuple[bool, bool]] = {}
+        self.reset()
+
+    def reset(self):
+        """Start a new call stack (reset section); the counts are kept."""
+        self._frames: List[Tuple[int, Optional[int]]] = []
+        self._prefix = ''
+        self._call_site: Optional[int] = None
+        self._overflow = 0
+
+    def _name(self, pc: int) -> Optional[str]:
+        name = self._names.get(pc, False)
+        if name is False:
+            name = self._names[pc] = self.symbolizer.function(pc)
+        return name
+
+    def _rebuild_prefix(self):
+        frames = self._frames
+        names = [self._name(frames[i + 1][1]) or f"0x{frames[i][0]:08x}"
+                 for i in range(len(frames) - 1)]
+        self._prefix = ''.join(name + ';' for name in names)
+
+    def retire(self, pc: int, word: int, cycles: int, size: Optional[int] = 4):
+        """Account one retired instruction (expanded word, 2/4 bytes or None if unknown)."""
+        if self._call_site is not None:
+            if len(self._frames) < self.max_depth:
+                self._frames.append((pc, self._call_site))
+                self._rebuild_prefix()
+                callee = self._name(pc) or f"0x{pc:08x}"
+                self.calls[callee] = self.calls.get(callee, 0) + 1
+            else:
+                self._overflow += 1
+                self.truncated_calls += 1
+            self._call_site = None
+        elif not self._frames:
+            self._frames.append((pc, None))
+
+        self.instructions += 1
+        self.cycles += cycles
+        slot = self.pcs.get(pc)
+        if slot is None:
+            self.pcs[pc] = [1, cycles, word, size]
+        else:
+            slot[0] += 1
+            slot[1] += cycles
+            if slot[3] is None:
+                slot[3] = size
+
+        leaf = self._name(pc) or f"0x{self._frames[-1][0]:08x}"
+        key = self._prefix + leaf
+        stack = self.stacks.get(key)
+        if stack is None:
+            self.stacks[key] = [1, cycles]
+        else:
+            stack[0] += 1
+            stack[1] += cycles
+
+        effect = self._effects.get(pc)
+        if effect is None:
+            effect = self._effects[pc] = call_effect(word)
+        pops, pushes = effect
+        if pops:
+            if self._overflow:
+                self._overflow -= 1
+            elif len(self._frames) > 1:
+                self._frames.pop()
+                self._rebuild_prefix()
+            else:
+                self.unmatched_returns += 1
+        if pushes:
+            self._call_site = pc
+
+    def mix(self) -> Dict[str, Dict[str, int]]:
+        """Instructions and cycles per instruction class, plus compressed instructions."""
+        classes = {name: {'instructions': 0, 'cycles': 0} for name in INSTRUCTION_CLASSES}
+        compressed = {'instructions': 0, 'cycles': 0}
+        for count, cycles, word, size in self.pcs.values():
+            entry = classes[classify(word)]
+            entry['instructions'] += count
+            entry['cycles'] += cycles
+            if size == 2:
+                compressed['instructions'] += count
+                compressed['cycles'] += cycles
+        classes['compressed'] = compressed
+        return classes
+
+    def hotspots(self, top: Optional[int] = None) -> List[Dict[str, any]]:
+        """Per-PC rows, most cycles first."""
+        rows = []
+        for pc, (count, cycles, word, size) in self.pcs.items():
+            rows.append({'pc': pc, 'location': self.symbolizer.locate(pc), 'count': count,
+                         'cycles': cycles, 'size': size, 'instruction': disassemble(word, pc)})
+        rows.sort(key=lambda row: (-row['cycles'], row['pc']))
+        return rows[:top] if top else rows
+
+    def functions(self) -> List[Dict[str, any]]:
+        """Per-function self and inclusive counts from the call stacks, most self cycles first."""
+        table: Dict[str, Dict[str, int]] = {}
+        for key, (count, cycles) in self.stacks.items():
+            names = key.split(';')
+            for name in set(names):
+                entry = table.setdefault(name, {'name': name, 'calls': self.calls.get(name, 0),
+                                                'instructions': 0, 'self_cycles': 0,
+                                                'total_cycles': 0})
+                entry['total_cycles'] += cycles
+            leaf = table[names[-1]]
+            leaf['instructions'] += count
+            leaf['self_cycles'] += cycles
+        return sorted(table.values(), key=lambda e: (-e['self_cycles'], -e['total_cycles'], e['name']))
+
+    def folded(self, weight: str = 'cycles') -> List[str]:
+        """Folded-stack lines ('outer;inner weight') for flame-graph tools."""
+        if weight not in WEIGHTS:
+            raise ValueError(f"Unknown weight '{weight}' (expected one of {', '.join(WEIGHTS)})")
+        index = WEIGHTS.index(weight) ^ 1
+        return [f"{key} {value[index]}" for key, value in sorted(self.stacks.items())
+                if value[index]]
+
+    def summary(self, top: Optional[int] = None) -> Dict[str, any]:
+        """Everything in one JSON-friendly dict."""
+        return {
+            'instructions': self.instructions,
+            'cycles': self.cycles,
+            'cpi': self.cycles / self.instructions if self.instructions else 0.0,
+            'mix': self.mix(),
+            'functions': self.functions(),
+            'hotspots': self.hotspots(top),
+            'unmatched_returns': self.unmatched_returns,
+            'truncated_calls': self.truncated_calls,
+        }
+
+
+def load_program(iss: VignaISS, path: str, base_addr: int = 0) -> List[Dict[str, any]]:
+    """Load a $readmemh image or an ELF into the ISS; returns the ELF's symbols."""
+    with open(path, 'rb') as f:
+        data = f.read()
+    if not is_elf(data):
+        iss.load_mem(path, base_addr)
+        return []
+    elf = read_elf(data)
+    for segment in elf['segments']:
+        iss.load_bytes(segment['data'], segment['addr'])
+    return elf['symbols']
+
+
+def profile_program(iss: VignaISS, profiler: Profiler, timing=None,
+                    max_instructions: int = 10_000_000) -> str:
+    """Run a loaded ISS into the profiler; returns the stop reason."""
+    decoded: Dict[int, Tuple[int, int]] = {}
+    instruction_at = iss.instruction_at
+
+    def retire(pc: int, cycles: int):
+        entry = decoded.get(pc)
+        if entry is None:
+            entry = decoded[pc] = instruction_at(pc)
+        profiler.retire(pc, entry[0], cycles, entry[1])
+
+    return iss.run(max_instructions, timing=timing, retire=retire)
+
+
+def profile_trace(lines: Iterable[str], profiler: Profiler, iss: Optional[VignaISS] = None) -> int:
+    """Feed a retire trace into the profiler; returns the number of sections.
+
+    Instruction sizes come from the image loaded in iss or, without one, from
+    the distance to the next PC when that is 2 or 4.
+    """
+    sections = 0
+    pending = None
+
+    def flush(next_pc: Optional[int], next_cycle: int):
+        pc, inst, cycle = pending
+        if iss is not None:
+            size = iss.instruction_at(pc)[1]
+        elif next_pc is not None and next_pc - pc in (2, 4):
+            size = next_pc - pc
+        else:
+            size = None
+        profiler.retire(pc, inst, next_cycle - cycle, size)
+
+    for line in lines:
+        record = parse_trace_line(line)
+        if record is None:
+            continue
+        if record[0] == 'section':
+            if pending is not None:
+                flush(None, pending[2] + 1)
+                pending = None
+            profiler.reset()
+            sections += 1
+            continue
+        _, pc, inst, _, _, cycle = record
+        if cycle is None:
+            raise ValueError("trace has no cycle column; record it with the current "
+                             "sim/vigna_retire_trace.vh")
+        if pending is not None:
+            flush(pc, cycle)
+        pending = (pc, inst, cycle)
+    if pending is not None:
+        flush(None, pending[2] + 1)
+    return sections
+
+
+def format_report(profiler: Profiler, top: int = 20) -> str:
+    """Text report: instruction mix, functions and hot spots."""
+    total = profiler.cycles or 1
+    lines = [f"Instructions: {profiler.instructions}",
+             f"Cycles:       {profiler.cycles}",
+             f"CPI:          {profiler.cycles / profiler.instructions if profiler.instructions else 0:.3f}",
+             "",
+             f"{'Class':10} {'Count':>10} {'Cycles':>12} {'Share':>7} {'Avg':>7}"]
+    for name, entry in profiler.mix().items():
+        count, cycles = entry['instructions'], entry['cycles']
+        if count:
+            lines.append(f"{name:10} {count:10d} {cycles:12d} {100 * cycles / total:6.1f}% "
+                         f"{cycles / count:7.2f}")
+
+    lines += ["", f"{'Function':24} {'Calls':>7} {'Instrs':>10} {'Self':>10} {'Share':>7} "
+                  f"{'Total':>10} {'Share':>7}"]
+    for entry in profiler.functions()[:top]:
+        lines.append(f"{entry['name'][:24]:24} {entry['calls']:7d} {entry['instructions']:10d} "
+                     f"{entry['self_cycles']:10d} {100 * entry['self_cycles'] / total:6.1f}% "
+                     f"{entry['total_cycles']:10d} {100 * entry['total_cycles'] / total:6.1f}%")
+
+    lines += ["", f"{'PC':10} {'Location':24} {'Count':>8} {'Cycles':>10} {'Share':>7} "
+                  f"{'CPI':>6}  Instruction"]
+    for row in profiler.hotspots(top):
+        lines.append(f"{row['pc']:08x}   {row['location'][:24]:24} {row['count']:8d} "
+                     f"{row['cycles']:10d} {100 * row['cycles'] / total:6.1f}% "
+                     f"{row['cycles'] / row['count']:6.2f}  {row['instruction']}")
+    if profiler.unmatched_returns or profiler.truncated_calls:
+        lines += ["", f"Call stack: {profiler.unmatched_returns} returns without a call, "
+                      f"{profiler.truncated_calls} calls beyond depth {profiler.max_depth}"]
+    return "\n".join(lines)
+
+
+def main():
+    """Command-line interface for the profiler."""
+    parser = argparse.ArgumentParser(description="VIGNA dynamic profiler")
+    parser.add_argument('program', nargs='?',
+                        help='Program image (.mem) or ELF; with --trace only used for '
+                             'instruction sizes and symbols')
+    parser.add_argument('--trace', help='Profile an RTL retire trace written with +trace=<file>')
+    parser.add_argument('--symbols', help='ELF or .sym symbol table (default: the ELF program, '
+                                          'or <program>.sym next to the image)')
+    parser.add_argument('--config', help='Predefined configuration name (e.g. rv32imc)')
+    parser.add_argument('--conf', help='Configuration header to read (e.g. vigna_conf.vh)')
+    parser.add_argument('--base-addr', type=lambda x: int(x, 0), default=0,
+                        help='Load address of a .mem image (default: 0)')
+    parser.add_argument('--mem-size', type=lambda x: int(x, 0), default=DEFAULT_MEM_SIZE,
+                        help=f'Simulated memory size in bytes (default: {DEFAULT_MEM_SIZE})')
+    parser.add_argument('--imem-latency', type=int, default=1,
+                        help='Instruction memory ready latency in cycles (default: 1)')
+    parser.add_argument('--dmem-latency', type=int, default=1,
+                        help='Data memory ready latency in cycles (default: 1)')
+    parser.add_argument('--max-instructions', type=int, default=10_000_000,
+                        help='Instruction budget (default: 10000000)')
+    parser.add_argument('--top', type=int, default=20,
+                        help='Functions and hot spots to list (default: 20)')
+    parser.add_argument('--folded', help='Write folded stacks for flame-graph tools to this file')
+    parser.add_argument('--weight', choices=WEIGHTS, default='cycles',
+                        help='Folded-stack weight (default: cycles)')
+    parser.add_argument('--json', help='Write the full profile as JSON to this file')
+    args = parser.parse_args()
+
+    if not args.program and not args.trace:
+        print("Error: give a program to run or a --trace to profile")
+        sys.exit(1)
+    if not args.config and not args.conf:
+        default_conf = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                    '..', 'vigna_conf.vh')
+        args.conf = default_conf if os.path.exists(default_conf) else None
+
+    try:
+        config = build_config(args.config, args.conf)
+        iss = None
+        symbols = []
+        if args.program:
+            iss = VignaISS(config, mem_size=args.mem_size)
+            symbols = load_program(iss, args.program, args.base_addr)
+        if args.symbols:
+            symbols = load_symbols(args.symbols)
+        elif args.program and not symbols:
+            sym_file = os.path.splitext(args.program)[0] + '.sym'
+            if os.path.exists(sym_file):
+                symbols = load_symbols(sym_file)
+        profiler = Profiler(Symbolizer(symbols))
+
+        if args.trace:
+            with open(args.trace, 'r') as f:
+                sections = profile_trace(f, profiler, iss)
+            source = f"{args.trace} ({sections} section(s))"
+        else:
+            model = VignaTimingModel(config, args.imem_latency, args.dmem_latency)
+            reason = profile_program(iss, profiler, model, args.max_instructions)
+            source = f"{args.program} on the ISS timing model, stopped ({reason}) at PC=0x{iss.pc:08x}"
+    except (ValueError, OSError, VignaISSError) as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+
+    print(f"Profile of {source}")
+    if not symbols:
+        print("No symbols: functions are named by their entry address")
+    print(format_report(profiler, args.top))
+
+    if args.folded:
+        with open(args.folded, 'w') as f:
+            for line in profiler.folded(args.weight):
+                f.write(line + "\n")
+        print(f"\nFolded stacks ({args.weight}) written to {args.folded}")
+    if args.json:
+        summary = profiler.summary()
+        summary['source'] = source
+        with open(args.json, 'w') as f:
+            json.dump(summary, f, indent=2)
+        print(f"Profile written to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
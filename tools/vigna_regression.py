@@ -0,0 +1,476 @@
+#!/usr/bin/env python3
+"""
+VIGNA Parallel Regression Runner
+
+Compiles and runs every (configuration x testbench) pair with Icarus Verilog
+on a pool of workers, streaming PASS/FAIL lines as the simulations print them
+and writing JUnit XML / JSON reports at the end.
+
+Configurations come from PREDEFINED_CONFIGS in vigna_config_generator.py,
+plus, with --sample, covering-array rows from vigna_config_space.py. Each
+job gets its own directory holding a generated vigna_conf.vh; iverilog and vvp
+run inside that directory, so `include "vigna_conf.vh" resolves to the job's
+configuration before falling back to the repository root (-I).
+
+Usage:
+    python3 vigna_regression.py
+    python3 vigna_regression.py --config rv32im --config rv32imc -j 8
+    python3 vigna_regression.py --testbench program --junit report.xml --json report.json
+    python3 vigna_regression.py --config rv32im -D VIGNA_CORE_C_EXTENSION
+    python3 vigna_regression.py --sample 2 --compile-only -j 16
+"""
+
+import os
+import re
+import sys
+import json
+import time
+import shutil
+import argparse
+import tempfile
+import threading
+import subprocess
+import xml.etree.ElementTree as ET
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from glob import glob
+from typing import Dict, List, Optional, Tuple
+
+from vigna_config_generator import VignaConfigGenerator, PREDEFINED_CONFIGS
+from vigna_vvp_cache import VvpCache, DEFAULT_CACHE_DIR, DEFAULT_MAX_BYTES
+from vigna_preprocessor import parse_define_args
+from vigna_config_space import sample_configs, parse_fixed
+
+REPO_ROOT = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+CORE_SOURCES = ['vigna_core.v']
+
+# Testbenches known to the runner.
+#   source:   testbench file, relative to the repository root
+#   sources:  extra design sources compiled before the testbench
+#   data:     files (globs) copied into the job directory before vvp runs
+#   requires: configuration options that must be enabled
+#   excludes: configuration options that must be disabled
+TESTBENCHES = {
+    'processor': {
+        'source': 'sim/processor_testbench.v',
+    },
+    'enhanced': {
+        'source': 'sim/enhanced_processor_testbench.v',
+        'excludes': ['e_extension'],
+    },
+    'comprehensive': {
+        'source': 'sim/comprehensive_processor_testbench.v',
+        'excludes': ['e_extension'],
+    },
+    'program': {
+        'source': 'sim/program_testbench.v',
+        'data': ['programs/build/*.mem'],
+        'excludes': ['e_extension'],
+    },
+    'axi': {
+        'source': 'sim/vigna_axi_testbench.v',
+        'sources': ['vigna_axi.v'],
+    },
+    'axi_backpressure': {
+        'source': 'sim/axi_backpressure_test.v',
+        'sources': ['vigna_axi.v'],
+        'data': ['programs/build/sorting_test.mem'],
+        'excludes': ['e_extension'],
+    },
+    'interrupt': {
+        'source': 'sim/interrupt_test.v',
+        'requires': ['interrupt', 'zicsr_extension'],
+    },
+    'c_extension': {
+        'source': 'sim/c_extension_testbench.v',
+        'requires': ['c_extension'],
+    },
+    'm_extension': {
+        'source': 'sim/m_extension_test.v',
+        'requires': ['m_extension'],
+    },
+    'perf_counters': {
+        'source': 'sim/perf_counter_test.v',
+        'requires': ['perf_counters', 'zicsr_extension'],
+    },
+}
+
+# Testbenches run when none are given on the command line. Incompatible
+# pairs are skipped, so rv32e only runs the basic processor testbench.
+DEFAULT_TESTBENCHES = ['comprehensive', 'program', 'interrupt', 'c_extension', 'm_extension',
+                       'perf_counters']
+FALLBACK_TESTBENCH = 'processor'
+
+PASS_RE = re.compile(r'^\s*PASS\b')
+FAIL_RE = re.compile(r'^\s*FAIL\b')
+SUMMARY_FAIL_RE = re.compile(r'FAILED|[Tt]imeout|TIMEOUT')
+SUMMARY_PASS_RE = re.compile(r'PASSED')
+
+
+class Job:
+    """One configuration compiled against one testbench."""
+
+    def __init__(self, config_name: str, config: Dict[str, any], testbench: str,
+                 defines: Optional[Dict[str, str]] = None,
+                 options: Optional[Dict[str, any]] = None):
+        self.config_name = config_name
+        self.config = config                # effective configuration (after defines)
+        self.options = options or config    # what the job's vigna_conf.vh holds
+        self.testbench = testbench
+        self.defines = defines or {}
+        self.status = 'pending'
+        self.passed = 0
+        self.failed = 0
+        self.message = ''
+        self.output: List[str] = []
+        self.compile_time = 0.0
+        self.run_time = 0.0
+        self.cached = False
+        self.workdir: Optional[str] = None
+
+    @property
+    def name(self) -> str:
+        return f"{self.config_name}/{self.testbench}"
+
+    def to_dict(self) -> Dict[str, any]:
+        return {
+            'config': self.config_name,
+            'testbench': self.testbench,
+            'status': self.status,
+            'passed': self.passed,
+            'failed': self.failed,
+            'message': self.message,
+            'cached': self.cached,
+            'compile_time': round(self.compile_time, 3),
+            'run_time': round(self.run_time, 3),
+        }
+
+
+def testbench_compatible(testbench: str, config: Dict[str, any]) -> bool:
+    """Check a testbench's requires/excludes lists against a configuration."""
+    info = TESTBENCHES[testbench]
+    if any(not config.get(option, False) for option in info.get('requires', [])):
+        return False
+    return not any(config.get(option, False) for option in info.get('excludes', []))
+
+
+def build_jobs(config_names: Optional[List[str]] = None,
+               testbenches: Optional[List[str]] = None,
+               defines: Optional[Dict[str, str]] = None,
+               configs: Optional[Dict[str, Dict[str, any]]] = None) -> List[Job]:
+    """Build the job matrix, skipping incompatible (config, testbench) pairs.
+
+    Configurations are the named predefined ones, or `configs` ({name:
+    options}) when given. With the default testbench list, a configuration
+    that none of them supports still gets the basic processor testbench.
+    Command-line `defines` are passed to iverilog, and compatibility is
+    judged on the configuration they produce.
+    """
+    if configs is None:
+        config_names = config_names or list(PREDEFINED_CONFIGS)
+        for name in config_names:
+            if name not in PREDEFINED_CONFIGS:
+                raise ValueError(f"unknown configuration '{name}'")
+        configs = {name: PREDEFINED_CONFIGS[name]['options'] for name in config_names}
+    explicit = testbenches is not None
+    testbenches = testbenches or DEFAULT_TESTBENCHES
+
+    for name in testbenches:
+        if name not in TESTBENCHES:
+            raise ValueError(f"unknown testbench '{name}'")
+
+    jobs = []
+    generator = VignaConfigGenerator()
+    for config_name, options in configs.items():
+        config = generator.apply_defines(options, defines) if defines else options
+        selected = [tb for tb in testbenches if testbench_compatible(tb, config)]
+        if not selected and not explicit:
+            selected = [FALLBACK_TESTBENCH]
+        jobs.extend(Job(config_name, config, tb, defines, options) for tb in selected)
+    return jobs
+
+
+def classify_line(line: str) -> Optional[str]:
+    """Return 'pass' / 'fail' for a check line printed by a testbench."""
+    if PASS_RE.match(line):
+        return 'pass'
+    if FAIL_RE.match(line):
+        return 'fail'
+    return None
+
+
+def evaluate_output(lines: List[str], returncode: int) -> Tuple[str, int, int, str]:
+    """Derive (status, passed, failed, message) from simulation output."""
+    passed = sum(1 for line in lines if classify_line(line) == 'pass')
+    failed = sum(1 for line in lines if classify_line(line) == 'fail')
+    summary_fail = [line.strip() for line in lines if SUMMARY_FAIL_RE.search(line)]
+    summary_pass = any(SUMMARY_PASS_RE.search(line) for line in lines)
+
+    if returncode != 0:
+        return 'error', passed, failed, f"vvp exited with status {returncode}"
+    if failed or summary_fail:
+        message = summary_fail[0] if summary_fail else f"{failed} check(s) failed"
+        return 'fail', passed, failed, message
+    if not passed and not summary_pass:
+        return 'error', passed, failed, "no PASS/FAIL output"
+    return 'pass', passed, failed, ''
+
+
+def prepare_workdir(job: Job, root: str) -> str:
+    """Create the job directory with its vigna_conf.vh and data files."""
+    workdir = os.path.join(root, f"{job.config_name}__{job.testbench}")
+    os.makedirs(workdir, exist_ok=True)
+    generator = VignaConfigGenerator()
+    conf_path = os.path.join(workdir, 'vigna_conf.vh')
+    title = PREDEFINED_CONFIGS.get(job.config_name, {}).get('name', job.config_name)
+    if not generator.generate_config_file(job.options, conf_path, title):
+        raise OSError(f"could not write {conf_path}")
+    for pattern in TESTBENCHES[job.testbench].get('data', []):
+        for path in glob(os.path.join(REPO_ROOT, pattern)):
+            shutil.copy(path, workdir)
+    return workdir
+
+
+def compile_command(job: Job, output: str, iverilog: str = 'iverilog') -> List[str]:
+    """iverilog command line for a job (run from the job directory)."""
+    info = TESTBENCHES[job.testbench]
+    sources = info.get('sources', []) + CORE_SOURCES + [info['source']]
+    defines = [f"-D{name}={value}" if value else f"-D{name}"
+               for name, value in job.defines.items()]
+    return ([iverilog, '-o', output, '-I', REPO_ROOT] + defines +
+            [os.path.join(REPO_ROOT, source) for source in sources])
+
+
+class Runner:
+    """Runs jobs on a thread pool; each worker drives its own iverilog/vvp processes."""
+
+    def __init__(self, jobs: List[Job], workers: int, timeout: float,
+                 workroot: str, waves: bool = False, verbose: bool = False,
+                 iverilog: str = 'iverilog', vvp: str = 'vvp',
+                 cache: Optional[VvpCache] = None, compile_only: bool = False):
+        self.jobs = jobs
+        self.workers = workers
+        self.timeout = timeout
+        self.workroot = workroot
+        self.waves = waves
+        self.verbose = verbose
+        self.iverilog = iverilog
+        self.vvp = vvp
+        self.cache = cache
+        self.compile_only = compile_only
+        self._lock = threading.Lock()
+
+    def _emit(self, job: Job, text: str):
+        with self._lock:
+            print(f"[{job.name}] {text}", flush=True)
+
+    def _compile(self, job: Job) -> Optional[str]:
+        output = os.path.join(job.workdir, 'sim.vvp')
+        start = time.time()
+        command = compile_command(job, output, self.iverilog)
+        if self.cache is not None:
+            result, job.cached = self.cache.compile(command[1:], job.workdir,
+                                                    self.iverilog, self.timeout)
+        else:
+            result = subprocess.run(command, cwd=job.workdir, capture_output=True,
+                                    text=True, timeout=self.timeout)
+        job.compile_time = time.time() - start
+        if result.returncode != 0:
+            job.output.extend((result.stdout + result.stderr).splitlines())
+            job.status = 'error'
+            job.message = 'compilation failed'
+            return None
+        return output
+
+    def _simulate(self, job: Job, vvp_file: str):
+        command = [self.vvp, '-n', vvp_file]
+        if not self.waves:
+            command.append('-none')
+        start = time.time()
+        process = subprocess.Popen(command, cwd=job.workdir, stdout=subprocess.PIPE,
+                                   stderr=subprocess.STDOUT, text=True)
+        timed_out = threading.Event()
+
+        def kill():
+            timed_out.set()
+            process.kill()
+        timer = threading.Timer(self.timeout, kill)
+        timer.start()
+        try:
+            for line in process.stdout:
+                line = line.rstrip('\n')
+                job.output.append(line)
+                kind = classify_line(line)
+                if kind == 'fail' or (kind == 'pass' and self.verbose):
+                    self._emit(job, line.strip())
+            returncode = process.wait()
+        finally:
+            timer.cancel()
+        job.run_time = time.time() - start
+        if timed_out.is_set():
+            job.status, job.passed, job.failed = 'error', 0, 0
+            job.message = f"timed out after {self.timeout:.0f}s"
+            return
+        job.status, job.passed, job.failed, job.message = evaluate_output(job.output, returncode)
+
+    def run_job(self, job: Job) -> Job:
+        try:
+            job.workdir = prepare_workdir(job, self.workroot)
+            vvp_file = self._compile(job)
+            if vvp_file and self.compile_only:
+                job.status = 'pass'
+            elif vvp_file:
+                self._simulate(job, vvp_file)
+        except subprocess.TimeoutExpired:
+            job.status = 'error'
+            job.message = f"compilation timed out after {self.timeout:.0f}s"
+        except OSError as e:
+            job.status = 'error'
+            job.message = str(e)
+        return job
+
+    def run(self) -> List[Job]:
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            futures = [pool.submit(self.run_job, job) for job in self.jobs]
+            for future in as_completed(futures):
+                job = future.result()
+                detail = f"{job.passed} passed, {job.failed} failed"
+                if job.cached:
+                    detail += ", cached build"
+                if job.message:
+                    detail += f" - {job.message}"
+                self._emit(job, f"{job.status.upper()} ({detail}, "
+                                f"{job.compile_time + job.run_time:.1f}s)")
+                if job.status == 'error' and job.output:
+                    with self._lock:
+                        for line in job.output[-20:]:
+                            print(f"    {line}")
+        return self.jobs
+
+
+def write_json_report(jobs: List[Job], path: str, elapsed: float):
+    """Write a JSON summary of all jobs."""
+    report = {
+        'elapsed': round(elapsed, 3),
+        'total': len(jobs),
+        'passed': sum(1 for job in jobs if job.status == 'pass'),
+        'failed': sum(1 for job in jobs if job.status == 'fail'),
+        'errors': sum(1 for job in jobs if job.status == 'error'),
+        'jobs': [job.to_dict() for job in jobs],
+    }
+    with open(path, 'w') as f:
+        json.dump(report, f, indent=2)
+
+
+def write_junit_report(jobs: List[Job], path: str, elapsed: float):
+    """Write a JUnit XML report with one testsuite per configuration."""
+    root = ET.Element('testsuites', name='vigna_regression', time=f"{elapsed:.3f}")
+    for config_name in dict.fromkeys(job.config_name for job in jobs):
+        suite_jobs = [job for job in jobs if job.config_name == config_name]
+        suite = ET.SubElement(
+            root, 'testsuite', name=config_name,
+            tests=str(len(suite_jobs)),
+            failures=str(sum(1 for job in suite_jobs if job.status == 'fail')),
+            errors=str(sum(1 for job in suite_jobs if job.status == 'error')),
+            time=f"{sum(job.compile_time + job.run_time for job in suite_jobs):.3f}")
+        for job in suite_jobs:
+            case = ET.SubElement(suite, 'testcase', classname=f"vigna.{config_name}",
+                                 name=job.testbench,
+                                 time=f"{job.compile_time + job.run_time:.3f}")
+            if job.status in ('fail', 'error'):
+                tag = 'failure' if job.status == 'fail' else 'error'
+                element = ET.SubElement(case, tag, message=job.message)
+                element.text = '\n'.join(job.output)
+            elif job.status == 'pending':
+                ET.SubElement(case, 'skipped')
+            ET.SubElement(case, 'system-out').text = '\n'.join(job.output)
+    ET.ElementTree(root).write(path, encoding='utf-8', xml_declaration=True)
+
+
+def main():
+    """Command-line interface for the regression runner."""
+    parser = argparse.ArgumentParser(description="VIGNA parallel regression runner")
+    parser.add_argument('--config', action='append',
+                        help='Predefined configuration to test (repeatable, default: all)')
+    parser.add_argument('--testbench', action='append', choices=sorted(TESTBENCHES),
+                        help=f"Testbench to run (repeatable, default: {', '.join(DEFAULT_TESTBENCHES)})")
+    parser.add_argument('--sample', type=int, metavar='STRENGTH',
+                        help='Add covering-array configurations so every STRENGTH-way option '
+                             'combination is tested (2 = pairwise); --config picks the base set')
+    parser.add_argument('--seed', type=int, default=0, help='Random seed for --sample (default: 0)')
+    parser.add_argument('--fix', action='append', default=[],
+                        help='With --sample, hold an option at NAME=0 or NAME=1 (repeatable)')
+    parser.add_argument('--compile-only', action='store_true',
+                        help='Only compile (elaborate) each job, do not simulate')
+    parser.add_argument('-D', '--define', action='append', default=[],
+                        help='Pass a define NAME[=VALUE] to every compilation (repeatable)')
+    parser.add_argument('-j', '--jobs', type=int, default=os.cpu_count() or 1,
+                        help='Number of parallel jobs (default: number of CPUs)')
+    parser.add_argument('--timeout', type=float, default=300.0,
+                        help='Per-step timeout in seconds (default: 300)')
+    parser.add_argument('--workdir', help='Directory for job files (default: temporary)')
+    parser.add_argument('--keep', action='store_true', help='Keep job directories')
+    parser.add_argument('--waves', action='store_true', help='Let testbenches write VCD files')
+    parser.add_argument('--no-cache', action='store_true',
+                        help='Always run iverilog instead of using the .vvp cache')
+    parser.add_argument('--cache-dir', default=DEFAULT_CACHE_DIR,
+                        help=f'Compiled simulation cache directory (default: {DEFAULT_CACHE_DIR})')
+    parser.add_argument('--cache-size', type=int, default=DEFAULT_MAX_BYTES // (1024 * 1024),
+                        help='Cache size limit in MiB (default: %(default)s)')
+    parser.add_argument('--junit', help='Write a JUnit XML report to this file')
+    parser.add_argument('--json', help='Write a JSON report to this file')
+    parser.add_argument('--list', action='store_true', help='List the job matrix and exit')
+    parser.add_argument('-v', '--verbose', action='store_true', help='Also stream PASS lines')
+    args = parser.parse_args()
+
+    try:
+        configs = None
+        if args.sample:
+            configs = sample_configs(args.sample, args.seed, parse_fixed(args.fix), args.config)
+        jobs = build_jobs(args.config, args.testbench, parse_define_args(args.define), configs)
+    except ValueError as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+
+    if args.list:
+        for job in jobs:
+            print(job.name)
+        return
+
+    for tool in ('iverilog', 'vvp'):
+        if shutil.which(tool) is None:
+            print(f"Error: '{tool}' not found in PATH (install Icarus Verilog)")
+            sys.exit(1)
+
+    workroot = args.workdir or tempfile.mkdtemp(prefix='vigna_regression_')
+    os.makedirs(workroot, exist_ok=True)
+    print(f"Running {len(jobs)} jobs on {args.jobs} workers in {workroot}")
+
+    start = time.time()
+    cache = None if args.no_cache else VvpCache(args.cache_dir, args.cache_size * 1024 * 1024)
+    runner = Runner(jobs, args.jobs, args.timeout, workroot, args.waves, args.verbose,
+                    cache=cache, compile_only=args.compile_only)
+    runner.run()
+    elapsed = time.time() - start
+
+    if args.json:
+        write_json_report(jobs, args.json, elapsed)
+    if args.junit:
+        write_junit_report(jobs, args.junit, elapsed)
+
+    failed = [job for job in jobs if job.status != 'pass']
+    print("-" * 60)
+    print(f"{len(jobs) - len(failed)}/{len(jobs)} jobs passed in {elapsed:.1f}s")
+    if cache is not None:
+        print(f"{sum(1 for job in jobs if job.cached)}/{len(jobs)} builds served from {args.cache_dir}")
+    for job in failed:
+        print(f"  {job.status.upper():5} {job.name}: {job.message}")
+
+    if not args.keep and not args.workdir:
+        shutil.rmtree(workroot, ignore_errors=True)
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,345 @@
+#!/usr/bin/env python3
+"""
+VIGNA Memory Latency Sweep
+
+Runs the program suite on the program harness over a grid of memory
+latencies for each configuration and reports cycles per instruction against
+memory latency. The harness memory (sim/vigna_mem_model.v) takes the
+latencies as plusargs, so each configuration is compiled once and every grid
+point is just another run. Instruction counts come from the instruction-set
+simulator; for fixed latencies the timing model's prediction is listed next
+to the measurement.
+
+By default the instruction and data latencies move together (--vary both);
+--vary imem or --vary dmem sweeps one of them with the other held at
+--fixed-latency. Random latency (--jitter), bank conflicts between the two
+ports (--banks) and the sparse address space (--sparse) apply to every
+point.
+
+The programs are the harness expectation files (programs/expected/*.json by
+default) and/or benchmarks of programs/bench (--bench, images built with
+`make -C programs bench`).
+
+Usage:
+    python3 vigna_sweep.py
+    python3 vigna_sweep.py --config rv32i --config rv32im --latency 1,2,4,8
+    python3 vigna_sweep.py --config rv32im --enable prefetch --vary imem
+    python3 vigna_sweep.py --bench sort --bench crc32 --vary dmem --jitter 2 --plot cpi.png
+    python3 vigna_sweep.py --banks 4 --csv sweep.csv programs/expected/*.json
+"""
+
+import os
+import sys
+import csv
+import glob
+import json
+import time
+import shutil
+import argparse
+import tempfile
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+from vigna_config_generator import VignaConfigGenerator, CONFIG_OPTIONS, PREDEFINED_CONFIGS
+from vigna_harness import compile_harness, run_program, load_expectation
+from vigna_bench import load_suite, isa_variant, bench_expectation, DEFAULT_SUITE
+from vigna_iss import VignaISS, VignaISSError, build_config
+from vigna_timing import VignaTimingModel, predict_testbench_cycles
+from vigna_vvp_cache import VvpCache, DEFAULT_CACHE_DIR
+
+REPO_ROOT = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+DEFAULT_EXPECTATIONS = os.path.join(REPO_ROOT, 'programs', 'expected', '*.json')
+DEFAULT_CONFIG = 'vigna_conf.vh'
+DEFAULT_LATENCIES = [1, 2, 3, 4, 6, 8]
+
+CSV_FIELDS = ['config', 'program', 'imem_latency', 'dmem_latency', 'status', 'cycles',
+              'instructions', 'cpi', 'model_cpi']
+
+
+def parse_latencies(text: str) -> List[int]:
+    """Latency list from "1,2,4" or ranges such as "1-4,8", sorted and unique."""
+    values = set()
+    for part in text.split(','):
+        part = part.strip()
+        if not part:
+            continue
+        low, _, high = part.partition('-')
+        try:
+            first, last = int(low), int(high or low)
+        except ValueError:
+            raise ValueError(f"bad latency '{part}'")
+        if first < 1 or last < first:
+            raise ValueError(f"bad latency '{part}' (latencies start at 1)")
+        values.update(range(first, last + 1))
+    if not values:
+        raise ValueError("no latencies given")
+    return sorted(values)
+
+
+def latency_grid(latencies: List[int], vary: str = 'both', fixed: int = 1) -> List[Tuple[int, int]]:
+    """(imem, dmem) latency pairs of the sweep."""
+    if vary == 'both':
+        return [(latency, latency) for latency in latencies]
+    if vary == 'imem':
+        return [(latency, fixed) for latency in latencies]
+    if vary == 'dmem':
+        return [(fixed, latency) for latency in latencies]
+    raise ValueError(f"unknown sweep axis '{vary}'")
+
+
+def memory_plusargs(imem: int, dmem: int, jitter: int = 0, banks: int = 0,
+                    seed: Optional[int] = None, sparse: bool = False) -> List[str]:
+    """Harness plusargs selecting one memory model setting."""
+    args = [f"+imem_latency={imem}", f"+dmem_latency={dmem}"]
+    if jitter:
+        args += [f"+imem_jitter={jitter}", f"+dmem_jitter={jitter}"]
+    if banks:
+        args.append(f"+mem_banks={banks}")
+    if seed is not None:
+        args.append(f"+mem_seed={seed}")
+    if sparse:
+        args.append("+mem_sparse")
+    return args
+
+
+def iss_run(config: Dict[str, any], exp: Dict[str, any],
+            latencies: Optional[Tuple[int, int]] = None) -> Tuple[int, Optional[int]]:
+    """(instructions, predicted harness cycles) of a program on the ISS.
+
+    Cycles are only predicted when `latencies` (imem, dmem) are given.
+    """
+    iss = VignaISS(config, mem_size=exp['mem_size'])
+    iss.load_mem(exp['image'])
+    timing = VignaTimingModel(config, *latencies) if latencies else None
+    reason = iss.run(exp['max_cycles'], timing=timing)
+    if reason != 'halt':
+        raise VignaISSError(f"{exp['image']}: ISS stopped with '{reason}' instead of halting")
+    return iss.instret, predict_testbench_cycles(iss) if timing else None
+
+
+def summarize(results: List[Dict[str, any]]) -> Dict[str, Dict[int, float]]:
+    """Mean CPI over the passing programs, per configuration and sweep position."""
+    points: Dict[str, Dict[int, List[float]]] = {}
+    for r in results:
+        if r['status'] == 'pass':
+            points.setdefault(r['config'], {}).setdefault(r['x'], []).append(r['cpi'])
+    return {config: {x: sum(cpis) / len(cpis) for x, cpis in sorted(by_x.items())}
+            for config, by_x in points.items()}
+
+
+def write_csv(path: str, results: List[Dict[str, any]]):
+    with open(path, 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=CSV_FIELDS, extrasaction='ignore')
+        writer.writeheader()
+        for r in results:
+            writer.writerow({field: r.get(field) for field in CSV_FIELDS})
+
+
+def plot_cpi(summary: Dict[str, Dict[int, float]], path: str, xlabel: str, title: str = ''):
+    """Line plot of mean CPI against latency, one line per configuration."""
+    try:
+        import matplotlib
+        matplotlib.use('Agg')
+        import matplotlib.pyplot as plt
+    except ImportError:
+        raise ImportError("plotting needs matplotlib (pip install matplotlib)")
+    fig, ax = plt.subplots(figsize=(7, 4.5))
+    for config, points in summary.items():
+        ax.plot(list(points), list(points.values()), marker='o', label=config)
+    ax.set_xlabel(xlabel)
+    ax.set_ylabel('cycles per instruction')
+    if title:
+        ax.set_title(title)
+    ax.grid(True, alpha=0.3)
+    ax.legend()
+    fig.tight_layout()
+    fig.savefig(path)
+    plt.close(fig)
+
+
+def sweep_program(vvp_file: str, config_name: str, config: Dict[str, any], exp: Dict[str, any],
+                  point: Tuple[int, int], x: int, plusargs: List[str], predict: bool,
+                  instructions: Dict[str, int], workdir: str, timeout: float) -> Dict[str, any]:
+    """Simulate one program at one grid point and derive its CPI."""
+    result = {'config': config_name, 'program': exp['name'], 'imem_latency': point[0],
+              'dmem_latency': point[1], 'x': x, 'status': 'error', 'message': '',
+              'cycles': None, 'instructions': instructions.get(exp['name']), 'cpi': None,
+              'model_cpi': None}
+    if not os.path.exists(exp['image']):
+        result['message'] = f"{exp['image']} not built"
+        return result
+    try:
+        if predict:
+            result['instructions'], predicted = iss_run(config, exp, point)
+            result['model_cpi'] = round(predicted / result['instructions'], 4)
+        elif result['instructions'] is None:
+            result['instructions'] = instructions[exp['name']] = iss_run(config, exp)[0]
+    except (OSError, ValueError, VignaISSError) as e:
+        result['message'] = f"ISS: {e}"
+        return result
+    run = run_program(vvp_file, exp, workdir, timeout, plusargs=plusargs)
+    result['status'], result['message'], result['cycles'] = run['status'], run['message'], run['cycles']
+    if run['status'] == 'pass':
+        result['cpi'] = round(run['cycles'] / result['instructions'], 4)
+    return result
+
+
+def main():
+    """Command-line interface for the latency sweep."""
+    parser = argparse.ArgumentParser(description="VIGNA CPI against memory latency sweep")
+    parser.add_argument('expectations', nargs='*',
+                        help='Expectation files (.json, default: programs/expected/*.json '
+                             'unless --bench is given)')
+    parser.add_argument('--config', action='append', choices=sorted(PREDEFINED_CONFIGS),
+                        help='Predefined configuration (repeatable, default: repository vigna_conf.vh)')
+    parser.add_argument('--enable', action='append', default=[], metavar='OPTION',
+                        help='Enable this option in every configuration (repeatable)')
+    parser.add_argument('--bench', action='append', default=[],
+                        help='Benchmark of the bench suite to include (repeatable)')
+    parser.add_argument('--suite', default=DEFAULT_SUITE, help='Benchmark suite description (.json)')
+    parser.add_argument('--latency', type=parse_latencies,
+                        default=DEFAULT_LATENCIES,
+                        help='Latencies to sweep, e.g. 1,2,4,8 or 1-6 (default: 1,2,3,4,6,8)')
+    parser.add_argument('--vary', choices=['both', 'imem', 'dmem'], default='both',
+                        help='Latency swept: both ports together, or one of them (default: both)')
+    parser.add_argument('--fixed-latency', type=int, default=1,
+                        help='Latency of the port not swept with --vary imem/dmem (default: 1)')
+    parser.add_argument('--jitter', type=int, default=0,
+                        help='Random extra cycles (0..N) per request on both ports')
+    parser.add_argument('--banks', type=int, default=0,
+                        help='Word-interleaved banks shared by the two ports')
+    parser.add_argument('--seed', type=int, help='Jitter seed')
+    parser.add_argument('--sparse', action='store_true', help='Use the sparse address space')
+    parser.add_argument('--no-model', action='store_true',
+                        help='Do not list the timing model prediction for fixed latencies')
+    parser.add_argument('-j', '--jobs', type=int, default=os.cpu_count() or 1,
+                        help='Number of parallel simulations (default: number of CPUs)')
+    parser.add_argument('--timeout', type=float, default=1800.0,
+                        help='Per-simulation timeout in seconds (default: 1800)')
+    parser.add_argument('--no-cache', action='store_true', help='Do not use the .vvp cache')
+    parser.add_argument('--csv', help='Write one row per run to this file')
+    parser.add_argument('--json', help='Write the results as JSON')
+    parser.add_argument('--plot', help='Plot mean CPI against latency to this image (needs matplotlib)')
+    args = parser.parse_args()
+
+    if args.fixed_latency < 1 or args.jitter < 0 or args.banks < 0:
+        print("Error: --fixed-latency must be at least 1, --jitter and --banks not negative")
+        sys.exit(1)
+    grid = latency_grid(args.latency, args.vary, args.fixed_latency)
+    xlabel = {'both': 'memory latency (cycles)', 'imem': 'instruction memory latency (cycles)',
+              'dmem': 'data memory latency (cycles)'}[args.vary]
+    predict = not args.no_model and not args.jitter and not args.banks
+
+    paths = args.expectations or ([] if args.bench else sorted(glob.glob(DEFAULT_EXPECTATIONS)))
+    try:
+        programs = [load_expectation(path) for path in paths]
+        suite = load_suite(args.suite) if args.bench else None
+    except (OSError, ValueError, KeyError) as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+    for name in args.bench:
+        if name not in suite['benchmarks']:
+            print(f"Error: unknown benchmark '{name}'")
+            sys.exit(1)
+
+    generator = VignaConfigGenerator()
+    if args.config:
+        configs = {name: dict(PREDEFINED_CONFIGS[name]['options']) for name in args.config}
+    else:
+        configs = {DEFAULT_CONFIG: build_config(None, os.path.join(REPO_ROOT, 'vigna_conf.vh'))}
+    for option in args.enable:
+        if option not in CONFIG_OPTIONS or CONFIG_OPTIONS[option].get('type') == 'value':
+            print(f"Error: '{option}' is not a configuration switch")
+            sys.exit(1)
+        configs = {(name if config.get(option) else f"{name}+{option}"): dict(config, **{option: True})
+                   for name, config in configs.items()}
+        configs = {name: config for name, config in configs.items() if generator.validate_config(config)[0]}
+    if not configs:
+        print("Error: no valid configuration left")
+        sys.exit(1)
+
+    for tool in ('iverilog', 'vvp'):
+        if shutil.which(tool) is None:
+            print(f"Error: '{tool}' not found in PATH (install Icarus Verilog)")
+            sys.exit(1)
+
+    cache = None if args.no_cache else VvpCache(DEFAULT_CACHE_DIR)
+    workdir = tempfile.mkdtemp(prefix='vigna_sweep_')
+    start = time.time()
+    results = []
+    try:
+        with ThreadPoolExecutor(max_workers=args.jobs) as pool:
+            def compile_config(item):
+                config_dir = os.path.join(workdir, item[0])
+                os.makedirs(config_dir)
+                if item[0] == DEFAULT_CONFIG and not args.enable:
+                    return compile_harness(config_dir, None, cache, args.timeout)
+                return compile_harness(config_dir, item[0], cache, args.timeout, item[1])
+
+            vvp_files = dict(zip(configs, pool.map(compile_config, configs.items())))
+            jobs = []
+            for config_name, config in configs.items():
+                config_programs = list(programs)
+                if suite is not None:
+                    variant = isa_variant(config, suite['variants'])
+                    if variant is None:
+                        print(f"[{config_name}] no benchmark variant for this configuration")
+                    else:
+                        config_programs += [bench_expectation(suite, name, variant) for name in args.bench]
+                instructions: Dict[str, int] = {}
+                for exp in config_programs:
+                    for x, point in zip(args.latency, grid):
+                        plusargs = memory_plusargs(*point, args.jitter, args.banks, args.seed, args.sparse)
+                        jobs.append(pool.submit(sweep_program, vvp_files[config_name], config_name, config,
+                                                exp, point, x, plusargs, predict, instructions,
+                                                os.path.dirname(vvp_files[config_name]), args.timeout))
+            for job in jobs:
+                results.append(job.result())
+    except (OSError, subprocess.TimeoutExpired) as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    print(f"{'config':<20}{'program':<22}{'imem':>5}{'dmem':>5}{'cycles':>10}{'CPI':>8}{'model':>8}")
+    for r in results:
+        if r['status'] != 'pass':
+            print(f"{r['config']:<20}{r['program']:<22}{r['imem_latency']:>5}{r['dmem_latency']:>5}"
+                  f"  {r['status'].upper()}: {r['message']}")
+            continue
+        model = '-' if r['model_cpi'] is None else f"{r['model_cpi']:.3f}"
+        print(f"{r['config']:<20}{r['program']:<22}{r['imem_latency']:>5}{r['dmem_latency']:>5}"
+              f"{r['cycles']:>10}{r['cpi']:>8.3f}{model:>8}")
+
+    summary = summarize(results)
+    print("-" * 60)
+    print(f"Mean CPI against {xlabel}")
+    print(f"{'config':<20}" + ''.join(f"{x:>8}" for x in args.latency))
+    for config, points in summary.items():
+        print(f"{config:<20}" + ''.join(f"{points[x]:>8.3f}" if x in points else f"{'-':>8}"
+                                        for x in args.latency))
+
+    failed = [r for r in results if r['status'] != 'pass']
+    print("-" * 60)
+    print(f"{len(results)} runs in {time.time() - start:.1f}s: {len(failed)} failed")
+    if args.csv:
+        write_csv(args.csv, results)
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'vary': args.vary, 'jitter': args.jitter, 'banks': args.banks,
+                       'sparse': args.sparse, 'summary': summary, 'results': results}, f, indent=2)
+    if args.plot:
+        try:
+            plot_cpi(summary, args.plot, xlabel, ', '.join(
+                f"{name} {value}" for name, value in (('jitter', args.jitter), ('banks', args.banks))
+                if value))
+        except ImportError as e:
+            print(f"Error: {e}")
+            sys.exit(1)
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
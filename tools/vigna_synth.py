@@ -0,0 +1,321 @@
+#!/usr/bin/env python3
+"""
+VIGNA Area and Timing Estimator
+
+Synthesizes vigna_core.v (top `vigna`) or vigna_axi.v (top `vigna_axi`) for
+any set of configurations with a local Yosys, several runs in parallel, and
+reports LUT, flip-flop, carry, RAM and total cell counts plus the longest
+topological path (cells between flip-flops) as a logic-depth estimate.
+
+Results are cached by configuration hash: the generated vigna_conf.vh, the
+contents of every source file it reaches, the top module, the target flow
+and the Yosys version. Unchanged configurations are reported instantly.
+
+Targets:
+    xc7      synth_xilinx -family xc7 (Artix-7, as in the README figures)
+    ice40    synth_ice40
+    generic  generic synthesis mapped to 6-input LUTs
+
+Usage:
+    python3 vigna_synth.py
+    python3 vigna_synth.py --config rv32i --config rv32imc --top vigna_axi -j 4
+    python3 vigna_synth.py --sample 2 --target generic --json area.json
+"""
+
+import os
+import re
+import sys
+import json
+import time
+import shutil
+import hashlib
+import argparse
+import tempfile
+import subprocess
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, List, Optional
+
+from vigna_config_generator import VignaConfigGenerator, PREDEFINED_CONFIGS
+from vigna_config_space import sample_configs, parse_fixed
+from vigna_preprocessor import resolve
+
+REPO_ROOT = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+DEFAULT_CACHE_DIR = os.environ.get(
+    'VIGNA_SYNTH_CACHE', os.path.join(os.path.expanduser('~'), '.cache', 'vigna', 'synth'))
+
+# Top modules and the source that defines each (it includes the rest)
+TOPS = {
+    'vigna': 'vigna_core.v',
+    'vigna_axi': 'vigna_axi.v',
+}
+
+# Yosys synthesis commands per target
+TARGETS = {
+    'xc7': ['synth_xilinx -family xc7 -top {top} -flatten'],
+    'ice40': ['synth_ice40 -top {top}'],
+    'generic': ['synth -top {top} -flatten', 'abc -lut 6', 'opt_clean'],
+}
+
+# Cell type patterns per reported resource class (first match wins)
+CELL_CLASSES = [
+    ('lut', re.compile(r'^(LUT\d|SB_LUT4|\$lut)$')),
+    ('ff', re.compile(r'^(FD[A-Z]*|SB_DFF\w*|\$_S?DFF\w*|\$_DLATCH\w*|\$s?dffe?|\$adffe?)$')),
+    ('carry', re.compile(r'^(CARRY4|CARRY8|SB_CARRY|\$alu)$')),
+    ('mux', re.compile(r'^(MUXF[78])$')),
+    ('ram', re.compile(r'^(RAM\w+|SB_RAM\w+|\$mem\w*)$')),
+    ('dsp', re.compile(r'^(DSP48\w*|SB_MAC16)$')),
+]
+RESOURCES = [name for name, _ in CELL_CLASSES] + ['other']
+
+LTP_RE = re.compile(r'Longest topological path in \S+ \(length=(\d+)\)')
+
+
+def classify_cells(cells_by_type: Dict[str, int]) -> Dict[str, int]:
+    """Cell counts summed into the RESOURCES classes."""
+    totals = {name: 0 for name in RESOURCES}
+    for cell_type, count in cells_by_type.items():
+        cell_type = cell_type.lstrip('\\')
+        name = next((n for n, pattern in CELL_CLASSES if pattern.match(cell_type)), 'other')
+        totals[name] += count
+    return totals
+
+
+def parse_stat(text: str, top: str) -> Dict[str, any]:
+    """{'cells', 'cells_by_type'} from the output of Yosys `stat -json`."""
+    data = json.loads(text)
+    design = data.get('design')
+    if design is None:
+        modules = data.get('modules', {})
+        design = modules.get('\\' + top) or modules.get(top)
+        if design is None:
+            raise ValueError(f"module {top} not found in the statistics")
+    return {'cells': int(design.get('num_cells', 0)),
+            'cells_by_type': {k.lstrip('\\'): int(v)
+                              for k, v in design.get('num_cells_by_type', {}).items()}}
+
+
+def parse_ltp(text: str) -> Optional[int]:
+    """Length of the longest topological path reported by `ltp -noff`."""
+    m = LTP_RE.search(text)
+    return int(m.group(1)) if m else None
+
+
+def yosys_script(top: str, target: str, conf_path: str) -> str:
+    """Yosys commands for one run; statistics go to stat.json and ltp.txt."""
+    commands = [f'read_verilog -I{REPO_ROOT} {conf_path} {os.path.join(REPO_ROOT, TOPS[top])}']
+    commands += [c.format(top=top) for c in TARGETS[target]]
+    commands += ['tee -q -o stat.json stat -json', 'tee -q -o ltp.txt ltp -noff']
+    return '\n'.join(commands) + '\n'
+
+
+_yosys_versions: Dict[str, str] = {}
+
+
+def yosys_version(yosys: str = 'yosys') -> str:
+    """Output of `yosys -V`, cached per executable."""
+    if yosys not in _yosys_versions:
+        try:
+            result = subprocess.run([yosys, '-V'], capture_output=True, text=True)
+            _yosys_versions[yosys] = result.stdout.strip() or 'unknown'
+        except OSError:
+            _yosys_versions[yosys] = 'unknown'
+    return _yosys_versions[yosys]
+
+
+def synth_key(conf_text: str, top: str, target: str, version: str, root: str = REPO_ROOT) -> str:
+    """Cache key: configuration header, sources it reaches, top, target and Yosys version.
+
+    The generated header is read first and its include guard empties the
+    repository's vigna_conf.vh, so that file is not part of the key.
+    """
+    digest = hashlib.sha256()
+    for part in (version, target, top, conf_text):
+        digest.update(part.encode() + b'\0')
+    repo_conf = os.path.normpath(os.path.join(root, 'vigna_conf.vh'))
+    files = resolve([TOPS[top]], include_dirs=[root], cwd=root, text=conf_text)['files']
+    for path in files:
+        if os.path.normpath(path) == repo_conf:
+            continue
+        with open(path, 'rb') as f:
+            digest.update(hashlib.sha256(f.read()).digest())
+    return digest.hexdigest()
+
+
+class SynthCache:
+    """A directory of <key>.json synthesis results."""
+
+    def __init__(self, directory: str = DEFAULT_CACHE_DIR):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def get(self, key: str) -> Optional[Dict[str, any]]:
+        try:
+            with open(os.path.join(self.directory, key + '.json'), 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def put(self, key: str, result: Dict[str, any]):
+        fd, tmp = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        with os.fdopen(fd, 'w') as f:
+            json.dump(result, f, indent=1)
+        os.replace(tmp, os.path.join(self.directory, key + '.json'))
+
+
+def synthesize(name: str, config: Dict[str, any], top: str = 'vigna', target: str = 'xc7',
+               workroot: Optional[str] = None, cache: Optional[SynthCache] = None,
+               yosys: str = 'yosys', timeout: float = 1800.0) -> Dict[str, any]:
+    """Synthesize one configuration; returns a result dictionary.
+
+    Keys: config, top, target, status ('ok' / 'error'), message, cached,
+    time, cells, cells_by_type, depth and one count per RESOURCES class.
+    """
+    conf_text = VignaConfigGenerator().render_config(config, name)
+    result = {'config': name, 'top': top, 'target': target, 'status': 'ok', 'message': '',
+              'cached': False, 'time': 0.0}
+    key = synth_key(conf_text, top, target, yosys_version(yosys))
+    if cache is not None:
+        hit = cache.get(key)
+        if hit is not None:
+            result.update({k: v for k, v in hit.items() if k not in ('config', 'cached')})
+            result['cached'] = True
+            return result
+
+    workdir = tempfile.mkdtemp(prefix=f"{name}__{top}__", dir=workroot)
+    conf_path = os.path.join(workdir, 'vigna_conf.vh')
+    with open(conf_path, 'w') as f:
+        f.write(conf_text)
+    with open(os.path.join(workdir, 'synth.ys'), 'w') as f:
+        f.write(yosys_script(top, target, conf_path))
+
+    start = time.time()
+    try:
+        process = subprocess.run([yosys, '-q', '-l', 'yosys.log', '-s', 'synth.ys'], cwd=workdir,
+                                 capture_output=True, text=True, timeout=timeout)
+        result['time'] = round(time.time() - start, 3)
+        if process.returncode != 0:
+            errors = [line for line in (process.stdout + process.stderr).splitlines()
+                      if 'ERROR' in line]
+            result['status'] = 'error'
+            result['message'] = errors[-1].strip() if errors else f"yosys exited with {process.returncode}"
+            return result
+        with open(os.path.join(workdir, 'stat.json'), 'r') as f:
+            stats = parse_stat(f.read(), top)
+        with open(os.path.join(workdir, 'ltp.txt'), 'r') as f:
+            depth = parse_ltp(f.read())
+    except subprocess.TimeoutExpired:
+        result['status'] = 'error'
+        result['message'] = f"synthesis timed out after {timeout:.0f}s"
+        return result
+    except (OSError, ValueError) as e:
+        result['status'] = 'error'
+        result['message'] = str(e)
+        return result
+    finally:
+        if workroot is None:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    result.update(stats)
+    result.update(classify_cells(stats['cells_by_type']))
+    result['depth'] = depth
+    if cache is not None:
+        cache.put(key, result)
+    return result
+
+
+def run_all(configs: Dict[str, Dict[str, any]], tops: List[str], target: str, workers: int,
+            cache: Optional[SynthCache] = None, yosys: str = 'yosys', timeout: float = 1800.0,
+            workroot: Optional[str] = None) -> List[Dict[str, any]]:
+    """Synthesize every (configuration, top) pair on a thread pool, in input order."""
+    pairs = [(name, config, top) for name, config in configs.items() for top in tops]
+    results: List[Optional[Dict[str, any]]] = [None] * len(pairs)
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(synthesize, name, config, top, target, workroot, cache, yosys,
+                               timeout): i for i, (name, config, top) in enumerate(pairs)}
+        for future in as_completed(futures):
+            result = future.result()
+            results[futures[future]] = result
+            state = 'cached' if result['cached'] else f"{result['time']:.1f}s"
+            detail = result['message'] if result['status'] != 'ok' else f"{result['lut']} LUTs"
+            print(f"[{result['config']}/{result['top']}] {result['status'].upper()} "
+                  f"({detail}, {state})", flush=True)
+    return results
+
+
+def format_table(results: List[Dict[str, any]]) -> str:
+    """Text table of synthesis results."""
+    columns = ['lut', 'ff', 'carry', 'mux', 'ram', 'dsp', 'cells', 'depth']
+    lines = [f"{'config':<16}{'top':<11}" + ''.join(f"{c:>8}" for c in columns)]
+    for r in results:
+        if r['status'] != 'ok':
+            lines.append(f"{r['config']:<16}{r['top']:<11}  error: {r['message']}")
+            continue
+        lines.append(f"{r['config']:<16}{r['top']:<11}" +
+                     ''.join(f"{'-' if r.get(c) is None else r[c]:>8}" for c in columns))
+    return '\n'.join(lines)
+
+
+def main():
+    """Command-line interface for the area and timing estimator."""
+    parser = argparse.ArgumentParser(description="VIGNA parallel Yosys area and logic-depth estimator")
+    parser.add_argument('--config', action='append',
+                        help='Predefined configuration (repeatable, default: all)')
+    parser.add_argument('--sample', type=int, metavar='STRENGTH',
+                        help='Add covering-array configurations (see vigna_config_space.py)')
+    parser.add_argument('--seed', type=int, default=0, help='Random seed for --sample (default: 0)')
+    parser.add_argument('--fix', action='append', default=[],
+                        help='With --sample, hold an option at NAME=0 or NAME=1 (repeatable)')
+    parser.add_argument('--top', action='append', choices=sorted(TOPS),
+                        help='Top module (repeatable, default: vigna)')
+    parser.add_argument('--target', choices=sorted(TARGETS), default='xc7',
+                        help='Synthesis flow (default: xc7)')
+    parser.add_argument('-j', '--jobs', type=int, default=os.cpu_count() or 1,
+                        help='Number of parallel Yosys runs (default: number of CPUs)')
+    parser.add_argument('--timeout', type=float, default=1800.0,
+                        help='Per-run timeout in seconds (default: 1800)')
+    parser.add_argument('--yosys', default='yosys', help='Yosys executable')
+    parser.add_argument('--cache-dir', default=DEFAULT_CACHE_DIR,
+                        help=f'Result cache directory (default: {DEFAULT_CACHE_DIR}, or $VIGNA_SYNTH_CACHE)')
+    parser.add_argument('--no-cache', action='store_true', help='Always run Yosys')
+    parser.add_argument('--workdir', help='Keep run directories (scripts, logs) under this directory')
+    parser.add_argument('--json', help='Write the results as JSON to this file')
+    args = parser.parse_args()
+
+    try:
+        if args.sample:
+            configs = sample_configs(args.sample, args.seed, parse_fixed(args.fix), args.config)
+        else:
+            names = args.config or list(PREDEFINED_CONFIGS)
+            for name in names:
+                if name not in PREDEFINED_CONFIGS:
+                    raise ValueError(f"unknown configuration '{name}'")
+            configs = {name: PREDEFINED_CONFIGS[name]['options'] for name in names}
+    except ValueError as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+
+    if shutil.which(args.yosys) is None:
+        print(f"Error: '{args.yosys}' not found in PATH (install Yosys)")
+        sys.exit(1)
+    if args.workdir:
+        os.makedirs(args.workdir, exist_ok=True)
+
+    cache = None if args.no_cache else SynthCache(args.cache_dir)
+    start = time.time()
+    results = run_all(configs, args.top or ['vigna'], args.target, args.jobs, cache,
+                      args.yosys, args.timeout, args.workdir)
+    print("-" * 60)
+    print(format_table(results))
+    print(f"{len(results)} runs ({sum(1 for r in results if r['cached'])} cached) "
+          f"in {time.time() - start:.1f}s; depth = cells on the longest path between flip-flops")
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2)
+    if any(r['status'] != 'ok' for r in results):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
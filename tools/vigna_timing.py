@@ -0,0 +1,452 @@
+#!/usr/bin/env python3
+"""
+VIGNA Cycle-Approximate Timing Model
+
+Predicts cycle counts for programs run on the VIGNA core with the simple
+(non-AXI) bus interface, by replaying the instruction stream of the
+instruction-set simulator through a model of the fetch_state / exec_state
+machines in vigna_core.v and the multiplier/divider in vigna_coproc.v
+(iterative, or the DSP multiplier and radix-4 divider of
+VIGNA_CORE_M_FPGA_FAST).
+
+Timing recurrence (edges counted from the first clock after reset release):
+
+    I[i+1] = S[i] + ctrl[i]            next fetch issue (ctrl = jump/branch/mret)
+    F[i+1] = I[i+1] + imem_latency + 1 instruction latched (fetch_state 3)
+    S[i+1] = max(F[i+1], X[i]) + 1     execute starts (exec_state 0 -> busy)
+
+where X[i] - S[i] is the number of cycles the instruction keeps exec_state
+away from 0. Because every term only depends on S[i], each instruction has a
+fixed cost S[i+1] - S[i] that can be computed once per PC (shifts and
+divides additionally depend on operand values).
+
+With VIGNA_CORE_PREFETCH the fetch unit runs ahead of execute, so F[i+1] is
+the cycle the word holding instruction i+1 reaches the prefetch queue (at
+the earliest one edge after the PC moves on). PrefetchQueue replays the
+queue: one request in flight at a time, at most two words queued, no new
+request while a jump or branch waits to resolve, and a refill from the
+target when the PC leaves the queued words. VIGNA_CORE_BRANCH_PREDICT
+releases jal and branches at dispatch (ctrl = 0, only jalr holds the
+queue): jal and backward branches steer the queue to their target the edge
+after they are latched, and a wrong guess sends it down the other path the
+edge after dispatch.
+
+Usage:
+    python3 vigna_timing.py programs/build/simple_test.mem
+    python3 vigna_timing.py --config rv32im --dmem-latency 3 --breakdown prog.mem
+    python3 vigna_timing.py --expect-cycles 54 programs/build/simple_test.mem
+"""
+
+import os
+import re
+import sys
+import argparse
+from typing import Callable, Dict, List, Optional, Tuple, Union
+
+from vigna_iss import VignaISS, VignaISSError, build_config, DEFAULT_MEM_SIZE
+
+# Cycles the testbench's run_program task needs to notice a halt: the PC must
+# be sampled unchanged 10 times, and samples lag the register by one edge.
+TESTBENCH_HALT_CYCLES = 11
+
+# Cycles the coprocessor spends on a full multiply or divide (valid to ready
+# seen by the core), and on the early-out divide by zero / overflow cases.
+COPROC_ITERATIVE_CYCLES = 35
+COPROC_EARLY_OUT_CYCLES = 3
+
+# The same for VIGNA_CORE_M_FPGA_FAST: a registered DSP multiply, and a divide
+# that takes one cycle per significant bit pair of the dividend after setup.
+COPROC_FAST_MUL_CYCLES = 3
+COPROC_FAST_DIV_SETUP_CYCLES = 3
+COPROC_FAST_EARLY_OUT_CYCLES = 2
+
+Cost = Union[int, Callable[[List[int]], int]]
+
+INSTRUCTION_CLASSES = ('alu', 'shift', 'load', 'store', 'jump', 'branch', 'muldiv', 'system')
+
+MRET = 0x30200073
+
+
+def classify(word: int) -> str:
+    """Return the timing class of a (possibly expanded) instruction word."""
+    opcode = word & 0x7F
+    funct3 = (word >> 12) & 0x7
+    if opcode == 0x03:
+        return 'load'
+    if opcode == 0x23:
+        return 'store'
+    if opcode in (0x6F, 0x67):
+        return 'jump'
+    if opcode == 0x63:
+        return 'branch'
+    if opcode == 0x13 and funct3 in (1, 5):
+        return 'shift'
+    if opcode == 0x33:
+        if (word >> 25) == 1:
+            return 'muldiv'
+        if funct3 in (1, 5):
+            return 'shift'
+    if opcode == 0x73:
+        return 'system'
+    return 'alu'
+
+
+class VignaTimingModel:
+    """Per-instruction cycle costs for one configuration and memory latency."""
+
+    def __init__(self, config: Optional[Dict[str, any]] = None,
+                 imem_latency: int = 1, dmem_latency: int = 1):
+        if imem_latency < 1 or dmem_latency < 1:
+            raise ValueError("memory latencies must be at least one cycle")
+        self.config = dict(config or {})
+        self.two_stage_shift = bool(self.config.get('two_stage_shift', False))
+        self.interrupt = bool(self.config.get('interrupt', False))
+        self.m_fpga_fast = bool(self.config.get('m_fpga_fast', False))
+        self.prefetch = bool(self.config.get('prefetch', False))
+        self.branch_prediction = self.prefetch and bool(self.config.get('branch_prediction', False))
+        self.imem_latency = imem_latency
+        self.dmem_latency = dmem_latency
+
+    @property
+    def startup_cycles(self) -> int:
+        """Edges from reset release until the first instruction starts executing."""
+        return 1 + self.imem_latency + 2
+
+    @property
+    def first_fetch_cycle(self) -> int:
+        """Edge at which the first fetch is issued."""
+        return 1
+
+    def issue_cost(self, exec_cycles: int, ctrl: int) -> int:
+        """Cycles between the execute start of an instruction and the next one.
+
+        With the prefetch queue this assumes the next instruction is already
+        queued; PrefetchQueue adds the cycles spent waiting for it.
+        """
+        fetch_cycles = 1 if self.prefetch else self.imem_latency + 1
+        return max(ctrl + fetch_cycles, exec_cycles) + 1
+
+    def front_end(self, pc: int, instruction_at: Optional[Callable[[int], Tuple[int, int]]] = None
+                  ) -> Optional['PrefetchQueue']:
+        """Prefetch queue state for a run starting at `pc`, or None without prefetch.
+
+        With branch prediction the queue decodes jumps and branches itself
+        through `instruction_at` (VignaISS.instruction_at).
+        """
+        if not self.prefetch:
+            return None
+        return PrefetchQueue(pc, self.imem_latency,
+                             instruction_at if self.branch_prediction else None)
+
+    @property
+    def mul_exec_cycles(self) -> int:
+        """Coprocessor cycles for a multiply."""
+        return COPROC_FAST_MUL_CYCLES if self.m_fpga_fast else COPROC_ITERATIVE_CYCLES
+
+    def shift_exec_cycles(self, amount: int) -> int:
+        """Cycles spent in exec_state 0110 for a shift by `amount` bits."""
+        if self.two_stage_shift:
+            steps = (amount >> 2) + (amount & 0x3)
+        else:
+            steps = amount
+        return steps + 1
+
+    def div_exec_cycles(self, dividend: int) -> int:
+        """Coprocessor cycles for a divide whose |dividend| is `dividend`."""
+        if not self.m_fpga_fast:
+            return COPROC_ITERATIVE_CYCLES
+        return COPROC_FAST_DIV_SETUP_CYCLES + (dividend.bit_length() + 1) // 2
+
+    def cost(self, word: int) -> Tuple[Cost, int]:
+        """Return (cost, ctrl) for an instruction word.
+
+        cost is either a cycle count or a callable taking the register file
+        (before the instruction executes) and returning the cycle count.
+        ctrl is 1 when the instruction holds the fetch unit until exec_state
+        reaches the jump/branch state (or, for mret, the CSR state that
+        redirects fetch to mepc), 0 otherwise.
+        """
+        kind = classify(word)
+        if kind in ('load', 'store'):
+            return self.issue_cost(2 + self.dmem_latency, 0), 0
+        if kind in ('jump', 'branch'):
+            if self.branch_prediction and word & 0x7F != 0x67:
+                return self.issue_cost(1, 0), 0
+            return self.issue_cost(1, 1), 1
+        if kind == 'shift':
+            if word & 0x7F == 0x13:
+                return self.issue_cost(self.shift_exec_cycles((word >> 20) & 0x1F), 0), 0
+            rs2 = (word >> 20) & 0x1F
+            table = [self.issue_cost(self.shift_exec_cycles(n), 0) for n in range(32)]
+
+            def shift_cost(regs):
+                return table[regs[rs2] & 0x1F]
+            return shift_cost, 0
+        if kind == 'muldiv':
+            funct3 = (word >> 12) & 0x7
+            if funct3 < 4:
+                return self.issue_cost(self.mul_exec_cycles, 0), 0
+            rs1 = (word >> 15) & 0x1F
+            rs2 = (word >> 20) & 0x1F
+            signed = not (funct3 & 0x1)
+            early = self.issue_cost(COPROC_FAST_EARLY_OUT_CYCLES if self.m_fpga_fast
+                                    else COPROC_EARLY_OUT_CYCLES, 0)
+            # indexed by the bit length of |dividend|
+            table = [self.issue_cost(self.div_exec_cycles((1 << n) >> 1), 0) for n in range(33)]
+
+            def div_cost(regs):
+                divisor = regs[rs2]
+                dividend = regs[rs1]
+                if divisor == 0 or (signed and divisor == 0xFFFFFFFF and dividend == 0x80000000):
+                    return early
+                if signed and dividend & 0x80000000:
+                    dividend = -dividend & 0xFFFFFFFF
+                return table[dividend.bit_length()]
+            return div_cost, 0
+        if word == MRET and self.interrupt:
+            return self.issue_cost(1, 1), 1
+        return self.issue_cost(1, 0), 0
+
+    def static_costs(self) -> Dict[str, int]:
+        """Typical cost of each instruction class (shifts by 1, full multiply).
+
+        With VIGNA_CORE_INTERRUPT 'mret' gives the cost of an interrupt
+        return, which holds fetch like jalr.
+        """
+        costs = {
+            'alu': self.issue_cost(1, 0),
+            'shift': self.issue_cost(self.shift_exec_cycles(1), 0),
+            'load': self.issue_cost(2 + self.dmem_latency, 0),
+            'store': self.issue_cost(2 + self.dmem_latency, 0),
+            'jump': self.issue_cost(1, 0 if self.branch_prediction else 1),
+            'branch': self.issue_cost(1, 0 if self.branch_prediction else 1),
+            'muldiv': self.issue_cost(self.mul_exec_cycles, 0),
+            'system': self.issue_cost(1, 0),
+        }
+        if self.interrupt:
+            costs['mret'] = self.issue_cost(1, 1)
+        return costs
+
+
+def static_prediction(word: int, pc: int, length: int) -> Optional[Tuple[bool, int]]:
+    """(taken, predicted next PC) of VIGNA_CORE_BRANCH_PREDICT for jal and branches.
+
+    jal and backward branches are predicted taken, forward branches not
+    taken; None for every other instruction.
+    """
+    opcode = word & 0x7F
+    if opcode == 0x6F:
+        imm = (((word >> 31) & 0x1) << 20) | (((word >> 12) & 0xFF) << 12) | \
+              (((word >> 20) & 0x1) << 11) | (((word >> 21) & 0x3FF) << 1)
+        return True, (pc + imm - ((imm & 0x100000) << 1)) & 0xFFFFFFFF
+    if opcode == 0x63 and (word >> 12) & 0x7 not in (2, 3):
+        if word & 0x80000000:
+            imm = (0x1 << 12) | (((word >> 7) & 0x1) << 11) | \
+                  (((word >> 25) & 0x3F) << 5) | (((word >> 8) & 0xF) << 1)
+            return True, (pc + imm - 0x2000) & 0xFFFFFFFF
+        return False, (pc + length) & 0xFFFFFFFF
+    return None
+
+
+class PrefetchQueue:
+    """The VIGNA_CORE_PREFETCH fetch unit, replayed one instruction at a time.
+
+    Edges are counted like the execute start S[i]. `stream` holds the edges
+    at which the queued words (from `base` on) arrive, including the one in
+    flight. Given `instruction_at`, the queue also follows the static branch
+    prediction of VIGNA_CORE_BRANCH_PREDICT.
+    """
+
+    # Words the queue holds
+    DEPTH = 2
+
+    def __init__(self, pc: int, imem_latency: int = 1,
+                 instruction_at: Optional[Callable[[int], Tuple[int, int]]] = None):
+        self.latency = imem_latency
+        self.base = pc & ~0x3
+        self.stream: List[int] = []
+        self.free = 1            # first edge without a request in flight
+        self.next_edge = 1       # first edge whose request is not decided yet
+        self.move = 1            # edge at which the PC moves to the next instruction
+        self.hold: Optional[Tuple[int, int]] = None
+        self.latch = 0
+        self.addr_change = 0     # last edge at which i_addr changed
+        self.instruction_at = instruction_at
+        self.predictions: Dict[int, Optional[Tuple[bool, int]]] = {}
+        self.prediction: Optional[Tuple[bool, int]] = None
+        self.mispredictions = 0
+
+    def _request(self, edge: int):
+        arrival = edge + self.latency + 1
+        self.stream.append(arrival)
+        self.free = arrival + 1
+        self.addr_change = arrival
+
+    def _issue(self, until: int):
+        """Decide the requests of every edge up to `until`."""
+        edge = max(self.next_edge, self.free)
+        while edge <= until and len(self.stream) < self.DEPTH:
+            if self.hold is not None and self.hold[0] <= edge <= self.hold[1]:
+                edge = self.hold[1] + 1
+                continue
+            self._request(edge)
+            edge = self.free
+        self.next_edge = max(self.next_edge, until + 1)
+
+    def _move(self, move: int, pc: int):
+        """Point the queue at `pc` at edge `move`: keep, pop or refill it."""
+        self._issue(move - 1)
+        word = pc & ~0x3
+        if word == self.base:
+            self._issue(move)
+        elif word == (self.base + 4) & 0xFFFFFFFF:
+            self._issue(move)
+            self.stream.pop(0)
+            self.base = word
+        else:
+            # the request in flight, if any, is dropped when it arrives
+            in_flight = move < self.free
+            self.stream = []
+            self.base = word
+            self.addr_change = move
+            self.next_edge = move + 1
+            if not in_flight:
+                self._request(move)
+
+    def fetch(self, earliest: int, pc: int, length: int) -> int:
+        """Execute start of the instruction at `pc`, no earlier than `earliest`."""
+        move = self.move
+        if self.prediction is not None:
+            taken, guess = self.prediction
+            if taken:
+                # steered to the target the edge after the jump or branch was latched
+                self._move(self.latch + 1, guess)
+            if pc != guess:
+                # the branch resolves the edge after dispatch
+                self._move(move, guess)
+                self.mispredictions += 1
+                move += 1
+        self._move(move, pc)
+        needed = 2 if pc & 0x2 and length == 4 else 1
+        while len(self.stream) < needed:
+            edge = max(self.next_edge, self.free)
+            self._request(edge)
+            self.next_edge = edge + 1
+        self.latch = max(move + 1, self.stream[needed - 1])
+        return max(earliest, self.latch + 1)
+
+    def execute(self, start: int, ctrl: int, pc: int = 0):
+        """Record the execute start of the fetched instruction at `pc`."""
+        self.move = start + ctrl
+        self.hold = (self.latch + 1, self.move) if ctrl else None
+        if self.instruction_at is not None:
+            if pc not in self.predictions:
+                word, length = self.instruction_at(pc)
+                self.predictions[pc] = static_prediction(word, pc, length)
+            self.prediction = self.predictions[pc]
+
+    def settle(self, earliest: int, pc: int, length: int, cost: int, ctrl: int) -> int:
+        """Edge at which i_addr stops changing once the halt loop at `pc` runs."""
+        for _ in range(2 * self.DEPTH + 2):
+            start = self.fetch(earliest, pc, length)
+            self.execute(start, ctrl, pc)
+            earliest = start + cost
+        return self.addr_change
+
+
+def predict_testbench_cycles(iss: VignaISS) -> Optional[int]:
+    """Predict the cycle_count program_testbench.v reports for a halted run."""
+    if iss.stop_reason != 'halt' or iss.halt_fetch_cycle is None:
+        return None
+    return iss.halt_fetch_cycle + TESTBENCH_HALT_CYCLES
+
+
+def parse_testbench_log(text: str) -> List[Tuple[int, int]]:
+    """Extract (halt PC, cycle_count) pairs from program_testbench.v output."""
+    pattern = re.compile(r'Program halted at PC=0x([0-9a-fA-F]+) after\s+(\d+) cycles')
+    return [(int(pc, 16), int(cycles)) for pc, cycles in pattern.findall(text)]
+
+
+def breakdown(iss: VignaISS, profile: Dict[int, List[int]]) -> Dict[str, List[int]]:
+    """Aggregate a per-PC [count, cycles] profile by instruction class."""
+    classes = {name: [0, 0] for name in INSTRUCTION_CLASSES}
+    for pc, (count, cycles) in profile.items():
+        entry = classes[classify(iss.instruction_at(pc)[0])]
+        entry[0] += count
+        entry[1] += cycles
+    return classes
+
+
+def main():
+    """Command-line interface for the timing model."""
+    parser = argparse.ArgumentParser(description="VIGNA cycle-approximate timing model")
+    parser.add_argument('image', help='Program image in $readmemh format (.mem)')
+    parser.add_argument('--config', help='Predefined configuration name (e.g. rv32imc)')
+    parser.add_argument('--conf', help='Configuration header to read (e.g. vigna_conf.vh)')
+    parser.add_argument('--base-addr', type=lambda x: int(x, 0), default=0,
+                        help='Load address of the image (default: 0)')
+    parser.add_argument('--mem-size', type=lambda x: int(x, 0), default=DEFAULT_MEM_SIZE,
+                        help=f'Simulated memory size in bytes (default: {DEFAULT_MEM_SIZE})')
+    parser.add_argument('--imem-latency', type=int, default=1,
+                        help='Instruction memory ready latency in cycles (default: 1)')
+    parser.add_argument('--dmem-latency', type=int, default=1,
+                        help='Data memory ready latency in cycles (default: 1)')
+    parser.add_argument('--max-instructions', type=int, default=10_000_000,
+                        help='Instruction budget (default: 10000000)')
+    parser.add_argument('--breakdown', action='store_true',
+                        help='Print cycles per instruction class')
+    parser.add_argument('--expect-cycles', type=int,
+                        help='Compare the predicted testbench cycle_count with this value')
+    parser.add_argument('--testbench-log',
+                        help='Compare against the first halt line of a program_testbench.v log')
+    args = parser.parse_args()
+
+    if not args.config and not args.conf:
+        default_conf = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                    '..', 'vigna_conf.vh')
+        args.conf = default_conf if os.path.exists(default_conf) else None
+
+    profile = {} if args.breakdown else None
+    try:
+        config = build_config(args.config, args.conf)
+        model = VignaTimingModel(config, args.imem_latency, args.dmem_latency)
+        iss = VignaISS(config, mem_size=args.mem_size)
+        iss.load_mem(args.image, args.base_addr)
+        reason = iss.run(args.max_instructions, timing=model, profile=profile)
+    except (ValueError, OSError, VignaISSError) as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+
+    cpi = iss.cycles / iss.instret if iss.instret else 0.0
+    print(f"Stopped ({reason}) at PC=0x{iss.pc:08x}")
+    print(f"Instructions: {iss.instret}")
+    print(f"Cycles:       {iss.cycles}")
+    print(f"CPI:          {cpi:.3f}")
+    predicted = predict_testbench_cycles(iss)
+    if predicted is not None:
+        print(f"Predicted program_testbench cycle_count: {predicted}")
+
+    if profile is not None:
+        print(f"\n{'Class':10} {'Count':>10} {'Cycles':>12} {'Avg':>7}")
+        for name, (count, cycles) in breakdown(iss, profile).items():
+            if count:
+                print(f"{name:10} {count:10d} {cycles:12d} {cycles / count:7.2f}")
+
+    expected = args.expect_cycles
+    if args.testbench_log:
+        with open(args.testbench_log, 'r') as f:
+            halts = parse_testbench_log(f.read())
+        if not halts:
+            print("Error: no 'Program halted' line found in testbench log")
+            sys.exit(1)
+        expected = halts[0][1]
+    if expected is not None:
+        if predicted == expected:
+            print(f"MATCH: predicted {predicted} == measured {expected}")
+        else:
+            print(f"MISMATCH: predicted {predicted} != measured {expected}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,268 @@
+#!/usr/bin/env python3
+"""
+VIGNA VCD Analyzer
+
+Streams a VCD dump from any of the sim/ testbenches and follows the core's
+fetch_state, exec_state and d_valid/d_ready signals to report CPI and where
+the cycles went:
+
+    dispatch      an instruction is issued (one per instruction)
+    execute       ALU, shift, jump, branch, CSR and load/store issue cycles
+    fetch_stall   the execution unit is idle waiting for an instruction
+    data_stall    a load or store is waiting for d_ready
+    coprocessor   the multiply/divide coprocessor is busy
+
+Stall cycles are also totalled per PC: fetch stalls against the instruction
+being fetched, everything else against the instruction being executed.
+
+The file is read line by line and only the tracked signals are decoded, so
+memory use does not depend on the dump size; .vcd.gz files are read directly.
+
+Usage:
+    python3 vigna_vcd.py sim/program_test.vcd
+    python3 vigna_vcd.py --scope program_testbench.dut --top 20 --json stalls.json dump.vcd.gz
+"""
+
+import sys
+import gzip
+import json
+import argparse
+from typing import Dict, Iterator, List, Optional, Set, TextIO, Tuple
+
+# Signals of the vigna module followed by the analyzer
+CORE_SIGNALS = ('clk', 'resetn', 'pc', 'fetch_state', 'exec_state', 'd_valid', 'd_ready')
+
+CATEGORIES = ('dispatch', 'execute', 'fetch_stall', 'data_stall', 'coprocessor')
+STALL_CATEGORIES = ('fetch_stall', 'data_stall', 'coprocessor')
+
+# exec_state encodings (see the state machine in vigna_core.v)
+EXEC_IDLE = 0x0
+EXEC_LOAD_STORE = (0x1, 0x3, 0x5)
+EXEC_COPROC = 0x9
+FETCHED = 3
+
+
+def open_vcd(path: str) -> TextIO:
+    """Open a .vcd or .vcd.gz file for reading."""
+    if path.endswith('.gz'):
+        return gzip.open(path, 'rt', errors='replace')
+    return open(path, 'r', errors='replace', buffering=1 << 20)
+
+
+def read_header(f: TextIO) -> Tuple[Dict[str, Tuple[str, int]], str]:
+    """Parse the declaration section.
+
+    Returns ({hierarchical name: (identifier code, width)}, timescale) and
+    leaves `f` positioned at the first value change.
+    """
+    signals: Dict[str, Tuple[str, int]] = {}
+    scope: List[str] = []
+    timescale = ''
+    tokens: List[str] = []
+    for line in f:
+        tokens.extend(line.split())
+        if '$end' not in tokens:
+            continue
+        keyword = tokens[0]
+        if keyword == '$scope':
+            scope.append(tokens[2])
+        elif keyword == '$upscope':
+            scope.pop()
+        elif keyword == '$var':
+            # $var <type> <width> <id> <name> [range] $end
+            signals['.'.join(scope + [tokens[4]])] = (tokens[3], int(tokens[2]))
+        elif keyword == '$timescale':
+            timescale = ''.join(tokens[1:tokens.index('$end')])
+        elif keyword == '$enddefinitions':
+            break
+        tokens = []
+    return signals, timescale
+
+
+def iter_changes(f: TextIO, ids: Set[str]) -> Iterator[Tuple[int, List[Tuple[str, str]]]]:
+    """Yield (time, [(identifier, value)]) for each timestamp touching `ids`.
+
+    Scalar values are '0'/'1'/'x'/'z'; vector values are the binary digits.
+    """
+    time = 0
+    changes: List[Tuple[str, str]] = []
+    for line in f:
+        c = line[0]
+        if c == '#':
+            if changes:
+                yield time, changes
+                changes = []
+            time = int(line[1:])
+        elif c in '01xzXZ':
+            ident = line[1:].rstrip()
+            if ident in ids:
+                changes.append((ident, c))
+        elif c in 'bBrR':
+            value, _, ident = line[1:].partition(' ')
+            ident = ident.rstrip()
+            if ident in ids:
+                changes.append((ident, value))
+    if changes:
+        yield time, changes
+
+
+def vcd_int(value: str) -> Optional[int]:
+    """Integer value of a binary VCD value, or None if it holds x or z bits."""
+    try:
+        return int(value, 2)
+    except ValueError:
+        return None
+
+
+def find_core_scope(signals: Dict[str, Tuple[str, int]]) -> str:
+    """Hierarchical path of the (first) vigna core instance in a dump."""
+    scopes = {name.rpartition('.')[0] for name in signals}
+    candidates = sorted((s for s in scopes
+                         if f"{s}.exec_state" in signals and f"{s}.fetch_state" in signals),
+                        key=lambda s: (s.count('.'), s))
+    if not candidates:
+        raise ValueError("no vigna core (exec_state/fetch_state) found in the dump")
+    return candidates[0]
+
+
+class StallAnalyzer:
+    """Classifies sampled clock cycles and accumulates per-PC totals."""
+
+    def __init__(self):
+        self.totals: Dict[str, int] = {c: 0 for c in CATEGORIES}
+        self.per_pc: Dict[int, List[int]] = {}     # pc -> [instructions, cycles per CATEGORIES]
+        self.exec_pc: Optional[int] = None
+
+    def _pc_entry(self, pc: int) -> List[int]:
+        entry = self.per_pc.get(pc)
+        if entry is None:
+            entry = self.per_pc[pc] = [0] * (1 + len(CATEGORIES))
+        return entry
+
+    def cycle(self, pc: Optional[int], fetch_state: Optional[int], exec_state: Optional[int],
+              d_valid: Optional[int], d_ready: Optional[int]) -> str:
+        """Account one clock cycle from the values sampled at its rising edge."""
+        if exec_state == EXEC_IDLE:
+            if fetch_state == FETCHED:
+                category = 'dispatch'
+                self.exec_pc = pc
+                if pc is not None:
+                    self._pc_entry(pc)[0] += 1
+            else:
+                category = 'fetch_stall'
+            owner = pc
+        else:
+            if exec_state in EXEC_LOAD_STORE and d_valid and not d_ready:
+                category = 'data_stall'
+            elif exec_state == EXEC_COPROC:
+                category = 'coprocessor'
+            else:
+                category = 'execute'
+            owner = self.exec_pc
+        self.totals[category] += 1
+        if owner is not None:
+            self._pc_entry(owner)[1 + CATEGORIES.index(category)] += 1
+        return category
+
+    def report(self, top: Optional[int] = None) -> Dict[str, any]:
+        """CPI, cycle breakdown and the PCs with the most stall cycles."""
+        cycles = sum(self.totals.values())
+        instructions = self.totals['dispatch']
+        stall_index = [1 + CATEGORIES.index(c) for c in STALL_CATEGORIES]
+        rows = []
+        for pc, entry in self.per_pc.items():
+            stalls = sum(entry[i] for i in stall_index)
+            row = {'pc': pc, 'instructions': entry[0], 'cycles': sum(entry[1:]), 'stalls': stalls}
+            row.update({c: entry[i] for c, i in zip(STALL_CATEGORIES, stall_index)})
+            rows.append(row)
+        rows.sort(key=lambda r: (-r['stalls'], r['pc']))
+        return {
+            'cycles': cycles,
+            'instructions': instructions,
+            'cpi': cycles / instructions if instructions else None,
+            'breakdown': dict(self.totals),
+            'per_pc': rows[:top] if top else rows,
+        }
+
+
+def analyze(f: TextIO, scope: Optional[str] = None) -> Tuple[str, str, StallAnalyzer]:
+    """Stream a VCD and classify every rising clock edge while out of reset.
+
+    Values are sampled before the changes recorded at the edge's own
+    timestamp, i.e. as the core's flip-flops see them.
+    """
+    signals, timescale = read_header(f)
+    scope = scope or find_core_scope(signals)
+    ids: Dict[str, str] = {}
+    for name in CORE_SIGNALS:
+        path = f"{scope}.{name}"
+        if path in signals:
+            ids[name] = signals[path][0]
+    for required in ('clk', 'fetch_state', 'exec_state'):
+        if required not in ids:
+            raise ValueError(f"signal {scope}.{required} not found in the dump")
+
+    state: Dict[str, Optional[int]] = {ident: None for ident in ids.values()}
+    clk = ids['clk']
+    reset = ids.get('resetn')
+    pc, fetch, exec_, d_valid, d_ready = (ids.get(n) for n in
+                                          ('pc', 'fetch_state', 'exec_state', 'd_valid', 'd_ready'))
+    analyzer = StallAnalyzer()
+    for _, changes in iter_changes(f, set(ids.values())):
+        rising = False
+        for ident, value in changes:
+            if ident == clk and value == '1' and state[clk] == 0:
+                rising = True
+        if rising and (reset is None or state[reset] == 1):
+            analyzer.cycle(state.get(pc), state[fetch], state[exec_],
+                           state.get(d_valid), state.get(d_ready))
+        for ident, value in changes:
+            state[ident] = vcd_int(value)
+    return scope, timescale, analyzer
+
+
+def format_report(report: Dict[str, any], scope: str) -> str:
+    """Text summary of an analyzer report."""
+    lines = [f"Core: {scope}",
+             f"Cycles: {report['cycles']}   Instructions: {report['instructions']}   CPI: "
+             + (f"{report['cpi']:.3f}" if report['cpi'] is not None else "n/a")]
+    for category in CATEGORIES:
+        count = report['breakdown'][category]
+        share = 100.0 * count / report['cycles'] if report['cycles'] else 0.0
+        lines.append(f"  {category:<12} {count:>12} {share:6.1f}%")
+    rows = [r for r in report['per_pc'] if r['stalls']]
+    if rows:
+        lines.append("")
+        lines.append(f"{'PC':<12}{'instr':>10}{'cycles':>10}{'fetch':>10}{'data':>10}{'coproc':>10}")
+        for r in rows:
+            lines.append(f"0x{r['pc']:08x}  {r['instructions']:>10}{r['cycles']:>10}"
+                         f"{r['fetch_stall']:>10}{r['data_stall']:>10}{r['coprocessor']:>10}")
+    return "\n".join(lines)
+
+
+def main():
+    """Command-line interface for the VCD analyzer."""
+    parser = argparse.ArgumentParser(description="VIGNA streaming VCD CPI and stall analyzer")
+    parser.add_argument('vcd', help='VCD dump (.vcd or .vcd.gz)')
+    parser.add_argument('--scope', help='Hierarchical path of the core instance (default: auto-detect)')
+    parser.add_argument('--top', type=int, default=10,
+                        help='Number of PCs to list by stall cycles (default: 10, 0 for all)')
+    parser.add_argument('--json', help='Write the full report as JSON to this file')
+    args = parser.parse_args()
+
+    try:
+        with open_vcd(args.vcd) as f:
+            scope, timescale, analyzer = analyze(f, args.scope)
+    except (OSError, ValueError) as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+
+    report = analyzer.report()
+    print(format_report(dict(report, per_pc=report['per_pc'][:args.top or None]), scope))
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(dict(report, scope=scope, timescale=timescale), f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,259 @@
+#!/usr/bin/env python3
+"""
+VIGNA Compiled Simulation Cache
+
+Content-addressed cache for the .vvp files produced by iverilog. A cache key
+covers the iverilog version and command line (defines, include directories,
+source order), the contents of every source file and of every file they
+`include that is active under the command-line defines (resolved the way
+iverilog does: working directory first, then -I directories), so an
+unchanged combination of core sources, vigna_conf*.vh, defines and testbench
+skips iverilog entirely.
+
+Entries are published with an atomic rename and read by copying, so any
+number of parallel jobs can share one cache directory. The cache is capped in
+size; the least recently used entries are evicted first.
+
+Usage (drop-in for iverilog):
+    python3 vigna_vvp_cache.py -- -o /tmp/test.vvp -I. vigna_core.v sim/processor_testbench.v
+    python3 vigna_vvp_cache.py --stats
+    python3 vigna_vvp_cache.py --clear
+"""
+
+import os
+import sys
+import shutil
+import hashlib
+import argparse
+import tempfile
+import subprocess
+from typing import Dict, List, Optional, Tuple
+
+from vigna_preprocessor import ICARUS_PREDEFINES, parse_define_args, resolve
+
+DEFAULT_CACHE_DIR = os.environ.get(
+    'VIGNA_VVP_CACHE', os.path.join(os.path.expanduser('~'), '.cache', 'vigna', 'vvp'))
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+
+# iverilog options that take a value, either attached (-Ifoo) or separate (-I foo)
+_VALUE_OPTIONS = ('-o', '-I', '-D', '-s', '-g', '-W', '-y', '-Y', '-c', '-f', '-p', '-P', '-t', '-T', '-M', '-m')
+
+
+def parse_iverilog_args(args: List[str]) -> Tuple[Optional[str], List[str], List[str], List[str]]:
+    """Split an iverilog command line into (output, include dirs, other options, sources)."""
+    output = None
+    include_dirs: List[str] = []
+    options: List[str] = []
+    sources: List[str] = []
+    i = 0
+    while i < len(args):
+        arg = args[i]
+        flag = arg[:2]
+        if arg.startswith('-') and flag in _VALUE_OPTIONS:
+            value = arg[2:]
+            if not value and i + 1 < len(args):
+                i += 1
+                value = args[i]
+            if flag == '-o':
+                output = value
+            elif flag == '-I':
+                include_dirs.append(value)
+            else:
+                options.append(flag + value)
+        elif arg.startswith('-'):
+            options.append(arg)
+        else:
+            sources.append(arg)
+        i += 1
+    return output, include_dirs, options, sources
+
+
+def collect_inputs(sources: List[str], include_dirs: List[str], cwd: str,
+                   defines: Optional[Dict[str, str]] = None) -> List[str]:
+    """All files that can influence compilation, in the order iverilog reads them.
+
+    The sources are preprocessed with the command-line `defines`, so only
+    `include directives in active `ifdef branches are followed.
+    """
+    return resolve(sources, dict(ICARUS_PREDEFINES, **(defines or {})),
+                   include_dirs, cwd)['files']
+
+
+_iverilog_versions: Dict[str, str] = {}
+
+
+def iverilog_version(iverilog: str = 'iverilog') -> str:
+    """First line of `iverilog -V`, cached per executable."""
+    if iverilog not in _iverilog_versions:
+        try:
+            result = subprocess.run([iverilog, '-V'], capture_output=True, text=True)
+            _iverilog_versions[iverilog] = (result.stdout or result.stderr).split('\n', 1)[0]
+        except OSError:
+            _iverilog_versions[iverilog] = 'unknown'
+    return _iverilog_versions[iverilog]
+
+
+class VvpCache:
+    """A directory of <sha256>.vvp files with LRU eviction by modification time."""
+
+    def __init__(self, directory: str = DEFAULT_CACHE_DIR, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        os.makedirs(directory, exist_ok=True)
+
+    def key(self, args: List[str], cwd: str = '.', version: str = '') -> str:
+        """Cache key for an iverilog command line run from `cwd`."""
+        cwd = os.path.abspath(cwd)
+        _, include_dirs, options, sources = parse_iverilog_args(args)
+        digest = hashlib.sha256()
+        digest.update(version.encode())
+        for part in options + ['--'] + include_dirs + ['--'] + sources:
+            digest.update(part.encode() + b'\0')
+        # Contents only: job directories with identical files share entries
+        defines = parse_define_args([o for o in options if o.startswith('-D')])
+        for path in collect_inputs(sources, include_dirs, cwd, defines):
+            with open(path, 'rb') as f:
+                digest.update(hashlib.sha256(f.read()).digest())
+        return digest.hexdigest()
+
+    def _entry(self, key: str) -> str:
+        return os.path.join(self.directory, key + '.vvp')
+
+    def lookup(self, key: str, dest: str) -> bool:
+        """Copy a cached entry to `dest`; returns False on a miss."""
+        entry = self._entry(key)
+        try:
+            shutil.copyfile(entry, dest)
+        except FileNotFoundError:
+            return False
+        try:
+            os.utime(entry)
+        except FileNotFoundError:
+            pass    # evicted by another job after we copied it
+        return True
+
+    def store(self, key: str, src: str):
+        """Publish a compiled file under `key` and enforce the size cap."""
+        fd, tmp = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as out, open(src, 'rb') as f:
+                shutil.copyfileobj(f, out)
+            os.replace(tmp, self._entry(key))
+        except BaseException:
+            if os.path.exists(tmp):
+                os.unlink(tmp)
+            raise
+        self.evict()
+
+    def entries(self) -> List[Tuple[float, int, str]]:
+        """(last use, size, path) for every entry, oldest first."""
+        result = []
+        for name in os.listdir(self.directory):
+            if not name.endswith('.vvp'):
+                continue
+            path = os.path.join(self.directory, name)
+            try:
+                st = os.stat(path)
+            except FileNotFoundError:
+                continue
+            result.append((st.st_mtime, st.st_size, path))
+        return sorted(result)
+
+    def evict(self):
+        """Remove least recently used entries until the cache fits in max_bytes."""
+        entries = self.entries()
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            try:
+                os.unlink(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+
+    def stats(self) -> Dict[str, int]:
+        entries = self.entries()
+        return {'entries': len(entries), 'bytes': sum(size for _, size, _ in entries),
+                'max_bytes': self.max_bytes}
+
+    def clear(self):
+        for _, _, path in self.entries():
+            try:
+                os.unlink(path)
+            except FileNotFoundError:
+                pass
+
+    def compile(self, args: List[str], cwd: str = '.', iverilog: str = 'iverilog',
+                timeout: Optional[float] = None) -> Tuple[subprocess.CompletedProcess, bool]:
+        """Run `iverilog args` in `cwd` unless the result is cached.
+
+        Returns (completed process, cache hit). Only successful compiles with
+        an -o output are stored.
+        """
+        output = parse_iverilog_args(args)[0]
+        if output is None:
+            return subprocess.run([iverilog] + args, cwd=cwd, capture_output=True,
+                                  text=True, timeout=timeout), False
+        dest = os.path.join(cwd, output)
+        key = self.key(args, cwd, iverilog_version(iverilog))
+        if self.lookup(key, dest):
+            return subprocess.CompletedProcess([iverilog] + args, 0, '', ''), True
+        result = subprocess.run([iverilog] + args, cwd=cwd, capture_output=True,
+                                text=True, timeout=timeout)
+        if result.returncode == 0 and os.path.exists(dest):
+            self.store(key, dest)
+        return result, False
+
+
+def main():
+    """Command-line interface: an iverilog wrapper plus cache maintenance."""
+    parser = argparse.ArgumentParser(
+        description="VIGNA compiled simulation (.vvp) cache",
+        usage="%(prog)s [options] -- <iverilog arguments>")
+    parser.add_argument('--cache-dir', default=DEFAULT_CACHE_DIR,
+                        help=f'Cache directory (default: {DEFAULT_CACHE_DIR}, or $VIGNA_VVP_CACHE)')
+    parser.add_argument('--max-size', type=int, default=DEFAULT_MAX_BYTES // (1024 * 1024),
+                        help='Cache size limit in MiB (default: %(default)s)')
+    parser.add_argument('--iverilog', default='iverilog', help='iverilog executable')
+    parser.add_argument('--stats', action='store_true', help='Print cache statistics')
+    parser.add_argument('--clear', action='store_true', help='Remove all cache entries')
+    parser.add_argument('-v', '--verbose', action='store_true', help='Report hits and misses')
+    parser.add_argument('iverilog_args', nargs=argparse.REMAINDER)
+    args = parser.parse_args()
+
+    cache = VvpCache(args.cache_dir, args.max_size * 1024 * 1024)
+    if args.clear:
+        cache.clear()
+        print(f"Cleared {args.cache_dir}")
+    if args.stats:
+        stats = cache.stats()
+        print(f"Cache directory: {args.cache_dir}")
+        print(f"Entries: {stats['entries']}")
+        print(f"Size:    {stats['bytes'] / (1024 * 1024):.1f} MiB of "
+              f"{stats['max_bytes'] / (1024 * 1024):.0f} MiB")
+
+    iverilog_args = args.iverilog_args
+    if iverilog_args and iverilog_args[0] == '--':
+        iverilog_args = iverilog_args[1:]
+    if not iverilog_args:
+        if not (args.stats or args.clear):
+            parser.print_usage()
+            sys.exit(1)
+        return
+
+    try:
+        result, hit = cache.compile(iverilog_args, os.getcwd(), args.iverilog)
+    except OSError as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+    sys.stdout.write(result.stdout)
+    sys.stderr.write(result.stderr)
+    if args.verbose:
+        output = parse_iverilog_args(iverilog_args)[0]
+        print(f"vvp cache {'hit' if hit else 'miss'}: {output}")
+    sys.exit(result.returncode)
+
+
+if __name__ == "__main__":
+    main()
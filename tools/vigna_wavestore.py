@@ -0,0 +1,378 @@
+#!/usr/bin/env python3
+"""
+VIGNA Columnar Waveform Store
+
+Converts a VCD dump into a directory of per-signal change arrays that are
+memory-mapped with NumPy, so scripted debugging can ask questions about a
+dump without re-parsing the text VCD each time:
+
+    <store>/index.json      timescale, end time and signal table
+    <store>/s<N>.time       uint64 change times, sorted (the time index)
+    <store>/s<N>.value      uint64 value after each change (low 64 bits)
+    <store>/s<N>.x          uint8 flags, 1 where the value had x/z bits (optional)
+
+Every lookup is a binary search on a .time column, so the value of a signal
+at any set of times is one vectorized searchsorted over a memory map.
+Conversion streams the VCD in constant memory and needs only the standard
+library; queries need NumPy.
+
+Usage:
+    python3 vigna_wavestore.py convert sim/program_test.vcd program_test.wave
+    python3 vigna_wavestore.py signals program_test.wave
+    python3 vigna_wavestore.py values program_test.wave vigna.pc --t0 1000 --t1 2000
+    python3 vigna_wavestore.py where program_test.wave "d_valid && !d_ready"
+
+In Python:
+    store = WaveStore('program_test.wave')
+    times, values = store.changes('vigna.pc', 1000, 2000)
+    stalled = store.cycles_where('d_valid && !d_ready')
+"""
+
+import os
+import re
+import ast
+import sys
+import json
+import argparse
+import operator
+from array import array
+from typing import Dict, List, Optional, Tuple
+
+from vigna_vcd import open_vcd, read_header, iter_changes, vcd_int, find_core_scope
+
+try:
+    import numpy as np
+except ImportError:     # conversion works without NumPy, queries do not
+    np = None
+
+FORMAT_VERSION = 1
+FLUSH_CHANGES = 1 << 16
+
+
+class _Column:
+    """Append buffers for one signal, flushed to its raw files."""
+
+    def __init__(self, base: str):
+        self.base = base
+        self.times = array('Q')
+        self.values = array('Q')
+        self.flags = bytearray()
+        self.count = 0
+        self.has_x = False
+
+    def append(self, time: int, value: str):
+        number = vcd_int(value)
+        flag = 0
+        if number is None:      # x/z bits (and real values, which the core never dumps)
+            number, flag = 0, 1
+        self.times.append(time)
+        self.values.append(number & 0xFFFFFFFFFFFFFFFF)
+        self.flags.append(flag)
+        self.has_x |= bool(flag)
+        if len(self.times) >= FLUSH_CHANGES:
+            self.flush()
+
+    def flush(self):
+        if not self.times:
+            return
+        for suffix, data in (('.time', self.times), ('.value', self.values), ('.x', self.flags)):
+            with open(self.base + suffix, 'ab') as f:
+                f.write(data if isinstance(data, bytearray) else data.tobytes())
+        self.count += len(self.times)
+        self.times = array('Q')
+        self.values = array('Q')
+        self.flags = bytearray()
+
+
+def convert(vcd_path: str, store_dir: str) -> Dict[str, any]:
+    """Convert a VCD (or .vcd.gz) into a store directory; returns the index."""
+    if array('Q').itemsize != 8:
+        raise OSError("platform has no 64-bit unsigned array type")
+    os.makedirs(store_dir, exist_ok=True)
+    for name in os.listdir(store_dir):
+        if name == 'index.json' or re.match(r's\d+\.(time|value|x)$', name):
+            os.unlink(os.path.join(store_dir, name))
+
+    with open_vcd(vcd_path) as f:
+        signals, timescale = read_header(f)
+        columns: Dict[str, _Column] = {}
+        for ident, _ in signals.values():
+            if ident not in columns:
+                columns[ident] = _Column(os.path.join(store_dir, f"s{len(columns)}"))
+        end_time = 0
+        for time, changes in iter_changes(f, set(columns)):
+            for ident, value in changes:
+                columns[ident].append(time, value)
+            end_time = time
+
+    for column in columns.values():
+        column.flush()
+        if not column.has_x and os.path.exists(column.base + '.x'):
+            os.unlink(column.base + '.x')
+    index = {
+        'version': FORMAT_VERSION,
+        'source': os.path.abspath(vcd_path),
+        'timescale': timescale,
+        'end_time': end_time,
+        'signals': {
+            name: {'column': os.path.basename(columns[ident].base), 'width': width,
+                   'changes': columns[ident].count, 'has_x': columns[ident].has_x}
+            for name, (ident, width) in sorted(signals.items())
+        },
+    }
+    with open(os.path.join(store_dir, 'index.json'), 'w') as f:
+        json.dump(index, f, indent=1)
+    return index
+
+
+class WaveStore:
+    """Read-only query interface over a converted store."""
+
+    def __init__(self, store_dir: str):
+        if np is None:
+            raise ImportError("numpy is required to query a waveform store (pip install numpy)")
+        with open(os.path.join(store_dir, 'index.json'), 'r') as f:
+            self.index = json.load(f)
+        if self.index.get('version') != FORMAT_VERSION:
+            raise ValueError(f"{store_dir}: unsupported store version {self.index.get('version')}")
+        self.directory = store_dir
+        self.timescale = self.index['timescale']
+        self.end_time = self.index['end_time']
+        self._signals = self.index['signals']
+        self._maps: Dict[str, Tuple[any, any, any]] = {}
+        self._core: Optional[str] = None
+
+    def signals(self) -> List[str]:
+        return list(self._signals)
+
+    def resolve(self, name: str) -> str:
+        """Full hierarchical name for `name`.
+
+        Accepts full names, unique suffixes ('dut.pc', 'd_valid') and names
+        starting with 'vigna.' for the core instance, wherever it sits.
+        """
+        if name in self._signals:
+            return name
+        head, _, rest = name.partition('.')
+        if head == 'vigna' and rest:
+            if self._core is None:
+                self._core = find_core_scope({n: (s['column'], s['width'])
+                                              for n, s in self._signals.items()})
+            if f"{self._core}.{rest}" in self._signals:
+                return f"{self._core}.{rest}"
+        # A net connected through a port appears at several levels: take the outermost
+        matches = sorted((n for n in self._signals if n.endswith('.' + name)),
+                         key=lambda n: (n.count('.'), n))
+        if not matches:
+            raise KeyError(f"no signal '{name}' in the store")
+        if len(matches) > 1 and matches[0].count('.') == matches[1].count('.'):
+            raise KeyError(f"'{name}' is ambiguous: {', '.join(matches[:4])}")
+        return matches[0]
+
+    def column(self, name: str):
+        """(times, values, x flags or None) memory maps for a signal."""
+        full = self.resolve(name)
+        info = self._signals[full]
+        key = info['column']
+        if key not in self._maps:
+            base = os.path.join(self.directory, key)
+            if info['changes'] == 0:
+                empty = np.zeros(0, dtype=np.uint64)
+                self._maps[key] = (empty, empty, None)
+            else:
+                times = np.memmap(base + '.time', dtype=np.uint64, mode='r')
+                values = np.memmap(base + '.value', dtype=np.uint64, mode='r')
+                flags = np.memmap(base + '.x', dtype=np.uint8, mode='r') if info['has_x'] else None
+                self._maps[key] = (times, values, flags)
+        return self._maps[key]
+
+    def value_at(self, name: str, times, before: bool = False):
+        """Value of a signal at each of `times` (0 before its first change).
+
+        With before=True a change at exactly the query time is not yet
+        visible, which is how flip-flops sample at a clock edge.
+        """
+        col_times, col_values, _ = self.column(name)
+        times = np.asarray(times, dtype=np.uint64)
+        if len(col_times) == 0:
+            return np.zeros(len(times), dtype=np.uint64)
+        pos = np.searchsorted(col_times, times, side='left' if before else 'right') - 1
+        result = col_values[np.maximum(pos, 0)]
+        return np.where(pos >= 0, result, np.uint64(0))
+
+    def changes(self, name: str, t0: int = 0, t1: Optional[int] = None):
+        """(times, values) of a signal over [t0, t1], starting with its value at t0."""
+        col_times, col_values, _ = self.column(name)
+        t1 = self.end_time if t1 is None else t1
+        lo = np.searchsorted(col_times, np.uint64(t0), side='right')
+        hi = np.searchsorted(col_times, np.uint64(t1), side='right')
+        times = np.concatenate(([np.uint64(t0)], col_times[lo:hi])).astype(np.uint64)
+        values = np.concatenate((self.value_at(name, [t0]), col_values[lo:hi])).astype(np.uint64)
+        return times, values
+
+    def edges(self, clock: str = 'vigna.clk', t0: int = 0, t1: Optional[int] = None):
+        """Rising-edge times of a clock within [t0, t1]."""
+        col_times, col_values, _ = self.column(clock)
+        t1 = self.end_time if t1 is None else t1
+        lo = np.searchsorted(col_times, np.uint64(t0), side='left')
+        hi = np.searchsorted(col_times, np.uint64(t1), side='right')
+        times = col_times[lo:hi]
+        values = col_values[lo:hi]
+        previous = self.value_at(clock, times[:1], before=True) if len(times) else values[:0]
+        rising = (values == 1) & (np.concatenate((previous, values[:-1])) == 0)
+        return np.asarray(times[rising])
+
+    def sample(self, names: List[str], clock: str = 'vigna.clk', t0: int = 0,
+               t1: Optional[int] = None) -> Tuple[any, Dict[str, any]]:
+        """(edge times, {name: values sampled at each rising clock edge})."""
+        edges = self.edges(clock, t0, t1)
+        return edges, {name: self.value_at(name, edges, before=True) for name in names}
+
+    def cycles_where(self, expression: str, clock: str = 'vigna.clk', t0: int = 0,
+                     t1: Optional[int] = None):
+        """Rising-edge times at which a condition holds.
+
+        The condition uses Verilog-style operators on signal names, e.g.
+        "d_valid && !d_ready" or "vigna.exec_state == 9 || vigna.pc == 0x40".
+        """
+        tree = parse_condition(expression)
+        names = sorted(_condition_names(tree))
+        edges, values = self.sample(names, clock, t0, t1)
+        result = _evaluate(tree, values)
+        return edges[np.broadcast_to(np.asarray(result, dtype=bool), edges.shape)]
+
+
+# -- condition expressions ----------------------------------------------------
+
+_VERILOG_OPS = [(re.compile(r'&&'), ' and '), (re.compile(r'\|\|'), ' or '),
+                (re.compile(r'!(?!=)'), ' not '), (re.compile(r"\b\d+'[hH]([0-9a-fA-F_]+)"), r'0x\1'),
+                (re.compile(r"\b\d+'[dD]([0-9_]+)"), r'\1'), (re.compile(r"\b\d+'[bB]([01_]+)"), r'0b\1')]
+
+
+def parse_condition(expression: str) -> ast.AST:
+    """Parse a Verilog-style condition into a Python expression tree."""
+    text = expression
+    for pattern, replacement in _VERILOG_OPS:
+        text = pattern.sub(replacement, text)
+    try:
+        tree = ast.parse(text.strip(), mode='eval').body
+    except SyntaxError as e:
+        raise ValueError(f"cannot parse condition '{expression}': {e.msg}")
+    for node in ast.walk(tree):
+        if not isinstance(node, (ast.BoolOp, ast.UnaryOp, ast.Compare, ast.BinOp, ast.Name,
+                                 ast.Attribute, ast.Constant, ast.Load, ast.boolop, ast.unaryop,
+                                 ast.cmpop, ast.operator)):
+            raise ValueError(f"unsupported construct in condition '{expression}'")
+    return tree
+
+
+def _dotted(node: ast.AST) -> Optional[str]:
+    if isinstance(node, ast.Name):
+        return node.id
+    if isinstance(node, ast.Attribute):
+        base = _dotted(node.value)
+        return f"{base}.{node.attr}" if base else None
+    return None
+
+
+def _condition_names(node: ast.AST) -> set:
+    """Signal names referenced by a parsed condition."""
+    name = _dotted(node)
+    if name is not None:
+        return {name}
+    names = set()
+    for child in ast.iter_child_nodes(node):
+        names |= _condition_names(child)
+    return names
+
+
+_BIN_OPS = {ast.BitAnd: operator.and_, ast.BitOr: operator.or_, ast.BitXor: operator.xor,
+            ast.Add: operator.add, ast.Sub: operator.sub,
+            ast.LShift: operator.lshift, ast.RShift: operator.rshift}
+_COMPARE = {ast.Eq: operator.eq, ast.NotEq: operator.ne, ast.Lt: operator.lt,
+            ast.LtE: operator.le, ast.Gt: operator.gt, ast.GtE: operator.ge}
+
+
+def _evaluate(node: ast.AST, values: Dict[str, any]):
+    """Evaluate a parsed condition over arrays of sampled values."""
+    if isinstance(node, (ast.Name, ast.Attribute)):
+        return values[_dotted(node)].astype(np.int64)
+    if isinstance(node, ast.Constant):
+        return node.value
+    if isinstance(node, ast.BoolOp):
+        parts = [_evaluate(v, values) != 0 for v in node.values]
+        reduce = np.logical_and if isinstance(node.op, ast.And) else np.logical_or
+        return reduce.reduce(parts)
+    if isinstance(node, ast.UnaryOp):
+        operand = _evaluate(node.operand, values)
+        if isinstance(node.op, ast.Not):
+            return np.logical_not(operand != 0)
+        if isinstance(node.op, ast.Invert):
+            return np.invert(operand)
+        if isinstance(node.op, ast.USub):
+            return -operand
+    if isinstance(node, ast.BinOp) and type(node.op) in _BIN_OPS:
+        return _BIN_OPS[type(node.op)](_evaluate(node.left, values), _evaluate(node.right, values))
+    if isinstance(node, ast.Compare) and all(type(op) in _COMPARE for op in node.ops):
+        result = True
+        left = _evaluate(node.left, values)
+        for op, comparator in zip(node.ops, node.comparators):
+            right = _evaluate(comparator, values)
+            result = np.logical_and(result, _COMPARE[type(op)](left, right))
+            left = right
+        return result
+    raise ValueError("unsupported construct in condition")
+
+
+def main():
+    """Command-line interface for the waveform store."""
+    parser = argparse.ArgumentParser(description="VIGNA columnar waveform store")
+    sub = parser.add_subparsers(dest='command', required=True)
+    p = sub.add_parser('convert', help='Convert a VCD dump into a store')
+    p.add_argument('vcd', help='VCD dump (.vcd or .vcd.gz)')
+    p.add_argument('store', help='Output store directory')
+    p = sub.add_parser('signals', help='List the signals in a store')
+    p.add_argument('store')
+    p = sub.add_parser('values', help='Print the changes of a signal over a time range')
+    p.add_argument('store')
+    p.add_argument('signal')
+    p.add_argument('--t0', type=int, default=0)
+    p.add_argument('--t1', type=int)
+    p = sub.add_parser('where', help='Print the clock edges at which a condition holds')
+    p.add_argument('store')
+    p.add_argument('condition', help='e.g. "d_valid && !d_ready"')
+    p.add_argument('--clock', default='vigna.clk')
+    p.add_argument('--t0', type=int, default=0)
+    p.add_argument('--t1', type=int)
+    p.add_argument('--count', action='store_true', help='Only print the number of matching edges')
+    args = parser.parse_args()
+
+    try:
+        if args.command == 'convert':
+            index = convert(args.vcd, args.store)
+            total = sum(s['changes'] for s in index['signals'].values())
+            print(f"Converted {len(index['signals'])} signals, {total} value changes to {args.store}")
+            return
+        store = WaveStore(args.store)
+        if args.command == 'signals':
+            for name in store.signals():
+                info = store.index['signals'][name]
+                print(f"{name:<60} {info['width']:>4} bits {info['changes']:>12} changes")
+        elif args.command == 'values':
+            times, values = store.changes(args.signal, args.t0, args.t1)
+            for t, v in zip(times.tolist(), values.tolist()):
+                print(f"{t:>14}  0x{v:x}")
+        else:
+            edges = store.cycles_where(args.condition, args.clock, args.t0, args.t1)
+            if args.count:
+                print(len(edges))
+            else:
+                for t in edges.tolist():
+                    print(t)
+    except (ImportError, OSError, KeyError, ValueError) as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
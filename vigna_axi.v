@@ -225,8 +225,14 @@ always @(posedge clk) begin
                     d_awvalid <= 1'b0;
                     d_wvalid <= 1'b0;
                     d_state <= D_WRITE_RESP;
+                end else if (d_awready || d_wready) begin
+                    // One channel completed on its own, wait for the other
+                    if (d_awready)
+                        d_awvalid <= 1'b0;
+                    if (d_wready)
+                        d_wvalid <= 1'b0;
+                    d_state <= D_WRITE_DATA;
                 end
-                // Wait for both d_awready and d_wready to be asserted
             end
             D_WRITE_DATA: begin
                 if (d_awready && d_awvalid) begin
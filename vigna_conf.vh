@@ -49,6 +49,22 @@
 
 /*--------------------------------------------------------------------------*/
 
+/* instruction prefetch option
+ * uncomment this line to fetch up to two words ahead while the execution
+ * unit is busy; the queue is flushed on taken jumps, branches and traps.
+ * instructions already fetched are not refetched after a store to them */
+
+//`define VIGNA_CORE_PREFETCH
+
+/* static branch prediction option (requires the prefetch queue)
+ * jal and backward branches steer the queue to their target as soon as they
+ * are decoded, forward branches let it run on; a wrong guess costs a refetch
+ * and is counted in mhpmcounter6 when the performance counters are on */
+
+//`define VIGNA_CORE_BRANCH_PREDICT
+
+/*--------------------------------------------------------------------------*/
+
 /* preload negative option
  * preload the negative number for the alu
  * this option uses more resources but provides better timing */
@@ -59,13 +75,24 @@
 
 `define VIGNA_CORE_M_EXTENSION
 
-//ToDo
+/* FPGA fast multiply/divide option (requires the M extension)
+ * DSP-mapped multiplier (3 cycles) and radix-4 early-out divider
+ * (at most 19 cycles) instead of the 35-cycle iterative unit */
+
 //`define VIGNA_CORE_M_FPGA_FAST
 
 `define VIGNA_CORE_INTERRUPT
 
 `define VIGNA_CORE_ZICSR_EXTENSION
 
+/* performance counters option (requires Zicsr)
+ * uncomment this line to add mcycle/minstret, their cycle/instret read-only
+ * shadows and mhpmcounter3-5 (fetch stall, data stall and coprocessor busy
+ * cycles), plus mhpmcounter6 (branch mispredictions) with branch prediction;
+ * mcountinhibit stops individual counters */
+
+//`define VIGNA_CORE_PERF_COUNTERS
+
 
 /* C extension support
  * uncomment this line to enable RISC-V Compact instruction extension
@@ -59,7 +59,10 @@
 // M extension ENABLED for RV32IM
 `define VIGNA_CORE_M_EXTENSION
 
-//ToDo
+/* FPGA fast multiply/divide option (requires the M extension)
+ * DSP-mapped multiplier (3 cycles) and radix-4 early-out divider
+ * (at most 19 cycles) instead of the 35-cycle iterative unit */
+
 //`define VIGNA_CORE_M_FPGA_FAST
 
 //ToDo
@@ -2,6 +2,173 @@
 `ifndef VIGNA_COPROC
 `define VIGNA_COPROC
 
+`ifdef VIGNA_CORE_M_FPGA_FAST
+
+/* FPGA-oriented variant: multiplies are a single 33x33 signed product with
+ * registered operands and result, so they map onto DSP blocks (3 cycles from
+ * valid to the core seeing ready); divides retire two quotient bits per cycle
+ * and skip the leading zero bit pairs of the dividend (3 + ceil(bits / 2)
+ * cycles, at most 19). Division by zero and signed overflow take 2 cycles. */
+module vigna_m_ext(
+    input clk,
+    input resetn,
+
+    input         valid,
+    output reg    ready,
+    input  [2:0]  func,
+    input  [2:0]  id,
+    input  [31:0] op1,
+    input  [31:0] op2,
+    output [31:0] result
+);
+
+    reg [32:0] ma, mb;   // sign- or zero-extended multiplier operands
+    reg [63:0] dr;
+    reg [31:0] dn;       // dividend bits still to be shifted in, msb first
+    reg [31:0] rem;
+    reg [31:0] quo;
+    reg [33:0] dd, dd3;  // divisor and three times the divisor
+    reg [2:0]  state;
+    reg [4:0]  ctr;
+
+    wire is_mul, is_mulh, is_mulhsu, is_mulhu;
+    assign is_mul    = func == 3'b000;
+    assign is_mulh   = func == 3'b001;
+    assign is_mulhsu = func == 3'b010;
+    assign is_mulhu  = func == 3'b011;
+
+    wire is_div, is_divu, is_rem, is_remu;
+    assign is_div  = func == 3'b100;
+    assign is_divu = func == 3'b101;
+    assign is_rem  = func == 3'b110;
+    assign is_remu = func == 3'b111;
+
+
+    wire sign;
+
+    assign sign = is_mulhsu                   ? op1[31] :
+                  is_div || is_rem || is_mulh ? op1[31] ^ op2[31] : 0;
+
+    assign result = (is_mulh || is_mulhsu || is_mulhu || is_div || is_divu) ? dr[63:32] : dr[31:0];
+
+    wire signed [65:0] product;
+    assign product = $signed(ma) * $signed(mb);
+
+    // number of significant bit pairs in the dividend
+    function [4:0] div_pairs;
+        input [31:0] x;
+        integer k;
+        begin
+            div_pairs = 0;
+            for (k = 0; k < 16; k = k + 1)
+                if (x[2 * k +: 2] != 2'b00)
+                    div_pairs = k + 1;
+        end
+    endfunction
+
+    wire [31:0] n_abs, d_abs;
+    assign n_abs = (op1[31] && !func[0]) ? ~op1 + 32'd1 : op1;
+    assign d_abs = (op2[31] && !func[0]) ? ~op2 + 32'd1 : op2;
+
+    wire [4:0] n_pairs;
+    assign n_pairs = div_pairs(n_abs);
+
+    // radix-4 restoring step
+    wire [33:0] r4, dd2;
+    assign r4  = {rem, dn[31:30]};
+    assign dd2 = {dd[32:0], 1'b0};
+
+    wire ge1, ge2, ge3;
+    assign ge1 = r4 >= dd;
+    assign ge2 = r4 >= dd2;
+    assign ge3 = r4 >= dd3;
+
+    wire [1:0] q;
+    assign q = ge3 ? 2'd3 : ge2 ? 2'd2 : ge1 ? 2'd1 : 2'd0;
+
+    wire [33:0] r4_next;
+    assign r4_next = ge3 ? r4 - dd3 :
+                     ge2 ? r4 - dd2 :
+                     ge1 ? r4 - dd  : r4;
+
+    always @ (posedge clk) begin
+        if (!resetn) begin
+            ma     <= 0;
+            mb     <= 0;
+            dr     <= 0;
+            dn     <= 0;
+            rem    <= 0;
+            quo    <= 0;
+            dd     <= 0;
+            dd3    <= 0;
+            state  <= 0;
+            ctr    <= 0;
+            ready  <= 0;
+        end
+        else begin
+            case (state)
+                0: begin
+                    if (valid) begin
+                        if (!func[2]) begin
+                            ma <= {(is_mulh || is_mulhsu) && op1[31], op1};
+                            mb <= {is_mulh && op2[31], op2};
+                            state <= 2;
+                        end
+                        else if (op2 == 0) begin
+                            state <= 1;
+                            ready <= 1;
+                            dr <= {32'hffffffff, op1};
+                        end
+                        else if ((is_div || is_rem) && (op1 == 32'h80000000) && (op2 == 32'hffffffff)) begin
+                            state <= 1;
+                            ready <= 1;
+                            dr <= {32'h80000000, 32'h0};
+                        end
+                        else begin
+                            dn  <= n_abs << {5'd16 - n_pairs, 1'b0};
+                            rem <= 0;
+                            quo <= 0;
+                            dd  <= {2'b00, d_abs};
+                            dd3 <= {2'b00, d_abs} + {1'b0, d_abs, 1'b0};
+                            ctr <= n_pairs;
+                            state <= n_pairs == 0 ? 5 : 4;
+                        end
+                    end
+                end
+                1: begin // wait_stage
+                    ready <= 0;
+                    state <= 0;
+                end
+                2: begin // mul_stage
+                    dr <= product[63:0];
+                    state <= 1;
+                    ready <= 1;
+                end
+                4: begin // div_stage
+                    rem <= r4_next[31:0];
+                    quo <= {quo[29:0], q};
+                    dn  <= {dn[29:0], 2'b00};
+                    ctr <= ctr - 5'd1;
+                    if (ctr == 5'd1)
+                        state <= 5;
+                end
+                5: begin
+                    dr[31:0] <= op1[31] & is_rem ? (~rem + 32'd1) : rem;
+                    dr[63:32] <= sign ? (~quo + 32'd1) : quo;
+                    state <= 1;
+                    ready <= 1;
+                end
+                default: begin
+                    state <= 0;
+                end
+            endcase
+        end
+    end
+
+endmodule
+
+`else
+
 module vigna_m_ext(
     input clk,
     input resetn,
@@ -128,4 +295,6 @@ module vigna_m_ext(
 
 endmodule
 
-`endif 
\ No newline at end of file
+`endif
+
+`endif
@@ -26,6 +26,14 @@
 `include "vigna_coproc.v"
 `endif 
 
+//branch prediction steers the prefetch queue, the plain fetch unit has no
+//use for it (pred_* only exist with the queue)
+`ifdef VIGNA_CORE_BRANCH_PREDICT
+`ifndef VIGNA_CORE_PREFETCH
+`error "VIGNA_CORE_BRANCH_PREDICT requires VIGNA_CORE_PREFETCH"
+`endif
+`endif
+
 //vigna top module
 module vigna(
     input clk,
@@ -72,6 +80,178 @@ assign fetched = fetch_state == 3;
 
 
 
+`ifdef VIGNA_CORE_PREFETCH
+//prefetch queue: up to two sequential words starting at pf_base, the one
+//at pf_addr may be in flight. pc always lies in the word at pf_base, except
+//while a predicted taken jump or branch waits for dispatch.
+reg  [31:0] pf_addr;
+reg  [31:0] pf_base;
+reg  [31:0] pf_word0, pf_word1;
+reg  [ 1:0] pf_count;
+reg  pf_drop;             // the request in flight belongs to a flushed stream
+wire pf_hold;             // do not fetch past an unresolved jump or branch
+
+`ifdef VIGNA_CORE_BRANCH_PREDICT
+//static prediction: jal and backward branches are predicted taken, forward
+//branches not taken. the queue is steered to the predicted target as soon as
+//the instruction is decoded, and sent down the other path when the branch
+//resolves the cycle after dispatch.
+wire pred_taken;          // the decoded instruction redirects fetch
+wire [31:0] pred_target;
+reg  pred_taken_r;        // prediction of the branch in execution
+reg  [31:0] pred_alt;     // the path not predicted
+wire pred_miss;
+`endif
+
+//words available to the instruction side this cycle, bypassing the queue
+//when the word arrives from memory
+wire pf_cap, pf_avail0, pf_avail1;
+wire [31:0] pf_inst0, pf_inst1;
+assign pf_cap    = internal_valid && i_ready && !pf_drop;
+assign pf_avail0 = pf_count != 0 || pf_cap;
+assign pf_avail1 = pf_count == 2 || (pf_count == 1 && pf_cap);
+assign pf_inst0  = pf_count != 0 ? pf_word0 : i_rdata;
+assign pf_inst1  = pf_count == 2 ? pf_word1 : i_rdata;
+
+//when pc moves on: stay in the head word, step to the next one, or refill
+wire pf_advance, pf_same, pf_pop, pf_flush, pf_push;
+wire [31:0] pf_target;
+`ifdef VIGNA_CORE_BRANCH_PREDICT
+assign pf_advance = (fetch_state == 3 && fetch_received) || pred_miss || (fetched && pred_taken);
+assign pf_target  = pred_miss ? pred_alt : pc_next;
+`else
+assign pf_advance = fetch_state == 3 && fetch_received;
+assign pf_target  = pc_next;
+`endif
+assign pf_same    = pf_target[31:2] == pf_base[31:2];
+//a mispredict can move pc on before the head word arrived, refill then
+assign pf_pop     = pf_advance && !pf_same && pf_target[31:2] == pf_base[31:2] + 30'd1 && pf_count != 0;
+assign pf_flush   = pf_advance && !pf_same && !pf_pop;
+assign pf_push    = pf_cap && !pf_flush;
+
+assign inst_addr = pc;
+assign i_addr = pf_addr;
+
+assign i_valid = internal_valid;
+
+always @ (posedge clk) begin
+    //reset logic
+    if (!resetn) begin
+        pc              <= `VIGNA_CORE_RESET_ADDR;
+        fetch_state     <= 0;
+        internal_valid  <= 0;
+        pf_addr         <= `VIGNA_CORE_RESET_ADDR & 32'hFFFF_FFFC;
+        pf_base         <= `VIGNA_CORE_RESET_ADDR & 32'hFFFF_FFFC;
+        pf_count        <= 0;
+        pf_drop         <= 0;
+        `ifdef VIGNA_CORE_C_EXTENSION
+        pending_inst    <= 16'h0;
+        inst_is_16bit   <= 0;
+        have_pending    <= 0;
+        `endif
+    end else begin
+        //instruction side: take the instruction at pc from the queue
+        case (fetch_state)
+            0: begin
+                fetch_state <= 1;
+            end
+            1: begin
+                `ifdef VIGNA_CORE_C_EXTENSION
+                if (pc[1] == 1'b0) begin
+                    if (pf_avail0) begin
+                        if (pf_inst0[1:0] != 2'b11) begin
+                            inst[31:16]   <= 16'h0;
+                            inst[15:0]    <= pf_inst0[15:0];
+                            inst_is_16bit <= 1;
+                        end else begin
+                            inst          <= pf_inst0;
+                            inst_is_16bit <= 0;
+                        end
+                        fetch_state <= 3;
+                    end
+                end else if (pf_avail0 && pf_inst0[17:16] != 2'b11) begin
+                    inst[31:16]   <= 16'h0;
+                    inst[15:0]    <= pf_inst0[31:16];
+                    inst_is_16bit <= 1;
+                    fetch_state   <= 3;
+                end else if (pf_avail0 && pf_avail1) begin
+                    // 32-bit instruction across the word boundary, the upper
+                    // halfword comes from the next queue entry
+                    inst          <= {pf_inst1[15:0], pf_inst0[31:16]};
+                    inst_is_16bit <= 0;
+                    fetch_state   <= 3;
+                end
+                `else
+                if (pf_avail0) begin
+                    inst        <= pf_inst0;
+                    fetch_state <= 3;
+                end
+                `endif
+            end
+            3: begin
+                if (fetch_received) begin
+                    pc              <= pc_next;
+                    fetch_state     <= 1;
+                end
+            end
+            default: begin
+                fetch_state     <= 0;
+            end
+        endcase
+
+        `ifdef VIGNA_CORE_BRANCH_PREDICT
+        //mispredicted branch: drop whatever was latched from the wrong path
+        if (pred_miss) begin
+            pc              <= pred_alt;
+            fetch_state     <= 1;
+        end
+        `endif
+
+        //queue
+        if (pf_flush) begin
+            pf_base     <= {pf_target[31:2], 2'b00};
+            pf_addr     <= {pf_target[31:2], 2'b00};
+            pf_count    <= 0;
+            pf_drop     <= internal_valid && !i_ready;
+        end else begin
+            if (internal_valid && i_ready)
+                pf_drop <= 0;
+            if (pf_push)
+                pf_addr <= pf_addr + 32'd4;
+            case ({pf_push, pf_pop})
+                2'b10: begin
+                    if (pf_count == 0) pf_word0 <= i_rdata;
+                    else               pf_word1 <= i_rdata;
+                    pf_count <= pf_count + 1;
+                end
+                2'b01: begin
+                    pf_word0 <= pf_word1;
+                    pf_base  <= pf_base + 32'd4;
+                    pf_count <= pf_count - 1;
+                end
+                2'b11: begin
+                    if (pf_count == 1) begin
+                        pf_word0 <= i_rdata;
+                    end else begin
+                        pf_word0 <= pf_word1;
+                        pf_word1 <= i_rdata;
+                    end
+                    pf_base  <= pf_base + 32'd4;
+                end
+                default: ;
+            endcase
+        end
+
+        //bus side: one request at a time, valid drops after every transfer
+        if (internal_valid) begin
+            if (i_ready)
+                internal_valid <= 0;
+        end else if (pf_flush || (!pf_hold && pf_count != 2)) begin
+            internal_valid <= 1;
+        end
+    end
+end
+`else
 //assign inst = i_ready ? i_rdata : inst;
 assign inst_addr = i_addr;
 assign i_addr = pc;
@@ -151,6 +331,7 @@ always @ (posedge clk) begin
         endcase
     end
 end
+`endif
 
 //decode logic
 wire [6:0] opcode;
@@ -455,8 +636,7 @@ localparam [11:0] CSR_MTVAL    = 12'h343;  // Machine trap value
 localparam [11:0] CSR_MIP      = 12'h344;  // Machine interrupt pending
 
 // Interrupt control signals
-reg interrupt_taken;
-reg [31:0] interrupt_cause;
+wire interrupt_taken;
 
 // Dedicated registers for interrupt CSRs
 reg [31:0] mstatus_r;
@@ -486,10 +666,62 @@ wire [2:0] irq_pending;
 assign irq_pending = {ext_irq, timer_irq, soft_irq};
 `endif
 
+`ifdef VIGNA_CORE_PERF_COUNTERS
+// Performance counter CSR addresses (RISC-V standard)
+localparam [11:0] CSR_MCOUNTINHIBIT = 12'h320;  // Machine counter inhibit
+
+// Counters 0 (mcycle), 2 (minstret) and 3-5 (mhpmcounter3-5), plus 6 with
+// branch prediction; counter 1 (time) reads as mcycle. Each is 64 bits, the
+// high half at address + 0x80.
+reg [63:0] mcycle_r;
+reg [63:0] minstret_r;
+reg [63:0] mhpmcounter3_r;  // fetch stall cycles
+reg [63:0] mhpmcounter4_r;  // data stall cycles
+reg [63:0] mhpmcounter5_r;  // coprocessor busy cycles
+`ifdef VIGNA_CORE_BRANCH_PREDICT
+reg [63:0] mhpmcounter6_r;  // branch mispredictions
+`endif
+reg [31:0] mcountinhibit_r;
+
+// 0xB00-0xB1F/0xB80-0xB9F machine counters, 0xC00-0xC1F/0xC80-0xC9F their
+// read-only user shadows (rdcycle, rdinstret, ...)
+wire perf_counter_csr;
+assign perf_counter_csr = (csr_addr[11:8] == 4'hB || csr_addr[11:8] == 4'hC)
+                          && csr_addr[6:5] == 2'b00;
+
+reg [63:0] perf_counter_val;
+always @ (*) begin
+    case (csr_addr[4:0])
+        5'd0, 5'd1: perf_counter_val = mcycle_r;
+        5'd2:       perf_counter_val = minstret_r;
+        5'd3:       perf_counter_val = mhpmcounter3_r;
+        5'd4:       perf_counter_val = mhpmcounter4_r;
+        5'd5:       perf_counter_val = mhpmcounter5_r;
+        `ifdef VIGNA_CORE_BRANCH_PREDICT
+        5'd6:       perf_counter_val = mhpmcounter6_r;
+        `endif
+        default:    perf_counter_val = 64'd0;
+    endcase
+end
+
+wire perf_csr_hit;
+assign perf_csr_hit = perf_counter_csr || csr_addr == CSR_MCOUNTINHIBIT;
+
+wire [31:0] perf_csr_rval;
+assign perf_csr_rval = csr_addr == CSR_MCOUNTINHIBIT ? mcountinhibit_r :
+                       csr_addr[7] ? perf_counter_val[63:32] : perf_counter_val[31:0];
+`endif
+
 // CSR read value
 wire [31:0] csr_rval;
+wire [31:0] csr_trap_rval;
+`ifdef VIGNA_CORE_PERF_COUNTERS
+assign csr_rval = perf_csr_hit ? perf_csr_rval : csr_trap_rval;
+`else
+assign csr_rval = csr_trap_rval;
+`endif
 `ifdef VIGNA_CORE_INTERRUPT
-assign csr_rval = (csr_addr == CSR_MSTATUS) ? mstatus :
+assign csr_trap_rval = (csr_addr == CSR_MSTATUS) ? mstatus :
                   (csr_addr == CSR_MIE)     ? mie :
                   (csr_addr == CSR_MTVEC)   ? mtvec :
                   (csr_addr == CSR_MSCRATCH)? mscratch :
@@ -499,7 +731,7 @@ assign csr_rval = (csr_addr == CSR_MSTATUS) ? mstatus :
                   (csr_addr == CSR_MIP)     ? mip :
                   csr_regs[csr_addr];
 `else
-assign csr_rval = csr_regs[csr_addr];
+assign csr_trap_rval = csr_regs[csr_addr];
 `endif
 
 // Global interrupt enable from mstatus.MIE (bit 3)
@@ -538,6 +770,12 @@ assign op2 = (r_type || b_type)   ? rs2_val :
 //backend state
 reg [3:0] exec_state;
 
+`ifdef VIGNA_CORE_INTERRUPT
+// Interrupts are taken in place of dispatching the fetched instruction, so
+// mepc holds the first instruction not yet executed
+assign interrupt_taken = exec_state == 4'b0000 && fetched && interrupt_request;
+`endif
+
 //source regex_jump
 reg [31:0] d1, d2, d3;
 
@@ -618,7 +856,13 @@ reg [3:0] ex_type;
 reg [3:0] ls_strb;
 reg ls_sign_extend;
 
-assign pc_next =  interrupt_taken     ? interrupt_cause :
+assign pc_next =
+                  `ifdef VIGNA_CORE_INTERRUPT
+                  interrupt_taken     ? mtvec :
+                  `endif
+                  `ifdef VIGNA_CORE_BRANCH_PREDICT
+                  pred_taken          ? pred_target :
+                  `endif
                   `ifdef VIGNA_CORE_INTERRUPT
                   (ex_jump && is_mret)  ? mepc :
                   `endif
@@ -665,6 +909,10 @@ always @ (posedge clk) begin
         exec_state     <= 0;
         wb_reg         <= 0;
         ex_jump        <= 0;
+        `ifdef VIGNA_CORE_BRANCH_PREDICT
+        pred_taken_r   <= 0;
+        pred_alt       <= 0;
+        `endif
         `ifdef VIGNA_CORE_ZICSR_EXTENSION
         // Initialize CSR registers to 0  
         for (integer i = 0; i < 4096; i = i + 1) begin
@@ -699,19 +947,13 @@ always @ (posedge clk) begin
         `endif
         shift_cnt <= 0;
         l_sll_srl_sra <= 0;
-        `ifdef VIGNA_CORE_INTERRUPT
-        interrupt_taken <= 0;
-        interrupt_cause <= 0;
-        `endif
     end else begin
         `ifdef VIGNA_CORE_INTERRUPT
         // MIP is wire-driven, no need to update reg.
         
-        // Check for interrupt request during instruction fetch
-        if (exec_state == 4'b0000 && fetched && interrupt_request && !interrupt_taken) begin
-            // Take interrupt: save state and jump to handler
-            interrupt_taken <= 1;
-            mepc_r <= pc; // Save current PC
+        // Take interrupt: save state and jump to handler
+        if (interrupt_taken) begin
+            mepc_r <= pc; // Save PC of the instruction not dispatched
 
             // Update mstatus: Clear MIE (bit 3), set MPIE (bit 7) to old MIE
             mstatus_r <= (mstatus & ~32'h00000088) | ((mstatus & 32'h00000008) << 4);
@@ -719,24 +961,22 @@ always @ (posedge clk) begin
             // Determine interrupt cause and set mcause
             if (ext_irq_ready) begin
                 mcause_r <= 32'h80000000 | 32'd11; // External interrupt
-                interrupt_cause <= mtvec; // Jump to trap handler
             end else if (timer_irq_ready) begin
                 mcause_r <= 32'h80000000 | 32'd7;  // Timer interrupt
-                interrupt_cause <= mtvec; // Jump to trap handler
             end else if (soft_irq_ready) begin
                 mcause_r <= 32'h80000000 | 32'd3;  // Software interrupt
-                interrupt_cause <= mtvec; // Jump to trap handler
             end
-        end else if (interrupt_taken && fetched) begin
-            // Reset interrupt_taken after PC has been updated
-            interrupt_taken <= 0;
         end
         `endif
         
         //state machine
         case (exec_state)
             4'b0000: begin
+                `ifdef VIGNA_CORE_INTERRUPT
+                if (fetched && !interrupt_taken) begin
+                `else
                 if (fetched) begin
+                `endif
                     d1 <= op1;
                     `ifdef VIGNA_CORE_PRELOAD_NEGATIVE
                     d2 <= (is_sub ? ~op2 : op2);
@@ -770,7 +1010,15 @@ always @ (posedge clk) begin
                         wb_reg <= 0;
                     end
                     ex_branch   <= b_type;
+                    `ifdef VIGNA_CORE_INTERRUPT
+                    ex_jump     <= is_jal || is_jalr || is_mret;
+                    `else
                     ex_jump     <= is_jal || is_jalr;
+                    `endif
+                    `ifdef VIGNA_CORE_BRANCH_PREDICT
+                    pred_taken_r <= pred_taken;
+                    pred_alt     <= pred_taken ? pred_fallthrough : inst_add_result;
+                    `endif
 
                     //next state logic
                     if (is_load || s_type) begin
@@ -923,7 +1171,7 @@ always @ (posedge clk) begin
                 if (is_mret) begin
                     // Machine return: restore PC and interrupt enable
                     mstatus_r <= (mstatus & ~32'h00000088) | ((mstatus & 32'h00000080) >> 4) | 32'h00000080;
-                    ex_jump <= 1; // Jump to MEPC
+                    ex_jump <= 0; // fetch is redirected to MEPC this cycle
                 end else begin
                 `endif
                     if (wb_reg != 0) begin
@@ -991,12 +1239,115 @@ always @ (posedge clk) begin
     end
 end
 
+`ifdef VIGNA_CORE_PERF_COUNTERS
+//part3. performance counters
+wire perf_retire, perf_fetch_stall, perf_data_stall, perf_coproc_busy;
+assign perf_retire      = exec_state == 4'b0000 && fetched
+`ifdef VIGNA_CORE_INTERRUPT
+                          && !interrupt_taken
+`endif
+                          ;
+assign perf_fetch_stall = exec_state == 4'b0000 && !fetched;
+assign perf_data_stall  = d_valid && !d_ready;
+`ifdef VIGNA_CORE_M_EXTENSION
+assign perf_coproc_busy = exec_state == 4'b1001;
+`else
+assign perf_coproc_busy = 1'b0;
+`endif
+
+// CSR instructions write the counters in their 1010 cycle; like the trap
+// CSRs, csrrs/csrrc with rs1 == x0 only read
+wire perf_csr_write;
+assign perf_csr_write = exec_state == 4'b1010
+                        `ifdef VIGNA_CORE_INTERRUPT
+                        && !is_mret
+                        `endif
+                        && (is_csrrw || is_csrrwi || rs1 != 0);
+
+wire [31:0] perf_csr_wval;
+assign perf_csr_wval = (is_csrrw || is_csrrwi) ? op2 :
+                       (is_csrrs || is_csrrsi) ? op1 | op2 : op1 & ~op2;
+
+// only the machine counters are writable, the 0xCxx shadows are read-only
+wire perf_write_lo, perf_write_hi;
+assign perf_write_lo = perf_csr_write && csr_addr[11:8] == 4'hB && csr_addr[7:5] == 3'b000;
+assign perf_write_hi = perf_csr_write && csr_addr[11:8] == 4'hB && csr_addr[7:5] == 3'b100;
+
+always @ (posedge clk) begin
+    if (!resetn) begin
+        mcycle_r        <= 64'd0;
+        minstret_r      <= 64'd0;
+        mhpmcounter3_r  <= 64'd0;
+        mhpmcounter4_r  <= 64'd0;
+        mhpmcounter5_r  <= 64'd0;
+        `ifdef VIGNA_CORE_BRANCH_PREDICT
+        mhpmcounter6_r  <= 64'd0;
+        `endif
+        mcountinhibit_r <= 32'd0;
+    end else begin
+        if (!mcountinhibit_r[0])                     mcycle_r       <= mcycle_r + 1;
+        if (!mcountinhibit_r[2] && perf_retire)      minstret_r     <= minstret_r + 1;
+        if (!mcountinhibit_r[3] && perf_fetch_stall) mhpmcounter3_r <= mhpmcounter3_r + 1;
+        if (!mcountinhibit_r[4] && perf_data_stall)  mhpmcounter4_r <= mhpmcounter4_r + 1;
+        if (!mcountinhibit_r[5] && perf_coproc_busy) mhpmcounter5_r <= mhpmcounter5_r + 1;
+        `ifdef VIGNA_CORE_BRANCH_PREDICT
+        if (!mcountinhibit_r[6] && pred_miss)        mhpmcounter6_r <= mhpmcounter6_r + 1;
+        `endif
+
+        // a CSR write takes precedence over the increment in the same cycle
+        if (perf_csr_write && csr_addr == CSR_MCOUNTINHIBIT)
+            mcountinhibit_r <= perf_csr_wval & 32'hFFFF_FFFD;  // time is not inhibitable
+        if (perf_write_lo) begin
+            case (csr_addr[4:0])
+                5'd0: mcycle_r[31:0]       <= perf_csr_wval;
+                5'd2: minstret_r[31:0]     <= perf_csr_wval;
+                5'd3: mhpmcounter3_r[31:0] <= perf_csr_wval;
+                5'd4: mhpmcounter4_r[31:0] <= perf_csr_wval;
+                5'd5: mhpmcounter5_r[31:0] <= perf_csr_wval;
+                `ifdef VIGNA_CORE_BRANCH_PREDICT
+                5'd6: mhpmcounter6_r[31:0] <= perf_csr_wval;
+                `endif
+                default: ;
+            endcase
+        end
+        if (perf_write_hi) begin
+            case (csr_addr[4:0])
+                5'd0: mcycle_r[63:32]       <= perf_csr_wval;
+                5'd2: minstret_r[63:32]     <= perf_csr_wval;
+                5'd3: mhpmcounter3_r[63:32] <= perf_csr_wval;
+                5'd4: mhpmcounter4_r[63:32] <= perf_csr_wval;
+                5'd5: mhpmcounter5_r[63:32] <= perf_csr_wval;
+                `ifdef VIGNA_CORE_BRANCH_PREDICT
+                5'd6: mhpmcounter6_r[63:32] <= perf_csr_wval;
+                `endif
+                default: ;
+            endcase
+        end
+    end
+end
+`endif
+
 wire is_branch;
 assign is_branch = is_beq || is_bne || is_blt || is_bge || is_bltu || is_bgeu;
 
-assign fetch_received = (exec_state == 4'b0000 && !is_jump && !is_branch)
+//mret holds fetch until its csr cycle, which redirects it to mepc
+`ifdef VIGNA_CORE_BRANCH_PREDICT
+//jal and branches release fetch at dispatch, only jalr waits for its target
+assign fetch_received = (exec_state == 4'b0000 && !is_jalr
+                        `ifdef VIGNA_CORE_INTERRUPT
+                        && !is_mret
+                        `endif
+                        )
+                        || (exec_state == 4'b0100 && !pred_taken_r)
+`else
+assign fetch_received = (exec_state == 4'b0000 && !is_jump && !is_branch
+                        `ifdef VIGNA_CORE_INTERRUPT
+                        && !is_mret
+                        `endif
+                        )
                         || (exec_state == 4'b0100)
                         || (exec_state == 4'b1000)
+`endif
                         `ifdef VIGNA_CORE_ZICSR_EXTENSION
                         || (exec_state == 4'b1010)
                         `endif
@@ -1005,6 +1356,36 @@ assign fetch_received = (exec_state == 4'b0000 && !is_jump && !is_branch)
                         `endif
                         ;
 
+`ifdef VIGNA_CORE_BRANCH_PREDICT
+wire [31:0] pred_fallthrough;
+`ifdef VIGNA_CORE_C_EXTENSION
+assign pred_fallthrough = inst_addr + pc_increment;
+`else
+assign pred_fallthrough = inst_addr + 32'd4;
+`endif
+assign pred_taken  = is_jal || (is_branch && imm[31]);
+assign pred_target = inst_addr + imm;
+//ex_branch: the branch in execution, inst may already hold the next instruction
+assign pred_miss   = exec_state == 4'b1000 && ex_branch && dr[0] != pred_taken_r;
+`endif
+
+`ifdef VIGNA_CORE_PREFETCH
+//mret holds the queue like jalr until fetch is redirected to mepc
+`ifdef VIGNA_CORE_BRANCH_PREDICT
+assign pf_hold = fetched && (is_jalr
+                 `ifdef VIGNA_CORE_INTERRUPT
+                 || is_mret
+                 `endif
+                 );
+`else
+assign pf_hold = fetched && (is_jump || is_branch
+                 `ifdef VIGNA_CORE_INTERRUPT
+                 || is_mret
+                 `endif
+                 );
+`endif
+`endif
+
 endmodule
 
 `endif